@@ -0,0 +1,31 @@
+"""add admin pagination indexes
+
+Revision ID: 3b7e2a9c41d5
+Revises: 6f90aa21d1c0
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b7e2a9c41d5'
+down_revision: Union[str, Sequence[str], None] = '6f90aa21d1c0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Foydalanuvchilar sahifasi: ORDER BY created_at DESC LIMIT ...
+    op.create_index('ix_users_created_at', 'users', ['created_at'], unique=False)
+    # E'lonlar sahifasi: WHERE status = ... ORDER BY created_at DESC LIMIT ...
+    op.create_index('ix_listings_status_created_at', 'listings', ['status', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_listings_status_created_at', table_name='listings')
+    op.drop_index('ix_users_created_at', table_name='users')
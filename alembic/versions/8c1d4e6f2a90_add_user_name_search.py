@@ -0,0 +1,65 @@
+"""add normalized user name for admin search
+
+Revision ID: 8c1d4e6f2a90
+Revises: 3b7e2a9c41d5
+Create Date: 2026-10-19 12:40:08.511372
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.utils.helpers import normalize_name
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1d4e6f2a90'
+down_revision: Union[str, Sequence[str], None] = '3b7e2a9c41d5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('name_normalized', sa.String(length=255), nullable=True))
+
+    # SQL lower() SQLite'da faqat ASCII bilan ishlaydi, shuning uchun Python'da to'ldiramiz
+    bind = op.get_bind()
+    users = sa.table('users', sa.column('id', sa.String), sa.column('name', sa.String),
+                     sa.column('name_normalized', sa.String))
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(users.c.id, users.c.name)
+            .where(users.c.id > last_id)
+            .order_by(users.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        bind.execute(
+            users.update().where(users.c.id == sa.bindparam('user_id')).values(name_normalized=sa.bindparam('normalized')),
+            [{'user_id': row.id, 'normalized': normalize_name(row.name)} for row in rows]
+        )
+        last_id = rows[-1].id
+
+    op.create_index('ix_users_name_normalized', 'users', ['name_normalized'], unique=False)
+
+    if bind.dialect.name == 'postgresql':
+        op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        op.create_index(
+            'ix_users_name_normalized_trgm', 'users', ['name_normalized'], unique=False,
+            postgresql_using='gin', postgresql_ops={'name_normalized': 'gin_trgm_ops'}
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == 'postgresql':
+        op.drop_index('ix_users_name_normalized_trgm', table_name='users')
+    op.drop_index('ix_users_name_normalized', table_name='users')
+    op.drop_column('users', 'name_normalized')
@@ -0,0 +1,70 @@
+"""add listing text signature and duplicate reference
+
+Revision ID: a7d3f5e9b812
+Revises: e4b9c2d7a1f3
+Create Date: 2026-10-19 17:55:31.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from src.services.duplicate_service import DuplicateDetector
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a7d3f5e9b812'
+down_revision: Union[str, Sequence[str], None] = 'e4b9c2d7a1f3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.batch_alter_table('listings') as batch_op:
+        batch_op.add_column(sa.Column('text_signature', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('duplicate_of_id', sa.String(length=36), nullable=True))
+        batch_op.add_column(sa.Column('duplicate_score', sa.Float(), nullable=True))
+        batch_op.create_foreign_key(
+            'fk_listings_duplicate_of_id', 'listings', ['duplicate_of_id'], ['id'], ondelete='SET NULL'
+        )
+
+    # Mavjud e'lonlar uchun imzolar - eski e'lonlar takror deb belgilanmaydi
+    bind = op.get_bind()
+    detector = DuplicateDetector()
+    listings = sa.table('listings', sa.column('id', sa.String), sa.column('title', sa.String),
+                        sa.column('description', sa.Text), sa.column('text_signature', sa.LargeBinary))
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(listings.c.id, listings.c.title, listings.c.description)
+            .where(listings.c.id > last_id)
+            .order_by(listings.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        values = [
+            {'listing_id': row.id, 'signature': DuplicateDetector.dump(detector.signature(row.title, row.description))}
+            for row in rows
+        ]
+        values = [value for value in values if value['signature'] is not None]
+        if values:
+            bind.execute(
+                listings.update().where(listings.c.id == sa.bindparam('listing_id')).values(text_signature=sa.bindparam('signature')),
+                values
+            )
+        last_id = rows[-1].id
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('listings') as batch_op:
+        batch_op.drop_constraint('fk_listings_duplicate_of_id', type_='foreignkey')
+        batch_op.drop_column('duplicate_score')
+        batch_op.drop_column('duplicate_of_id')
+        batch_op.drop_column('text_signature')
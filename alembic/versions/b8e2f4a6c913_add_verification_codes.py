@@ -0,0 +1,39 @@
+"""add verification_codes
+
+Revision ID: b8e2f4a6c913
+Revises: f1a6b3c8d295
+Create Date: 2026-10-19 21:04:12.318406
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b8e2f4a6c913'
+down_revision: Union[str, Sequence[str], None] = 'f1a6b3c8d295'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('verification_codes',
+    sa.Column('phone', sa.String(length=20), nullable=False),
+    sa.Column('code', sa.String(length=10), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('verified', sa.Boolean(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('cooldown_until', sa.DateTime(), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('phone')
+    )
+    op.create_index(op.f('ix_verification_codes_expires_at'), 'verification_codes', ['expires_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_verification_codes_expires_at'), table_name='verification_codes')
+    op.drop_table('verification_codes')
@@ -0,0 +1,123 @@
+"""move listing media_urls into listing_media table
+
+Revision ID: c5e1a8d4f620
+Revises: a7d3f5e9b812
+Create Date: 2026-10-19 18:41:06.352907
+
+"""
+import json
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c5e1a8d4f620'
+down_revision: Union[str, Sequence[str], None] = 'a7d3f5e9b812'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BACKFILL_BATCH_SIZE = 1000
+
+# media_urls JSON havolasi kalitlari -> listing_media ustunlari
+REFERENCE_COLUMNS = (
+    'file_id', 'file_unique_id', 'thumb_file_id', 'sha256', 'thumb_sha256',
+    'path', 'size', 'width', 'height'
+)
+
+listings = sa.table('listings', sa.column('id', sa.String), sa.column('media_urls', sa.Text))
+listing_media = sa.table(
+    'listing_media',
+    sa.column('listing_id', sa.String), sa.column('position', sa.Integer),
+    sa.column('file_id', sa.String), sa.column('file_unique_id', sa.String),
+    sa.column('thumb_file_id', sa.String), sa.column('sha256', sa.String),
+    sa.column('thumb_sha256', sa.String), sa.column('path', sa.String),
+    sa.column('is_document', sa.Boolean), sa.column('size', sa.BigInteger),
+    sa.column('width', sa.Integer), sa.column('height', sa.Integer),
+)
+
+
+def _parse_media_urls(media_urls):
+    """JSON havolalar ro'yxati yoki eski vergul bilan ajratilgan fayl yo'llari"""
+    if not media_urls:
+        return []
+    try:
+        media = json.loads(media_urls)
+    except ValueError:
+        return [{'path': path.strip()} for path in media_urls.split(',') if path.strip()]
+    return [item for item in media if isinstance(item, dict)] if isinstance(media, list) else []
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('listing_media',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('listing_id', sa.String(length=36), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('file_id', sa.String(length=255), nullable=True),
+    sa.Column('file_unique_id', sa.String(length=100), nullable=True),
+    sa.Column('thumb_file_id', sa.String(length=255), nullable=True),
+    sa.Column('sha256', sa.String(length=64), nullable=True),
+    sa.Column('thumb_sha256', sa.String(length=64), nullable=True),
+    sa.Column('path', sa.String(length=500), nullable=True),
+    sa.Column('is_document', sa.Boolean(), nullable=False),
+    sa.Column('size', sa.BigInteger(), nullable=True),
+    sa.Column('width', sa.Integer(), nullable=True),
+    sa.Column('height', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_listing_media_listing_id_position', 'listing_media', ['listing_id', 'position'], unique=True)
+    op.create_index(op.f('ix_listing_media_sha256'), 'listing_media', ['sha256'], unique=False)
+
+    bind = op.get_bind()
+    last_id = ''
+    while True:
+        rows = bind.execute(
+            sa.select(listings.c.id, listings.c.media_urls)
+            .where(listings.c.id > last_id, listings.c.media_urls.isnot(None))
+            .order_by(listings.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        values = [
+            dict(
+                {column: item.get(column) for column in REFERENCE_COLUMNS},
+                listing_id=row.id, position=position, is_document=bool(item.get('document'))
+            )
+            for row in rows
+            for position, item in enumerate(_parse_media_urls(row.media_urls))
+        ]
+        if values:
+            bind.execute(listing_media.insert(), values)
+        last_id = rows[-1].id
+
+    with op.batch_alter_table('listings') as batch_op:
+        batch_op.drop_column('media_urls')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('listings') as batch_op:
+        batch_op.add_column(sa.Column('media_urls', sa.Text(), nullable=True))
+
+    bind = op.get_bind()
+    media = {}
+    for row in bind.execute(sa.select(listing_media).order_by(listing_media.c.listing_id, listing_media.c.position)):
+        reference = {column: getattr(row, column) for column in REFERENCE_COLUMNS if getattr(row, column) is not None}
+        if row.is_document:
+            reference['document'] = True
+        media.setdefault(row.listing_id, []).append(reference)
+
+    if media:
+        bind.execute(
+            listings.update().where(listings.c.id == sa.bindparam('listing_id')).values(media_urls=sa.bindparam('media')),
+            [{'listing_id': listing_id, 'media': json.dumps(references)} for listing_id, references in media.items()]
+        )
+
+    op.drop_index(op.f('ix_listing_media_sha256'), table_name='listing_media')
+    op.drop_index('ix_listing_media_listing_id_position', table_name='listing_media')
+    op.drop_table('listing_media')
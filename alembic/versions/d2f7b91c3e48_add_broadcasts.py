@@ -0,0 +1,49 @@
+"""add broadcasts and unreachable users
+
+Revision ID: d2f7b91c3e48
+Revises: 8c1d4e6f2a90
+Create Date: 2026-10-19 14:05:52.904113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd2f7b91c3e48'
+down_revision: Union[str, Sequence[str], None] = '8c1d4e6f2a90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('users', sa.Column('unreachable', sa.Boolean(), server_default=sa.false(), nullable=False))
+    op.create_table('broadcasts',
+    sa.Column('id', sa.String(length=36), nullable=False),
+    sa.Column('admin_telegram_id', sa.BigInteger(), nullable=False),
+    sa.Column('text', sa.Text(), nullable=False),
+    sa.Column('status', sa.Enum('running', 'completed', 'cancelled', name='broadcaststatus'), nullable=False),
+    sa.Column('last_telegram_user_id', sa.BigInteger(), nullable=False),
+    sa.Column('total_count', sa.Integer(), nullable=False),
+    sa.Column('sent_count', sa.Integer(), nullable=False),
+    sa.Column('failed_count', sa.Integer(), nullable=False),
+    sa.Column('unreachable_count', sa.Integer(), nullable=False),
+    sa.Column('progress_chat_id', sa.BigInteger(), nullable=True),
+    sa.Column('progress_message_id', sa.Integer(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_broadcasts_status'), 'broadcasts', ['status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_broadcasts_status'), table_name='broadcasts')
+    op.drop_table('broadcasts')
+    sa.Enum(name='broadcaststatus').drop(op.get_bind(), checkfirst=True)
+    op.drop_column('users', 'unreachable')
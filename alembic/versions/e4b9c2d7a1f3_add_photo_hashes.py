@@ -0,0 +1,50 @@
+"""add photo perceptual hashes
+
+Revision ID: e4b9c2d7a1f3
+Revises: 5a3c8e1f7b26
+Create Date: 2026-10-19 16:48:52.904716
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e4b9c2d7a1f3'
+down_revision: Union[str, Sequence[str], None] = '5a3c8e1f7b26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('photo_hashes',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('listing_id', sa.String(length=36), nullable=False),
+    sa.Column('position', sa.Integer(), nullable=False),
+    sa.Column('dhash', sa.BigInteger(), nullable=False),
+    sa.Column('band0', sa.Integer(), nullable=False),
+    sa.Column('band1', sa.Integer(), nullable=False),
+    sa.Column('band2', sa.Integer(), nullable=False),
+    sa.Column('band3', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['listing_id'], ['listings.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_photo_hashes_listing_id'), 'photo_hashes', ['listing_id'], unique=False)
+    op.create_index(op.f('ix_photo_hashes_band0'), 'photo_hashes', ['band0'], unique=False)
+    op.create_index(op.f('ix_photo_hashes_band1'), 'photo_hashes', ['band1'], unique=False)
+    op.create_index(op.f('ix_photo_hashes_band2'), 'photo_hashes', ['band2'], unique=False)
+    op.create_index(op.f('ix_photo_hashes_band3'), 'photo_hashes', ['band3'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_photo_hashes_band3'), table_name='photo_hashes')
+    op.drop_index(op.f('ix_photo_hashes_band2'), table_name='photo_hashes')
+    op.drop_index(op.f('ix_photo_hashes_band1'), table_name='photo_hashes')
+    op.drop_index(op.f('ix_photo_hashes_band0'), table_name='photo_hashes')
+    op.drop_index(op.f('ix_photo_hashes_listing_id'), table_name='photo_hashes')
+    op.drop_table('photo_hashes')
@@ -0,0 +1,27 @@
+"""index listing_media thumb_sha256 for media gc
+
+Revision ID: f1a6b3c8d295
+Revises: c5e1a8d4f620
+Create Date: 2026-10-19 19:27:44.680315
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a6b3c8d295'
+down_revision: Union[str, Sequence[str], None] = 'c5e1a8d4f620'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_listing_media_thumb_sha256'), 'listing_media', ['thumb_sha256'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_listing_media_thumb_sha256'), table_name='listing_media')
@@ -0,0 +1,107 @@
+"""
+Image Pipeline Benchmark - Turli hovuz o'lchamlarida o'tkazuvchanlik
+
+Ishlatish:
+    python -m benchmarks.bench_image_pipeline --images 48 --size 4000x3000 --workers 1 2 4
+
+Har bir hovuz o'lchami uchun rasm/soniya va event loop ning eng katta
+kechikishi (rasm qayta ishlanayotganda bot javob bera oladimi) chiqariladi.
+"""
+import argparse
+import asyncio
+import io
+import os
+import random
+import sys
+import time
+from typing import List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw
+from src.services.image_pipeline import ImagePipeline, process_image
+
+
+def make_photo(width: int, height: int, seed: int) -> bytes:
+    """Telefon rasmiga o'xshash (shovqinli, ko'p detalli) JPEG yaratish"""
+    rng = random.Random(seed)
+    image = Image.effect_noise((width, height), 48).convert('RGB')
+    draw = ImageDraw.Draw(image)
+    for _ in range(40):
+        x, y = rng.randrange(width), rng.randrange(height)
+        color = tuple(rng.randrange(256) for _ in range(3))
+        draw.rectangle([x, y, x + rng.randrange(width // 4), y + rng.randrange(height // 4)], fill=color)
+
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=92)
+    return output.getvalue()
+
+
+async def measure_loop_lag(stop: asyncio.Event, interval: float = 0.01) -> float:
+    """Event loop kechikishini o'lchash (eng katta qiymat, soniya)"""
+    worst = 0.0
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(interval)
+        worst = max(worst, time.perf_counter() - started - interval)
+    return worst
+
+
+async def run_pool(photos: List[bytes], workers: int) -> Tuple[float, float]:
+    """Bitta hovuz o'lchami uchun (rasm/soniya, loop kechikishi)"""
+    pipeline = ImagePipeline(max_workers=workers)
+    try:
+        # Jarayonlarni ishga tushirish vaqtini o'lchovdan chiqarish
+        await asyncio.gather(*(pipeline.process(photos[0]) for _ in range(workers)))
+
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        started = time.perf_counter()
+        await asyncio.gather(*(pipeline.process(photo) for photo in photos))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        return len(photos) / elapsed, await lag_task
+    finally:
+        pipeline.shutdown()
+
+
+async def run_inline(photos: List[bytes]) -> Tuple[float, float]:
+    """Taqqoslash uchun: event loop ichida to'g'ridan-to'g'ri qayta ishlash"""
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(measure_loop_lag(stop))
+    await asyncio.sleep(0)
+    started = time.perf_counter()
+    for photo in photos:
+        process_image(photo)
+        await asyncio.sleep(0)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    return len(photos) / elapsed, await lag_task
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Image pipeline throughput benchmark")
+    parser.add_argument('--images', type=int, default=24, help="Rasmlar soni")
+    parser.add_argument('--size', default='4000x3000', help="Rasm o'lchami, masalan 4000x3000")
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, os.cpu_count() or 1])
+    args = parser.parse_args()
+
+    width, height = (int(value) for value in args.size.split('x'))
+    # Bir nechta noyob rasm - qolganlari takrorlanadi (yaratish ham qimmat)
+    unique = [make_photo(width, height, seed) for seed in range(min(args.images, 4))]
+    photos = [unique[i % len(unique)] for i in range(args.images)]
+    average_kb = sum(len(photo) for photo in unique) / len(unique) / 1024
+
+    print(f"{args.images} ta rasm, {width}x{height}, o'rtacha {average_kb:.0f} KB, CPU: {os.cpu_count()}")
+    print(f"{'rejim':<12}{'rasm/s':>10}{'loop lag, ms':>16}")
+
+    rate, lag = await run_inline(photos)
+    print(f"{'inline':<12}{rate:>10.2f}{lag * 1000:>16.1f}")
+
+    for workers in sorted(set(args.workers)):
+        rate, lag = await run_pool(photos, workers)
+        print(f"{f'pool={workers}':<12}{rate:>10.2f}{lag * 1000:>16.1f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
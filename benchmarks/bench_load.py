@@ -0,0 +1,300 @@
+"""
+Load Benchmark - Virtual foydalanuvchilar bilan butun bot bo'ylab yuklama
+
+Ishlatish:
+    python -m benchmarks.bench_load --users 2000 --admins 5 --ramp 60 --duration 120 \\
+        --think 2 --api-latency 0.05 --listings 100000 --output load.json
+
+UyKelishuvBot soxta Bot API (tools/fake_bot_api.py) ga ulanadi va update lar
+Application.update_queue orqali haqiqiy botdagi kabi qayta ishlanadi.
+Virtual foydalanuvchilar --ramp soniya davomida bir tekis qo'shiladi va
+--duration tugaguncha ssenariylarni takrorlaydi:
+- e'lon joylashtirish wizard i (/start -> viloyat -> ... -> tasdiqlash)
+- qidiruv wizard i (viloyat, shahar, tur, xonalar, narx oralig'i, natijalar)
+- admin moderatsiyasi (/admin -> kutilayotgan e'lonlar -> tasdiqlash, statistika)
+
+Tugmalar bot yuborgan oxirgi klaviaturadan tanlanadi - foydalanuvchi
+faqat haqiqatan ko'rgan tugmani bosadi. Har bir update uchun navbatga
+qo'yilgandan to handler tugaguncha bo'lgan vaqt o'lchanadi; hisobotda
+yo'nalishlar (callback pattern, buyruq, matn kiritish) bo'yicha
+throughput va p50/p95/p99 chiqadi.
+
+Baza standart holatda vaqtinchalik SQLite; --listings bilan oldindan
+benchmarks.datagen ma'lumotlari yoziladi (qidiruv natijali bo'lishi uchun).
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List, Any, Tuple, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Virtual foydalanuvchilar Telegram ID lari (datagen foydalanuvchilari bilan to'qnashmaydi)
+BASE_USER_ID = 900_000_000
+
+# (turi, qiymat, yorliq): command - buyruq, text - matn, click - tugma prefiksi
+Step = Tuple[str, Any, str]
+
+
+def listing_wizard(rng: random.Random) -> List[Step]:
+    """E'lon joylashtirish"""
+    rooms_price = rng.randint(150, 1500)
+    return [
+        ('command', "/start", "start"),
+        ('click', "POST_LISTING", ""),
+        ('click', "LISTING_REGION:", ""),
+        ('click', "LISTING_CITY:", ""),
+        ('click', "LISTING_TYPE:", ""),
+        # Faqat ijara uchun so'raladi - klaviaturada bo'lmasa o'tkazib yuboriladi
+        ('click', "LISTING_PROPERTY_TYPE:", ""),
+        ('click', "LISTING_ROOMS:", ""),
+        ('click', "LISTING_CURRENCY:USD", ""),
+        ('click', "LISTING_FURNISHED:", ""),
+        ('click', "LISTING_PETS:", ""),
+        ('text', str(rooms_price), "price"),
+        ('text', f"{rng.randint(1, 5)} xonali kvartira, yaxshi ta'mirlangan", "title"),
+        ('click', "LISTING_SKIP_DESCRIPTION", ""),
+        ('click', "LISTING_PHOTOS_DONE", ""),
+        ('click', "LISTING_SUBMIT", ""),
+        ('click', "CONFIRM_LISTING", ""),
+    ]
+
+
+def search_wizard(rng: random.Random) -> List[Step]:
+    """Qidiruv"""
+    steps = [
+        ('command', "/start", "start"),
+        ('click', "SEARCH_LISTINGS", ""),
+        ('click', "SEARCH_REGION:", ""),
+        ('click', "SEARCH_CITY:", ""),
+        ('click', "SEARCH_TYPE:", ""),
+        ('click', "SEARCH_PROPERTY_TYPE:", ""),
+        ('click', "SEARCH_ROOMS:", ""),
+    ]
+    if rng.random() < 0.5:
+        low = rng.choice([100, 200, 300, 500])
+        steps += [('click', "SEARCH_PRICE:custom", ""), ('text', f"{low}-{low * 3}", "price_range")]
+    steps += [('click', "SEARCH_EXECUTE", ""), ('click', "SEARCH_PAGE:", "")]
+    return steps
+
+
+def admin_moderation(rng: random.Random) -> List[Step]:
+    """Admin: kutilayotgan e'lonni tasdiqlash va statistika"""
+    return [
+        ('command', "/admin", "admin"),
+        ('click', "ADMIN_PENDING_LISTINGS", ""),
+        ('click', "ADMIN_APPROVE:", ""),
+        ('command', "/admin", "admin"),
+        ('click', "ADMIN_STATISTICS", ""),
+    ]
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank persentil (tartiblangan ro'yxat)"""
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class LoadStats:
+    """Yo'nalishlar bo'yicha kechikishlar"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.timeouts: Dict[str, int] = defaultdict(int)
+        self.completed_at: List[float] = []
+        self.skipped = 0
+        self.scenarios: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, latency: float, at: float) -> None:
+        self.latencies[route].append(latency)
+        self.completed_at.append(at)
+
+    @staticmethod
+    def _summary(samples: List[float], elapsed: float) -> Dict[str, Any]:
+        ordered = sorted(samples)
+        return {
+            'count': len(ordered),
+            'throughput_per_s': round(len(ordered) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+            'max_ms': round(ordered[-1] * 1000, 2)
+        }
+
+    def report(self, elapsed: float) -> Dict[str, Any]:
+        everything = [value for samples in self.latencies.values() for value in samples]
+        timeline = defaultdict(int)
+        for at in self.completed_at:
+            timeline[int(at)] += 1
+        return {
+            'total': self._summary(everything, elapsed) if everything else {'count': 0},
+            'routes': {
+                route: self._summary(samples, elapsed)
+                for route, samples in sorted(self.latencies.items())
+            },
+            'timeouts': dict(self.timeouts),
+            'skipped_steps': self.skipped,
+            'scenarios': dict(self.scenarios),
+            # Har soniyada tugagan update lar - ramp davomida to'yinish nuqtasi ko'rinadi
+            'timeline': [timeline.get(second, 0) for second in range(int(elapsed) + 1)]
+        }
+
+
+async def virtual_user(harness, route_of: Callable[[str], str], index: int, is_admin: bool,
+                       args: argparse.Namespace, stats: LoadStats, started: float, deadline: float) -> None:
+    """Bitta foydalanuvchi: ramp bo'yicha kirib, muddat tugaguncha ssenariylarni bajaradi"""
+    rng = random.Random(args.seed * 1_000_003 + index)
+    await asyncio.sleep(args.ramp * index / max(1, args.users))
+    user = harness.user(BASE_USER_ID + index, f"Virtual {index}")
+
+    while time.monotonic() < deadline:
+        if is_admin:
+            name, scenario = "admin", admin_moderation
+        elif rng.random() < args.listing_share:
+            name, scenario = "listing", listing_wizard
+        else:
+            name, scenario = "search", search_wizard
+        stats.scenarios[name] += 1
+
+        for kind, value, label in scenario(rng):
+            if time.monotonic() >= deadline:
+                return
+            if kind == 'click':
+                choices = [data for data in harness.api.buttons(user['id']) if data.startswith(value)]
+                if not choices:
+                    stats.skipped += 1
+                    continue
+                data = rng.choice(choices)
+                update, route = harness.callback_update(user, data), route_of(data)
+            elif kind == 'command':
+                update, route = harness.message_update(user, value), f"/{label}"
+            else:
+                update, route = harness.message_update(user, value), f"text:{label}"
+
+            try:
+                latency = await harness.feed(update)
+                stats.record(route, latency, time.monotonic() - started)
+            except asyncio.TimeoutError:
+                stats.timeouts[route] += 1
+
+            if args.think:
+                await asyncio.sleep(rng.expovariate(1 / args.think))
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    # Bot moduli import qilinishidan oldin sozlamalar
+    from src.database.database import init_db, close_db, engine
+    from src.utils.metrics import callback_route
+    from benchmarks.datagen import DataGenerator
+    from tools.bot_harness import BotHarness
+    from tools.fake_bot_api import FakeBotAPI
+
+    await init_db()
+    if args.listings:
+        print(f"Seeding {args.listings} listings ...", flush=True)
+        await DataGenerator(args.listings, seed=args.seed).populate(engine)
+
+    api = FakeBotAPI(latency=args.api_latency, jitter=args.api_latency / 2, seed=args.seed)
+    harness = BotHarness(api, concurrent_updates=args.concurrent_updates,
+                         timeout=args.timeout, network=args.network)
+    stats = LoadStats()
+
+    def route_of(data: str) -> str:
+        return f"callback:{callback_route(data)}"
+
+    await harness.start()
+    try:
+        print(f"{args.users} users ({args.admins} admins), ramp {args.ramp}s, duration {args.duration}s", flush=True)
+        started = time.monotonic()
+        deadline = started + args.duration
+        await asyncio.gather(*(
+            virtual_user(harness, route_of, index, index < args.admins, args, stats, started, deadline)
+            for index in range(args.users)
+        ))
+        elapsed = time.monotonic() - started
+    finally:
+        await harness.stop()
+        await close_db()
+
+    return {
+        'meta': {
+            'users': args.users,
+            'admins': args.admins,
+            'ramp_seconds': args.ramp,
+            'duration_seconds': args.duration,
+            'think_seconds': args.think,
+            'api_latency_seconds': args.api_latency,
+            'concurrent_updates': args.concurrent_updates,
+            'network': args.network,
+            'seeded_listings': args.listings,
+            'database': engine.dialect.name,
+            'seed': args.seed
+        },
+        **stats.report(elapsed),
+        'handler_errors': harness.errors,
+        'bot_api_calls': dict(api.calls),
+        'bot_api_errors': {f"{method}:{code}": count for (method, code), count in api.errors.items()}
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    total = report['total']
+    if not total.get('count'):
+        print("No updates completed")
+        return
+    print(f"\n{total['count']} updates, {total['throughput_per_s']} updates/s, "
+          f"p50 {total['p50_ms']} ms, p95 {total['p95_ms']} ms, p99 {total['p99_ms']} ms")
+    print(f"{'route':40s} {'count':>7s} {'rps':>8s} {'p50':>9s} {'p95':>9s} {'p99':>9s}")
+    for route, stats in report['routes'].items():
+        print(f"{route:40s} {stats['count']:>7d} {stats['throughput_per_s']:>8.2f} "
+              f"{stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} {stats['p99_ms']:>9.2f}")
+    if report['timeouts']:
+        print(f"timeouts: {report['timeouts']}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="End-to-end load test against a fake Bot API")
+    parser.add_argument('--users', type=int, default=500, help="Virtual foydalanuvchilar soni")
+    parser.add_argument('--admins', type=int, default=2, help="Ulardan nechtasi admin")
+    parser.add_argument('--ramp', type=float, default=30.0, help="Barcha foydalanuvchilar qo'shilish vaqti (s)")
+    parser.add_argument('--duration', type=float, default=60.0, help="Umumiy davomiylik (s)")
+    parser.add_argument('--think', type=float, default=1.0, help="Qadamlar orasidagi o'rtacha pauza (s)")
+    parser.add_argument('--listing-share', type=float, default=0.3, help="E'lon joylashtiruvchi ssenariy ulushi")
+    parser.add_argument('--api-latency', type=float, default=0.03, help="Soxta Bot API kechikishi (s)")
+    parser.add_argument('--concurrent-updates', type=int, default=0,
+                        help="PTB concurrent_updates (0 - ketma-ket, production dagi kabi)")
+    parser.add_argument('--network', action='store_true',
+                        help="Soxta Bot API ga HTTP orqali ulanish (tarmoq yo'li bilan)")
+    parser.add_argument('--listings', type=int, default=10000, help="Oldindan yoziladigan e'lonlar")
+    parser.add_argument('--database-url', default=None, help="Async URL (standart: vaqtinchalik SQLite)")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Bitta update uchun maksimal kutish (s)")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--output', default=None, help="JSON hisobot fayli")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        os.environ['DATABASE_URL'] = args.database_url or f"sqlite+aiosqlite:///{os.path.join(directory, 'load.db')}"
+        os.environ['ADMIN_IDS'] = ','.join(str(BASE_USER_ID + index) for index in range(args.admins)) or "0"
+        os.environ.setdefault('DEBUG', 'false')
+        os.environ.setdefault('HTTP_PORT', '0')
+        logging.basicConfig(level=logging.WARNING)
+
+        args.concurrent_updates = args.concurrent_updates or False
+        report = asyncio.run(run(args))
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+"""
+Media I/O Benchmark - Parallel yuklashlarda event loop kechikishi
+
+Ishlatish:
+    python -m benchmarks.bench_media_io --uploads 50 --size 2000000 --latency 0.02
+
+Har bir yuklash omborga yozish, hajm/tur tekshiruvi va eski faylni
+o'chirishdan iborat. Sekin diskni taqlid qilish uchun os.stat, os.remove,
+os.replace va fayl yozish har bir chaqiruvda --latency soniya kutadi.
+Ikki holat solishtiriladi: fayl operatsiyalari event loop ichida (eski
+usul) va async_fs hovuzi orqali.
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.database.models import Base
+from src.services.media_service import MediaService, MEDIA_MODE_LOCAL
+from src.services.media_store import ContentAddressedStore, LocalMediaBackend, HashingWriter, blob_key
+from src.utils import async_fs
+from src.utils.validators import IMAGE_HEADER_SIZE, validate_image_file
+
+from benchmarks.bench_image_pipeline import measure_loop_lag
+
+JPEG_HEADER = b"\xff\xd8\xff\xe0\x00\x10JFIF\x00"
+
+
+def slow_disk(latency: float) -> None:
+    """Fayl tizimi chaqiruvlarini sekinlashtirish"""
+    for name in ('stat', 'remove', 'replace'):
+        original = getattr(os, name)
+
+        def slowed(*args, _original=original, **kwargs):
+            time.sleep(latency)
+            return _original(*args, **kwargs)
+
+        setattr(os, name, slowed)
+
+    original_write = HashingWriter.write
+
+    def slow_write(self, data):
+        time.sleep(latency)
+        return original_write(self, data)
+
+    HashingWriter.write = slow_write
+
+
+def blocking_upload(root: str, index: int, data: bytes) -> None:
+    """Eski usul: barcha fayl operatsiyalari event loop ichida"""
+    os.makedirs(root, exist_ok=True)
+    path = os.path.join(root, f"{index}.jpg")
+    with open(path, 'wb') as file:
+        HashingWriter(file, images_only=True).write(data)
+
+    if os.path.exists(path) and os.path.getsize(path) <= 20 * 1024 * 1024:
+        with open(path, 'rb') as file:
+            validate_image_file(file.read(IMAGE_HEADER_SIZE), path)
+    if os.path.exists(path):
+        os.remove(path)
+
+
+async def pooled_upload(service: MediaService, root: str, index: int, data: bytes) -> None:
+    """Yangi usul: ombor, tekshiruv va tozalash async_fs orqali"""
+    sha256 = await service.store.save_bytes(data)
+    await async_fs.makedirs(root)
+    path = os.path.join(root, f"{index}.jpg")
+    await async_fs.run(shutil.copyfile, service.store.backend.path(blob_key(sha256)), path)
+    await service.validate_media(path)
+    await service.cleanup_media(path)
+
+
+async def run(mode: str, uploads: int, size: int) -> Tuple[float, float]:
+    """Bitta rejim uchun (umumiy vaqt, eng katta loop kechikishi)"""
+    root = tempfile.mkdtemp(prefix=f"bench-media-{mode}-")
+    engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(root, 'bench.db')}")
+    async with engine.begin() as connection:
+        await connection.run_sync(Base.metadata.create_all)
+
+    service = MediaService(MEDIA_MODE_LOCAL)
+    service._store = ContentAddressedStore(
+        LocalMediaBackend(os.path.join(root, "media")),
+        async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+    )
+    # Har bir yuklash alohida fayl - deduplikatsiya natijani buzmasin
+    payloads = [JPEG_HEADER + index.to_bytes(4, 'big') + b"\x00" * size for index in range(uploads)]
+
+    async def blocking(index: int) -> None:
+        await asyncio.sleep(0)
+        blocking_upload(os.path.join(root, "legacy"), index, payloads[index])
+
+    try:
+        stop = asyncio.Event()
+        lag_task = asyncio.create_task(measure_loop_lag(stop))
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        if mode == 'blocking':
+            await asyncio.gather(*(blocking(index) for index in range(uploads)))
+        else:
+            await asyncio.gather(*(
+                pooled_upload(service, os.path.join(root, "uploads"), index, payloads[index])
+                for index in range(uploads)
+            ))
+        elapsed = time.perf_counter() - started
+        stop.set()
+        return elapsed, await lag_task
+    finally:
+        await engine.dispose()
+        shutil.rmtree(root, ignore_errors=True)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Media filesystem event loop lag benchmark")
+    parser.add_argument('--uploads', type=int, default=50, help="Parallel yuklashlar soni")
+    parser.add_argument('--size', type=int, default=2_000_000, help="Fayl hajmi (bayt)")
+    parser.add_argument('--latency', type=float, default=0.02, help="Har bir fayl operatsiyasi kechikishi (s)")
+    args = parser.parse_args()
+
+    slow_disk(args.latency)
+
+    print(f"{args.uploads} uploads x {args.size} bytes, {args.latency * 1000:.0f} ms per fs call")
+    print(f"{'mode':>10} {'total s':>10} {'max loop lag ms':>16}")
+    for mode in ('blocking', 'async_fs'):
+        elapsed, lag = await run(mode, args.uploads, args.size)
+        print(f"{mode:>10} {elapsed:>10.2f} {lag * 1000:>16.1f}")
+
+    async_fs.shutdown()
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
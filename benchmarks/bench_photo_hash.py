@@ -0,0 +1,89 @@
+"""
+Photo Hash Benchmark - O'xshash rasm qidiruvi tezligi
+
+Ishlatish:
+    python -m benchmarks.bench_photo_hash --photos 1000000 --queries 200
+
+Vaqtinchalik SQLite bazaga tasodifiy hashlar yoziladi va har bir so'rov
+uchun find_similar ning o'rtacha va p99 vaqti, nomzodlar soni chiqariladi.
+"""
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert, text
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from src.database.models import Base, PhotoHash
+from src.services.photo_hash_service import PhotoHashService, split_bands, to_signed
+
+INSERT_BATCH_SIZE = 20000
+
+
+async def populate(engine, photos: int, rng: random.Random) -> list:
+    """Jadvalni tasodifiy hashlar bilan to'ldirish"""
+    hashes = []
+    async with engine.begin() as conn:
+        # FK tekshirilmaydi - e'lonlar jadvali kerak emas
+        await conn.execute(text("PRAGMA foreign_keys=OFF"))
+        for start in range(0, photos, INSERT_BATCH_SIZE):
+            rows = []
+            for index in range(start, min(photos, start + INSERT_BATCH_SIZE)):
+                value = rng.getrandbits(64)
+                hashes.append(value)
+                bands = split_bands(value)
+                rows.append({
+                    'listing_id': f"{index // 5:036d}", 'position': index % 5, 'dhash': to_signed(value),
+                    'band0': bands[0], 'band1': bands[1], 'band2': bands[2], 'band3': bands[3]
+                })
+            await conn.execute(insert(PhotoHash), rows)
+    return hashes
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Photo hash lookup benchmark")
+    parser.add_argument('--photos', type=int, default=200000, help="Bazadagi rasmlar soni")
+    parser.add_argument('--queries', type=int, default=200, help="So'rovlar soni")
+    parser.add_argument('--distance', type=int, default=7, help="Hamming masofasi chegarasi")
+    args = parser.parse_args()
+
+    rng = random.Random(1)
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{os.path.join(directory, 'bench.db')}")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all, tables=[PhotoHash.__table__])
+
+        started = time.perf_counter()
+        hashes = await populate(engine, args.photos, rng)
+        print(f"{args.photos} ta hash yozildi: {time.perf_counter() - started:.1f} s")
+
+        timings, candidates = [], []
+        async with AsyncSession(engine) as db:
+            service = PhotoHashService(db)
+            for _ in range(args.queries):
+                # Mavjud rasmning biroz o'zgargan nusxasi
+                query = hashes[rng.randrange(len(hashes))]
+                for position in rng.sample(range(64), rng.randint(0, args.distance)):
+                    query ^= 1 << position
+
+                started = time.perf_counter()
+                matches = await service.find_similar(query, args.distance)
+                timings.append(time.perf_counter() - started)
+                candidates.append(len(matches))
+
+        await engine.dispose()
+
+    timings.sort()
+    p99 = timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+    print(f"o'rtacha: {statistics.mean(timings) * 1000:.2f} ms, p99: {p99 * 1000:.2f} ms, "
+          f"o'rtacha topilgan: {statistics.mean(candidates):.2f}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,370 @@
+"""
+Replay Benchmark - Yozib olingan update oqimini botga qayta berish
+
+Ishlatish:
+    python -m benchmarks.bench_replay updates.jsonl.gz --snapshot snapshot.db --speed 1 --output before.json
+    python -m benchmarks.bench_replay updates.jsonl.gz --snapshot snapshot.db --speed 10 \\
+        --salt "$UPDATE_RECORDING_SALT" --anonymize-snapshot --admin-ids 924016177 --output after.json
+    python -m benchmarks.bench_replay --compare before.json after.json
+
+Yozuv UPDATE_RECORDING_PATH bilan olinadi (src/utils/update_recorder.py).
+Update lar asl vaqt oraliqlari bilan (--speed marta tezlashtirib; 0 - kutmasdan,
+ketma-ket) tools/bot_harness.py orqali soxta Bot API ga ulangan botga beriladi.
+
+Baza: --snapshot SQLite fayli vaqtinchalik nusxada ishlatiladi (asl fayl
+o'zgarmaydi) yoki --database-url (Postgres - oldindan tiklangan snapshot).
+Yozuvdagi foydalanuvchi ID lari psevdonim - snapshot dagi foydalanuvchilar
+bilan mos kelishi uchun --anonymize-snapshot ularni yozuvdagi kalit (--salt)
+bilan xuddi shunday almashtiradi; --admin-ids asl admin ID larini
+psevdonimga aylantirib ADMIN_IDS ga qo'yadi.
+
+Har bir update uchun navbatdan handler oxirigacha bo'lgan kechikish, SQL
+so'rovlar va Bot API chaqiruvlari soni tracing span laridan olinadi.
+Hisobot yo'nalishlar (buyruq, callback pattern, matn, media) bo'yicha;
+--compare ikki hisobotning p50 va update ga to'g'ri keladigan so'rovlarini
+yonma-yon chiqaradi.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Optional, Dict, List, Any, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings ga tegmaydigan modullar; bot modullari main() sozlagandan keyin import qilinadi
+from src.utils.update_recorder import pseudonym, fake_phone, read_recording
+from tools.fake_bot_api import FakeBotAPI, default_file
+
+REPORT_VERSION = 1
+
+
+def percentile(ordered: List[float], fraction: float) -> float:
+    """Nearest-rank persentil (tartiblangan ro'yxat)"""
+    index = max(0, min(len(ordered) - 1, int(round(fraction * len(ordered))) - 1))
+    return ordered[index]
+
+
+class ReplayExporter:
+    """
+    Span larni update bo'yicha sanovchi exporter
+
+    Bola span lar (SQL, Bot API) ildizdan oldin yopiladi - ular trace bo'yicha
+    yig'iladi va ildiz yopilganda update_id ga o'tkaziladi.
+    """
+
+    def __init__(self):
+        self._traces: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.updates: Dict[int, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+
+    def export(self, span) -> None:
+        if span.parent_id is not None:
+            kind = span.name.split(' ', 1)[0]
+            self._traces[span.trace_id][kind] += 1
+            return
+        counts = self._traces.pop(span.trace_id, {})
+        update_id = span.attributes.get('telegram.update_id')
+        if update_id is not None:
+            for kind, count in counts.items():
+                self.updates[update_id][kind] += count
+
+    def pop(self, update_id: int) -> Dict[str, int]:
+        return self.updates.pop(update_id, {})
+
+
+def route_of(update: Dict[str, Any], callback_route) -> str:
+    """Update yo'nalishi: buyruq, callback pattern, matn yoki media"""
+    if 'callback_query' in update:
+        return f"callback:{callback_route(update['callback_query'].get('data'))}"
+    message = update.get('message') or update.get('edited_message')
+    if message is None:
+        return "other"
+    text = message.get('text')
+    if text is not None:
+        return text.split()[0].split('@')[0] if text.startswith('/') else "text"
+    if 'photo' in message or 'document' in message:
+        return "media"
+    if 'contact' in message:
+        return "contact"
+    return "other"
+
+
+def prepare(harness, update: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Yozilgan update ni soxta Bot API holatiga moslash
+
+    Xabar ID lari soxta API da qaytadan beriladi, callback esa foydalanuvchi
+    ko'rgan oxirgi klaviaturali xabarga bog'lanadi; yozuvdagi fayl ID lari
+    yuklab olinadigan bo'ladi.
+    """
+    api = harness.api
+    prepared = {'update_id': harness.next_update_id()}
+    if 'callback_query' in update:
+        query = dict(update['callback_query'])
+        message = api.last_bot_message(query['from']['id'], with_keyboard=True)
+        if message is not None:
+            query['message'] = message
+        prepared['callback_query'] = query
+        return prepared
+
+    for key in ('message', 'edited_message'):
+        if key in update:
+            fields = {
+                name: value for name, value in update[key].items()
+                if name not in ('message_id', 'date', 'chat', 'from', 'text')
+            }
+            file_ids = [photo['file_id'] for photo in fields.get('photo', [])]
+            if fields.get('document'):
+                file_ids.append(fields['document']['file_id'])
+            for file_id in file_ids:
+                if file_id not in api.files:
+                    api.files[file_id] = default_file()
+            user = update[key].get('from') or {'id': update[key]['chat']['id'], 'first_name': "Foydalanuvchi"}
+            prepared[key] = api.user_message(user, update[key].get('text'), **fields)
+            return prepared
+
+    return {**update, **prepared}
+
+
+async def anonymize_snapshot(engine, salt: str) -> int:
+    """Snapshot dagi foydalanuvchilarni yozuvdagi kabi psevdonimlash"""
+    from sqlalchemy import select, update
+    from src.database.models import User
+
+    async with engine.begin() as conn:
+        rows = (await conn.execute(select(User.id, User.telegram_user_id))).all()
+        for user_id, telegram_id in rows:
+            await conn.execute(
+                update(User).where(User.id == user_id).values(
+                    telegram_user_id=pseudonym(telegram_id, salt),
+                    name="Foydalanuvchi",
+                    name_normalized="foydalanuvchi",
+                    phone_number=fake_phone(telegram_id, salt)
+                )
+            )
+    return len(rows)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class ReplayStats:
+    """Yo'nalishlar bo'yicha kechikish va so'rovlar"""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.queries: Dict[str, List[int]] = defaultdict(list)
+        self.api_calls: Dict[str, List[int]] = defaultdict(list)
+        self.timeouts: Dict[str, int] = defaultdict(int)
+
+    def record(self, route: str, latency: float, counts: Dict[str, int]) -> None:
+        self.latencies[route].append(latency)
+        self.queries[route].append(counts.get('db', 0))
+        self.api_calls[route].append(counts.get('telegram', 0))
+
+    def _summary(self, latencies: List[float], queries: List[int], api_calls: List[int]) -> Dict[str, Any]:
+        ordered = sorted(latencies)
+        return {
+            'count': len(ordered),
+            'p50_ms': round(percentile(ordered, 0.50) * 1000, 2),
+            'p95_ms': round(percentile(ordered, 0.95) * 1000, 2),
+            'p99_ms': round(percentile(ordered, 0.99) * 1000, 2),
+            'max_ms': round(ordered[-1] * 1000, 2),
+            'queries_per_update': round(sum(queries) / len(queries), 2),
+            'max_queries': max(queries),
+            'api_calls_per_update': round(sum(api_calls) / len(api_calls), 2)
+        }
+
+    def report(self) -> Dict[str, Any]:
+        routes = {
+            route: self._summary(self.latencies[route], self.queries[route], self.api_calls[route])
+            for route in sorted(self.latencies)
+        }
+        everything = [value for values in self.latencies.values() for value in values]
+        total = self._summary(
+            everything,
+            [value for values in self.queries.values() for value in values],
+            [value for values in self.api_calls.values() for value in values]
+        ) if everything else {'count': 0}
+        return {'total': total, 'routes': routes, 'timeouts': dict(self.timeouts)}
+
+
+async def replay(args: argparse.Namespace) -> Dict[str, Any]:
+    # Bot moduli import qilinishidan oldin sozlamalar (main() da)
+    from src.database.database import init_db, close_db, engine
+    from src.utils.metrics import callback_route
+    from src.utils.tracing import TRACER
+    from tools.bot_harness import BotHarness
+
+    await init_db()
+    if args.anonymize_snapshot:
+        anonymized = await anonymize_snapshot(engine, args.salt)
+        print(f"Anonymized {anonymized} snapshot users", flush=True)
+
+    records: List[Tuple[float, Dict[str, Any]]] = list(read_recording(args.recording))
+    if args.limit:
+        records = records[:args.limit]
+
+    exporter = ReplayExporter()
+    TRACER.configure(exporter, 1.0)
+    api = FakeBotAPI(latency=args.api_latency, jitter=args.api_latency / 2)
+    harness = BotHarness(api, concurrent_updates=args.concurrent_updates,
+                         timeout=args.timeout, network=args.network)
+    stats = ReplayStats()
+
+    async def play(update: Dict[str, Any]) -> None:
+        route = route_of(update, callback_route)
+        prepared = prepare(harness, update)
+        try:
+            latency = await harness.feed(prepared)
+        except asyncio.TimeoutError:
+            stats.timeouts[route] += 1
+            return
+        stats.record(route, latency, exporter.pop(prepared['update_id']))
+
+    await harness.start()
+    try:
+        print(f"Replaying {len(records)} updates at {args.speed or 'max'}x", flush=True)
+        started = time.monotonic()
+        tasks = []
+        for offset, update in records:
+            if not args.speed:
+                await play(update)
+                continue
+            # Asl oraliqlar saqlanadi; bot ortda qolsa update lar navbatda kutadi
+            delay = started + offset / args.speed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.create_task(play(update)))
+        await asyncio.gather(*tasks)
+        elapsed = time.monotonic() - started
+    finally:
+        await harness.stop()
+        TRACER.configure(None)
+        await close_db()
+
+    return {
+        'version': REPORT_VERSION,
+        'meta': {
+            'recording': os.path.basename(args.recording),
+            'updates': len(records),
+            'recorded_seconds': round(records[-1][0], 2) if records else 0,
+            'speed': args.speed,
+            'elapsed_seconds': round(elapsed, 2),
+            'api_latency_seconds': args.api_latency,
+            'concurrent_updates': args.concurrent_updates,
+            'network': args.network,
+            'database': engine.dialect.name,
+            'commit': _git_commit(),
+            'python': platform.python_version()
+        },
+        **stats.report(),
+        'handler_errors': harness.errors,
+        'bot_api_calls': dict(api.calls),
+        'bot_api_errors': {f"{method}:{code}": count for (method, code), count in api.errors.items()}
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    total = report['total']
+    if not total.get('count'):
+        print("No updates replayed")
+        return
+    print(f"\n{total['count']} updates in {report['meta']['elapsed_seconds']} s, p50 {total['p50_ms']} ms, "
+          f"p99 {total['p99_ms']} ms, {total['queries_per_update']} queries/update")
+    print(f"{'route':40s} {'count':>7s} {'p50':>9s} {'p95':>9s} {'p99':>9s} {'queries':>8s} {'api':>6s}")
+    for route, stats in report['routes'].items():
+        print(f"{route:40s} {stats['count']:>7d} {stats['p50_ms']:>9.2f} {stats['p95_ms']:>9.2f} "
+              f"{stats['p99_ms']:>9.2f} {stats['queries_per_update']:>8.2f} {stats['api_calls_per_update']:>6.2f}")
+    if report['timeouts']:
+        print(f"timeouts: {report['timeouts']}")
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Ikki hisobotning p50 va so'rovlar sonini solishtirish"""
+    with open(before_path) as file:
+        before = json.load(file)
+    with open(after_path) as file:
+        after = json.load(file)
+
+    print(f"before: {before['meta']['commit']}  after: {after['meta']['commit']}  "
+          f"({after['meta']['recording']}, {after['meta']['updates']} updates)")
+    for route, stats in after['routes'].items():
+        old = before['routes'].get(route)
+        if old is None:
+            continue
+        print(f"{route:40s} p50 {old['p50_ms']:>9.2f} -> {stats['p50_ms']:>9.2f} ms  "
+              f"queries {old['queries_per_update']:>6.2f} -> {stats['queries_per_update']:>6.2f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay a recorded update stream against a fake Bot API")
+    parser.add_argument('recording', nargs='?', help="UPDATE_RECORDING_PATH fayli (.jsonl.gz)")
+    parser.add_argument('--speed', type=float, default=1.0, help="Tezlashtirish (1 - asl tezlik, 0 - kutmasdan)")
+    parser.add_argument('--snapshot', default=None, help="SQLite snapshot (vaqtinchalik nusxasi ishlatiladi)")
+    parser.add_argument('--database-url', default=None, help="Async URL (Postgres snapshot)")
+    parser.add_argument('--salt', default="", help="Yozuvdagi UPDATE_RECORDING_SALT")
+    parser.add_argument('--anonymize-snapshot', action='store_true', help="Snapshot foydalanuvchilarini psevdonimlash")
+    parser.add_argument('--admin-ids', default="", help="Asl admin Telegram ID lari (vergul bilan)")
+    parser.add_argument('--api-latency', type=float, default=0.03, help="Soxta Bot API kechikishi (s)")
+    parser.add_argument('--concurrent-updates', type=int, default=0,
+                        help="PTB concurrent_updates (0 - ketma-ket, production dagi kabi)")
+    parser.add_argument('--network', action='store_true',
+                        help="Soxta Bot API ga HTTP orqali ulanish (tarmoq yo'li bilan)")
+    parser.add_argument('--limit', type=int, default=0, help="Faqat birinchi N ta update")
+    parser.add_argument('--timeout', type=float, default=60.0, help="Bitta update uchun maksimal kutish (s)")
+    parser.add_argument('--output', default=None, help="JSON hisobot fayli")
+    parser.add_argument('--compare', nargs=2, metavar=('BEFORE', 'AFTER'), help="Ikki hisobotni solishtirish")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+    if not args.recording:
+        parser.error("recording is required")
+    if (args.anonymize_snapshot or args.admin_ids) and not args.salt:
+        parser.error("--salt is required to match recorded pseudonyms")
+
+    with tempfile.TemporaryDirectory() as directory:
+        if args.database_url:
+            os.environ['DATABASE_URL'] = args.database_url
+        else:
+            path = os.path.join(directory, 'replay.db')
+            if args.snapshot:
+                shutil.copyfile(args.snapshot, path)
+            os.environ['DATABASE_URL'] = f"sqlite+aiosqlite:///{path}"
+        admin_ids = [pseudonym(int(value), args.salt) for value in args.admin_ids.split(',') if value.strip()]
+        os.environ['ADMIN_IDS'] = ','.join(str(value) for value in admin_ids) or "0"
+        # SQL span lari engine ga faqat shu sozlama bilan ulanadi
+        os.environ['TRACING_ENABLED'] = 'true'
+        os.environ['UPDATE_RECORDING_PATH'] = ''
+        os.environ.setdefault('DEBUG', 'false')
+        os.environ.setdefault('HTTP_PORT', '0')
+        logging.basicConfig(level=logging.WARNING)
+
+        args.concurrent_updates = args.concurrent_updates or False
+        report = asyncio.run(replay(args))
+
+    print_report(report)
+    if args.output:
+        with open(args.output, 'w') as file:
+            json.dump(report, file, indent=2)
+        print(f"Report written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
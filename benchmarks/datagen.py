@@ -0,0 +1,183 @@
+"""
+Benchmark Data Generator - Deterministik sintetik foydalanuvchi va e'lonlar
+
+Bir xil seed va hajm har safar aynan bir xil ma'lumot beradi - turli
+commit lar yoki bazalar (SQLite/Postgres) natijalarini solishtirish mumkin.
+
+Taqsimotlar haqiqiy botga yaqin:
+- viloyatlar: Toshkent shahri eng ko'p, keyin Toshkent viloyati va Samarqand;
+  viloyat ichida markaziy shahar ko'proq
+- e'lonlar egalari: oz sonli "agent" lar ko'p e'lon beradi (egri taqsimot)
+- narx: turi (ijara/sotuv), xonalar soni va viloyatga bog'liq log-normal
+- holatlar: ko'pchiligi approved, qolgani pending/rejected/archived
+"""
+import math
+import random
+import uuid
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Iterator, Tuple
+from sqlalchemy import insert
+from src.config import REGIONS, CITIES_BY_REGION
+from src.database.models import User, Listing, ListingType, PropertyType, ListingStatus
+
+# Boshqa viloyatlar 1.0 vazn oladi
+REGION_WEIGHTS = {"14": 12.0, "13": 3.0, "10": 2.5, "03": 1.8, "01": 1.6, "06": 1.5}
+# Narx ko'paytiruvchisi (Toshkent qimmatroq)
+REGION_PRICE_FACTOR = {"14": 1.6, "13": 1.15, "10": 1.05}
+
+TYPE_WEIGHTS = [(ListingType.ijara, 0.65), (ListingType.sotuv, 0.35)]
+PROPERTY_WEIGHTS = [(PropertyType.kvartira, 0.70), (PropertyType.uy, 0.25), (PropertyType.ofis, 0.05)]
+ROOM_WEIGHTS = [(1, 0.20), (2, 0.35), (3, 0.28), (4, 0.12), (5, 0.05)]
+STATUS_WEIGHTS = [
+    (ListingStatus.approved, 0.70), (ListingStatus.pending, 0.12),
+    (ListingStatus.rejected, 0.08), (ListingStatus.archived, 0.10)
+]
+
+# Oylik ijara va sotuv narxlari medianasi (USD, 1 xonali, viloyat markazi)
+MEDIAN_PRICE = {ListingType.ijara: 250.0, ListingType.sotuv: 30000.0}
+
+# Vaqtlar bazasi qat'iy - hisobot qachon olinganiga bog'liq emas
+EPOCH = datetime(2025, 1, 1)
+
+INSERT_BATCH_SIZE = 5000
+
+
+def _choice(rng: random.Random, weighted: List[Tuple[Any, float]]) -> Any:
+    values, weights = zip(*weighted)
+    return rng.choices(values, weights)[0]
+
+
+def _uuid(rng: random.Random) -> str:
+    return str(uuid.UUID(int=rng.getrandbits(128), version=4))
+
+
+class DataGenerator:
+    """
+    Sintetik ma'lumotlar generatori
+
+    Args:
+        listings: E'lonlar soni
+        seed: Tasodifiy generator boshlang'ich qiymati
+        listings_per_user: O'rtacha e'lonlar soni (foydalanuvchilar soni shundan)
+    """
+
+    def __init__(self, listings: int, seed: int = 42, listings_per_user: float = 3.0):
+        self.listings = listings
+        self.seed = seed
+        self.users = max(10, int(listings / listings_per_user))
+        self.user_ids: List[str] = []
+        self._regions = list(REGIONS)
+        self._region_weights = [REGION_WEIGHTS.get(code, 1.0) for code in self._regions]
+
+    def user_rows(self) -> Iterator[List[Dict[str, Any]]]:
+        """Foydalanuvchilar (partiyalab)"""
+        rng = random.Random(f"{self.seed}-users")
+        self.user_ids = []
+        batch = []
+        for index in range(self.users):
+            user_id = _uuid(rng)
+            self.user_ids.append(user_id)
+            batch.append({
+                'id': user_id,
+                'telegram_user_id': 100_000_000 + index,
+                'name': f"Foydalanuvchi {index}",
+                'name_normalized': f"foydalanuvchi {index}",
+                'phone_number': f"+99890{index:07d}" if index < 10_000_000 else None,
+                'locale': "uz" if rng.random() < 0.8 else "ru",
+                'verified': rng.random() < 0.6,
+                'blocked': rng.random() < 0.02,
+                'unreachable': False,
+                'created_at': EPOCH + timedelta(seconds=rng.randrange(365 * 86400))
+            })
+            if len(batch) == INSERT_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def owner_index(self, rng: random.Random) -> int:
+        """Egri taqsimot: kichik indeksli foydalanuvchilar (agentlar) ko'p e'lon beradi"""
+        return min(self.users - 1, int(self.users * rng.random() ** 2))
+
+    def _price(self, rng: random.Random, listing_type: ListingType, rooms: int, region_code: str) -> float:
+        median = MEDIAN_PRICE[listing_type] * REGION_PRICE_FACTOR.get(region_code, 1.0) * (1 + 0.35 * (rooms - 1))
+        price = rng.lognormvariate(math.log(median), 0.35)
+        step = 10 if listing_type == ListingType.ijara else 500
+        return float(max(step, round(price / step) * step))
+
+    def listing_rows(self) -> Iterator[List[Dict[str, Any]]]:
+        """E'lonlar (partiyalab; avval user_rows() ishlatilgan bo'lishi kerak)"""
+        if not self.user_ids:
+            for _ in self.user_rows():
+                pass
+
+        rng = random.Random(f"{self.seed}-listings")
+        batch = []
+        for index in range(self.listings):
+            region_code = rng.choices(self._regions, self._region_weights)[0]
+            cities = CITIES_BY_REGION[region_code]
+            # Markaziy shahar (ro'yxatda birinchi) eng ommabop
+            city_name = cities[min(len(cities) - 1, int(rng.expovariate(0.6)))]
+            listing_type = _choice(rng, TYPE_WEIGHTS)
+            property_type = _choice(rng, PROPERTY_WEIGHTS)
+            rooms = _choice(rng, ROOM_WEIGHTS)
+            status = _choice(rng, STATUS_WEIGHTS)
+            created_at = EPOCH + timedelta(seconds=rng.randrange(365 * 86400))
+            total_floors = rng.randint(1, 16) if property_type == PropertyType.kvartira else None
+
+            batch.append({
+                'id': _uuid(rng),
+                'user_id': self.user_ids[self.owner_index(rng)],
+                'region_code': region_code,
+                'city_name': city_name,
+                'address': f"{city_name}, {rng.randint(1, 120)}-uy",
+                'type': listing_type,
+                'property_type': property_type,
+                'rooms': rooms,
+                'area_m2': round(rng.uniform(25, 35) * rooms, 1),
+                'floor': rng.randint(1, total_floors) if total_floors else None,
+                'total_floors': total_floors,
+                'price': self._price(rng, listing_type, rooms, region_code),
+                'currency': "USD",
+                'furnished': rng.random() < 0.45,
+                'pets_allowed': rng.random() < 0.2,
+                'title': f"{rooms} xonali {property_type.value} {city_name}da",
+                'description': f"Sintetik e'lon #{index}",
+                'views_count': int(rng.expovariate(1 / 40)),
+                'contacts_count': int(rng.expovariate(1 / 4)),
+                'status': status,
+                'created_at': created_at,
+                'updated_at': created_at,
+                'approved_at': created_at + timedelta(hours=2) if status == ListingStatus.approved else None
+            })
+            if len(batch) == INSERT_BATCH_SIZE:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    async def populate(self, engine) -> None:
+        """Jadvallarni to'ldirish (jadvallar bo'sh va yaratilgan bo'lishi kerak)"""
+        async with engine.begin() as conn:
+            for batch in self.user_rows():
+                await conn.execute(insert(User), batch)
+        for batch in self.listing_rows():
+            async with engine.begin() as conn:
+                await conn.execute(insert(Listing), batch)
+
+    def sample_filters(self) -> Dict[str, Dict[str, Any]]:
+        """Qidiruv holatlari (keng, o'rta va tor filtrlar)"""
+        tashkent_center = CITIES_BY_REGION["14"][0]
+        return {
+            'search_region': {'region_code': "14"},
+            'search_city_rooms': {'region_code': "14", 'city_name': tashkent_center, 'rooms': "2", 'type': "ijara"},
+            'search_price_range': {'region_code': "10", 'type': "ijara", 'min_price': 250, 'max_price': 400},
+            'search_narrow': {
+                'region_code': "01", 'city_name': CITIES_BY_REGION["01"][0], 'type': "sotuv",
+                'property_type': "uy", 'rooms': "3", 'furnished': True
+            }
+        }
+
+    def sample_users(self) -> Dict[str, str]:
+        """Eng ko'p e'lonli (agent) va oddiy foydalanuvchi"""
+        return {'heavy': self.user_ids[0], 'typical': self.user_ids[len(self.user_ids) // 10]}
@@ -15,6 +15,7 @@ async def health_check():
     """Railway health check"""
     try:
         # Basic imports test
+        from sqlalchemy import text
         from src.config import settings
         from src.database.database import engine
         
@@ -24,7 +25,7 @@ async def health_check():
         
         # Test database connection
         async with engine.begin() as conn:
-            await conn.execute("SELECT 1")
+            await conn.execute(text("SELECT 1"))
         print("✅ Database connection successful")
         
         return True
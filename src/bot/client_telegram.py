@@ -1,6 +1,7 @@
 """
 UyKelishuv Telegram Bot Client
 """
+import asyncio
 import logging
 from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
@@ -9,6 +10,7 @@ from telegram.ext import (
     CommandHandler, 
     CallbackQueryHandler, 
     MessageHandler, 
+    TypeHandler, 
     filters, 
     ContextTypes
 )
@@ -17,10 +19,22 @@ from src.config import settings
 from src.services.keyboard_builder import KeyboardBuilder
 from src.services.message_builder import MessageBuilder
 from src.services.validation_service import ErrorHandler
-from src.database.database import AsyncSessionLocal
+from src.database.database import AsyncSessionLocal, engine
 from src.services.user_service import UserService
 from src.services.listing_service import ListingService
 from src.services.admin_service import AdminService
+from src.services.media_service import shutdown_image_pipeline
+from src.services.duplicate_service import get_duplicate_detector
+from src.services.media_gc import MediaGarbageCollector
+from src.services.sms_service import SMSService
+from src.services.sms_provider import close_sms_client
+from src.utils import async_fs
+from src.utils.health import HealthChecker
+from src.utils.http_server import HTTPServer
+from src.utils.metrics import InstrumentedRequest, timed_handler, monitor_event_loop, metrics_endpoint
+from src.utils.query_budget import budgeted_handler
+from src.utils.tracing import TRACER, OTLPExporter, traced_handler
+from src.utils.update_recorder import UpdateRecorder, RECORDER_GROUP
 from src.bot.handlers.listing_handlers import ListingHandlers
 from src.bot.handlers.admin_handlers import AdminHandlers
 from src.utils.constants import CallbackPatterns
@@ -28,11 +42,33 @@ from src.utils.constants import CallbackPatterns
 logger = logging.getLogger(__name__)
 
 
+def _instrumented(name: str, callback):
+    """Handler ni update span i, vaqt o'lchovi va so'rovlar byudjeti bilan o'rash"""
+    return traced_handler(name)(timed_handler(name)(budgeted_handler(name)(callback)))
+
+
 class UyKelishuvBot:
     """UyKelishuv Bot asosiy klassi"""
     
-    def __init__(self):
-        self.application = Application.builder().token(settings.bot_token).build()
+    def __init__(self, application: Optional[Application] = None):
+        """
+        Args:
+            application: Tayyor PTB Application (load test va replay uchun soxta
+                Bot API ga ulangan); berilmasa settings bo'yicha yaratiladi
+        """
+        if application is None:
+            builder = (
+                Application.builder()
+                .token(settings.bot_token)
+                # Bot API so'rovlari vaqti va xatolari /metrics da ko'rinadi
+                .request(InstrumentedRequest(connection_pool_size=256))
+                .get_updates_request(InstrumentedRequest(connection_pool_size=1))
+            )
+            if settings.telegram_api_url:
+                api_url = settings.telegram_api_url.rstrip('/')
+                builder = builder.base_url(f"{api_url}/bot").base_file_url(f"{api_url}/file/bot")
+            application = builder.build()
+        self.application = application
         self.keyboard_builder = KeyboardBuilder()
         self.message_builder = MessageBuilder()
         self.user_service = UserService()
@@ -40,6 +76,23 @@ class UyKelishuvBot:
         self.admin_service = AdminService()
         self.listing_handlers = ListingHandlers(self.listing_service)
         self.admin_handlers = AdminHandlers(self.admin_service)
+        self.media_gc_task: Optional[asyncio.Task] = None
+        self.verification_cleanup_task: Optional[asyncio.Task] = None
+        self.loop_monitor_task: Optional[asyncio.Task] = None
+        self.trace_exporter: Optional[OTLPExporter] = None
+        self.trace_export_task: Optional[asyncio.Task] = None
+        self.recorder: Optional[UpdateRecorder] = None
+        if settings.update_recording_path:
+            self.recorder = UpdateRecorder(settings.update_recording_path, settings.update_recording_salt)
+        self.http_server = HTTPServer(settings.http_host, settings.http_port)
+        self.http_server.route('/metrics', metrics_endpoint)
+        self.health = HealthChecker(
+            engine, self.application,
+            db_timeout=settings.health_db_timeout,
+            max_queue_depth=settings.health_max_queue_depth
+        )
+        self.http_server.route('/healthz', self.health.liveness)
+        self.http_server.route('/readyz', self.health.readiness)
         logger.info("Bot ishga tushirilmoqda...")
         
     async def start(self):
@@ -56,21 +109,35 @@ class UyKelishuvBot:
         try:
             logger.info("Handlerlarni ro'yxatdan o'tkazish boshlandi...")
             
-            self.application.add_handler(CommandHandler("start", self._handle_start))
+            # Replay uchun yozuv - boshqa handlerlardan oldin, ularga ta'sir qilmaydi
+            if self.recorder:
+                self.application.add_handler(TypeHandler(Update, self.recorder.record), group=RECORDER_GROUP)
+                logger.info(f"✅ Update yozuvi yoqildi: {settings.update_recording_path}")
+            
+            self.application.add_handler(CommandHandler("start", _instrumented("start", self._handle_start)))
             logger.info("✅ Start handler qo'shildi")
             
-            self.application.add_handler(CommandHandler("help", self._handle_help))
+            self.application.add_handler(CommandHandler("help", _instrumented("help", self._handle_help)))
             logger.info("✅ Help handler qo'shildi")
             
-            self.application.add_handler(CommandHandler("admin", self._handle_admin))
+            self.application.add_handler(CommandHandler("admin", _instrumented("admin", self._handle_admin)))
             logger.info("✅ Admin handler qo'shildi")
             
-            self.application.add_handler(CallbackQueryHandler(self._handle_callback))
+            self.application.add_handler(CommandHandler("slowlog", _instrumented("slowlog", self.admin_handlers.handle_slowlog)))
+            logger.info("✅ Slowlog handler qo'shildi")
+            
+            self.application.add_handler(CommandHandler("profiler", _instrumented("profiler", self.admin_handlers.handle_profiler)))
+            logger.info("✅ Profiler handler qo'shildi")
+            
+            self.application.add_handler(CallbackQueryHandler(_instrumented("callback", self._handle_callback)))
             logger.info("✅ Callback handler qo'shildi")
             
-            self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, self._handle_message))
+            self.application.add_handler(MessageHandler(filters.TEXT & ~filters.COMMAND, _instrumented("message", self._handle_message)))
             logger.info("✅ Message handler qo'shildi")
             
+            self.application.add_handler(MessageHandler(filters.PHOTO | filters.Document.IMAGE, _instrumented("media", self._handle_media)))
+            logger.info("✅ Media handler qo'shildi")
+            
             logger.info("Handlerlar muvaffaqiyatli ro'yxatdan o'tkazildi")
             
         except Exception as e:
@@ -233,6 +300,12 @@ Bu bot uy-joy kelishuvi uchun yaratilgan.
             elif data == CallbackPatterns.LISTING_CANCEL:
                 await self.listing_handlers.handle_listing_cancel(update, context)
             
+            elif data == CallbackPatterns.LISTING_SKIP_DESCRIPTION:
+                await self.listing_handlers.handle_skip_description(update, context)
+            
+            elif data == CallbackPatterns.LISTING_PHOTOS_DONE:
+                await self.listing_handlers.handle_photos_done(update, context)
+            
             elif data == CallbackPatterns.SEARCH_LISTINGS:
                 await self.listing_handlers.handle_search_listings(update, context)
             
@@ -317,12 +390,67 @@ Bu bot uy-joy kelishuvi uchun yaratilgan.
             elif data == CallbackPatterns.ADMIN_USERS_MANAGEMENT:
                 await self.admin_handlers.handle_users_management(update, context)
             
+            elif data.startswith(f'{CallbackPatterns.ADMIN_LISTING_PHOTOS}:'):
+                listing_id = data.split(':')[1]
+                await self.admin_handlers.handle_listing_photos(update, context, listing_id)
+            
+            elif data == CallbackPatterns.ADMIN_BROADCAST:
+                await self.admin_handlers.handle_broadcast(update, context)
+            
+            elif data == CallbackPatterns.ADMIN_BROADCAST_CONFIRM:
+                await self.admin_handlers.handle_broadcast_confirm(update, context)
+            
+            elif data == CallbackPatterns.ADMIN_BROADCAST_CANCEL:
+                await self.admin_handlers.handle_broadcast_cancel(update, context)
+            
+            elif data.startswith(f'{CallbackPatterns.ADMIN_BROADCAST_STOP}:'):
+                broadcast_id = data.split(':', 1)[1]
+                await self.admin_handlers.handle_broadcast_stop(update, context, broadcast_id)
+            
+            elif data == CallbackPatterns.ADMIN_SEARCH_USER:
+                await self.admin_handlers.handle_search_user(update, context)
+            
+            elif data.startswith(f'{CallbackPatterns.ADMIN_USER_SEARCH_PAGE}:'):
+                page = int(data.split(':')[1])
+                await self.admin_handlers.handle_user_search_page(update, context, page)
+            
+            elif data == CallbackPatterns.ADMIN_ALL_USERS or data.startswith(f'{CallbackPatterns.ADMIN_ALL_USERS}:'):
+                page = int(data.split(':')[1]) if ':' in data else 0
+                await self.admin_handlers.handle_users_list(update, context, page=page)
+            
+            elif data == CallbackPatterns.ADMIN_BLOCKED_USERS or data.startswith(f'{CallbackPatterns.ADMIN_BLOCKED_USERS}:'):
+                page = int(data.split(':')[1]) if ':' in data else 0
+                await self.admin_handlers.handle_users_list(update, context, page=page, blocked_only=True)
+            
             elif data == CallbackPatterns.ADMIN_STATISTICS:
                 await self.admin_handlers.handle_statistics(update, context)
             
             elif data == "ADMIN_CREATE_LISTING":
                 await self.admin_handlers.handle_admin_create_listing(update, context)
             
+            elif data == CallbackPatterns.ADMIN_BULK_MODERATION:
+                await self.admin_handlers.handle_bulk_moderation(update, context)
+            
+            elif data.startswith(f'{CallbackPatterns.ADMIN_BULK_TOGGLE}:'):
+                listing_id = data.split(':')[1]
+                await self.admin_handlers.handle_bulk_toggle(update, context, listing_id)
+            
+            elif data.startswith(f'{CallbackPatterns.ADMIN_BULK_PAGE}:'):
+                page = int(data.split(':')[1])
+                await self.admin_handlers.handle_bulk_page(update, context, page)
+            
+            elif data == CallbackPatterns.ADMIN_BULK_SELECT_PAGE:
+                await self.admin_handlers.handle_bulk_select_page(update, context)
+            
+            elif data == CallbackPatterns.ADMIN_BULK_APPROVE:
+                await self.admin_handlers.handle_bulk_approve(update, context)
+            
+            elif data == CallbackPatterns.ADMIN_BULK_REJECT:
+                await self.admin_handlers.handle_bulk_reject(update, context)
+            
+            elif data == CallbackPatterns.ADMIN_BULK_DELETE:
+                await self.admin_handlers.handle_bulk_delete(update, context)
+            
             elif data.startswith(f'{CallbackPatterns.ADMIN_APPROVE}:'):
                 listing_id = data.split(':')[1]
                 await self.admin_handlers.handle_approve_listing(update, context, listing_id)
@@ -382,6 +510,16 @@ Bu bot uy-joy kelishuvi uchun yaratilgan.
                 await self.admin_handlers.handle_rejection_reason_input(update, context)
                 return
             
+            # Admin foydalanuvchi qidiruvi
+            if context.user_data.get('waiting_for_user_search'):
+                await self.admin_handlers.handle_user_search_input(update, context)
+                return
+            
+            # Admin ommaviy xabar matni
+            if context.user_data.get('waiting_for_broadcast_text'):
+                await self.admin_handlers.handle_broadcast_text_input(update, context)
+                return
+            
             # Oddiy xabarlarga javob
             await update.message.reply_text(
                 "Sizning xabaringizni qabul qildim! Asosiy menyu uchun /start buyrug'ini ishlating.",
@@ -394,6 +532,24 @@ Bu bot uy-joy kelishuvi uchun yaratilgan.
             ErrorHandler.log_error(e, "message_handler")
             await update.message.reply_text(self.message_builder.create_error_message("generic"))
     
+    async def _handle_media(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        """Rasm xabarlari handler"""
+        try:
+            if context.user_data.get('waiting_for_photos'):
+                await self.listing_handlers.handle_photo_input(update, context)
+                return
+            
+            await update.message.reply_text(
+                "Rasmlar faqat e'lon joylashtirish paytida qabul qilinadi.",
+                reply_markup=InlineKeyboardMarkup([[
+                    InlineKeyboardButton("🏠 Asosiy menyu", callback_data='MAIN_MENU')
+                ]])
+            )
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "media_handler")
+            await update.message.reply_text(self.message_builder.create_error_message("generic"))
+    
     def _get_welcome_message(self, name: str) -> str:
         """Xush kelibsiz xabari"""
         return self.message_builder.create_welcome_message(name)
@@ -417,11 +573,44 @@ Bu bot uy-joy kelishuvi uchun yaratilgan.
             await self.application.initialize()
             await self.application.start()
             
+            # /metrics, /healthz, /readyz va event loop kechikishi
+            self.loop_monitor_task = asyncio.create_task(monitor_event_loop())
+            if settings.http_port:
+                await self.http_server.start()
+            
+            # Update span lari OTLP kollektoriga yuboriladi
+            if settings.tracing_enabled:
+                self.trace_exporter = OTLPExporter(settings.otlp_endpoint)
+                TRACER.configure(self.trace_exporter, settings.tracing_sample_rate)
+                self.trace_export_task = asyncio.create_task(self.trace_exporter.run_forever())
+            
+            # Takror e'lonlar indeksini bazadagi imzolardan tiklash
+            await get_duplicate_detector().load(AsyncSessionLocal)
+            
             # Polling ni boshlash
             await self.application.updater.start_polling()
             
+            # To'xtab qolgan ommaviy xabarlarni davom ettirish
+            broadcast_service = self.admin_handlers.broadcast_service
+            broadcast_service.bot = self.application.bot
+            resumed = await broadcast_service.resume_unfinished()
+            if resumed:
+                logger.info(f"{resumed} ta ommaviy xabar davom ettirildi")
+            
+            # Yetim media fayllarni vaqti-vaqti bilan tozalash
+            if settings.media_gc_interval_hours > 0:
+                media_gc = MediaGarbageCollector(dry_run=settings.media_gc_dry_run)
+                self.media_gc_task = asyncio.create_task(
+                    media_gc.run_forever(settings.media_gc_interval_hours * 3600)
+                )
+            
+            # Bazadagi muddati tugagan tasdiqlash kodlarini tozalash
+            if settings.verification_cleanup_interval_minutes > 0:
+                self.verification_cleanup_task = asyncio.create_task(
+                    SMSService().run_cleanup_forever(settings.verification_cleanup_interval_minutes * 60)
+                )
+            
             # Botni uzilguncha kutish
-            import asyncio
             await asyncio.Event().wait()
             
         except Exception as e:
@@ -429,8 +618,24 @@ Bu bot uy-joy kelishuvi uchun yaratilgan.
             raise
         finally:
             # Botni to'xtatish
+            if self.media_gc_task:
+                self.media_gc_task.cancel()
+            if self.verification_cleanup_task:
+                self.verification_cleanup_task.cancel()
+            if self.loop_monitor_task:
+                self.loop_monitor_task.cancel()
+            await self.http_server.stop()
+            if self.trace_exporter:
+                self.trace_export_task.cancel()
+                TRACER.configure(None)
+                await self.trace_exporter.close()
+            if self.recorder:
+                await self.recorder.close()
             try:
                 await self.application.stop()
             except:
                 pass
+            shutdown_image_pipeline()
+            async_fs.shutdown()
+            await close_sms_client()
     
\ No newline at end of file
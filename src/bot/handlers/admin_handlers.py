@@ -1,19 +1,28 @@
 """
 Admin Handlers - Admin panel handlerlari
 """
+import asyncio
+import io
 import logging
-from typing import Dict, Any, List, Optional
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple, Set
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
+from sqlalchemy import select
 from src.services.admin_service import AdminService
+from src.services.listing_service import ListingService
 from src.services.keyboard_builder import KeyboardBuilder
 from src.services.message_builder import MessageBuilder
 from src.services.validation_service import ErrorHandler
 from src.services.notification_service import NotificationService
+from src.services.broadcast_service import BroadcastService
+from src.services.media_service import MediaService
+from src.services.photo_hash_service import PhotoHashService
 from src.utils.constants import CallbackPatterns, BotConstants
-from src.config import REGIONS
-from src.database.database import AsyncSessionLocal
+from src.config import settings, REGIONS
+from src.database.database import AsyncSessionLocal, slow_query_log
 from src.database.models import Listing, ListingStatus, User
+from src.utils import profiler
 
 logger = logging.getLogger(__name__)
 
@@ -26,7 +35,10 @@ class AdminHandlers:
         self.keyboard_builder = KeyboardBuilder()
         self.message_builder = MessageBuilder()
         self.notification_service = NotificationService()
+        self.broadcast_service = BroadcastService()
+        self.media_service = MediaService()
         self.admin_data: Dict[int, Dict[str, Any]] = {}
+        self._background_tasks: Set[asyncio.Task] = set()
     
     async def handle_admin_panel(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Admin panelni ochish"""
@@ -84,9 +96,13 @@ class AdminHandlers:
                     )
                     return
                 
+                # Navbatdagi barcha e'lonlar rasmlari bitta so'rovda
+                media = await ListingService(db).get_media_for_listings([listing.id for listing in pending_listings])
+                
                 # Birinchi e'lonni ko'rsatish
                 self.admin_data[user_id] = {
                     'pending_listings': pending_listings,
+                    'media': media,
                     'current_index': 0
                 }
                 
@@ -108,12 +124,15 @@ class AdminHandlers:
                     await update.callback_query.answer("❌ Ruxsat yo'q")
                     return
                 
-                # E'lonni tasdiqlash
-                success = await self.admin_service.approve_listing(listing_id, user_id)
+                # E'lonni tasdiqlash - egasining ma'lumotlari shu so'rovda qaytadi
+                approved = await self.admin_service.approve_listing(listing_id, user_id)
                 
-                if success:
+                if approved:
                     await update.callback_query.answer("✅ E'lon tasdiqlandi")
                     
+                    self.notification_service.bot = context.bot
+                    await self.notification_service.queue_moderation_notifications([approved], approved=True)
+                    
                     # Keyingi e'lonni ko'rsatish
                     await self._show_next_pending_listing(update, context)
                 else:
@@ -141,6 +160,7 @@ class AdminHandlers:
             # Sabab kiritish uchun kutish
             context.user_data['waiting_for_rejection_reason'] = True
             context.user_data['rejecting_listing_id'] = listing_id
+            context.user_data['rejecting_listing_ids'] = None
             
         except Exception as e:
             ErrorHandler.log_error(e, "handle_reject_listing")
@@ -153,6 +173,11 @@ class AdminHandlers:
             reason = update.message.text.strip()
             listing_id = context.user_data.get('rejecting_listing_id')
             
+            # Ommaviy rad etish
+            if context.user_data.get('rejecting_listing_ids'):
+                await self._reject_selected_listings(update, context, reason)
+                return
+            
             if not listing_id:
                 await update.message.reply_text("❌ E'lon ID topilmadi")
                 return
@@ -164,12 +189,15 @@ class AdminHandlers:
                     await update.message.reply_text("❌ Ruxsat yo'q")
                     return
                 
-                # E'lonni rad etish
-                success = await self.admin_service.reject_listing(listing_id, user_id, reason)
+                # E'lonni rad etish - egasining ma'lumotlari shu so'rovda qaytadi
+                rejected = await self.admin_service.reject_listing(listing_id, user_id, reason)
                 
-                if success:
+                if rejected:
                     await update.message.reply_text("✅ E'lon rad etildi")
                     
+                    self.notification_service.bot = context.bot
+                    await self.notification_service.queue_moderation_notifications([rejected], approved=False, reason=reason)
+                    
                     # Keyingi e'lonni ko'rsatish
                     await self._show_next_pending_listing_after_message(update, context)
                 else:
@@ -210,6 +238,507 @@ class AdminHandlers:
             ErrorHandler.log_error(e, "handle_delete_listing")
             await update.callback_query.answer("❌ Xatolik yuz berdi")
     
+    # ==================== BULK MODERATION ====================
+    
+    async def handle_bulk_moderation(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Ommaviy moderatsiya - pending e'lonlarni tanlash"""
+        try:
+            user_id = update.effective_user.id
+            
+            async with AsyncSessionLocal() as db:
+                self.admin_service.db = db
+                
+                if not self.admin_service.is_admin(user_id):
+                    await update.callback_query.answer("❌ Ruxsat yo'q")
+                    return
+                
+                listings = await self.admin_service.get_pending_listing_summaries(
+                    limit=BotConstants.BULK_MODERATION_MAX_LISTINGS
+                )
+            
+            if not listings:
+                await update.callback_query.edit_message_text(
+                    "📋 **Ommaviy moderatsiya**\n\n"
+                    "Hozirda tasdiqlanmagan e'lonlar yo'q.",
+                    reply_markup=self._create_back_to_admin_keyboard(),
+                    parse_mode='Markdown'
+                )
+                return
+            
+            # Faqat ID va sarlavhalarni saqlaymiz - to'liq obyektlar kerak emas
+            self.admin_data.setdefault(user_id, {})['bulk'] = {
+                'listings': [(listing.id, listing.title) for listing in listings],
+                'selected': set(),
+                'page': 0
+            }
+            
+            await self._show_bulk_moderation(update, user_id)
+        
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_bulk_moderation")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_bulk_toggle(self, update: Update, context: ContextTypes.DEFAULT_TYPE, listing_id: str) -> None:
+        """Ommaviy moderatsiyada e'lonni tanlash/bekor qilish"""
+        try:
+            user_id = update.effective_user.id
+            bulk_state = self._get_bulk_state(user_id)
+            
+            if bulk_state is None:
+                await self.handle_bulk_moderation(update, context)
+                return
+            
+            selected = bulk_state['selected']
+            if listing_id in selected:
+                selected.discard(listing_id)
+            else:
+                selected.add(listing_id)
+            
+            await self._show_bulk_moderation(update, user_id)
+        
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_bulk_toggle")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_bulk_select_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Joriy sahifadagi barcha e'lonlarni tanlash/bekor qilish"""
+        try:
+            user_id = update.effective_user.id
+            bulk_state = self._get_bulk_state(user_id)
+            
+            if bulk_state is None:
+                await self.handle_bulk_moderation(update, context)
+                return
+            
+            page_ids = [listing_id for listing_id, _ in self._get_bulk_page_items(bulk_state)]
+            selected = bulk_state['selected']
+            
+            if all(listing_id in selected for listing_id in page_ids):
+                selected.difference_update(page_ids)
+            else:
+                selected.update(page_ids)
+            
+            await self._show_bulk_moderation(update, user_id)
+        
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_bulk_select_page")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_bulk_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE, page: int) -> None:
+        """Ommaviy moderatsiya sahifasini almashtirish"""
+        try:
+            user_id = update.effective_user.id
+            bulk_state = self._get_bulk_state(user_id)
+            
+            if bulk_state is None:
+                await self.handle_bulk_moderation(update, context)
+                return
+            
+            bulk_state['page'] = page
+            await self._show_bulk_moderation(update, user_id)
+        
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_bulk_page")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_bulk_approve(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Tanlangan e'lonlarni tasdiqlash"""
+        try:
+            user_id = update.effective_user.id
+            bulk_state = self._get_bulk_state(user_id)
+            
+            if not bulk_state or not bulk_state['selected']:
+                await update.callback_query.answer("Hech qanday e'lon tanlanmagan")
+                return
+            
+            async with AsyncSessionLocal() as db:
+                self.admin_service.db = db
+                approved = await self.admin_service.bulk_approve_listings(list(bulk_state['selected']), user_id)
+            
+            self.notification_service.bot = context.bot
+            await self.notification_service.queue_moderation_notifications(approved, approved=True)
+            
+            await update.callback_query.answer(f"✅ {len(approved)} ta e'lon tasdiqlandi")
+            await self.handle_bulk_moderation(update, context)
+        
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_bulk_approve")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_bulk_reject(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Tanlangan e'lonlarni rad etish - sabab so'rash"""
+        try:
+            user_id = update.effective_user.id
+            bulk_state = self._get_bulk_state(user_id)
+            
+            if not bulk_state or not bulk_state['selected']:
+                await update.callback_query.answer("Hech qanday e'lon tanlanmagan")
+                return
+            
+            await update.callback_query.edit_message_text(
+                f"❌ **{len(bulk_state['selected'])} ta e'lonni rad etish**\n\n"
+                "Rad etish sababini kiriting:",
+                reply_markup=InlineKeyboardMarkup([[
+                    InlineKeyboardButton("🔙 Orqaga", callback_data=f"{CallbackPatterns.ADMIN_BULK_PAGE}:{bulk_state['page']}")
+                ]]),
+                parse_mode='Markdown'
+            )
+            
+            context.user_data['waiting_for_rejection_reason'] = True
+            context.user_data['rejecting_listing_ids'] = list(bulk_state['selected'])
+        
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_bulk_reject")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_bulk_delete(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Tanlangan e'lonlarni o'chirish"""
+        try:
+            user_id = update.effective_user.id
+            bulk_state = self._get_bulk_state(user_id)
+            
+            if not bulk_state or not bulk_state['selected']:
+                await update.callback_query.answer("Hech qanday e'lon tanlanmagan")
+                return
+            
+            async with AsyncSessionLocal() as db:
+                self.admin_service.db = db
+                deleted_ids = await self.admin_service.bulk_delete_listings(list(bulk_state['selected']), user_id)
+            
+            await update.callback_query.answer(f"🗑️ {len(deleted_ids)} ta e'lon o'chirildi")
+            await self.handle_bulk_moderation(update, context)
+        
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_bulk_delete")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def _reject_selected_listings(self, update: Update, context: ContextTypes.DEFAULT_TYPE, reason: str) -> None:
+        """Ommaviy rad etishni sabab bilan yakunlash"""
+        user_id = update.effective_user.id
+        listing_ids = context.user_data.get('rejecting_listing_ids') or []
+        
+        context.user_data['waiting_for_rejection_reason'] = False
+        context.user_data['rejecting_listing_ids'] = None
+        
+        async with AsyncSessionLocal() as db:
+            self.admin_service.db = db
+            
+            if not self.admin_service.is_admin(user_id):
+                await update.message.reply_text("❌ Ruxsat yo'q")
+                return
+            
+            rejected = await self.admin_service.bulk_reject_listings(listing_ids, user_id, reason)
+        
+        self.notification_service.bot = context.bot
+        await self.notification_service.queue_moderation_notifications(rejected, approved=False, reason=reason)
+        
+        bulk_state = self._get_bulk_state(user_id)
+        if bulk_state is not None:
+            bulk_state['selected'].clear()
+        
+        await update.message.reply_text(
+            f"✅ {len(rejected)} ta e'lon rad etildi",
+            reply_markup=InlineKeyboardMarkup([[
+                InlineKeyboardButton("☑️ Ommaviy moderatsiya", callback_data=CallbackPatterns.ADMIN_BULK_MODERATION)
+            ], [
+                InlineKeyboardButton("🔙 Admin Panel", callback_data="ADMIN_PANEL")
+            ]])
+        )
+    
+    def _get_bulk_state(self, user_id: int) -> Optional[Dict[str, Any]]:
+        """Admin ning ommaviy moderatsiya holatini olish"""
+        return self.admin_data.get(user_id, {}).get('bulk')
+    
+    def _get_bulk_page_items(self, bulk_state: Dict[str, Any]) -> List[Any]:
+        """Joriy sahifadagi (id, title) juftliklari"""
+        page_size = BotConstants.BULK_MODERATION_PAGE_SIZE
+        start = bulk_state['page'] * page_size
+        return bulk_state['listings'][start:start + page_size]
+    
+    async def _show_bulk_moderation(self, update: Update, user_id: int) -> None:
+        """Ommaviy moderatsiya oynasini ko'rsatish"""
+        bulk_state = self._get_bulk_state(user_id)
+        total = len(bulk_state['listings'])
+        total_pages = max((total - 1) // BotConstants.BULK_MODERATION_PAGE_SIZE + 1, 1)
+        bulk_state['page'] = min(max(bulk_state['page'], 0), total_pages - 1)
+        
+        message = (
+            f"☑️ **Ommaviy moderatsiya** ({bulk_state['page'] + 1}/{total_pages})\n\n"
+            f"📋 Kutayotgan e'lonlar: {total}\n"
+            f"✅ Tanlangan: {len(bulk_state['selected'])}\n\n"
+            "E'lonlarni tanlang va amalni bajaring:"
+        )
+        
+        await update.callback_query.edit_message_text(
+            message,
+            reply_markup=self._create_bulk_moderation_keyboard(bulk_state, total_pages),
+            parse_mode='Markdown'
+        )
+    
+    def _create_bulk_moderation_keyboard(self, bulk_state: Dict[str, Any], total_pages: int) -> InlineKeyboardMarkup:
+        """Ommaviy moderatsiya klaviaturasi"""
+        keyboard = []
+        selected = bulk_state['selected']
+        page = bulk_state['page']
+        
+        for listing_id, title in self._get_bulk_page_items(bulk_state):
+            mark = "✅" if listing_id in selected else "⬜"
+            keyboard.append([InlineKeyboardButton(
+                f"{mark} {title[:40]}",
+                callback_data=f"{CallbackPatterns.ADMIN_BULK_TOGGLE}:{listing_id}"
+            )])
+        
+        # Navigation buttons
+        nav_row = []
+        if page > 0:
+            nav_row.append(InlineKeyboardButton("⬅️ Oldingi", callback_data=f"{CallbackPatterns.ADMIN_BULK_PAGE}:{page - 1}"))
+        nav_row.append(InlineKeyboardButton("☑️ Sahifani tanlash", callback_data=CallbackPatterns.ADMIN_BULK_SELECT_PAGE))
+        if page < total_pages - 1:
+            nav_row.append(InlineKeyboardButton("➡️ Keyingi", callback_data=f"{CallbackPatterns.ADMIN_BULK_PAGE}:{page + 1}"))
+        keyboard.append(nav_row)
+        
+        keyboard.append([
+            InlineKeyboardButton("✅ Tasdiqlash", callback_data=CallbackPatterns.ADMIN_BULK_APPROVE),
+            InlineKeyboardButton("❌ Rad etish", callback_data=CallbackPatterns.ADMIN_BULK_REJECT)
+        ])
+        keyboard.append([InlineKeyboardButton("🗑️ O'chirish", callback_data=CallbackPatterns.ADMIN_BULK_DELETE)])
+        keyboard.append([InlineKeyboardButton("🔙 Admin Panel", callback_data="ADMIN_PANEL")])
+        
+        return InlineKeyboardMarkup(keyboard)
+    
+    async def handle_listing_photos(self, update: Update, context: ContextTypes.DEFAULT_TYPE, listing_id: str) -> None:
+        """E'lon rasmlarini admin chatiga media guruh sifatida yuborish"""
+        try:
+            user_id = update.effective_user.id
+            
+            async with AsyncSessionLocal() as db:
+                self.admin_service.db = db
+                
+                if not self.admin_service.is_admin(user_id):
+                    await update.callback_query.answer("❌ Ruxsat yo'q")
+                    return
+                
+                media = await self.admin_service.get_listing_media(listing_id)
+            
+            sent = await self.media_service.send_listing_media(
+                context.bot, update.effective_chat.id, self.media_service.to_references(media)
+            )
+            await update.callback_query.answer(f"🖼 {sent} ta rasm yuborildi" if sent else "Rasmlar yo'q")
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_listing_photos")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    # ==================== OMMAVIY XABAR ====================
+    
+    async def handle_broadcast(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Ommaviy xabar matnini so'rash"""
+        try:
+            user_id = update.effective_user.id
+            
+            if not self.admin_service.is_admin(user_id):
+                await update.callback_query.answer("❌ Ruxsat yo'q")
+                return
+            
+            await update.callback_query.edit_message_text(
+                "📣 **Ommaviy xabar**\n\n"
+                "Barcha foydalanuvchilarga yuboriladigan xabar matnini kiriting:",
+                reply_markup=self._create_back_to_admin_keyboard(),
+                parse_mode='Markdown'
+            )
+            
+            # Xabar matnini kutish
+            context.user_data['waiting_for_broadcast_text'] = True
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_broadcast")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_broadcast_text_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Ommaviy xabar matnini qabul qilib tasdiqlash so'rash"""
+        try:
+            context.user_data['waiting_for_broadcast_text'] = False
+            
+            if not self.admin_service.is_admin(update.effective_user.id):
+                await update.message.reply_text("❌ Ruxsat yo'q")
+                return
+            
+            text = update.message.text.strip()
+            context.user_data['broadcast_text'] = text
+            recipients = await self.broadcast_service.count_recipients()
+            
+            # Admin matni Markdown bo'lmasligi mumkin - oldindan ko'rishda parse_mode ishlatilmaydi
+            await update.message.reply_text(
+                f"📣 Ommaviy xabar {recipients} ta foydalanuvchiga yuboriladi:\n\n{text}",
+                reply_markup=InlineKeyboardMarkup([
+                    [InlineKeyboardButton("✅ Yuborish", callback_data=CallbackPatterns.ADMIN_BROADCAST_CONFIRM)],
+                    [InlineKeyboardButton("❌ Bekor qilish", callback_data=CallbackPatterns.ADMIN_BROADCAST_CANCEL)]
+                ])
+            )
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_broadcast_text_input")
+            await update.message.reply_text("❌ Xatolik yuz berdi")
+    
+    async def handle_broadcast_confirm(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Ommaviy xabarni fonda yuborishni boshlash"""
+        try:
+            user_id = update.effective_user.id
+            
+            if not self.admin_service.is_admin(user_id):
+                await update.callback_query.answer("❌ Ruxsat yo'q")
+                return
+            
+            text = context.user_data.pop('broadcast_text', None)
+            if not text:
+                await update.callback_query.answer("❌ Xabar matni topilmadi")
+                return
+            
+            # Tasdiqlash xabari progress xabariga aylanadi
+            progress_message = update.callback_query.message
+            broadcast = await self.broadcast_service.create_broadcast(
+                user_id, text,
+                progress_chat_id=progress_message.chat_id,
+                progress_message_id=progress_message.message_id
+            )
+            
+            await update.callback_query.edit_message_text(
+                self.broadcast_service.create_progress_message(broadcast),
+                reply_markup=InlineKeyboardMarkup([[
+                    InlineKeyboardButton(
+                        "⏹ To'xtatish",
+                        callback_data=f"{CallbackPatterns.ADMIN_BROADCAST_STOP}:{broadcast.id}"
+                    )
+                ]]),
+                parse_mode='Markdown'
+            )
+            
+            self.broadcast_service.bot = context.bot
+            self.broadcast_service.start(broadcast.id)
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_broadcast_confirm")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_broadcast_cancel(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Ommaviy xabarni yubormasdan bekor qilish"""
+        try:
+            context.user_data.pop('broadcast_text', None)
+            
+            await update.callback_query.edit_message_text(
+                "❌ Ommaviy xabar bekor qilindi",
+                reply_markup=self._create_back_to_admin_keyboard()
+            )
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_broadcast_cancel")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_broadcast_stop(self, update: Update, context: ContextTypes.DEFAULT_TYPE, broadcast_id: str) -> None:
+        """Yuborilayotgan ommaviy xabarni to'xtatish"""
+        try:
+            if not self.admin_service.is_admin(update.effective_user.id):
+                await update.callback_query.answer("❌ Ruxsat yo'q")
+                return
+            
+            if await self.broadcast_service.cancel(broadcast_id):
+                await update.callback_query.answer("⏹ Ommaviy xabar to'xtatilmoqda")
+            else:
+                await update.callback_query.answer("Ommaviy xabar allaqachon tugagan")
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_broadcast_stop")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_slowlog(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """/slowlog - sekin SQL so'rovlar jurnalini fayl sifatida yuborish (/slowlog clear - tozalash)"""
+        try:
+            if not self.admin_service.is_admin(update.effective_user.id):
+                await update.message.reply_text("❌ Sizda admin huquqi yo'q!")
+                return
+            
+            if context.args and context.args[0] == 'clear':
+                slow_query_log.clear()
+                await update.message.reply_text("🧹 Sekin so'rovlar jurnali tozalandi")
+                return
+            
+            if not len(slow_query_log):
+                await update.message.reply_text(
+                    f"✅ {slow_query_log.threshold * 1000:.0f} ms dan sekin so'rovlar yozilmagan"
+                )
+                return
+            
+            entries = slow_query_log.snapshot()
+            slowest = max(entries, key=lambda entry: entry['duration_ms'])
+            document = io.BytesIO(slow_query_log.dump().encode('utf-8'))
+            document.name = "slowlog.txt"
+            await update.message.reply_document(
+                document=document,
+                caption=f"🐢 Sekin so'rovlar: {len(entries)} ta, eng sekini {slowest['duration_ms']} ms"
+            )
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_slowlog")
+            await update.message.reply_text("❌ Xatolik yuz berdi")
+    
+    async def handle_profiler(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """/profiler [soniya] [top] - botni profillash, natija hisobot va collapsed stek fayli sifatida"""
+        try:
+            if not self.admin_service.is_admin(update.effective_user.id):
+                await update.message.reply_text("❌ Sizda admin huquqi yo'q!")
+                return
+            
+            try:
+                seconds = int(context.args[0]) if context.args else 30
+                top = int(context.args[1]) if len(context.args or []) > 1 else 20
+            except ValueError:
+                await update.message.reply_text("Foydalanish: /profiler [soniya] [top]")
+                return
+            seconds = max(1, min(seconds, settings.profiler_max_seconds))
+            top = max(1, min(top, 50))
+            
+            if profiler.is_busy():
+                await update.message.reply_text("⏳ Profil allaqachon olinmoqda, tugashini kuting")
+                return
+            
+            await update.message.reply_text(f"🔬 Profillash boshlandi: {seconds} s")
+            # Handler kutib turmaydi - sampler fonda olinadi va natija shu yerdan yuboriladi
+            task = asyncio.create_task(self._send_profile(update, seconds, top))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_profiler")
+            await update.message.reply_text("❌ Xatolik yuz berdi")
+    
+    async def _send_profile(self, update: Update, seconds: int, top: int) -> None:
+        """Profil olish va natijani yuborish"""
+        try:
+            try:
+                profile = await profiler.profile_for(seconds, settings.profiler_interval_ms / 1000)
+            except profiler.ProfilerBusy:
+                # Boshqa /profiler tekshiruvdan keyin ulgurib qolgan
+                await update.message.reply_text("⏳ Profil allaqachon olinmoqda, tugashini kuting")
+                return
+            
+            if not profile.busy_samples:
+                await update.message.reply_text("💤 Bot bu vaqtda bo'sh turdi - band namunalar yo'q")
+                return
+            
+            report = profile.report(top)
+            # Telegram xabari 4096 belgidan oshmasligi kerak
+            await update.message.reply_text(report[:4000])
+            
+            document = io.BytesIO(profile.collapsed().encode('utf-8'))
+            document.name = f"profile-{datetime.now().strftime('%Y%m%d-%H%M%S')}.folded"
+            await update.message.reply_document(
+                document=document,
+                caption="🔥 flamegraph.pl yoki speedscope.app uchun collapsed stek lar"
+            )
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "send_profile")
+    
     async def handle_users_management(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Foydalanuvchilar boshqaruvi"""
         try:
@@ -222,10 +751,11 @@ class AdminHandlers:
                     await update.callback_query.answer("❌ Ruxsat yo'q")
                     return
                 
-                # Foydalanuvchilar ro'yxati
-                users = await self.admin_service.get_all_users()
+                # Sonlar SQL aggregate bilan, ro'yxat esa faqat oxirgi 10 ta
+                counts = await self.admin_service.get_user_counts()
+                recent_users, _ = await self.admin_service.get_users_page(page=0, per_page=10)
                 
-                message = self._create_users_management_message(users)
+                message = self._create_users_management_message(counts, recent_users)
                 keyboard = self._create_users_management_keyboard()
                 
                 await update.callback_query.edit_message_text(
@@ -238,6 +768,109 @@ class AdminHandlers:
             ErrorHandler.log_error(e, "handle_users_management")
             await update.callback_query.answer("❌ Xatolik yuz berdi")
     
+    async def handle_users_list(self, update: Update, context: ContextTypes.DEFAULT_TYPE,
+                                page: int = 0, blocked_only: bool = False) -> None:
+        """Foydalanuvchilar ro'yxatini sahifalab ko'rsatish"""
+        try:
+            user_id = update.effective_user.id
+            
+            async with AsyncSessionLocal() as db:
+                self.admin_service.db = db
+                
+                if not self.admin_service.is_admin(user_id):
+                    await update.callback_query.answer("❌ Ruxsat yo'q")
+                    return
+                
+                users, has_next = await self.admin_service.get_users_page(
+                    page=page,
+                    per_page=BotConstants.ADMIN_USERS_PER_PAGE,
+                    blocked=True if blocked_only else None
+                )
+                
+                title = "🚫 **Bloklangan foydalanuvchilar**" if blocked_only else "📋 **Barcha foydalanuvchilar**"
+                message = self._create_users_list_message(title, users, page)
+                callback_prefix = CallbackPatterns.ADMIN_BLOCKED_USERS if blocked_only else CallbackPatterns.ADMIN_ALL_USERS
+                keyboard = self._create_users_list_keyboard(callback_prefix, page, has_next)
+                
+                await update.callback_query.edit_message_text(
+                    message,
+                    reply_markup=keyboard,
+                    parse_mode='Markdown'
+                )
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_users_list")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_search_user(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Foydalanuvchi qidirish so'rovini kiritishni so'rash"""
+        try:
+            user_id = update.effective_user.id
+            
+            if not self.admin_service.is_admin(user_id):
+                await update.callback_query.answer("❌ Ruxsat yo'q")
+                return
+            
+            await update.callback_query.edit_message_text(
+                "🔍 **Foydalanuvchi qidirish**\n\n"
+                "Telegram ID, telefon raqami yoki ismning boshini kiriting:",
+                reply_markup=InlineKeyboardMarkup([[
+                    InlineKeyboardButton("🔙 Orqaga", callback_data=CallbackPatterns.ADMIN_USERS_MANAGEMENT)
+                ]]),
+                parse_mode='Markdown'
+            )
+            
+            # Qidiruv so'rovini kutish
+            context.user_data['waiting_for_user_search'] = True
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_search_user")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def handle_user_search_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Foydalanuvchi qidiruv so'rovini qabul qilish"""
+        try:
+            context.user_data['waiting_for_user_search'] = False
+            context.user_data['admin_user_search_query'] = update.message.text.strip()
+            
+            message, keyboard = await self._search_users_page(update.effective_user.id, context, page=0)
+            await update.message.reply_text(message, reply_markup=keyboard, parse_mode='Markdown')
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_user_search_input")
+            await update.message.reply_text("❌ Xatolik yuz berdi")
+    
+    async def handle_user_search_page(self, update: Update, context: ContextTypes.DEFAULT_TYPE, page: int) -> None:
+        """Qidiruv natijalarining boshqa sahifasini ko'rsatish"""
+        try:
+            message, keyboard = await self._search_users_page(update.effective_user.id, context, page)
+            await update.callback_query.edit_message_text(message, reply_markup=keyboard, parse_mode='Markdown')
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_user_search_page")
+            await update.callback_query.answer("❌ Xatolik yuz berdi")
+    
+    async def _search_users_page(self, user_id: int, context: ContextTypes.DEFAULT_TYPE,
+                                 page: int) -> Tuple[str, InlineKeyboardMarkup]:
+        """Saqlangan qidiruv so'rovi bo'yicha natijalar sahifasini tayyorlash"""
+        if not self.admin_service.is_admin(user_id):
+            return "❌ Ruxsat yo'q", self._create_back_to_admin_keyboard()
+        
+        query = context.user_data.get('admin_user_search_query')
+        if not query:
+            return "❌ Qidiruv so'rovi topilmadi", self._create_users_management_keyboard()
+        
+        async with AsyncSessionLocal() as db:
+            self.admin_service.db = db
+            users, has_next = await self.admin_service.search_users(
+                query, page=page, per_page=BotConstants.ADMIN_USERS_PER_PAGE
+            )
+        
+        title = f"🔍 **Qidiruv natijalari:** `{query}`"
+        message = self._create_users_list_message(title, users, page)
+        keyboard = self._create_users_list_keyboard(CallbackPatterns.ADMIN_USER_SEARCH_PAGE, page, has_next)
+        return message, keyboard
+    
     async def handle_statistics(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """Statistika ko'rsatish"""
         try:
@@ -395,25 +1028,14 @@ class AdminHandlers:
                     await update.callback_query.answer("❌ Ruxsat yo'q")
                     return
                 
-                # Tasdiqlangan e'lonlarni olish
-                approved_listings = await self.admin_service.get_approved_listings()
-                
-                if not approved_listings:
+                # Birinchi e'lonni ko'rsatish
+                if not await self._show_approved_listing_at(update, context, 0):
                     await update.callback_query.edit_message_text(
                         "✅ **Tasdiqlangan e'lonlar**\n\n"
                         "Hozirda tasdiqlangan e'lonlar yo'q.",
                         reply_markup=self._create_back_to_admin_keyboard(),
                         parse_mode='Markdown'
                     )
-                    return
-                
-                # Birinchi e'lonni ko'rsatish
-                self.admin_data[user_id] = {
-                    'approved_listings': approved_listings,
-                    'current_index': 0
-                }
-                
-                await self._show_approved_listing(update, context, approved_listings[0], 0, len(approved_listings))
             
         except Exception as e:
             ErrorHandler.log_error(e, "handle_approved_listings")
@@ -435,21 +1057,8 @@ class AdminHandlers:
                     )
                     return
                 
-                # Tasdiqlangan e'lonlarni olish
-                listings = await self.admin_service.get_approved_listings()
-                
-                if not listings:
-                    await update.callback_query.edit_message_text(
-                        "✅ Tasdiqlangan e'lonlar yo'q",
-                        reply_markup=self.keyboard_builder.create_back_button()
-                    )
-                    return
-                
                 # Keyingi e'lonni ko'rsatish
-                next_index = current_index + 1
-                if next_index < len(listings):
-                    await self._show_approved_listing(update, context, listings[next_index], next_index, len(listings))
-                else:
+                if not await self._show_approved_listing_at(update, context, current_index + 1):
                     await update.callback_query.answer("Bu oxirgi e'lon!")
                     
         except Exception as e:
@@ -472,27 +1081,34 @@ class AdminHandlers:
                     )
                     return
                 
-                # Tasdiqlangan e'lonlarni olish
-                listings = await self.admin_service.get_approved_listings()
-                
-                if not listings:
-                    await update.callback_query.edit_message_text(
-                        "✅ Tasdiqlangan e'lonlar yo'q",
-                        reply_markup=self.keyboard_builder.create_back_button()
-                    )
-                    return
-                
                 # Oldingi e'lonni ko'rsatish
-                prev_index = current_index - 1
-                if prev_index >= 0:
-                    await self._show_approved_listing(update, context, listings[prev_index], prev_index, len(listings))
-                else:
+                if current_index < 1 or not await self._show_approved_listing_at(update, context, current_index - 1):
                     await update.callback_query.answer("Bu birinchi e'lon!")
                     
         except Exception as e:
             ErrorHandler.log_error(e, "handle_prev_approved_listing")
             await update.callback_query.answer("❌ Xatolik yuz berdi")
     
+    async def _show_approved_listing_at(self, update: Update, context: ContextTypes.DEFAULT_TYPE, index: int) -> bool:
+        """
+        index-o'rindagi tasdiqlangan e'lonni ko'rsatish
+        
+        Har bosishda barcha tasdiqlangan e'lonlar emas, faqat bitta qator
+        (LIMIT/OFFSET) va ularning soni (COUNT) o'qiladi.
+        
+        Returns:
+            bool: E'lon topildi va ko'rsatildi
+        """
+        listings, _ = await self.admin_service.get_listings_page(
+            page=index, per_page=1, status=ListingStatus.approved
+        )
+        if not listings:
+            return False
+        
+        total = await self.admin_service.get_listings_count(ListingStatus.approved)
+        await self._show_approved_listing(update, context, listings[0], index, total)
+        return True
+    
     # Helper methods
     
     def _create_admin_panel_message(self, stats: Dict[str, Any]) -> str:
@@ -522,10 +1138,12 @@ Kerakli amalni tanlang:"""
         keyboard = [
             [InlineKeyboardButton("📋 Yangi e'lonlar", callback_data="ADMIN_NEW_LISTINGS")],
             [InlineKeyboardButton("📋 Tasdiqlanmagan e'lonlar", callback_data="ADMIN_PENDING_LISTINGS")],
+            [InlineKeyboardButton("☑️ Ommaviy moderatsiya", callback_data=CallbackPatterns.ADMIN_BULK_MODERATION)],
             [InlineKeyboardButton("✅ Tasdiqlangan e'lonlar", callback_data="ADMIN_APPROVED_LISTINGS")],
             [InlineKeyboardButton("📝 E'lon qo'shish", callback_data="ADMIN_CREATE_LISTING")],
             [InlineKeyboardButton("👥 Foydalanuvchilar", callback_data="ADMIN_USERS_MANAGEMENT")],
             [InlineKeyboardButton("📊 Batafsil statistika", callback_data="ADMIN_STATISTICS")],
+            [InlineKeyboardButton("📣 Ommaviy xabar", callback_data=CallbackPatterns.ADMIN_BROADCAST)],
             [InlineKeyboardButton("🔙 Asosiy menyu", callback_data=CallbackPatterns.MAIN_MENU)]
         ]
         return InlineKeyboardMarkup(keyboard)
@@ -560,10 +1178,12 @@ Kerakli amalni tanlang:"""
 **Egasi:** {listing.owner.name}
 **Telefon:** {listing.owner.phone_number or 'Ko\'rsatilmagan'}
 **Yaratilgan:** {listing.created_at.strftime('%d.%m.%Y %H:%M')}
-
+{await self._duplicate_text(listing)}{await self._similar_photos_text(listing.id)}
 Ushbu e'lon bilan nima qilasiz?"""
             
-            keyboard = self._create_listing_moderation_keyboard(listing.id, current_index, total_count)
+            media = self.admin_data.get(update.effective_user.id, {}).get('media', {})
+            photos_count = len(media.get(listing.id, []))
+            keyboard = self._create_listing_moderation_keyboard(listing.id, current_index, total_count, photos_count)
             
             await update.callback_query.edit_message_text(
                 message,
@@ -575,7 +1195,52 @@ Ushbu e'lon bilan nima qilasiz?"""
             ErrorHandler.log_error(e, "_show_listing_for_moderation")
             await update.callback_query.answer("❌ Xatolik yuz berdi")
     
-    def _create_listing_moderation_keyboard(self, listing_id: str, current_index: int, total_count: int) -> InlineKeyboardMarkup:
+    async def _duplicate_text(self, listing: Listing) -> str:
+        """Matni deyarli bir xil bo'lgan avvalgi e'lon haqida ogohlantirish"""
+        if not listing.duplicate_of_id:
+            return ""
+        
+        try:
+            async with AsyncSessionLocal() as db:
+                result = await db.execute(
+                    select(Listing.title, Listing.status).where(Listing.id == listing.duplicate_of_id)
+                )
+                original = result.first()
+        except Exception as e:
+            logger.warning(f"Duplicate lookup failed for {listing.id}: {e}")
+            return ""
+        
+        if original is None:
+            return ""
+        
+        score = f"{listing.duplicate_score:.0%}" if listing.duplicate_score is not None else "?"
+        return (
+            f"\n🔁 **Ehtimoliy takror ({score}):** {original.title} "
+            f"(ID: `{listing.duplicate_of_id[:8]}`, {original.status.value})\n"
+        )
+    
+    async def _similar_photos_text(self, listing_id: str) -> str:
+        """Boshqa e'lonlarda ishlatilgan o'xshash rasmlar haqida ogohlantirish"""
+        try:
+            async with AsyncSessionLocal() as db:
+                similar = await PhotoHashService(db).find_similar_listings(listing_id)
+        except Exception as e:
+            logger.warning(f"Similar photo lookup failed for {listing_id}: {e}")
+            return ""
+        
+        if not similar:
+            return ""
+        
+        lines = ["", "⚠️ **O'xshash rasmlar boshqa e'lonlarda ishlatilgan:**"]
+        for item in similar:
+            lines.append(
+                f"• {item['title']} (ID: `{item['listing_id'][:8]}`, {item['status'].value}) - "
+                f"{item['matches']} ta rasm, farq: {item['distance']} bit"
+            )
+        return "\n".join(lines) + "\n"
+    
+    def _create_listing_moderation_keyboard(self, listing_id: str, current_index: int, total_count: int,
+                                            photos_count: int = 0) -> InlineKeyboardMarkup:
         """E'lon moderatsiya klaviaturasi"""
         keyboard = [
             [
@@ -585,6 +1250,12 @@ Ushbu e'lon bilan nima qilasiz?"""
             [InlineKeyboardButton("🗑️ O'chirish", callback_data=f"ADMIN_DELETE:{listing_id}")],
         ]
         
+        if photos_count:
+            keyboard.insert(0, [InlineKeyboardButton(
+                f"🖼 Rasmlar ({photos_count})",
+                callback_data=f"{CallbackPatterns.ADMIN_LISTING_PHOTOS}:{listing_id}"
+            )])
+        
         # Navigation buttons
         nav_row = []
         if current_index > 0:
@@ -655,22 +1326,53 @@ Ushbu e'lon bilan nima qilasiz?"""
             ErrorHandler.log_error(e, "_show_next_pending_listing_after_message")
             await update.message.reply_text("❌ Xatolik yuz berdi")
     
-    def _create_users_management_message(self, users: List[User]) -> str:
+    def _create_users_management_message(self, counts: Dict[str, int], recent_users: List[User]) -> str:
         """Foydalanuvchilar boshqaruvi xabari"""
-        total_users = len(users)
-        verified_users = sum(1 for user in users if user.verified)
-        blocked_users = sum(1 for user in users if user.blocked)
+        recent_lines = "\n".join(self._format_user_line(user) for user in recent_users) or "Foydalanuvchilar yo'q"
         
         return f"""👥 **Foydalanuvchilar Boshqaruvi**
 
 📊 **Statistika:**
-• Jami foydalanuvchilar: {total_users}
-• Tasdiqlangan: {verified_users}
-• Bloklangan: {blocked_users}
+• Jami foydalanuvchilar: {counts['total']}
+• Tasdiqlangan: {counts['verified']}
+• Bloklangan: {counts['blocked']}
 
 **Oxirgi 10 foydalanuvchi:**
+{recent_lines}
 """
     
+    def _create_users_list_message(self, title: str, users: List[User], page: int) -> str:
+        """Foydalanuvchilar ro'yxati xabari"""
+        if not users:
+            return f"{title}\n\nFoydalanuvchilar topilmadi."
+        
+        start = page * BotConstants.ADMIN_USERS_PER_PAGE
+        lines = [f"{start + i + 1}. {self._format_user_line(user)}" for i, user in enumerate(users)]
+        return f"{title} (sahifa {page + 1})\n\n" + "\n".join(lines)
+    
+    @staticmethod
+    def _format_user_line(user: User) -> str:
+        """Foydalanuvchi haqida bir qatorli ma'lumot"""
+        status = "🚫" if user.blocked else ("✅" if user.verified else "•")
+        return f"{status} {user.name} | ID: `{user.telegram_user_id}` | {user.phone_number or 'Telefon yo\'q'}"
+    
+    def _create_users_list_keyboard(self, callback_prefix: str, page: int, has_next: bool) -> InlineKeyboardMarkup:
+        """Foydalanuvchilar ro'yxati klaviaturasi"""
+        keyboard = []
+        
+        nav_row = []
+        if page > 0:
+            nav_row.append(InlineKeyboardButton("⬅️ Oldingi", callback_data=f"{callback_prefix}:{page - 1}"))
+        if has_next:
+            nav_row.append(InlineKeyboardButton("➡️ Keyingi", callback_data=f"{callback_prefix}:{page + 1}"))
+        
+        if nav_row:
+            keyboard.append(nav_row)
+        
+        keyboard.append([InlineKeyboardButton("🔙 Foydalanuvchilar", callback_data=CallbackPatterns.ADMIN_USERS_MANAGEMENT)])
+        
+        return InlineKeyboardMarkup(keyboard)
+    
     def _create_users_management_keyboard(self) -> InlineKeyboardMarkup:
         """Foydalanuvchilar boshqaruvi klaviaturasi"""
         keyboard = [
@@ -1,8 +1,9 @@
 """
 Listing Handlers - E'lon joylashtirish va qidirish handlerlari (Clean Code)
 """
+import asyncio
 import logging
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Set
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 from src.services.user_service import UserService
@@ -10,6 +11,8 @@ from src.services.listing_service import ListingService
 from src.services.validation_service import ValidationService, ErrorHandler
 from src.services.keyboard_builder import KeyboardBuilder
 from src.services.message_builder import MessageBuilder
+from src.services.media_service import MediaService, MEDIA_GROUP_LIMIT
+from src.services.photo_hash_service import PhotoHashService
 from src.utils.constants import CallbackPatterns, BotConstants
 from src.config import settings, REGIONS, CURRENCIES
 from src.database.database import AsyncSessionLocal
@@ -27,7 +30,9 @@ class ListingHandlers:
         self.search_data: Dict[int, Dict[str, Any]] = {}
         self.keyboard_builder = KeyboardBuilder()
         self.message_builder = MessageBuilder()
+        self.media_service = MediaService()
         self.validator = ValidationService()
+        self._background_tasks: Set[asyncio.Task] = set()
     
     # ==================== LISTING CREATION HANDLERS ====================
     
@@ -35,6 +40,8 @@ class ListingHandlers:
         """E'lon joylashtirishni boshlash"""
         try:
             user_id = update.effective_user.id
+            # Tashlab ketilgan oldingi qoralama rasmlari bo'shatiladi
+            await self._discard_draft(user_id)
             self.user_data[user_id] = {}
             
             await update.callback_query.edit_message_text(
@@ -368,13 +375,101 @@ class ListingHandlers:
             self.user_data[user_id]['description'] = cleaned_description
             context.user_data['waiting_for_description'] = False
             
-            # E'lon preview ko'rsatish
-            await self.show_listing_preview(update, context)
+            # Rasmlarni so'rash
+            await update.message.reply_text(
+                self._get_photos_prompt(),
+                reply_markup=self.keyboard_builder.create_photos_done_keyboard()
+            )
+            context.user_data['waiting_for_photos'] = True
             
         except Exception as e:
             ErrorHandler.log_error(e, "handle_description_input")
             await update.message.reply_text(self.message_builder.create_error_message("generic"))
     
+    async def handle_skip_description(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Tavsifni o'tkazib yuborish"""
+        try:
+            user_id = update.effective_user.id
+            
+            if user_id not in self.user_data:
+                await update.callback_query.edit_message_text(
+                    self.message_builder.create_error_message("missing_data"),
+                    reply_markup=self.keyboard_builder.create_back_button()
+                )
+                return
+            
+            context.user_data['waiting_for_description'] = False
+            
+            await update.callback_query.edit_message_text(
+                self._get_photos_prompt(),
+                reply_markup=self.keyboard_builder.create_photos_done_keyboard()
+            )
+            context.user_data['waiting_for_photos'] = True
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_skip_description")
+            await update.callback_query.answer(self.message_builder.create_error_message("generic"))
+    
+    async def handle_photo_input(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """E'lon rasmini qabul qilish"""
+        try:
+            user_id = update.effective_user.id
+            
+            if user_id not in self.user_data:
+                await update.message.reply_text(
+                    self.message_builder.create_error_message("missing_data"),
+                    reply_markup=self.keyboard_builder.create_back_button()
+                )
+                return
+            
+            media = self.user_data[user_id].setdefault('media', [])
+            if len(media) >= MEDIA_GROUP_LIMIT:
+                await update.message.reply_text(
+                    f"❌ Ko'pi bilan {MEDIA_GROUP_LIMIT} ta rasm qo'shish mumkin",
+                    reply_markup=self.keyboard_builder.create_photos_done_keyboard()
+                )
+                return
+            
+            # file_id rejimida rasm serverga yuklanmaydi
+            reference = await self.media_service.store_media(update, context)
+            if not reference:
+                await update.message.reply_text(
+                    "❌ Rasmni qabul qilib bo'lmadi. Boshqa rasm yuboring.",
+                    reply_markup=self.keyboard_builder.create_photos_done_keyboard()
+                )
+                return
+            
+            media.append(reference)
+            
+            await update.message.reply_text(
+                f"✅ Rasm qo'shildi ({len(media)}/{MEDIA_GROUP_LIMIT})",
+                reply_markup=self.keyboard_builder.create_photos_done_keyboard()
+            )
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_photo_input")
+            await update.message.reply_text(self.message_builder.create_error_message("generic"))
+    
+    async def handle_photos_done(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        """Rasmlar qo'shishni yakunlash va preview ko'rsatish"""
+        try:
+            context.user_data['waiting_for_photos'] = False
+            
+            await update.callback_query.answer()
+            await self.show_listing_preview(update, context)
+            
+        except Exception as e:
+            ErrorHandler.log_error(e, "handle_photos_done")
+            await update.callback_query.answer(self.message_builder.create_error_message("generic"))
+    
+    @staticmethod
+    def _get_photos_prompt() -> str:
+        """Rasm so'rash matni"""
+        return (
+            f"📷 E'lon rasmlarini yuboring ({MEDIA_GROUP_LIMIT} tagacha, ixtiyoriy).\n\n"
+            "Tugatgach yoki rasmsiz davom etish uchun tugmani bosing."
+        )
+    
     async def show_listing_preview(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """E'lon preview ko'rsatish"""
         try:
@@ -382,7 +477,7 @@ class ListingHandlers:
             listing_data = self.user_data.get(user_id, {})
             
             if not listing_data:
-                await update.message.reply_text(
+                await update.effective_message.reply_text(
                     self.message_builder.create_error_message("missing_data"),
                     reply_markup=self.keyboard_builder.create_back_button()
                 )
@@ -391,13 +486,13 @@ class ListingHandlers:
             # E'lon ma'lumotlarini tekshirish
             is_valid, error = self.validator.validate_listing_data(listing_data)
             if not is_valid:
-                await update.message.reply_text(
+                await update.effective_message.reply_text(
                     self.message_builder.create_error_message("generic", error),
                     reply_markup=self.keyboard_builder.create_back_button()
                 )
                 return
             
-            await update.message.reply_text(
+            await update.effective_message.reply_text(
                 self.message_builder.create_listing_preview_message(listing_data),
                 reply_markup=self.keyboard_builder.create_listing_preview_keyboard(),
                 parse_mode='Markdown'
@@ -405,7 +500,7 @@ class ListingHandlers:
             
         except Exception as e:
             ErrorHandler.log_error(e, "show_listing_preview")
-            await update.message.reply_text(self.message_builder.create_error_message("generic"))
+            await update.effective_message.reply_text(self.message_builder.create_error_message("generic"))
     
     async def handle_listing_submit(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
         """E'lonni yuborish"""
@@ -440,6 +535,16 @@ class ListingHandlers:
                 listing = await self.listing_service.create_listing(user_db.id, listing_data)
                 
                 if listing:
+                    # Rasmlar endi e'longa tegishli - qoralama bilan bo'shatilmaydi
+                    media = listing_data.pop('media', None)
+                    if media:
+                        # Rasm hashlari fonda hisoblanadi - foydalanuvchi kutmaydi
+                        task = asyncio.create_task(
+                            self._index_listing_photos(listing.id, media, context.bot)
+                        )
+                        self._background_tasks.add(task)
+                        task.add_done_callback(self._background_tasks.discard)
+                    
                     # E'lon ko'rinishini ko'rsatish
                     await self._show_listing_preview(update, context, listing)
                 else:
@@ -452,6 +557,29 @@ class ListingHandlers:
             ErrorHandler.log_error(e, "handle_listing_submit")
             await update.callback_query.answer(self.message_builder.create_error_message("generic"))
     
+    async def _discard_draft(self, user_id: int) -> None:
+        """Qoralamani o'chirish va omborga yuklangan rasmlari havolalarini bo'shatish"""
+        draft = self.user_data.pop(user_id, None)
+        if not draft:
+            return
+        shas = [
+            reference[key]
+            for reference in draft.get('media', [])
+            for key in ('sha256', 'thumb_sha256')
+            if reference.get(key)
+        ]
+        if shas:
+            await self.media_service.store.release_all(shas)
+    
+    async def _index_listing_photos(self, listing_id: str, media: List[Dict[str, Any]], bot) -> None:
+        """E'lon rasmlari hashlarini o'xshash rasmlarni qidirish uchun saqlash"""
+        try:
+            hashes = await self.media_service.compute_photo_hashes(bot, media)
+            async with AsyncSessionLocal() as db:
+                await PhotoHashService(db).add_listing_hashes(listing_id, hashes)
+        except Exception as e:
+            ErrorHandler.log_error(e, "_index_listing_photos")
+    
     async def _show_listing_preview(self, update: Update, context: ContextTypes.DEFAULT_TYPE, listing) -> None:
         """E'lon ko'rinishini ko'rsatish"""
         try:
@@ -615,8 +743,7 @@ class ListingHandlers:
             user_id = update.effective_user.id
             
             # Foydalanuvchi ma'lumotlarini tozalash
-            if user_id in self.user_data:
-                del self.user_data[user_id]
+            await self._discard_draft(user_id)
             
             await update.callback_query.edit_message_text(
                 "❌ E'lon joylashtirish bekor qilindi.",
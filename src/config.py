@@ -12,6 +12,8 @@ class Settings(BaseSettings):
     
     # Telegram Bot
     bot_token: str = Field(env="TELEGRAM_BOT_TOKEN")
+    # Lokal Bot API server yoki tools/fake_bot_api.py (bo'sh - api.telegram.org)
+    telegram_api_url: str = Field(default="", env="TELEGRAM_API_URL")
     
     # Database
     database_url: str = Field(default="sqlite:///uykelishuv.db", env="DATABASE_URL")
@@ -29,6 +31,65 @@ class Settings(BaseSettings):
     # Bot Settings
     bot_name: str = Field(default="UyKelishuv Bot", env="BOT_NAME")
     
+    # Broadcast Settings (Telegram umumiy limiti ~30 xabar/soniya)
+    broadcast_rate: float = Field(default=25.0, env="BROADCAST_RATE")
+    broadcast_concurrency: int = Field(default=10, env="BROADCAST_CONCURRENCY")
+    
+    # Media Settings ("file_id" - Telegram file_id saqlanadi, "local" - diskka yuklanadi)
+    media_storage_mode: str = Field(default="file_id", env="MEDIA_STORAGE_MODE")
+    media_root: str = Field(default="media", env="MEDIA_ROOT")
+    # Rasm qayta ishlash jarayonlari soni (0 - CPU yadrolari soni)
+    image_pipeline_workers: int = Field(default=2, env="IMAGE_PIPELINE_WORKERS")
+    # Yetim media fayllarni tozalash (0 - o'chirilgan) va yangi fayllar muhlati
+    media_gc_interval_hours: float = Field(default=24.0, env="MEDIA_GC_INTERVAL_HOURS")
+    media_gc_grace_hours: float = Field(default=24.0, env="MEDIA_GC_GRACE_HOURS")
+    media_gc_dry_run: bool = Field(default=False, env="MEDIA_GC_DRY_RUN")
+    
+    # Sekin SQL so'rovlar jurnali (0 - o'chirilgan)
+    slow_query_threshold_ms: float = Field(default=200.0, env="SLOW_QUERY_THRESHOLD_MS")
+    slow_query_sample_rate: float = Field(default=1.0, env="SLOW_QUERY_SAMPLE_RATE")
+    slow_query_log_size: int = Field(default=100, env="SLOW_QUERY_LOG_SIZE")
+    slow_query_explain: bool = Field(default=True, env="SLOW_QUERY_EXPLAIN")
+    
+    # Admin /profiler buyrug'i: namuna olish oralig'i va eng uzoq profil
+    profiler_interval_ms: float = Field(default=10.0, env="PROFILER_INTERVAL_MS")
+    profiler_max_seconds: int = Field(default=120, env="PROFILER_MAX_SECONDS")
+    
+    # Bot jarayonidagi HTTP server (/metrics, /healthz, /readyz); 0 - o'chirilgan
+    http_host: str = Field(default="0.0.0.0", env="HTTP_HOST")
+    http_port: int = Field(default=8080, env="HTTP_PORT")
+    # /readyz: baza javobini kutish muddati va update navbati chegarasi
+    health_db_timeout: float = Field(default=2.0, env="HEALTH_DB_TIMEOUT")
+    health_max_queue_depth: int = Field(default=100, env="HEALTH_MAX_QUEUE_DEPTH")
+    
+    # Update -> SQL -> Bot API tracing (OTLP/HTTP JSON kollektoriga yuboriladi)
+    tracing_enabled: bool = Field(default=False, env="TRACING_ENABLED")
+    tracing_sample_rate: float = Field(default=1.0, env="TRACING_SAMPLE_RATE")
+    otlp_endpoint: str = Field(default="http://localhost:4318/v1/traces", env="OTLP_ENDPOINT")
+    
+    # Kiruvchi update larni anonim yozib olish (replay uchun); bo'sh - o'chirilgan
+    update_recording_path: str = Field(default="", env="UPDATE_RECORDING_PATH")
+    update_recording_salt: str = Field(default="", env="UPDATE_RECORDING_SALT")
+    
+    # Eskiz.uz SMS provayderi
+    sms_api_url: str = Field(default="https://notify.eskiz.uz", env="SMS_API_URL")
+    sms_email: str = Field(default="", env="SMS_EMAIL")
+    sms_password: str = Field(default="", env="SMS_PASSWORD")
+    sms_sender: str = Field(default="4546", env="SMS_SENDER")
+    sms_timeout: float = Field(default=10.0, env="SMS_TIMEOUT")
+    # SMS tasdiqlash kodlari ombori: "database", "redis" yoki "memory" (faqat bitta jarayon)
+    verification_store: str = Field(default="database", env="VERIFICATION_STORE")
+    # Muddati tugagan kodlarni bazadan o'chirish oralig'i (0 - o'chirilgan)
+    verification_cleanup_interval_minutes: float = Field(default=60.0, env="VERIFICATION_CLEANUP_INTERVAL_MINUTES")
+    redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
+    
+    # S3-mos ombor (MEDIA_STORAGE_MODE=s3)
+    s3_endpoint_url: str = Field(default="", env="S3_ENDPOINT_URL")
+    s3_bucket: str = Field(default="", env="S3_BUCKET")
+    s3_access_key: str = Field(default="", env="S3_ACCESS_KEY")
+    s3_secret_key: str = Field(default="", env="S3_SECRET_KEY")
+    s3_region: str = Field(default="us-east-1", env="S3_REGION")
+    
     model_config = {
         "env_file": ".env",
         "env_file_encoding": "utf-8",
@@ -75,12 +136,50 @@ def create_settings():
         # Settings yaratish
         data = {
             'bot_token': bot_token,
+            'telegram_api_url': os.getenv('TELEGRAM_API_URL', ''),
             'database_url': database_url,
             'secret_key': os.getenv('SECRET_KEY', 'local_secret_key'),
             'jwt_secret_key': os.getenv('JWT_SECRET_KEY', 'local_jwt_secret'),
             'debug': os.getenv('DEBUG', 'true').lower() == 'true',
             'admin_ids': os.getenv('ADMIN_IDS', '924016177'),
-            'bot_name': os.getenv('BOT_NAME', 'UyKelishuv Bot')
+            'bot_name': os.getenv('BOT_NAME', 'UyKelishuv Bot'),
+            'broadcast_rate': float(os.getenv('BROADCAST_RATE', '25')),
+            'broadcast_concurrency': int(os.getenv('BROADCAST_CONCURRENCY', '10')),
+            'media_storage_mode': os.getenv('MEDIA_STORAGE_MODE', 'file_id'),
+            'media_root': os.getenv('MEDIA_ROOT', 'media'),
+            'image_pipeline_workers': int(os.getenv('IMAGE_PIPELINE_WORKERS', '2')),
+            'media_gc_interval_hours': float(os.getenv('MEDIA_GC_INTERVAL_HOURS', '24')),
+            'media_gc_grace_hours': float(os.getenv('MEDIA_GC_GRACE_HOURS', '24')),
+            'media_gc_dry_run': os.getenv('MEDIA_GC_DRY_RUN', 'false').lower() == 'true',
+            'slow_query_threshold_ms': float(os.getenv('SLOW_QUERY_THRESHOLD_MS', '200')),
+            'slow_query_sample_rate': float(os.getenv('SLOW_QUERY_SAMPLE_RATE', '1')),
+            'slow_query_log_size': int(os.getenv('SLOW_QUERY_LOG_SIZE', '100')),
+            'slow_query_explain': os.getenv('SLOW_QUERY_EXPLAIN', 'true').lower() == 'true',
+            'profiler_interval_ms': float(os.getenv('PROFILER_INTERVAL_MS', '10')),
+            'profiler_max_seconds': int(os.getenv('PROFILER_MAX_SECONDS', '120')),
+            'http_host': os.getenv('HTTP_HOST', '0.0.0.0'),
+            # Railway PORT ni o'zi beradi
+            'http_port': int(os.getenv('HTTP_PORT', os.getenv('PORT', '8080'))),
+            'health_db_timeout': float(os.getenv('HEALTH_DB_TIMEOUT', '2')),
+            'health_max_queue_depth': int(os.getenv('HEALTH_MAX_QUEUE_DEPTH', '100')),
+            'tracing_enabled': os.getenv('TRACING_ENABLED', 'false').lower() == 'true',
+            'tracing_sample_rate': float(os.getenv('TRACING_SAMPLE_RATE', '1')),
+            'otlp_endpoint': os.getenv('OTLP_ENDPOINT', 'http://localhost:4318/v1/traces'),
+            'update_recording_path': os.getenv('UPDATE_RECORDING_PATH', ''),
+            'update_recording_salt': os.getenv('UPDATE_RECORDING_SALT', ''),
+            'sms_api_url': os.getenv('SMS_API_URL', 'https://notify.eskiz.uz'),
+            'sms_email': os.getenv('SMS_EMAIL', ''),
+            'sms_password': os.getenv('SMS_PASSWORD', ''),
+            'sms_sender': os.getenv('SMS_SENDER', '4546'),
+            'sms_timeout': float(os.getenv('SMS_TIMEOUT', '10')),
+            'verification_store': os.getenv('VERIFICATION_STORE', 'database'),
+            'verification_cleanup_interval_minutes': float(os.getenv('VERIFICATION_CLEANUP_INTERVAL_MINUTES', '60')),
+            'redis_url': os.getenv('REDIS_URL', 'redis://localhost:6379/0'),
+            's3_endpoint_url': os.getenv('S3_ENDPOINT_URL', ''),
+            's3_bucket': os.getenv('S3_BUCKET', ''),
+            's3_access_key': os.getenv('S3_ACCESS_KEY', ''),
+            's3_secret_key': os.getenv('S3_SECRET_KEY', ''),
+            's3_region': os.getenv('S3_REGION', 'us-east-1')
         }
         
         return Settings(**data)
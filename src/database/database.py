@@ -3,9 +3,14 @@ Database connection and session management
 """
 import os
 import logging
+from sqlalchemy import event, text
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from src.config import settings
 from src.database.models import Base
+from src.database.slow_query_log import SlowQueryLog
+from src.utils.metrics import instrument_engine
+from src.utils.query_budget import count_engine_queries
+from src.utils.tracing import trace_engine
 
 logger = logging.getLogger(__name__)
 
@@ -50,6 +55,37 @@ if database_url.startswith('postgresql+asyncpg://') and os.getenv('RAILWAY_ENVIR
 
 engine = create_async_engine(database_url, **engine_kwargs)
 
+
+def enable_sqlite_foreign_keys(engine) -> None:
+    """SQLite da ON DELETE CASCADE/SET NULL ishlashi uchun har bir ulanishda foreign_keys ni yoqish"""
+    @event.listens_for(engine.sync_engine, "connect")
+    def _set_foreign_keys(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+
+if engine.dialect.name == "sqlite":
+    enable_sqlite_foreign_keys(engine)
+# SQL so'rovlar va hovuz ko'rsatkichlari (/metrics)
+instrument_engine(engine)
+# Handler chaqiruvi boshiga so'rovlar soni (src/utils/query_budget.py)
+count_engine_queries(engine)
+
+# Chegaradan sekin so'rovlar reja bilan yoziladi (admin /slowlog bilan ko'radi)
+slow_query_log = SlowQueryLog(
+    threshold_ms=settings.slow_query_threshold_ms,
+    capacity=settings.slow_query_log_size,
+    sample_rate=settings.slow_query_sample_rate,
+    explain=settings.slow_query_explain
+)
+if settings.slow_query_threshold_ms > 0:
+    slow_query_log.attach(engine)
+
+# Update ichidagi SQL so'rovlar span sifatida yoziladi
+if settings.tracing_enabled:
+    trace_engine(engine)
+
 # Async session factory
 AsyncSessionLocal = async_sessionmaker(
     engine,
@@ -62,6 +98,9 @@ async def init_db():
     """Database jadvallarini yaratish"""
     try:
         async with engine.begin() as conn:
+            if conn.dialect.name == "postgresql":
+                # Foydalanuvchi ismlari bo'yicha trigram qidiruvi uchun
+                await conn.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
             await conn.run_sync(Base.metadata.create_all)
         logger.info("Database initialized successfully")
     except Exception as e:
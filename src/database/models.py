@@ -6,11 +6,12 @@ from datetime import datetime
 from typing import Optional
 from sqlalchemy import (
     Column, String, Integer, Float, Boolean, DateTime, Text, 
-    ForeignKey, Enum, Numeric, BigInteger
+    ForeignKey, Enum, Numeric, BigInteger, Index, LargeBinary
 )
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
+from src.utils.helpers import normalize_name
 
 Base = declarative_base()
 
@@ -36,6 +37,18 @@ class ListingStatus(enum.Enum):
     archived = "archived"
 
 
+class BroadcastStatus(enum.Enum):
+    """Ommaviy xabar holatlari"""
+    running = "running"
+    completed = "completed"
+    cancelled = "cancelled"
+
+
+def _default_name_normalized(context) -> Optional[str]:
+    """INSERT paytida name_normalized ni name dan hisoblash"""
+    return normalize_name(context.get_current_parameters().get('name'))
+
+
 class User(Base):
     """Foydalanuvchi modeli"""
     __tablename__ = "users"
@@ -43,14 +56,26 @@ class User(Base):
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     telegram_user_id = Column(BigInteger, unique=True, nullable=False)
     name = Column(String(255), nullable=False)
+    # Admin qidiruvi uchun: kichik harfli prefiks indeksi (Postgres'da trigram ham)
+    name_normalized = Column(String(255), default=_default_name_normalized, nullable=True, index=True)
     phone_number = Column(String(20), unique=True, nullable=True)
     locale = Column(String(10), default="uz", nullable=False)
     verified = Column(Boolean, default=False, nullable=False)
     blocked = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Botni bloklagan (Forbidden) foydalanuvchilar - ommaviy xabarlarda o'tkazib yuboriladi
+    unreachable = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
     
     # Relationships
     listings = relationship("Listing", back_populates="owner")
+    
+    __table_args__ = (
+        Index(
+            'ix_users_name_normalized_trgm', 'name_normalized',
+            postgresql_using='gin',
+            postgresql_ops={'name_normalized': 'gin_trgm_ops'}
+        ).ddl_if(dialect='postgresql'),
+    )
 
 
 class Listing(Base):
@@ -84,7 +109,11 @@ class Listing(Base):
     # Content
     title = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
-    media_urls = Column(Text, nullable=True)
+    
+    # Takrorlarni aniqlash: sarlavha + tavsif MinHash imzosi va topilgan asl e'lon
+    text_signature = Column(LargeBinary, nullable=True)
+    duplicate_of_id = Column(String(36), ForeignKey("listings.id", ondelete="SET NULL"), nullable=True)
+    duplicate_score = Column(Float, nullable=True)
     
     # Statistics
     views_count = Column(Integer, default=0, nullable=False)
@@ -100,4 +129,110 @@ class Listing(Base):
     approved_at = Column(DateTime, nullable=True)
     
     # Relationships
-    owner = relationship("User", back_populates="listings", foreign_keys=[user_id])
\ No newline at end of file
+    owner = relationship("User", back_populates="listings", foreign_keys=[user_id])
+    
+    __table_args__ = (
+        # Admin sahifalari: status bo'yicha filtrlash + created_at bo'yicha tartiblash
+        Index('ix_listings_status_created_at', 'status', 'created_at'),
+    )
+
+
+class Broadcast(Base):
+    """Ommaviy xabar modeli"""
+    __tablename__ = "broadcasts"
+    
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    admin_telegram_id = Column(BigInteger, nullable=False)
+    text = Column(Text, nullable=False)
+    status = Column(Enum(BroadcastStatus), default=BroadcastStatus.running, nullable=False, index=True)
+    
+    # Davom ettirish nuqtasi: oxirgi ishlangan telegram_user_id
+    last_telegram_user_id = Column(BigInteger, default=0, nullable=False)
+    
+    # Progress
+    total_count = Column(Integer, default=0, nullable=False)
+    sent_count = Column(Integer, default=0, nullable=False)
+    failed_count = Column(Integer, default=0, nullable=False)
+    unreachable_count = Column(Integer, default=0, nullable=False)
+    
+    # Admin ko'radigan progress xabari
+    progress_chat_id = Column(BigInteger, nullable=True)
+    progress_message_id = Column(Integer, nullable=True)
+    
+    # Timestamps
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    finished_at = Column(DateTime, nullable=True)
+
+
+class MediaBlob(Base):
+    """Kontent bo'yicha saqlangan media fayl (SHA-256)"""
+    __tablename__ = "media_blobs"
+    
+    sha256 = Column(String(64), primary_key=True)
+    size = Column(BigInteger, nullable=False)
+    content_type = Column(String(100), default="image/jpeg", nullable=False)
+    # Nechta e'lon shu faylni ishlatadi - 0 bo'lganda fayl o'chiriladi
+    ref_count = Column(Integer, default=1, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class PhotoHash(Base):
+    """E'lon rasmining perceptual hash i (o'xshash rasmlarni topish uchun)"""
+    __tablename__ = "photo_hashes"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    listing_id = Column(String(36), ForeignKey("listings.id", ondelete="CASCADE"), nullable=False, index=True)
+    position = Column(Integer, default=0, nullable=False)
+    # 64 bitli dHash (BIGINT ga sig'ishi uchun ishorali ko'rinishda)
+    dhash = Column(BigInteger, nullable=False)
+    # Multi-index hashing: har bir 16 bitli bo'lak alohida indekslanadi
+    band0 = Column(Integer, nullable=False, index=True)
+    band1 = Column(Integer, nullable=False, index=True)
+    band2 = Column(Integer, nullable=False, index=True)
+    band3 = Column(Integer, nullable=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class ListingMedia(Base):
+    """E'lon rasmi (tartib raqami bilan)"""
+    __tablename__ = "listing_media"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    listing_id = Column(String(36), ForeignKey("listings.id", ondelete="CASCADE"), nullable=False)
+    position = Column(Integer, nullable=False)
+    
+    # file_id rejimi - Telegram serveridagi fayl
+    file_id = Column(String(255), nullable=True)
+    file_unique_id = Column(String(100), nullable=True)
+    thumb_file_id = Column(String(255), nullable=True)
+    # Ombor rejimi - media_blobs dagi kontent hash i
+    sha256 = Column(String(64), nullable=True, index=True)
+    thumb_sha256 = Column(String(64), nullable=True, index=True)
+    # Eski e'lonlar - lokal fayl yo'li
+    path = Column(String(500), nullable=True)
+    
+    is_document = Column(Boolean, default=False, nullable=False)
+    size = Column(BigInteger, nullable=True)
+    width = Column(Integer, nullable=True)
+    height = Column(Integer, nullable=True)
+    
+    __table_args__ = (
+        # E'lon rasmlarini tartib bilan olish (listing_id bo'yicha qidiruv ham shu indeksdan)
+        Index('ix_listing_media_listing_id_position', 'listing_id', 'position', unique=True),
+    )
+
+
+class VerificationCode(Base):
+    """Telefon raqamini tasdiqlash kodi (bir nechta bot nusxasi uchun umumiy)"""
+    __tablename__ = "verification_codes"
+    
+    phone = Column(String(20), primary_key=True)
+    code = Column(String(10), nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    verified = Column(Boolean, default=False, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # Shu vaqtgacha yangi kod yuborilmaydi
+    cooldown_until = Column(DateTime, nullable=False)
+    # Muddati tugagan qatorlar shu indeks bo'yicha tozalanadi
+    expires_at = Column(DateTime, nullable=False, index=True)
@@ -0,0 +1,154 @@
+"""
+Slow Query Log - Sekin SQL so'rovlarni reja (EXPLAIN) bilan yozib borish
+
+Chegaradan sekin bajarilgan so'rov parametrlari va bajarilish rejasi bilan
+halqa buferga yoziladi (eng eskisi o'chadi). Reja so'rov bajarilgan
+ulanishning o'zida, DBAPI kursori orqali olinadi - SQLAlchemy hodisalari
+qayta ishga tushmaydi. Yozuvlar tasodifiy tanlanadi (sample_rate), shuning
+uchun ko'p sekin so'rov bo'lganda ham EXPLAIN bazani ortiqcha yuklamaydi.
+"""
+import logging
+import random
+import time
+from collections import deque
+from datetime import datetime
+from typing import Optional, List, Dict, Any, Callable
+
+logger = logging.getLogger(__name__)
+
+# Parametr qiymati shu uzunlikdan keyin qisqartiriladi
+MAX_PARAMETER_LENGTH = 200
+
+# Reja faqat o'qish so'rovlari uchun olinadi
+EXPLAINABLE = ("SELECT", "WITH")
+
+
+def _short(value: Any) -> str:
+    text = repr(value)
+    return text if len(text) <= MAX_PARAMETER_LENGTH else text[:MAX_PARAMETER_LENGTH] + "..."
+
+
+def format_parameters(parameters: Any) -> str:
+    """Parametrlarni qisqartirilgan matnga o'tkazish"""
+    if isinstance(parameters, dict):
+        return '{' + ', '.join(f"{key!r}: {_short(value)}" for key, value in parameters.items()) + '}'
+    if isinstance(parameters, (list, tuple)):
+        return '(' + ', '.join(_short(value) for value in parameters) + ')'
+    return _short(parameters)
+
+
+class SlowQueryLog:
+    """Sekin so'rovlar halqa buferi"""
+
+    def __init__(self, threshold_ms: float = 200.0, capacity: int = 100, sample_rate: float = 1.0,
+                 explain: bool = True, rng: Optional[Callable[[], float]] = None):
+        self.threshold = threshold_ms / 1000
+        self.sample_rate = sample_rate
+        self.explain = explain
+        self.entries: deque = deque(maxlen=capacity)
+        self.seen = 0
+        self._random = rng or random.random
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def clear(self) -> None:
+        self.entries.clear()
+        self.seen = 0
+
+    def attach(self, engine) -> None:
+        """
+        Engine ga hodisalarni ulash
+
+        Args:
+            engine: AsyncEngine yoki Engine
+        """
+        from sqlalchemy import event
+
+        sync_engine = getattr(engine, 'sync_engine', engine)
+        event.listen(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.listen(sync_engine, "handle_error", self._handle_error)
+
+    def detach(self, engine) -> None:
+        """Hodisalarni uzish"""
+        from sqlalchemy import event
+
+        sync_engine = getattr(engine, 'sync_engine', engine)
+        event.remove(sync_engine, "before_cursor_execute", self._before_cursor_execute)
+        event.remove(sync_engine, "after_cursor_execute", self._after_cursor_execute)
+        event.remove(sync_engine, "handle_error", self._handle_error)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('slow_query_started', []).append(time.perf_counter())
+
+    def _handle_error(self, context) -> None:
+        if context.connection is not None:
+            stack = context.connection.info.get('slow_query_started')
+            if stack:
+                stack.pop()
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['slow_query_started'].pop()
+        if duration < self.threshold:
+            return
+
+        self.seen += 1
+        if self._random() >= self.sample_rate:
+            return
+
+        plan = None
+        keyword = statement.lstrip()[:6].upper()
+        if self.explain and not executemany and keyword.startswith(EXPLAINABLE):
+            plan = self._explain(conn, statement, parameters)
+
+        self.entries.append({
+            'at': datetime.utcnow(),
+            'duration_ms': round(duration * 1000, 2),
+            'statement': statement,
+            'parameters': format_parameters(parameters),
+            'plan': plan
+        })
+        logger.warning(f"Slow query ({duration * 1000:.0f} ms): {' '.join(statement.split())[:200]}")
+
+    @staticmethod
+    def _explain(conn, statement: str, parameters: Any) -> Optional[List[str]]:
+        """So'rov rejasini olish (xatolik so'rovning o'ziga ta'sir qilmaydi)"""
+        prefix = "EXPLAIN QUERY PLAN " if conn.dialect.name == "sqlite" else "EXPLAIN "
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                cursor.execute(prefix + statement, parameters)
+                rows = cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception as e:
+            logger.debug(f"EXPLAIN failed: {e}")
+            return None
+
+        if conn.dialect.name == "sqlite":
+            # (id, parent, notused, detail)
+            return [str(row[-1]) for row in rows]
+        return [str(row[0]) for row in rows]
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Yozuvlar (eng yangisi birinchi)"""
+        return list(reversed(self.entries))
+
+    def dump(self) -> str:
+        """Admin uchun matn ko'rinishi"""
+        entries = self.snapshot()
+        lines = [
+            f"Slow queries: {len(entries)} recorded, {self.seen} over "
+            f"{self.threshold * 1000:.0f} ms (sample rate {self.sample_rate})",
+            ""
+        ]
+        for entry in entries:
+            lines.append(f"[{entry['at']:%Y-%m-%d %H:%M:%S}] {entry['duration_ms']} ms")
+            lines.append(entry['statement'].strip())
+            lines.append(f"params: {entry['parameters']}")
+            if entry['plan']:
+                lines.append("plan:")
+                lines.extend(f"  {line}" for line in entry['plan'])
+            lines.append("")
+        return '\n'.join(lines)
@@ -6,14 +6,17 @@ import logging
 from src.config import settings
 from src.database.database import init_db, close_db
 from src.bot.client_telegram import UyKelishuvBot
+from src.utils.tracing import TraceContextFilter
 
 
-# Logging sozlash
+# Logging sozlash (trace_id - update ichidagi loglar uchun, aks holda "-")
+log_handler = logging.StreamHandler()
+log_handler.addFilter(TraceContextFilter())
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    format='%(asctime)s - %(name)s - %(levelname)s - [%(trace_id)s] %(message)s',
     handlers=[
-        logging.StreamHandler()
+        log_handler
     ]
 )
 
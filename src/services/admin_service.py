@@ -2,12 +2,16 @@
 Admin Service - Admin panel operatsiyalari
 """
 import logging
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete, func
-from sqlalchemy.orm import selectinload
-from src.database.models import User, Listing, ListingStatus, ListingType
+from sqlalchemy import select, update, delete, func, case, or_, true
+from sqlalchemy.orm import selectinload, joinedload
+from src.database.models import User, Listing, ListingMedia, ListingStatus, ListingType
+from src.services.listing_service import ListingService
+from src.services.media_store import ContentAddressedStore, get_media_store
+from src.services.duplicate_service import get_duplicate_detector
 from src.config import settings
+from src.utils.helpers import normalize_name, format_phone_number, validate_phone
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +19,16 @@ logger = logging.getLogger(__name__)
 class AdminService:
     """Admin xizmatlari"""
     
-    def __init__(self, db: Optional[AsyncSession] = None):
+    def __init__(self, db: Optional[AsyncSession] = None, media_store: Optional[ContentAddressedStore] = None):
         self.db = db
+        self._media_store = media_store
+    
+    @property
+    def media_store(self) -> ContentAddressedStore:
+        """Rasm fayllari ombori (o'chirilgan e'lon havolalarini bo'shatish uchun)"""
+        if self._media_store is None:
+            self._media_store = get_media_store()
+        return self._media_store
     
     def is_admin(self, user_id: int) -> bool:
         """
@@ -47,98 +59,6 @@ class AdminService:
             # Fallback: check if user ID is the default admin
             return user_id == 924016177
     
-    async def approve_listing(self, listing_id: str, admin_user_id: int) -> Optional[Listing]:
-        """
-        E'lonni tasdiqlash
-        
-        Args:
-            listing_id: E'lon ID
-            admin_user_id: Admin user ID
-            
-        Returns:
-            Listing: Tasdiqlangan e'lon yoki None
-        """
-        try:
-            # E'lonni topish
-            result = await self.db.execute(
-                select(Listing)
-                .options(selectinload(Listing.owner))
-                .where(Listing.id == listing_id)
-            )
-            listing = result.scalar_one_or_none()
-            
-            if not listing:
-                logger.warning(f"Listing not found: {listing_id}")
-                return None
-            
-            # Status ni yangilash
-            await self.db.execute(
-                update(Listing)
-                .where(Listing.id == listing_id)
-                .values(
-                    status=ListingStatus.approved,
-                    approved_at=func.now()
-                )
-            )
-            
-            await self.db.commit()
-            await self.db.refresh(listing)
-            
-            logger.info(f"Listing {listing_id} approved by admin {admin_user_id}")
-            return listing
-            
-        except Exception as e:
-            logger.error(f"Error approving listing {listing_id}: {e}")
-            await self.db.rollback()
-            raise
-    
-    async def reject_listing(self, listing_id: str, admin_user_id: int, reason: str = None) -> Optional[Listing]:
-        """
-        E'lonni rad etish
-        
-        Args:
-            listing_id: E'lon ID
-            admin_user_id: Admin user ID
-            reason: Rad etish sababi
-            
-        Returns:
-            Listing: Rad etilgan e'lon yoki None
-        """
-        try:
-            # E'lonni topish
-            result = await self.db.execute(
-                select(Listing)
-                .options(selectinload(Listing.owner))
-                .where(Listing.id == listing_id)
-            )
-            listing = result.scalar_one_or_none()
-            
-            if not listing:
-                logger.warning(f"Listing not found: {listing_id}")
-                return None
-            
-            # Status ni yangilash
-            await self.db.execute(
-                update(Listing)
-                .where(Listing.id == listing_id)
-                .values(
-                    status=ListingStatus.rejected,
-                    rejected_at=func.now(),
-                    rejection_reason=reason
-                )
-            )
-            
-            await self.db.commit()
-            await self.db.refresh(listing)
-            
-            logger.info(f"Listing {listing_id} rejected by admin {admin_user_id}, reason: {reason}")
-            return listing
-            
-        except Exception as e:
-            logger.error(f"Error rejecting listing {listing_id}: {e}")
-            await self.db.rollback()
-            raise
-    
     async def get_pending_listings(self) -> List[Listing]:
         """
         Tasdiqlanmagan e'lonlarni olish
@@ -149,9 +69,11 @@ class AdminService:
         try:
             result = await self.db.execute(
                 select(Listing)
-                .options(selectinload(Listing.owner))
+                # Egasi (many-to-one) shu so'rovning o'zida JOIN bilan
+                .options(joinedload(Listing.owner))
                 .where(Listing.status == ListingStatus.pending)
-                .order_by(Listing.created_at.desc())
+                # Ehtimoliy takrorlar navbat oxirida
+                .order_by(Listing.duplicate_of_id.isnot(None), Listing.created_at.desc())
             )
             return result.scalars().all()
             
@@ -159,15 +81,18 @@ class AdminService:
             logger.error(f"Failed to get pending listings: {e}")
             return []
     
-    async def get_all_listings(self, status: Optional[ListingStatus] = None) -> List[Listing]:
+    async def get_listings_page(self, page: int = 0, per_page: int = 10,
+                                status: Optional[ListingStatus] = None) -> Tuple[List[Listing], bool]:
         """
-        Barcha e'lonlarni olish
+        E'lonlarni sahifalab olish
         
         Args:
+            page: Sahifa raqami (0 dan boshlanadi)
+            per_page: Sahifadagi e'lonlar soni
             status: E'lon statusi filter
             
         Returns:
-            List[Listing]: E'lonlar ro'yxati
+            Tuple[List[Listing], bool]: (e'lonlar, keyingi sahifa bormi)
         """
         try:
             query = select(Listing).options(selectinload(Listing.owner))
@@ -175,15 +100,20 @@ class AdminService:
             if status:
                 query = query.where(Listing.status == status)
             
-            query = query.order_by(Listing.created_at.desc())
+            # Bitta ortiqcha qator keyingi sahifa borligini bildiradi
+            query = (
+                query.order_by(Listing.created_at.desc(), Listing.id)
+                .offset(page * per_page)
+                .limit(per_page + 1)
+            )
             
             result = await self.db.execute(query)
-            return result.scalars().all()
+            listings = list(result.scalars().all())
+            return listings[:per_page], len(listings) > per_page
             
         except Exception as e:
-            logger.error(f"Failed to get all listings: {e}")
-            return []
-    
+            logger.error(f"Failed to get listings page {page}: {e}")
+            return [], False
     
     async def get_new_listings_count(self) -> int:
         """Yangi e'lonlar sonini olish"""
@@ -198,40 +128,47 @@ class AdminService:
             logger.error(f"Error getting new listings count: {e}")
             return 0
     
-    async def get_approved_listings(self) -> List[Listing]:
+    async def get_listings_count(self, status: Optional[ListingStatus] = None) -> int:
         """
-        Tasdiqlangan e'lonlarni olish
+        E'lonlar sonini SQL COUNT bilan olish
+        
+        Args:
+            status: E'lon statusi filter
         
         Returns:
-            List[Listing]: Tasdiqlangan e'lonlar ro'yxati
+            int: E'lonlar soni
         """
         try:
-            from sqlalchemy.orm import selectinload
-            query = select(Listing).options(selectinload(Listing.owner)).where(Listing.status == ListingStatus.approved).order_by(Listing.created_at.desc())
+            query = select(func.count(Listing.id))
+            
+            if status:
+                query = query.where(Listing.status == status)
+            
             result = await self.db.execute(query)
-            return result.scalars().all()
+            return result.scalar() or 0
+            
         except Exception as e:
-            logger.error(f"Failed to get approved listings: {e}")
-            return []
+            logger.error(f"Failed to count listings: {e}")
+            return 0
     
-    async def approve_listing(self, listing_id: str, admin_id: int) -> bool:
+    async def approve_listing(self, listing_id: str, admin_id: int) -> Optional[Any]:
         """
-        E'lonni tasdiqlash
+        E'lonni tasdiqlash (bitta UPDATE ... RETURNING so'rovi)
         
         Args:
             listing_id: E'lon ID
             admin_id: Admin ID
             
         Returns:
-            bool: Muvaffaqiyat holati
+            Optional[Any]: Tasdiqlangan e'lon qatori (owner_telegram_id, owner_name bilan) yoki None
         """
         try:
             # Check if user is admin
             if not self.is_admin(admin_id):
                 logger.warning(f"Non-admin user {admin_id} tried to approve listing {listing_id}")
-                return False
+                return None
             
-            # Update listing status
+            # Status ni yangilash va egasining ma'lumotlarini bir so'rovda olish
             result = await self.db.execute(
                 update(Listing)
                 .where(Listing.id == listing_id)
@@ -239,25 +176,27 @@ class AdminService:
                     status=ListingStatus.approved,
                     approved_at=func.now()
                 )
+                .returning(*self._moderation_returning_columns())
+                .execution_options(synchronize_session=False)
             )
+            listing = result.one_or_none()
             
             await self.db.commit()
             
-            if result.rowcount > 0:
+            if listing:
                 logger.info(f"Listing {listing_id} approved by admin {admin_id}")
-                return True
             else:
                 logger.warning(f"Listing {listing_id} not found for approval")
-                return False
+            return listing
                 
         except Exception as e:
             logger.error(f"Failed to approve listing {listing_id}: {e}")
             await self.db.rollback()
-            return False
+            return None
     
-    async def reject_listing(self, listing_id: str, admin_id: int, reason: str = None) -> bool:
+    async def reject_listing(self, listing_id: str, admin_id: int, reason: str = None) -> Optional[Any]:
         """
-        E'lonni rad etish
+        E'lonni rad etish (bitta UPDATE ... RETURNING so'rovi)
         
         Args:
             listing_id: E'lon ID
@@ -265,15 +204,15 @@ class AdminService:
             reason: Rad etish sababi
             
         Returns:
-            bool: Muvaffaqiyat holati
+            Optional[Any]: Rad etilgan e'lon qatori (owner_telegram_id, owner_name bilan) yoki None
         """
         try:
             # Check if user is admin
             if not self.is_admin(admin_id):
                 logger.warning(f"Non-admin user {admin_id} tried to reject listing {listing_id}")
-                return False
+                return None
             
-            # Update listing status
+            # Status ni yangilash va egasining ma'lumotlarini bir so'rovda olish
             result = await self.db.execute(
                 update(Listing)
                 .where(Listing.id == listing_id)
@@ -281,21 +220,23 @@ class AdminService:
                     status=ListingStatus.rejected,
                     rejection_reason=reason
                 )
+                .returning(*self._moderation_returning_columns())
+                .execution_options(synchronize_session=False)
             )
+            listing = result.one_or_none()
             
             await self.db.commit()
             
-            if result.rowcount > 0:
+            if listing:
                 logger.info(f"Listing {listing_id} rejected by admin {admin_id}: {reason}")
-                return True
             else:
                 logger.warning(f"Listing {listing_id} not found for rejection")
-                return False
+            return listing
                 
         except Exception as e:
             logger.error(f"Failed to reject listing {listing_id}: {e}")
             await self.db.rollback()
-            return False
+            return None
     
     async def delete_listing(self, listing_id: str, admin_id: int) -> bool:
         """
@@ -315,6 +256,7 @@ class AdminService:
                 return False
             
             # Delete listing
+            shas = await ListingService(self.db).delete_listing_dependents([listing_id])
             result = await self.db.execute(
                 delete(Listing)
                 .where(Listing.id == listing_id)
@@ -322,7 +264,11 @@ class AdminService:
             
             await self.db.commit()
             
+            if shas:
+                await self.media_store.release_all(shas)
+            
             if result.rowcount > 0:
+                get_duplicate_detector().remove(listing_id)
                 logger.info(f"Listing {listing_id} deleted by admin {admin_id}")
                 return True
             else:
@@ -334,24 +280,341 @@ class AdminService:
             await self.db.rollback()
             return False
     
-    async def get_all_users(self) -> List[User]:
+    async def get_listing_media(self, listing_id: str) -> List[ListingMedia]:
+        """
+        E'lonning rasmlarini olish (butun e'lonni yuklamasdan)
+        
+        Args:
+            listing_id: E'lon ID si
+            
+        Returns:
+            List[ListingMedia]: Tartiblangan rasmlar
+        """
+        try:
+            media = await ListingService(self.db).get_media_for_listings([listing_id])
+            return media[listing_id]
+            
+        except Exception as e:
+            logger.error(f"Failed to get media of listing {listing_id}: {e}")
+            return []
+    
+    async def get_pending_listing_summaries(self, limit: int = 200) -> List[Any]:
         """
-        Barcha foydalanuvchilarni olish
+        Ommaviy moderatsiya uchun pending e'lonlarning qisqa ro'yxati
+        
+        Args:
+            limit: Maksimal e'lonlar soni
         
         Returns:
-            List[User]: Foydalanuvchilar ro'yxati
+            List: (id, title) qatorlari
         """
         try:
             result = await self.db.execute(
-                select(User)
-                .order_by(User.created_at.desc())
+                select(Listing.id, Listing.title)
+                .where(Listing.status == ListingStatus.pending)
+                # get_pending_listings bilan bir xil tartib - takrorlar oxirida
+                .order_by(Listing.duplicate_of_id.isnot(None), Listing.created_at.desc())
+                .limit(limit)
             )
-            return result.scalars().all()
+            return result.all()
+        
+        except Exception as e:
+            logger.error(f"Failed to get pending listing summaries: {e}")
+            return []
+    
+    async def bulk_approve_listings(self, listing_ids: List[str], admin_id: int) -> List[Any]:
+        """
+        Bir nechta e'lonni bitta UPDATE ... RETURNING bilan tasdiqlash
+        
+        Args:
+            listing_ids: E'lon ID lari
+            admin_id: Admin ID
+        
+        Returns:
+            List: Tasdiqlangan e'lonlar qatorlari (egasining telegram ID si bilan)
+        """
+        if not listing_ids:
+            return []
+        
+        try:
+            if not self.is_admin(admin_id):
+                logger.warning(f"Non-admin user {admin_id} tried to bulk approve listings")
+                return []
+            
+            result = await self.db.execute(
+                update(Listing)
+                .where(
+                    Listing.id.in_(listing_ids),
+                    Listing.status == ListingStatus.pending
+                )
+                .values(
+                    status=ListingStatus.approved,
+                    approved_at=func.now()
+                )
+                .returning(*self._moderation_returning_columns())
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            
+            await self.db.commit()
+            
+            logger.info(f"{len(rows)}/{len(listing_ids)} listings approved by admin {admin_id}")
+            return rows
+        
+        except Exception as e:
+            logger.error(f"Failed to bulk approve listings: {e}")
+            await self.db.rollback()
+            return []
+    
+    async def bulk_reject_listings(self, listing_ids: List[str], admin_id: int, reason: str = None) -> List[Any]:
+        """
+        Bir nechta e'lonni bitta UPDATE ... RETURNING bilan rad etish
+        
+        Args:
+            listing_ids: E'lon ID lari
+            admin_id: Admin ID
+            reason: Rad etish sababi
+        
+        Returns:
+            List: Rad etilgan e'lonlar qatorlari (egasining telegram ID si bilan)
+        """
+        if not listing_ids:
+            return []
+        
+        try:
+            if not self.is_admin(admin_id):
+                logger.warning(f"Non-admin user {admin_id} tried to bulk reject listings")
+                return []
+            
+            result = await self.db.execute(
+                update(Listing)
+                .where(
+                    Listing.id.in_(listing_ids),
+                    Listing.status == ListingStatus.pending
+                )
+                .values(
+                    status=ListingStatus.rejected,
+                    rejection_reason=reason
+                )
+                .returning(*self._moderation_returning_columns())
+                .execution_options(synchronize_session=False)
+            )
+            rows = result.all()
+            
+            await self.db.commit()
+            
+            logger.info(f"{len(rows)}/{len(listing_ids)} listings rejected by admin {admin_id}: {reason}")
+            return rows
+        
+        except Exception as e:
+            logger.error(f"Failed to bulk reject listings: {e}")
+            await self.db.rollback()
+            return []
+    
+    async def bulk_delete_listings(self, listing_ids: List[str], admin_id: int) -> List[str]:
+        """
+        Bir nechta e'lonni bitta DELETE ... RETURNING bilan o'chirish
+        
+        Args:
+            listing_ids: E'lon ID lari
+            admin_id: Admin ID
+        
+        Returns:
+            List[str]: O'chirilgan e'lonlar ID lari
+        """
+        if not listing_ids:
+            return []
+        
+        try:
+            if not self.is_admin(admin_id):
+                logger.warning(f"Non-admin user {admin_id} tried to bulk delete listings")
+                return []
+            
+            shas = await ListingService(self.db).delete_listing_dependents(listing_ids)
+            result = await self.db.execute(
+                delete(Listing)
+                .where(Listing.id.in_(listing_ids))
+                .returning(Listing.id)
+                .execution_options(synchronize_session=False)
+            )
+            deleted_ids = list(result.scalars().all())
+            
+            await self.db.commit()
             
+            if shas:
+                await self.media_store.release_all(shas)
+            
+            duplicate_detector = get_duplicate_detector()
+            for listing_id in deleted_ids:
+                duplicate_detector.remove(listing_id)
+            
+            logger.info(f"{len(deleted_ids)}/{len(listing_ids)} listings deleted by admin {admin_id}")
+            return deleted_ids
+        
         except Exception as e:
-            logger.error(f"Failed to get all users: {e}")
+            logger.error(f"Failed to bulk delete listings: {e}")
+            await self.db.rollback()
             return []
     
+    @staticmethod
+    def _moderation_returning_columns() -> List[Any]:
+        """
+        Moderatsiya so'rovlari qaytaradigan ustunlar
+        
+        Egasining telegram ID va ismi korrelyatsiyalangan subquery orqali
+        RETURNING ichida olinadi (SQLite RETURNING da FROM jadvallariga ruxsat bermaydi),
+        shuning uchun xabar yuborish uchun qo'shimcha so'rov kerak emas.
+        """
+        owner_telegram_id = (
+            select(User.telegram_user_id)
+            .where(User.id == Listing.user_id)
+            .scalar_subquery()
+            .label('owner_telegram_id')
+        )
+        owner_name = (
+            select(User.name)
+            .where(User.id == Listing.user_id)
+            .scalar_subquery()
+            .label('owner_name')
+        )
+        return [
+            Listing.id,
+            Listing.title,
+            Listing.region_code,
+            Listing.city_name,
+            Listing.type,
+            Listing.rooms,
+            Listing.price,
+            Listing.currency,
+            owner_telegram_id,
+            owner_name,
+        ]
+    
+    async def get_user_counts(self) -> Dict[str, int]:
+        """
+        Foydalanuvchilar sonini bitta aggregate so'rov bilan olish
+        
+        Returns:
+            Dict[str, int]: total, verified, blocked
+        """
+        try:
+            result = await self.db.execute(
+                select(
+                    func.count(User.id),
+                    func.count(case((User.verified == True, 1))),
+                    func.count(case((User.blocked == True, 1)))
+                )
+            )
+            total, verified, blocked = result.one()
+            return {'total': total, 'verified': verified, 'blocked': blocked}
+            
+        except Exception as e:
+            logger.error(f"Failed to get user counts: {e}")
+            return {'total': 0, 'verified': 0, 'blocked': 0}
+    
+    async def get_users_page(self, page: int = 0, per_page: int = 10,
+                             blocked: Optional[bool] = None) -> Tuple[List[User], bool]:
+        """
+        Foydalanuvchilarni sahifalab olish
+        
+        Args:
+            page: Sahifa raqami (0 dan boshlanadi)
+            per_page: Sahifadagi foydalanuvchilar soni
+            blocked: Bloklanganlik bo'yicha filter
+            
+        Returns:
+            Tuple[List[User], bool]: (foydalanuvchilar, keyingi sahifa bormi)
+        """
+        try:
+            query = select(User)
+            
+            if blocked is not None:
+                query = query.where(User.blocked == blocked)
+            
+            # Bitta ortiqcha qator keyingi sahifa borligini bildiradi
+            query = (
+                query.order_by(User.created_at.desc(), User.id)
+                .offset(page * per_page)
+                .limit(per_page + 1)
+            )
+            
+            result = await self.db.execute(query)
+            users = list(result.scalars().all())
+            return users[:per_page], len(users) > per_page
+            
+        except Exception as e:
+            logger.error(f"Failed to get users page {page}: {e}")
+            return [], False
+    
+    async def search_users(self, query: str, page: int = 0,
+                           per_page: int = 10) -> Tuple[List[User], bool]:
+        """
+        Foydalanuvchilarni telegram ID, telefon raqami yoki ism boshlanishi bo'yicha qidirish
+        
+        Raqamli so'rov telegram_user_id va phone_number bo'yicha aniq moslik
+        (ikkalasi ham unique indeks) bilan qidiriladi. Matnli so'rov
+        name_normalized ustunidagi prefiks indeksidan foydalanadi, Postgres'da
+        esa qo'shimcha ravishda pg_trgm o'xshashligi bo'yicha tartiblanadi.
+        
+        Args:
+            query: Qidiruv so'rovi
+            page: Sahifa raqami (0 dan boshlanadi)
+            per_page: Sahifadagi foydalanuvchilar soni
+            
+        Returns:
+            Tuple[List[User], bool]: (foydalanuvchilar, keyingi sahifa bormi)
+        """
+        query = (query or '').strip()
+        if not query:
+            return [], False
+        
+        try:
+            statement = select(User)
+            compact = query.replace(' ', '').replace('-', '')
+            
+            if compact.lstrip('+').isdigit():
+                conditions = []
+                number = int(compact.lstrip('+'))
+                if number < 2 ** 63:
+                    conditions.append(User.telegram_user_id == number)
+                if validate_phone(compact):
+                    conditions.append(User.phone_number == format_phone_number(compact))
+                if not conditions:
+                    return [], False
+                
+                statement = statement.where(or_(*conditions)).order_by(User.id)
+            else:
+                prefix = normalize_name(query.lstrip('@'))
+                if not prefix:
+                    return [], False
+                
+                if self.db.bind.dialect.name == 'postgresql':
+                    # GIN (gin_trgm_ops) indeksi ham LIKE 'prefix%' ni, ham % operatorini qo'llaydi
+                    statement = statement.where(
+                        or_(
+                            User.name_normalized.startswith(prefix, autoescape=True),
+                            User.name_normalized.op('%')(prefix)
+                        )
+                    ).order_by(func.similarity(User.name_normalized, prefix).desc(), User.id)
+                else:
+                    # LIKE o'rniga diapazon: B-tree indeksi bo'yicha qidiriladi va tartiblanadi
+                    upper_bound = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                    statement = statement.where(
+                        User.name_normalized >= prefix,
+                        User.name_normalized < upper_bound
+                    ).order_by(User.name_normalized, User.id)
+            
+            # Bitta ortiqcha qator keyingi sahifa borligini bildiradi
+            statement = statement.offset(page * per_page).limit(per_page + 1)
+            
+            result = await self.db.execute(statement)
+            users = list(result.scalars().all())
+            return users[:per_page], len(users) > per_page
+            
+        except Exception as e:
+            logger.error(f"Failed to search users by '{query}': {e}")
+            return [], False
+    
     async def block_user(self, user_id: str, admin_id: int, reason: str = None) -> bool:
         """
         Foydalanuvchini bloklash
@@ -437,34 +700,39 @@ class AdminService:
             Dict[str, Any]: Statistika ma'lumotlari
         """
         try:
-            # Users statistics
-            total_users = await self.db.execute(select(func.count(User.id)))
-            verified_users = await self.db.execute(select(func.count(User.id)).where(User.verified == True))
-            blocked_users = await self.db.execute(select(func.count(User.id)).where(User.blocked == True))
-            
-            # Listings statistics
-            total_listings = await self.db.execute(select(func.count(Listing.id)))
-            pending_listings = await self.db.execute(select(func.count(Listing.id)).where(Listing.status == ListingStatus.pending))
-            approved_listings = await self.db.execute(select(func.count(Listing.id)).where(Listing.status == ListingStatus.approved))
-            rejected_listings = await self.db.execute(select(func.count(Listing.id)).where(Listing.status == ListingStatus.rejected))
-            
-            # Listing types
-            rental_listings = await self.db.execute(select(func.count(Listing.id)).where(Listing.type == ListingType.ijara))
-            sale_listings = await self.db.execute(select(func.count(Listing.id)).where(Listing.type == ListingType.sotuv))
+            # Ikkala jadval bittadan o'tiladi: har bir ko'rsatkich - shartli COUNT,
+            # ikki bir qatorli natija bitta so'rovda birlashtiriladi
+            user_counts = select(
+                func.count(User.id).label('users_total'),
+                func.count(case((User.verified == True, 1))).label('users_verified'),
+                func.count(case((User.blocked == True, 1))).label('users_blocked')
+            ).subquery()
+            listing_counts = select(
+                func.count(Listing.id).label('listings_total'),
+                func.count(case((Listing.status == ListingStatus.pending, 1))).label('listings_pending'),
+                func.count(case((Listing.status == ListingStatus.approved, 1))).label('listings_approved'),
+                func.count(case((Listing.status == ListingStatus.rejected, 1))).label('listings_rejected'),
+                func.count(case((Listing.type == ListingType.ijara, 1))).label('listings_rental'),
+                func.count(case((Listing.type == ListingType.sotuv, 1))).label('listings_sale')
+            ).subquery()
+            result = await self.db.execute(
+                select(user_counts, listing_counts).select_from(user_counts.join(listing_counts, true()))
+            )
+            row = result.one()
             
             return {
                 'users': {
-                    'total': total_users.scalar(),
-                    'verified': verified_users.scalar(),
-                    'blocked': blocked_users.scalar()
+                    'total': row.users_total,
+                    'verified': row.users_verified,
+                    'blocked': row.users_blocked
                 },
                 'listings': {
-                    'total': total_listings.scalar(),
-                    'pending': pending_listings.scalar(),
-                    'approved': approved_listings.scalar(),
-                    'rejected': rejected_listings.scalar(),
-                    'rental': rental_listings.scalar(),
-                    'sale': sale_listings.scalar()
+                    'total': row.listings_total,
+                    'pending': row.listings_pending,
+                    'approved': row.listings_approved,
+                    'rejected': row.listings_rejected,
+                    'rental': row.listings_rental,
+                    'sale': row.listings_sale
                 }
             }
             
@@ -0,0 +1,304 @@
+"""
+Broadcast Service - Barcha foydalanuvchilarga ommaviy xabar yuborish
+"""
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Optional, Dict, List, Callable
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import Forbidden, BadRequest, RetryAfter
+from sqlalchemy import select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.database import AsyncSessionLocal
+from src.database.models import User, Broadcast, BroadcastStatus
+from src.utils.constants import CallbackPatterns
+from src.utils.rate_limiter import TokenBucket
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Bitta xabar yuborish natijalari
+SENT = "sent"
+FAILED = "failed"
+UNREACHABLE = "unreachable"
+
+
+class BroadcastService:
+    """
+    Ommaviy xabar yuborish xizmati
+
+    Qabul qiluvchilar telegram_user_id bo'yicha keyset sahifalari bilan
+    o'qiladi va har bir sahifadan keyin oxirgi ID bazaga yoziladi, shuning
+    uchun bot qayta ishga tushsa yuborish shu joydan davom etadi.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+                 bot: Optional[Bot] = None, rate: Optional[float] = None,
+                 concurrency: Optional[int] = None, chunk_size: int = 500,
+                 progress_interval: float = 5.0, max_retries: int = 3):
+        self.session_factory = session_factory
+        self.bot = bot
+        self.rate = rate or settings.broadcast_rate
+        self.concurrency = concurrency or settings.broadcast_concurrency
+        self.chunk_size = chunk_size
+        self.progress_interval = progress_interval
+        self.max_retries = max_retries
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    async def count_recipients(self) -> int:
+        """Xabar yetib boradigan foydalanuvchilar soni"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(func.count(User.id)).where(User.blocked == False, User.unreachable == False)
+            )
+            return result.scalar() or 0
+
+    async def create_broadcast(self, admin_id: int, text: str, progress_chat_id: Optional[int] = None,
+                               progress_message_id: Optional[int] = None) -> Broadcast:
+        """
+        Yangi ommaviy xabar yaratish
+
+        Args:
+            admin_id: Admin Telegram ID
+            text: Xabar matni
+            progress_chat_id: Progress xabari joylashgan chat
+            progress_message_id: Progress xabari ID si
+
+        Returns:
+            Broadcast: Yaratilgan ommaviy xabar
+        """
+        total_count = await self.count_recipients()
+
+        async with self.session_factory() as db:
+            broadcast = Broadcast(
+                admin_telegram_id=admin_id,
+                text=text,
+                total_count=total_count,
+                progress_chat_id=progress_chat_id,
+                progress_message_id=progress_message_id
+            )
+            db.add(broadcast)
+            await db.commit()
+            await db.refresh(broadcast)
+
+        logger.info(f"Broadcast {broadcast.id} created by {admin_id} for {total_count} users")
+        return broadcast
+
+    def start(self, broadcast_id: str) -> asyncio.Task:
+        """Ommaviy xabarni fonda yuborishni boshlash"""
+        task = self._tasks.get(broadcast_id)
+        if task is None or task.done():
+            task = asyncio.create_task(self.run(broadcast_id))
+            self._tasks[broadcast_id] = task
+        return task
+
+    async def resume_unfinished(self) -> int:
+        """Bot to'xtaganda tugamay qolgan ommaviy xabarlarni davom ettirish"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(Broadcast.id).where(Broadcast.status == BroadcastStatus.running)
+            )
+            broadcast_ids = result.scalars().all()
+
+        for broadcast_id in broadcast_ids:
+            logger.info(f"Resuming broadcast {broadcast_id}")
+            self.start(broadcast_id)
+
+        return len(broadcast_ids)
+
+    async def cancel(self, broadcast_id: str) -> bool:
+        """Ommaviy xabarni to'xtatish (joriy sahifa tugagach to'xtaydi)"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(Broadcast)
+                .where(Broadcast.id == broadcast_id, Broadcast.status == BroadcastStatus.running)
+                .values(status=BroadcastStatus.cancelled, finished_at=datetime.utcnow())
+            )
+            await db.commit()
+            return result.rowcount > 0
+
+    async def get_broadcast(self, broadcast_id: str) -> Optional[Broadcast]:
+        """Ommaviy xabarni ID bo'yicha olish"""
+        async with self.session_factory() as db:
+            return await db.get(Broadcast, broadcast_id)
+
+    async def run(self, broadcast_id: str) -> Optional[Broadcast]:
+        """
+        Ommaviy xabarni oxirigacha yuborish
+
+        Args:
+            broadcast_id: Ommaviy xabar ID si
+
+        Returns:
+            Optional[Broadcast]: Yakuniy holat
+        """
+        bucket = TokenBucket(self.rate)
+        semaphore = asyncio.Semaphore(self.concurrency)
+        started_at = time.monotonic()
+        sent_since_start = 0
+        last_progress_at = started_at
+
+        while True:
+            async with self.session_factory() as db:
+                broadcast = await db.get(Broadcast, broadcast_id)
+                if broadcast is None or broadcast.status != BroadcastStatus.running:
+                    if broadcast is not None:
+                        await self._update_progress(broadcast, self._send_rate(sent_since_start, started_at))
+                    return broadcast
+
+                result = await db.execute(
+                    select(User.telegram_user_id)
+                    .where(
+                        User.blocked == False,
+                        User.unreachable == False,
+                        User.telegram_user_id > broadcast.last_telegram_user_id
+                    )
+                    .order_by(User.telegram_user_id)
+                    .limit(self.chunk_size)
+                )
+                chat_ids = result.scalars().all()
+
+            if not chat_ids:
+                broadcast = await self._finish(broadcast_id)
+                await self._update_progress(broadcast, self._send_rate(sent_since_start, started_at))
+                logger.info(f"Broadcast {broadcast_id} completed: {broadcast.sent_count} sent")
+                return broadcast
+
+            outcomes = await asyncio.gather(
+                *(self._send(chat_id, broadcast.text, bucket, semaphore) for chat_id in chat_ids)
+            )
+
+            unreachable_ids = [chat_id for chat_id, outcome in zip(chat_ids, outcomes) if outcome == UNREACHABLE]
+            sent = outcomes.count(SENT)
+            sent_since_start += sent
+
+            broadcast = await self._save_chunk(
+                broadcast_id, chat_ids[-1], sent, outcomes.count(FAILED), unreachable_ids
+            )
+
+            now = time.monotonic()
+            if now - last_progress_at >= self.progress_interval:
+                last_progress_at = now
+                await self._update_progress(broadcast, self._send_rate(sent_since_start, started_at))
+
+    async def _send(self, chat_id: int, text: str, bucket: TokenBucket,
+                    semaphore: asyncio.Semaphore) -> str:
+        """Bitta foydalanuvchiga xabar yuborish"""
+        async with semaphore:
+            for _ in range(self.max_retries):
+                await bucket.acquire()
+                try:
+                    await self.bot.send_message(chat_id=chat_id, text=text)
+                    return SENT
+                except RetryAfter as e:
+                    # Telegram kutishni talab qildi - butun hovuz to'xtaydi
+                    retry_after = e.retry_after
+                    if isinstance(retry_after, timedelta):
+                        retry_after = retry_after.total_seconds()
+                    logger.warning(f"Broadcast flood control, waiting {retry_after}s")
+                    bucket.pause(retry_after)
+                    await asyncio.sleep(retry_after)
+                except Forbidden:
+                    return UNREACHABLE
+                except BadRequest as e:
+                    if "chat not found" in str(e).lower():
+                        return UNREACHABLE
+                    logger.error(f"Broadcast message to {chat_id} failed: {e}")
+                    return FAILED
+                except Exception as e:
+                    logger.error(f"Broadcast message to {chat_id} failed: {e}")
+                    return FAILED
+
+            return FAILED
+
+    async def _save_chunk(self, broadcast_id: str, last_telegram_user_id: int, sent: int,
+                          failed: int, unreachable_ids: List[int]) -> Broadcast:
+        """Sahifa natijalarini va davom ettirish nuqtasini bitta tranzaksiyada saqlash"""
+        async with self.session_factory() as db:
+            if unreachable_ids:
+                await db.execute(
+                    update(User)
+                    .where(User.telegram_user_id.in_(unreachable_ids))
+                    .values(unreachable=True)
+                    .execution_options(synchronize_session=False)
+                )
+
+            await db.execute(
+                update(Broadcast)
+                .where(Broadcast.id == broadcast_id)
+                .values(
+                    last_telegram_user_id=last_telegram_user_id,
+                    sent_count=Broadcast.sent_count + sent,
+                    failed_count=Broadcast.failed_count + failed,
+                    unreachable_count=Broadcast.unreachable_count + len(unreachable_ids)
+                )
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+            return await db.get(Broadcast, broadcast_id)
+
+    async def _finish(self, broadcast_id: str) -> Broadcast:
+        """Ommaviy xabarni yakunlangan deb belgilash"""
+        async with self.session_factory() as db:
+            await db.execute(
+                update(Broadcast)
+                .where(Broadcast.id == broadcast_id, Broadcast.status == BroadcastStatus.running)
+                .values(status=BroadcastStatus.completed, finished_at=datetime.utcnow())
+                .execution_options(synchronize_session=False)
+            )
+            await db.commit()
+
+            return await db.get(Broadcast, broadcast_id)
+
+    @staticmethod
+    def _send_rate(sent: int, started_at: float) -> float:
+        """Joriy ishga tushirishdagi yuborish tezligi (xabar/soniya)"""
+        elapsed = time.monotonic() - started_at
+        return sent / elapsed if elapsed > 0 else 0.0
+
+    async def _update_progress(self, broadcast: Broadcast, rate: float) -> None:
+        """Admin progress xabarini yangilash"""
+        if not self.bot or not broadcast.progress_chat_id or not broadcast.progress_message_id:
+            return
+
+        keyboard = None
+        if broadcast.status == BroadcastStatus.running:
+            keyboard = InlineKeyboardMarkup([[
+                InlineKeyboardButton(
+                    "⏹ To'xtatish",
+                    callback_data=f"{CallbackPatterns.ADMIN_BROADCAST_STOP}:{broadcast.id}"
+                )
+            ]])
+
+        try:
+            await self.bot.edit_message_text(
+                chat_id=broadcast.progress_chat_id,
+                message_id=broadcast.progress_message_id,
+                text=self.create_progress_message(broadcast, rate),
+                reply_markup=keyboard,
+                parse_mode='Markdown'
+            )
+        except Exception as e:
+            logger.debug(f"Broadcast progress update skipped: {e}")
+
+    @staticmethod
+    def create_progress_message(broadcast: Broadcast, rate: float = 0.0) -> str:
+        """Progress xabari matni"""
+        processed = broadcast.sent_count + broadcast.failed_count + broadcast.unreachable_count
+        percent = min(100, processed * 100 // broadcast.total_count) if broadcast.total_count else 100
+
+        status_text = {
+            BroadcastStatus.running: "⏳ Yuborilmoqda",
+            BroadcastStatus.completed: "✅ Yakunlandi",
+            BroadcastStatus.cancelled: "⏹ To'xtatildi",
+        }[broadcast.status]
+
+        return f"""📣 **Ommaviy xabar** - {status_text}
+
+📊 **Progress:** {processed}/{broadcast.total_count} ({percent}%)
+✅ Yuborildi: {broadcast.sent_count}
+🚫 Botni bloklagan: {broadcast.unreachable_count}
+❌ Xatolik: {broadcast.failed_count}
+⚡ Tezlik: {rate:.1f} xabar/soniya"""
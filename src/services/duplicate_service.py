@@ -0,0 +1,244 @@
+"""
+Duplicate Service - Matni deyarli bir xil e'lonlarni topish (MinHash + LSH)
+
+E'lon sarlavhasi va tavsifidan so'z shingle lari olinadi va ulardan
+MinHash imzosi hisoblanadi. Imzo bo'laklarga (band) bo'linib xotiradagi
+LSH bucket larga joylanadi: yangi e'lon faqat kamida bitta bo'lagi mos
+tushgan e'lonlar bilan solishtiriladi, barcha e'lonlar bilan emas.
+Imzo bazada ham saqlanadi, shuning uchun bot qayta ishga tushganda
+bucket lar qayta hisoblamasdan tiklanadi.
+"""
+import hashlib
+import logging
+import random
+import re
+from array import array
+from typing import Optional, List, Dict, Set, Tuple, Callable
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import Listing
+
+logger = logging.getLogger(__name__)
+
+# Mersenne tub soni - universal hash funksiyalar uchun
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """
+    Matndan so'z shingle lari (ketma-ket `size` ta so'z)
+
+    Katta-kichik harf va tinish belgilari hisobga olinmaydi.
+    """
+    words = _WORD_RE.findall(text.casefold())
+    if len(words) < size:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+class MinHasher:
+    """Shingle to'plamidan MinHash imzosini hisoblash"""
+
+    def __init__(self, num_perm: int = 64, seed: int = 1):
+        rng = random.Random(seed)
+        self.num_perm = num_perm
+        self._permutations = [
+            (rng.randrange(1, MERSENNE_PRIME), rng.randrange(0, MERSENNE_PRIME))
+            for _ in range(num_perm)
+        ]
+
+    def signature(self, items: Set[str]) -> array:
+        """
+        MinHash imzosi
+
+        Args:
+            items: Shingle lar
+
+        Returns:
+            array: num_perm ta 32 bitli qiymat
+        """
+        hashes = [
+            int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little')
+            for item in items
+        ]
+        return array('I', (
+            min(((a * value + b) % MERSENNE_PRIME) & MAX_HASH for value in hashes) if hashes else MAX_HASH
+            for a, b in self._permutations
+        ))
+
+
+def estimate_similarity(first: array, second: array) -> float:
+    """Ikki imzo bo'yicha Jaccard o'xshashligi bahosi"""
+    equal = sum(1 for left, right in zip(first, second) if left == right)
+    return equal / len(first)
+
+
+class LSHIndex:
+    """
+    MinHash imzolari uchun xotiradagi LSH indeks
+
+    Imzo `bands` ta bo'lakka bo'linadi; ikki imzoning kamida bitta bo'lagi
+    to'liq mos kelsa ular nomzod hisoblanadi.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError("num_perm bands ga bo'linishi kerak")
+
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: Dict[int, Set[str]] = {}
+        self._signatures: Dict[str, array] = {}
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def _bucket_keys(self, signature: array) -> List[int]:
+        """Har bir bo'lak uchun bucket kaliti"""
+        return [
+            hash((band,) + tuple(signature[band * self.rows:(band + 1) * self.rows]))
+            for band in range(self.bands)
+        ]
+
+    def add(self, key: str, signature: array) -> None:
+        """Imzoni indeksga qo'shish (mavjud bo'lsa almashtiriladi)"""
+        self.remove(key)
+        self._signatures[key] = signature
+        for bucket_key in self._bucket_keys(signature):
+            self._buckets.setdefault(bucket_key, set()).add(key)
+
+    def remove(self, key: str) -> None:
+        """Imzoni indeksdan olib tashlash"""
+        signature = self._signatures.pop(key, None)
+        if signature is None:
+            return
+        for bucket_key in self._bucket_keys(signature):
+            bucket = self._buckets.get(bucket_key)
+            if bucket is not None:
+                bucket.discard(key)
+                if not bucket:
+                    del self._buckets[bucket_key]
+
+    def query(self, signature: array, threshold: float) -> List[Tuple[str, float]]:
+        """
+        O'xshash imzolarni topish
+
+        Args:
+            signature: Qidirilayotgan imzo
+            threshold: Eng kichik o'xshashlik bahosi (0..1)
+
+        Returns:
+            List[Tuple[str, float]]: (kalit, o'xshashlik) - kamayish tartibida
+        """
+        candidates: Set[str] = set()
+        for bucket_key in self._bucket_keys(signature):
+            candidates.update(self._buckets.get(bucket_key, ()))
+
+        matches = []
+        for key in candidates:
+            similarity = estimate_similarity(signature, self._signatures[key])
+            if similarity >= threshold:
+                matches.append((key, similarity))
+
+        matches.sort(key=lambda match: match[1], reverse=True)
+        return matches
+
+
+class DuplicateDetector:
+    """E'lonlar matni bo'yicha takrorlarni aniqlash"""
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, threshold: float = 0.6,
+                 min_shingles: int = 4):
+        self.hasher = MinHasher(num_perm)
+        self.index = LSHIndex(num_perm, bands)
+        self.threshold = threshold
+        self.min_shingles = min_shingles
+        self.loaded = False
+
+    def signature(self, title: Optional[str], description: Optional[str]) -> Optional[array]:
+        """
+        E'lon matni imzosi
+
+        Juda qisqa matnlar (masalan faqat "2 xonali kvartira") uchun imzo
+        hisoblanmaydi - ular turli e'lonlarda tabiiy ravishda takrorlanadi.
+        """
+        items = shingles(f"{title or ''} {description or ''}")
+        if len(items) < self.min_shingles:
+            return None
+        return self.hasher.signature(items)
+
+    def find_duplicates(self, signature: array) -> List[Tuple[str, float]]:
+        """Imzoga o'xshash e'lonlar (eng o'xshashi birinchi)"""
+        return self.index.query(signature, self.threshold)
+
+    def add(self, listing_id: str, signature: Optional[array]) -> None:
+        """E'lonni indeksga qo'shish"""
+        if signature is not None:
+            self.index.add(listing_id, signature)
+
+    def remove(self, listing_id: str) -> None:
+        """O'chirilgan e'lonni indeksdan olib tashlash"""
+        self.index.remove(listing_id)
+
+    @staticmethod
+    def dump(signature: Optional[array]) -> Optional[bytes]:
+        """Imzoni bazada saqlash uchun baytlarga o'tkazish"""
+        return signature.tobytes() if signature is not None else None
+
+    @staticmethod
+    def load_signature(data: Optional[bytes]) -> Optional[array]:
+        """Bazadan o'qilgan baytlardan imzoni tiklash"""
+        if not data:
+            return None
+        signature = array('I')
+        signature.frombytes(data)
+        return signature
+
+    async def load(self, session_factory: Callable[[], AsyncSession], batch_size: int = 5000) -> int:
+        """
+        Bazadagi imzolardan LSH indeksni tiklash
+
+        Args:
+            session_factory: Session yaratuvchi
+            batch_size: Bitta so'rovdagi e'lonlar soni
+
+        Returns:
+            int: Indeksga qo'shilgan e'lonlar soni
+        """
+        count = 0
+        last_id = ''
+        async with session_factory() as db:
+            while True:
+                result = await db.execute(
+                    select(Listing.id, Listing.text_signature)
+                    .where(Listing.id > last_id, Listing.text_signature.isnot(None))
+                    .order_by(Listing.id)
+                    .limit(batch_size)
+                )
+                rows = result.all()
+                if not rows:
+                    break
+
+                for row in rows:
+                    self.add(row.id, self.load_signature(row.text_signature))
+                count += len(rows)
+                last_id = rows[-1].id
+
+        self.loaded = True
+        logger.info(f"Duplicate index loaded: {count} listings")
+        return count
+
+
+# Barcha ListingService lar uchun bitta indeks
+_duplicate_detector: Optional[DuplicateDetector] = None
+
+
+def get_duplicate_detector() -> DuplicateDetector:
+    """Umumiy takrorlarni aniqlash indeksini olish"""
+    global _duplicate_detector
+    if _duplicate_detector is None:
+        _duplicate_detector = DuplicateDetector()
+    return _duplicate_detector
@@ -0,0 +1,159 @@
+"""
+Image Pipeline - Rasmlarni siqish, thumbnail yaratish va EXIF ni olib tashlash
+
+Og'ir (CPU) ishlar ProcessPoolExecutor da bajariladi, shuning uchun bot
+event loop i rasm dekodlash paytida bloklanmaydi. Bu modul worker
+jarayonlarda import qilinadi - faqat stdlib va Pillow ga bog'liq bo'lishi kerak.
+"""
+import asyncio
+import functools
+import io
+import logging
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional, Dict, Any
+from PIL import Image, ImageOps
+
+logger = logging.getLogger(__name__)
+
+# Dekompressiya bombasidan himoya (~ 50 megapiksel)
+MAX_IMAGE_PIXELS = 50_000_000
+
+
+def _to_rgb(image: Image.Image) -> Image.Image:
+    """Shaffof rasmlarni oq fon ustiga qo'yib RGB ga o'tkazish"""
+    if image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, (255, 255, 255))
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    if image.mode != 'RGB':
+        return image.convert('RGB')
+    return image
+
+
+def _encode_jpeg(image: Image.Image, quality: int) -> bytes:
+    """JPEG ga kodlash (metadata yozilmaydi)"""
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+def _dhash_image(image: Image.Image, size: int = 8) -> int:
+    """Ochilgan rasmning 64 bitli difference hash i"""
+    gray = image.convert('L').resize((size + 1, size), Image.Resampling.LANCZOS)
+    pixels = gray.tobytes()
+
+    bits = 0
+    for row in range(size):
+        offset = row * (size + 1)
+        for col in range(size):
+            bits = (bits << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return bits
+
+
+def dhash(data: bytes, size: int = 8) -> int:
+    """
+    Rasmning perceptual difference hash i (dHash)
+
+    Qayta siqilgan, kichraytirilgan yoki biroz o'zgartirilgan nusxalar
+    bir-biridan bir necha bit bilan farq qiladi (Hamming masofasi).
+
+    Args:
+        data: Rasm baytlari (thumbnail ham yetarli)
+        size: Hash tomoni (size*size bit)
+
+    Returns:
+        int: Ishorasiz 64 bitli hash
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        image.draft('L', (size * 4, size * 4))
+        return _dhash_image(ImageOps.exif_transpose(image), size)
+
+
+def process_image(data: bytes, max_side: int = 1600, thumb_side: int = 320,
+                  quality: int = 82, thumb_quality: int = 70) -> Dict[str, Any]:
+    """
+    Rasmdan siqilgan asosiy nusxa va thumbnail yaratish
+
+    EXIF (shu jumladan GPS) saqlanmaydi, lekin orientatsiya avval
+    piksellarga qo'llanadi, shuning uchun rasm burilib qolmaydi.
+
+    Args:
+        data: Asl rasm baytlari
+        max_side: Asosiy rasmning eng katta tomoni
+        thumb_side: Thumbnail ning eng katta tomoni
+        quality: Asosiy rasm JPEG sifati
+        thumb_quality: Thumbnail JPEG sifati
+
+    Returns:
+        Dict[str, Any]: main, thumb (JPEG baytlari), width, height, dhash
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        if image.width * image.height > MAX_IMAGE_PIXELS:
+            raise ValueError(f"Rasm juda katta: {image.width}x{image.height}")
+
+        # JPEG uchun DCT darajasida kichraytirib dekodlash - to'liq o'lchamni ochmaydi
+        image.draft('RGB', (max_side, max_side))
+        image = ImageOps.exif_transpose(image)
+        image = _to_rgb(image)
+
+        image.thumbnail((max_side, max_side), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        main = _encode_jpeg(image, quality)
+        width, height = image.size
+        image_hash = _dhash_image(image)
+
+        image.thumbnail((thumb_side, thumb_side), Image.Resampling.LANCZOS, reducing_gap=3.0)
+        thumb = _encode_jpeg(image, thumb_quality)
+
+    return {'main': main, 'thumb': thumb, 'width': width, 'height': height, 'dhash': image_hash}
+
+
+class ImagePipeline:
+    """Rasmlarni alohida jarayonlarda qayta ishlash"""
+
+    def __init__(self, max_workers: Optional[int] = None, max_side: int = 1600,
+                 thumb_side: int = 320, quality: int = 82):
+        self.max_workers = max_workers
+        self.max_side = max_side
+        self.thumb_side = thumb_side
+        self.quality = quality
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Jarayonlar hovuzini birinchi kerak bo'lganda yaratish"""
+        if self._executor is None:
+            # fork bot ichidagi thread va ulanishlarni nusxalaydi - spawn xavfsizroq
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn')
+            )
+        return self._executor
+
+    async def process(self, data: bytes) -> Dict[str, Any]:
+        """
+        Rasmni hovuzda qayta ishlash
+
+        Args:
+            data: Asl rasm baytlari
+
+        Returns:
+            Dict[str, Any]: main, thumb, width, height, dhash
+        """
+        loop = asyncio.get_running_loop()
+        job = functools.partial(
+            process_image, data,
+            max_side=self.max_side, thumb_side=self.thumb_side, quality=self.quality
+        )
+        return await loop.run_in_executor(self._get_executor(), job)
+
+    async def dhash(self, data: bytes) -> int:
+        """Rasm dHash ini hovuzda hisoblash"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._get_executor(), dhash, data)
+
+    def shutdown(self) -> None:
+        """Jarayonlar hovuzini to'xtatish"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
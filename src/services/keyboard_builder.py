@@ -372,6 +372,15 @@ class KeyboardBuilder:
         ]
         return InlineKeyboardMarkup(keyboard)
     
+    @staticmethod
+    def create_photos_done_keyboard() -> InlineKeyboardMarkup:
+        """Rasmlar qo'shishni yakunlash klaviaturasi"""
+        keyboard = [
+            [InlineKeyboardButton(KeyboardTexts.PHOTOS_DONE, callback_data=CallbackPatterns.LISTING_PHOTOS_DONE)],
+            [InlineKeyboardButton(KeyboardTexts.CANCEL, callback_data=CallbackPatterns.LISTING_CANCEL)]
+        ]
+        return InlineKeyboardMarkup(keyboard)
+    
     @staticmethod
     def create_description_skip_keyboard() -> InlineKeyboardMarkup:
         """Tavsif o'tkazish klaviaturasi"""
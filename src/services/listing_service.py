@@ -1,18 +1,32 @@
 """
 Listing Service - E'lonlar bilan bog'liq operatsiyalar
 """
-from typing import Optional, List
+from typing import Optional, List, Dict
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, update, delete
+from sqlalchemy import select, insert, update, delete
 from sqlalchemy.orm import selectinload
-from src.database.models import Listing, User, ListingType, ListingStatus, PropertyType
+from src.database.models import Listing, ListingMedia, PhotoHash, User, ListingType, ListingStatus, PropertyType
+from src.services.media_service import MediaService
+from src.services.media_store import ContentAddressedStore, get_media_store
+from src.services.duplicate_service import DuplicateDetector, get_duplicate_detector
 
 
 class ListingService:
     """E'lon xizmatlari"""
     
-    def __init__(self, db: Optional[AsyncSession] = None):
+    def __init__(self, db: Optional[AsyncSession] = None,
+                 duplicate_detector: Optional[DuplicateDetector] = None,
+                 media_store: Optional[ContentAddressedStore] = None):
         self.db = db
+        self.duplicate_detector = duplicate_detector or get_duplicate_detector()
+        self._media_store = media_store
+    
+    @property
+    def media_store(self) -> ContentAddressedStore:
+        """Rasm fayllari ombori (o'chirilgan e'lon havolalarini bo'shatish uchun)"""
+        if self._media_store is None:
+            self._media_store = get_media_store()
+        return self._media_store
     
     async def create_listing(self, user_id: str, listing_data: dict) -> Optional[Listing]:
         """Yangi e'lon yaratish"""
@@ -34,18 +48,57 @@ class ListingService:
                 pets_allowed=listing_data.get('pets_allowed', False),
                 title=listing_data.get('title'),
                 description=listing_data.get('description'),
-                media_urls=listing_data.get('media_urls'),
                 status=ListingStatus.pending
             )
             
+            signature = self.duplicate_detector.signature(listing.title, listing.description)
+            if signature is not None:
+                listing.text_signature = DuplicateDetector.dump(signature)
+                await self._mark_duplicate(listing, signature)
+            
             self.db.add(listing)
+            
+            media = listing_data.get('media')
+            if media:
+                # listing.id flush paytida yaratiladi; rasmlar soni qancha bo'lmasin
+                # bitta ko'p qatorli INSERT
+                await self.db.flush()
+                await self.db.execute(
+                    insert(ListingMedia).values(MediaService.to_listing_media_values(listing.id, media))
+                )
+            
+            # Barcha standart qiymatlar Python tomonida beriladi va flush da obyektga
+            # yoziladi - commit dan keyin refresh (qo'shimcha SELECT) kerak emas
             await self.db.commit()
-            await self.db.refresh(listing)
+            
+            self.duplicate_detector.add(listing.id, signature)
             return listing
         except Exception as e:
             await self.db.rollback()
             raise
     
+    async def _mark_duplicate(self, listing: Listing, signature) -> None:
+        """LSH nomzodlaridan hali bazada bor eng o'xshash e'lonni belgilash"""
+        candidates = self.duplicate_detector.find_duplicates(signature)
+        if not candidates:
+            return
+        
+        # Nomzodlar soni qancha bo'lmasin - bitta IN so'rovi
+        result = await self.db.execute(
+            select(Listing.id).where(Listing.id.in_([duplicate_id for duplicate_id, _ in candidates]))
+        )
+        existing = set(result.scalars().all())
+        
+        for duplicate_id, similarity in candidates:
+            if duplicate_id not in existing:
+                # Boshqa jarayonda o'chirilgan - indeksda qolib ketgan
+                self.duplicate_detector.remove(duplicate_id)
+                continue
+            
+            if listing.duplicate_of_id is None:
+                listing.duplicate_of_id = duplicate_id
+                listing.duplicate_score = round(similarity, 2)
+    
     async def get_listing_by_id(self, listing_id: str) -> Optional[Listing]:
         """ID orqali e'lonni topish"""
         try:
@@ -60,6 +113,35 @@ class ListingService:
                 await self.db.rollback()
             raise
     
+    async def get_media_for_listings(self, listing_ids: List[str]) -> Dict[str, List[ListingMedia]]:
+        """
+        Bir nechta e'lon rasmlarini bitta IN so'rovi bilan olish
+        
+        Args:
+            listing_ids: E'lonlar ID lari (masalan bitta sahifa)
+            
+        Returns:
+            Dict[str, List[ListingMedia]]: E'lon ID si -> tartiblangan rasmlar
+            (rasmi yo'q e'lonlar uchun bo'sh ro'yxat)
+        """
+        media: Dict[str, List[ListingMedia]] = {listing_id: [] for listing_id in listing_ids}
+        if not listing_ids:
+            return media
+        
+        try:
+            result = await self.db.execute(
+                select(ListingMedia)
+                .where(ListingMedia.listing_id.in_(listing_ids))
+                .order_by(ListingMedia.listing_id, ListingMedia.position)
+            )
+            for row in result.scalars().all():
+                media[row.listing_id].append(row)
+            return media
+        except Exception as e:
+            if self.db:
+                await self.db.rollback()
+            raise
+    
     async def get_user_listings(self, user_id: str) -> List[Listing]:
         """Foydalanuvchining e'lonlarini olish"""
         try:
@@ -91,15 +173,45 @@ class ListingService:
             await self.db.rollback()
             raise
     
+    async def delete_listing_dependents(self, listing_ids: List[str]) -> List[str]:
+        """
+        E'lonlarning rasmlari va rasm hashlarini o'chirish (commit qilinmaydi)
+        
+        ON DELETE CASCADE ga tayanilmaydi - eski SQLite bazalarda foreign_keys
+        o'chiq bo'lishi mumkin, shuning uchun e'lonni o'chiruvchi har bir yo'l
+        avval shu metodni chaqiradi.
+        
+        Args:
+            listing_ids: O'chirilayotgan e'lonlar ID lari
+        
+        Returns:
+            List[str]: Omborda saqlangan fayllar hashlari - commit dan keyin
+            media_store.release_all() ga beriladi
+        """
+        if not listing_ids:
+            return []
+        await self.db.execute(delete(PhotoHash).where(PhotoHash.listing_id.in_(listing_ids)))
+        result = await self.db.execute(
+            delete(ListingMedia)
+            .where(ListingMedia.listing_id.in_(listing_ids))
+            .returning(ListingMedia.sha256, ListingMedia.thumb_sha256)
+            .execution_options(synchronize_session=False)
+        )
+        return [sha256 for row in result.all() for sha256 in row if sha256]
+    
     async def delete_listing(self, listing_id: str) -> bool:
         """E'lonni o'chirish"""
         try:
+            shas = await self.delete_listing_dependents([listing_id])
             result = await self.db.execute(
                 delete(Listing).where(Listing.id == listing_id)
             )
             
             if result.rowcount > 0:
                 await self.db.commit()
+                self.duplicate_detector.remove(listing_id)
+                if shas:
+                    await self.media_store.release_all(shas)
                 return True
             return False
         except Exception as e:
@@ -0,0 +1,233 @@
+"""
+Media GC - Hech bir e'longa tegishli bo'lmagan media fayllarni tozalash
+
+O'chirilgan, rad etilgan yoki yakunlanmagan e'lonlarning fayllari media/
+papkasida qolib ketadi. GC papkani os.scandir bilan oqim sifatida o'qiydi
+va fayllarni partiyalab listing_media bilan solishtiradi, shuning uchun
+xotira fayllar soniga emas, partiya hajmiga bog'liq. Yangi yuklangan
+fayllar (hali e'lon yaratilmagan qoralamalar) muhlat tugaguncha
+o'chirilmaydi.
+
+Ishlatish:
+    python -m src.services.media_gc --dry-run
+"""
+import argparse
+import asyncio
+import logging
+import os
+import re
+import time
+from typing import Optional, Dict, List, Iterator, Tuple, Callable, Set
+from sqlalchemy import select, delete, union
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.database import AsyncSessionLocal
+from src.database.models import Listing, ListingMedia, MediaBlob
+from src.config import settings
+from src.utils import async_fs
+from src.utils.metrics import REGISTRY
+
+logger = logging.getLogger(__name__)
+
+_SHA256_RE = re.compile(r"^[0-9a-f]{64}$")
+
+# O'chirishdan oldin fayl shu nom bilan ko'chiriladi
+TOMBSTONE_SUFFIX = ".gc"
+
+# (yo'l, nom, hajm, o'zgartirilgan vaqt)
+FileEntry = Tuple[str, str, int, float]
+
+# dry run o'tishlari sanalmaydi
+MEDIA_GC_FILES_DELETED = REGISTRY.counter(
+    "media_gc_files_deleted_total", "Orphaned media files removed by the garbage collector"
+)
+MEDIA_GC_BYTES_RECLAIMED = REGISTRY.counter(
+    "media_gc_bytes_reclaimed_total", "Bytes freed by removing orphaned media files"
+)
+MEDIA_GC_ERRORS = REGISTRY.counter(
+    "media_gc_errors_total", "Orphaned media files the garbage collector failed to remove"
+)
+
+
+class MediaGarbageCollector:
+    """Yetim media fayllarni topish va o'chirish"""
+
+    def __init__(self, root: Optional[str] = None,
+                 session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+                 grace_seconds: Optional[float] = None, batch_size: int = 1000,
+                 dry_run: bool = False):
+        self.root = root or settings.media_root
+        self.session_factory = session_factory
+        self.grace_seconds = grace_seconds if grace_seconds is not None else settings.media_gc_grace_hours * 3600
+        self.batch_size = batch_size
+        self.dry_run = dry_run
+        self.last_stats: Optional[Dict[str, float]] = None
+
+    def _scan(self) -> Iterator[FileEntry]:
+        """Papkani rekursiv o'qish - ro'yxat xotirada yig'ilmaydi"""
+        directories = [self.root]
+        while directories:
+            directory = directories.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                directories.append(entry.path)
+                            elif entry.is_file(follow_symlinks=False):
+                                stat = entry.stat(follow_symlinks=False)
+                                yield entry.path, entry.name, stat.st_size, stat.st_mtime
+                        except OSError as e:
+                            logger.warning(f"Media GC could not stat {entry.path}: {e}")
+            except FileNotFoundError:
+                continue
+
+    def _next_batch(self, files: Iterator[FileEntry]) -> List[FileEntry]:
+        """Keyingi partiya (bo'sh ro'yxat - papka tugadi)"""
+        batch = []
+        for entry in files:
+            batch.append(entry)
+            if len(batch) >= self.batch_size:
+                break
+        return batch
+
+    async def _referenced(self, shas: List[str], paths: List[str]) -> Tuple[Set[str], Set[str]]:
+        """Partiyadagi qaysi hash va yo'llar e'lonlarda ishlatilgani"""
+        referenced_shas: Set[str] = set()
+        referenced_paths: Set[str] = set()
+
+        # Faqat mavjud e'lonlarning rasmlari: foreign_keys o'chiq SQLite da
+        # o'chirilgan e'londan qolib ketgan listing_media qatorlari hisoblanmaydi
+        live_media = select(ListingMedia).join(Listing, Listing.id == ListingMedia.listing_id).subquery()
+
+        async with self.session_factory() as db:
+            if shas:
+                result = await db.execute(union(
+                    select(live_media.c.sha256).where(live_media.c.sha256.in_(shas)),
+                    select(live_media.c.thumb_sha256).where(live_media.c.thumb_sha256.in_(shas))
+                ))
+                referenced_shas.update(result.scalars().all())
+            if paths:
+                result = await db.execute(select(live_media.c.path).where(live_media.c.path.in_(paths)))
+                referenced_paths.update(result.scalars().all())
+
+        return referenced_shas, referenced_paths
+
+    async def _remove_blob(self, path: str, sha256: str, cutoff: float) -> bool:
+        """
+        Kontent bo'yicha saqlangan faylni o'chirish
+
+        Fayl avval boshqa nomga ko'chiriladi: shu orada kimdir xuddi shu
+        faylni yuklasa (takror - fayl vaqti yangilanadi) u joyiga qaytariladi,
+        media_blobs qatori yo'qolgan bo'lsa esa yangi nusxa yoziladi.
+        """
+        tombstone = path + TOMBSTONE_SUFFIX
+        try:
+            await async_fs.replace(path, tombstone)
+            if (await async_fs.stat(tombstone)).st_mtime >= cutoff:
+                await async_fs.replace(tombstone, path)
+                return False
+        except FileNotFoundError:
+            return False
+
+        async with self.session_factory() as db:
+            await db.execute(delete(MediaBlob).where(MediaBlob.sha256 == sha256))
+            await db.commit()
+
+        await async_fs.remove(tombstone)
+        return True
+
+    async def collect(self) -> Dict[str, float]:
+        """
+        Bitta to'liq GC o'tishi
+
+        Returns:
+            Dict[str, float]: scanned, orphaned, deleted, bytes_reclaimed, errors, duration
+        """
+        started = time.monotonic()
+        cutoff = time.time() - self.grace_seconds
+        stats = {'scanned': 0, 'orphaned': 0, 'deleted': 0, 'bytes_reclaimed': 0, 'errors': 0}
+        spool_dir = os.path.join(self.root, ".spool")
+
+        files = self._scan()
+        while True:
+            batch = await async_fs.run(self._next_batch, files)
+            if not batch:
+                break
+
+            stats['scanned'] += len(batch)
+            # Muhlati tugamagan fayllar hatto bazaga so'ralmaydi
+            candidates = [entry for entry in batch if entry[3] < cutoff]
+            shas = [name for _, name, _, _ in candidates if _SHA256_RE.match(name)]
+            paths = [path for path, name, _, _ in candidates if not _SHA256_RE.match(name)]
+            referenced_shas, referenced_paths = await self._referenced(shas, paths)
+
+            for path, name, size, _ in candidates:
+                is_blob = bool(_SHA256_RE.match(name))
+                # Yakunlanmagan yuklashlar va to'xtab qolgan GC qoldiqlari
+                is_leftover = os.path.dirname(path) == spool_dir or name.endswith(TOMBSTONE_SUFFIX)
+                if is_blob and name in referenced_shas:
+                    continue
+                if not is_blob and not is_leftover and path in referenced_paths:
+                    continue
+
+                stats['orphaned'] += 1
+                if self.dry_run:
+                    stats['bytes_reclaimed'] += size
+                    continue
+
+                try:
+                    if is_blob:
+                        removed = await self._remove_blob(path, name, cutoff)
+                    else:
+                        removed = await async_fs.remove(path)
+                except OSError as e:
+                    logger.warning(f"Media GC could not remove {path}: {e}")
+                    stats['errors'] += 1
+                    MEDIA_GC_ERRORS.inc()
+                    continue
+
+                if removed:
+                    stats['deleted'] += 1
+                    stats['bytes_reclaimed'] += size
+                    MEDIA_GC_FILES_DELETED.inc()
+                    MEDIA_GC_BYTES_RECLAIMED.inc(size)
+
+        stats['duration'] = round(time.monotonic() - started, 3)
+        self.last_stats = stats
+        logger.info(
+            f"Media GC{' (dry run)' if self.dry_run else ''}: scanned {stats['scanned']}, "
+            f"orphaned {stats['orphaned']}, deleted {stats['deleted']}, "
+            f"reclaimed {stats['bytes_reclaimed']} bytes in {stats['duration']}s"
+        )
+        return stats
+
+    async def run_forever(self, interval_seconds: float) -> None:
+        """GC ni belgilangan oraliqda ishga tushirish (bot bilan birga fonda)"""
+        while True:
+            try:
+                await self.collect()
+            except Exception as e:
+                logger.error(f"Media GC failed: {e}")
+            await asyncio.sleep(interval_seconds)
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description="Orphaned media garbage collector")
+    parser.add_argument('--root', default=None, help="Media papkasi (standart: MEDIA_ROOT)")
+    parser.add_argument('--grace-hours', type=float, default=None, help="Shundan yangi fayllar o'chirilmaydi")
+    parser.add_argument('--dry-run', action='store_true', help="Faqat hisoblash, o'chirmaslik")
+    args = parser.parse_args()
+
+    collector = MediaGarbageCollector(
+        root=args.root,
+        grace_seconds=args.grace_hours * 3600 if args.grace_hours is not None else None,
+        dry_run=args.dry_run
+    )
+    stats = await collector.collect()
+    for key, value in stats.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main())
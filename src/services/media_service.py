@@ -2,40 +2,83 @@
 Media Service - Rasm va fayl yuklash xizmati
 """
 import logging
+import mimetypes
 import os
-import uuid
 from typing import Optional, List, Dict, Any
-from telegram import Update, PhotoSize, Document
+from telegram import Update, PhotoSize, Document, Bot, InputMediaPhoto, InputMediaDocument
 from telegram.ext import ContextTypes
+from src.services.media_store import ContentAddressedStore, create_media_backend
+from src.services.image_pipeline import ImagePipeline
+from src.database.models import ListingMedia
 from src.config import settings
+from src.utils import async_fs
+from src.utils.validators import IMAGE_HEADER_SIZE, validate_image_file
 
 logger = logging.getLogger(__name__)
 
+# Media saqlash rejimlari
+MEDIA_MODE_FILE_ID = "file_id"
+MEDIA_MODE_LOCAL = "local"
+
+# Telegram send_media_group limiti
+MEDIA_GROUP_LIMIT = 10
+
+# Barcha MediaService lar uchun bitta jarayonlar hovuzi
+_image_pipeline: Optional[ImagePipeline] = None
+
+
+def get_image_pipeline() -> ImagePipeline:
+    """Umumiy rasm qayta ishlash hovuzini olish"""
+    global _image_pipeline
+    if _image_pipeline is None:
+        _image_pipeline = ImagePipeline(max_workers=settings.image_pipeline_workers or None)
+    return _image_pipeline
+
+
+def shutdown_image_pipeline() -> None:
+    """Rasm qayta ishlash hovuzini to'xtatish (bot to'xtaganda)"""
+    if _image_pipeline is not None:
+        _image_pipeline.shutdown()
+
 
 class MediaService:
     """Media fayllar bilan ishlash xizmati"""
     
-    def __init__(self):
-        self.media_dir = "media"
+    def __init__(self, storage_mode: Optional[str] = None, image_pipeline: Optional[ImagePipeline] = None):
+        self.media_dir = settings.media_root
         self.allowed_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp'}
         self.max_file_size = 20 * 1024 * 1024  # 20MB
-        
-    def _ensure_media_dir(self) -> None:
-        """Media papkasini yaratish"""
-        if not os.path.exists(self.media_dir):
-            os.makedirs(self.media_dir)
-            logger.info(f"Media directory created: {self.media_dir}")
+        self.storage_mode = storage_mode or settings.media_storage_mode
+        self._store: Optional[ContentAddressedStore] = None
+        self._image_pipeline = image_pipeline
+    
+    @property
+    def store(self) -> ContentAddressedStore:
+        """Kontent bo'yicha manzillanadigan ombor (local yoki s3 rejimida)"""
+        if self._store is None:
+            self._store = ContentAddressedStore(
+                create_media_backend(self.storage_mode),
+                max_size=self.max_file_size
+            )
+        return self._store
+    
+    @property
+    def image_pipeline(self) -> ImagePipeline:
+        """Rasm qayta ishlash hovuzi"""
+        if self._image_pipeline is None:
+            self._image_pipeline = get_image_pipeline()
+        return self._image_pipeline
     
     async def download_photo(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[str]:
         """
-        Rasmni yuklab olish
+        Rasmni yuklab olib kontent bo'yicha saqlash
         
         Args:
             update: Telegram update
             context: Bot context
             
         Returns:
-            str: Yuklangan fayl yo'li yoki None
+            str: Faylning SHA-256 hash i yoki None
         """
         try:
             if not update.message or not update.message.photo:
@@ -44,20 +87,12 @@ class MediaService:
             # Eng katta rasmni olish
             photo = update.message.photo[-1]
             
-            # Fayl nomini yaratish
-            file_id = photo.file_id
-            file_name = f"{uuid.uuid4()}.jpg"
-            file_path = os.path.join(self.media_dir, file_name)
-            
-            # Media papkasini yaratish
-            self._ensure_media_dir()
+            # Rasm yuklanish paytida hashlanadi, takroriy rasm bir marta saqlanadi
+            file = await context.bot.get_file(photo.file_id)
+            sha256 = await self.store.save_download(file, "image/jpeg")
             
-            # Rasmni yuklab olish
-            file = await context.bot.get_file(file_id)
-            await file.download_to_drive(file_path)
-            
-            logger.info(f"Photo downloaded: {file_path}")
-            return file_path
+            logger.info(f"Photo stored: {sha256}")
+            return sha256
             
         except Exception as e:
             logger.error(f"Error downloading photo: {e}")
@@ -65,14 +100,14 @@ class MediaService:
     
     async def download_document(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[str]:
         """
-        Hujjatni yuklab olish
+        Hujjatni yuklab olib kontent bo'yicha saqlash
         
         Args:
             update: Telegram update
             context: Bot context
             
         Returns:
-            str: Yuklangan fayl yo'li yoki None
+            str: Faylning SHA-256 hash i yoki None
         """
         try:
             if not update.message or not update.message.document:
@@ -93,19 +128,15 @@ class MediaService:
                 logger.warning(f"File extension not allowed: {file_ext}")
                 return None
             
-            # Fayl nomini yaratish
-            unique_name = f"{uuid.uuid4()}{file_ext}"
-            file_path = os.path.join(self.media_dir, unique_name)
-            
-            # Media papkasini yaratish
-            self._ensure_media_dir()
+            content_type = document.mime_type or mimetypes.guess_type(file_name)[0] or "application/octet-stream"
             
-            # Hujjatni yuklab olish
+            # Hujjat yuklanish paytida hashlanadi, takroriy fayl bir marta saqlanadi.
+            # Kengaytma soxta bo'lishi mumkin - tur fayl boshidagi baytlardan tekshiriladi
             file = await context.bot.get_file(document.file_id)
-            await file.download_to_drive(file_path)
+            sha256 = await self.store.save_download(file, content_type, images_only=True)
             
-            logger.info(f"Document downloaded: {file_path}")
-            return file_path
+            logger.info(f"Document stored: {sha256}")
+            return sha256
             
         except Exception as e:
             logger.error(f"Error downloading document: {e}")
@@ -120,7 +151,7 @@ class MediaService:
             context: Bot context
             
         Returns:
-            str: Yuklangan fayl yo'li yoki None
+            str: Faylning SHA-256 hash i yoki None
         """
         try:
             logger.info(f"Processing media for user {update.effective_user.id}")
@@ -142,6 +173,271 @@ class MediaService:
             logger.error(f"Error processing media: {e}")
             return None
     
+    async def store_media(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> Optional[Dict[str, Any]]:
+        """
+        Media faylni saqlash rejimiga qarab saqlash
+        
+        file_id rejimida fayl serverga yuklanmaydi - faqat Telegram file_id
+        saqlanadi va keyin shu ID bilan qayta yuboriladi. Boshqa rejimlarda
+        asl fayl o'rniga siqilgan nusxa va thumbnail saqlanadi.
+        
+        Args:
+            update: Telegram update
+            context: Bot context
+            
+        Returns:
+            Dict: Media havolasi (file_id yoki sha256) yoki None
+        """
+        if self.storage_mode == MEDIA_MODE_FILE_ID:
+            return self.get_media_reference(update)
+        
+        sha256 = await self.process_media(update, context)
+        if not sha256:
+            return None
+        
+        return await self.create_renditions(sha256)
+    
+    async def create_renditions(self, original_sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        Saqlangan asl rasmdan siqilgan nusxa va thumbnail yaratish
+        
+        Asl fayl (EXIF/GPS bilan) omborda qoldirilmaydi.
+        
+        Args:
+            original_sha256: Asl faylning hash i
+            
+        Returns:
+            Dict: sha256, thumb_sha256, size, width, height, dhash yoki None (rasm bo'lmasa)
+        """
+        main_sha256 = None
+        try:
+            data = await self.store.read(original_sha256)
+            rendition = await self.image_pipeline.process(data)
+            main_sha256 = await self.store.save_bytes(rendition['main'], "image/jpeg")
+            thumb_sha256 = await self.store.save_bytes(rendition['thumb'], "image/jpeg")
+        except Exception as e:
+            logger.error(f"Error processing image {original_sha256}: {e}")
+            # Egasiz qoladigan havolalarni qaytarish
+            await self.store.release_all(sha for sha in (main_sha256, original_sha256) if sha)
+            return None
+        
+        await self.store.release(original_sha256)
+        
+        return {
+            'sha256': main_sha256,
+            'thumb_sha256': thumb_sha256,
+            'size': len(rendition['main']),
+            'width': rendition['width'],
+            'height': rendition['height'],
+            'dhash': rendition['dhash']
+        }
+    
+    def get_media_reference(self, update: Update) -> Optional[Dict[str, Any]]:
+        """
+        Xabardagi rasmning Telegram file_id havolasini olish (yuklab olmasdan)
+        
+        Args:
+            update: Telegram update
+            
+        Returns:
+            Dict: file_id, file_unique_id va thumbnail file_id yoki None
+        """
+        message = update.message
+        if not message:
+            return None
+        
+        if message.photo:
+            # PhotoSize ro'yxati kichikdan kattaga tartiblangan
+            largest = message.photo[-1]
+            smallest = message.photo[0]
+            return {
+                'file_id': largest.file_id,
+                'file_unique_id': largest.file_unique_id,
+                'thumb_file_id': smallest.file_id if smallest is not largest else None,
+                'size': largest.file_size,
+                'width': largest.width,
+                'height': largest.height
+            }
+        
+        document = message.document
+        if document and (document.mime_type or '').startswith('image/'):
+            if document.file_size and document.file_size > self.max_file_size:
+                logger.warning(f"File too large: {document.file_size} bytes")
+                return None
+            
+            thumb = getattr(document, 'thumbnail', None) or getattr(document, 'thumb', None)
+            return {
+                'file_id': document.file_id,
+                'file_unique_id': document.file_unique_id,
+                'thumb_file_id': thumb.file_id if thumb else None,
+                'size': document.file_size,
+                'document': True
+            }
+        
+        return None
+    
+    @staticmethod
+    def to_listing_media_values(listing_id: str, media: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Media havolalarini listing_media ustunlari qiymatlariga aylantirish
+        
+        Bitta ko'p qatorli INSERT uchun: insert(ListingMedia).values(...)
+        
+        Args:
+            listing_id: E'lon ID si
+            media: store_media qaytargan havolalar (tartib saqlanadi)
+            
+        Returns:
+            List[Dict[str, Any]]: Har bir rasm uchun ustun qiymatlari
+        """
+        return [
+            {
+                'listing_id': listing_id,
+                'position': position,
+                'file_id': item.get('file_id'),
+                'file_unique_id': item.get('file_unique_id'),
+                'thumb_file_id': item.get('thumb_file_id'),
+                'sha256': item.get('sha256'),
+                'thumb_sha256': item.get('thumb_sha256'),
+                'path': item.get('path'),
+                'is_document': bool(item.get('document')),
+                'size': item.get('size'),
+                'width': item.get('width'),
+                'height': item.get('height')
+            }
+            for position, item in enumerate(media)
+        ]
+    
+    @staticmethod
+    def to_listing_media(listing_id: str, media: List[Dict[str, Any]]) -> List[ListingMedia]:
+        """
+        Media havolalarini listing_media qatorlariga aylantirish
+        
+        Args:
+            listing_id: E'lon ID si
+            media: store_media qaytargan havolalar (tartib saqlanadi)
+            
+        Returns:
+            List[ListingMedia]: Saqlanmagan qatorlar
+        """
+        return [ListingMedia(**values) for values in MediaService.to_listing_media_values(listing_id, media)]
+    
+    @staticmethod
+    def to_references(rows: List[ListingMedia]) -> List[Dict[str, Any]]:
+        """listing_media qatorlarini media havolalariga aylantirish"""
+        references = []
+        for row in rows:
+            reference = {
+                key: value for key, value in (
+                    ('file_id', row.file_id),
+                    ('file_unique_id', row.file_unique_id),
+                    ('thumb_file_id', row.thumb_file_id),
+                    ('sha256', row.sha256),
+                    ('thumb_sha256', row.thumb_sha256),
+                    ('path', row.path),
+                    ('size', row.size),
+                    ('width', row.width),
+                    ('height', row.height),
+                )
+                if value is not None
+            }
+            if row.is_document:
+                reference['document'] = True
+            references.append(reference)
+        return references
+    
+    async def send_listing_media(self, bot: Bot, chat_id: int, media: List[Dict[str, Any]],
+                                 caption: Optional[str] = None) -> int:
+        """
+        E'lon rasmlarini send_media_group bilan yuborish
+        
+        file_id bilan saqlangan rasmlar Telegram serverlaridan qayta
+        yuboriladi, fayl bizning server orqali o'tmaydi.
+        
+        Args:
+            bot: Telegram bot
+            chat_id: Qabul qiluvchi chat
+            media: Media havolalari (to_references)
+            caption: Birinchi rasm ostidagi matn
+            
+        Returns:
+            int: Yuborilgan media soni
+        """
+        # Media guruhida rasm va hujjatni aralashtirib bo'lmaydi
+        photos = [item for item in media if not item.get('document')]
+        documents = [item for item in media if item.get('document')]
+        
+        sent = 0
+        for group in (photos, documents):
+            for start in range(0, len(group), MEDIA_GROUP_LIMIT):
+                chunk = group[start:start + MEDIA_GROUP_LIMIT]
+                input_media = [
+                    await self._build_input_media(item, caption if sent == 0 and i == 0 else None)
+                    for i, item in enumerate(chunk)
+                ]
+                
+                if len(input_media) == 1:
+                    single = input_media[0]
+                    if isinstance(single, InputMediaDocument):
+                        await bot.send_document(chat_id=chat_id, document=single.media, caption=single.caption)
+                    else:
+                        await bot.send_photo(chat_id=chat_id, photo=single.media, caption=single.caption)
+                else:
+                    await bot.send_media_group(chat_id=chat_id, media=input_media)
+                
+                sent += len(input_media)
+        
+        return sent
+    
+    async def _build_input_media(self, item: Dict[str, Any], caption: Optional[str] = None) -> Any:
+        """Media havolasidan InputMedia obyektini yaratish"""
+        media_class = InputMediaDocument if item.get('document') else InputMediaPhoto
+        
+        if item.get('file_id'):
+            return media_class(media=item['file_id'], caption=caption)
+        
+        if item.get('sha256'):
+            return media_class(media=await self.store.read(item['sha256']), caption=caption)
+        
+        # Eski lokal fayl
+        return media_class(media=await async_fs.read_bytes(item['path']), caption=caption)
+    
+    async def compute_photo_hashes(self, bot: Bot, media: List[Dict[str, Any]]) -> List[Optional[int]]:
+        """
+        E'lon rasmlarining dHash larini hisoblash
+        
+        Hash kichik nusxadan hisoblanadi: file_id rejimida faqat thumbnail
+        yuklab olinadi, omborda esa saqlangan thumbnail o'qiladi.
+        
+        Args:
+            bot: Telegram bot
+            media: Media havolalari
+        
+        Returns:
+            List[Optional[int]]: Rasmlar tartibidagi hashlar (xatolikda None)
+        """
+        hashes = []
+        for item in media:
+            if item.get('dhash') is not None:
+                hashes.append(item['dhash'])
+                continue
+            
+            try:
+                if item.get('file_id'):
+                    file = await bot.get_file(item.get('thumb_file_id') or item['file_id'])
+                    data = bytes(await file.download_as_bytearray())
+                elif item.get('sha256'):
+                    data = await self.store.read(item.get('thumb_sha256') or item['sha256'])
+                else:
+                    data = await async_fs.read_bytes(item['path'])
+                
+                hashes.append(await self.image_pipeline.dhash(data))
+            except Exception as e:
+                logger.warning(f"Could not hash listing photo: {e}")
+                hashes.append(None)
+        
+        return hashes
+    
     def get_media_url(self, file_path: str) -> str:
         """
         Fayl yo'lini URL ga aylantirish
@@ -165,10 +461,13 @@ class MediaService:
             logger.error(f"Error getting media URL: {e}")
             return file_path
     
-    def validate_media(self, file_path: str) -> bool:
+    async def validate_media(self, file_path: str) -> bool:
         """
         Media faylini tekshirish
         
+        Hajm va tur fayl hovuzida o'qiladi; kengaytma fayl boshidagi
+        baytlardan aniqlangan turga mos bo'lishi kerak.
+        
         Args:
             file_path: Fayl yo'li
             
@@ -176,26 +475,27 @@ class MediaService:
             bool: Fayl to'g'ri bo'lsa True
         """
         try:
-            if not os.path.exists(file_path):
+            # Fayl kengaytmasini tekshirish (diskka murojaatsiz)
+            file_ext = os.path.splitext(file_path)[1].lower()
+            if file_ext not in self.allowed_extensions:
                 return False
             
             # Fayl hajmini tekshirish
-            file_size = os.path.getsize(file_path)
-            if file_size > self.max_file_size:
+            try:
+                file_size = (await async_fs.stat(file_path)).st_size
+            except FileNotFoundError:
                 return False
-            
-            # Fayl kengaytmasini tekshirish
-            file_ext = os.path.splitext(file_path)[1].lower()
-            if file_ext not in self.allowed_extensions:
+            if file_size > self.max_file_size:
                 return False
             
-            return True
+            header = await async_fs.read_header(file_path, IMAGE_HEADER_SIZE)
+            return validate_image_file(header, file_path)
             
         except Exception as e:
             logger.error(f"Error validating media: {e}")
             return False
     
-    def cleanup_media(self, file_path: str) -> bool:
+    async def cleanup_media(self, file_path: str) -> bool:
         """
         Media faylni o'chirish
         
@@ -206,8 +506,7 @@ class MediaService:
             bool: O'chirilgan bo'lsa True
         """
         try:
-            if os.path.exists(file_path):
-                os.remove(file_path)
+            if await async_fs.remove(file_path):
                 logger.info(f"Media file deleted: {file_path}")
                 return True
             return False
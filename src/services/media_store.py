@@ -0,0 +1,546 @@
+"""
+Media Store - Kontent bo'yicha manzillanadigan (SHA-256) media ombori
+"""
+import hashlib
+import hmac
+import logging
+import os
+import tempfile
+import uuid
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Optional, Dict, Callable, AsyncIterator, BinaryIO, Iterable
+from urllib.parse import quote, urlsplit
+import httpx
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.database import AsyncSessionLocal
+from src.database.models import MediaBlob
+from src.config import settings
+from src.utils import async_fs
+from src.utils.validators import IMAGE_HEADER_SIZE, detect_image_type
+
+logger = logging.getLogger(__name__)
+
+# Diskdan o'qish/yozish bo'lagi
+CHUNK_SIZE = 64 * 1024
+
+
+def blob_key(sha256: str) -> str:
+    """Hash bo'yicha saqlash kaliti: ab/cd/abcd..."""
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}"
+
+
+class MediaTooLargeError(ValueError):
+    """Media fayl ruxsat etilgan hajmdan katta"""
+
+
+class UnsupportedMediaError(ValueError):
+    """Fayl tarkibi ruxsat etilgan turga mos emas"""
+
+
+class MediaBackend(ABC):
+    """Media saqlash backend interfeysi"""
+
+    @abstractmethod
+    async def put(self, key: str, source_path: str, sha256: str, content_type: str) -> None:
+        """Vaqtinchalik faylni kalit bo'yicha saqlash"""
+
+    @abstractmethod
+    async def get(self, key: str) -> bytes:
+        """Fayl tarkibini olish"""
+
+    @abstractmethod
+    async def exists(self, key: str) -> bool:
+        """Kalit mavjudligini tekshirish"""
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        """Faylni o'chirish"""
+
+    async def touch(self, key: str) -> None:
+        """Fayl yangi havola olganini belgilash (GC muhlati shundan hisoblanadi)"""
+
+
+class LocalMediaBackend(MediaBackend):
+    """Lokal fayl tizimi backend i (media/ab/cd/<sha256>)"""
+
+    def __init__(self, root: str = "media"):
+        self.root = root
+
+    def path(self, key: str) -> str:
+        """Kalitning diskdagi yo'li"""
+        return os.path.join(self.root, *key.split('/'))
+
+    async def put(self, key: str, source_path: str, sha256: str, content_type: str) -> None:
+        """Vaqtinchalik faylni joyiga ko'chirish (bir fayl tizimida atomik)"""
+        target = self.path(key)
+        await async_fs.makedirs(os.path.dirname(target))
+        await async_fs.move(source_path, target)
+
+    async def get(self, key: str) -> bytes:
+        """Fayl tarkibini o'qish"""
+        return await async_fs.read_bytes(self.path(key))
+
+    async def exists(self, key: str) -> bool:
+        """Fayl mavjudligini tekshirish"""
+        return await async_fs.exists(self.path(key))
+
+    async def delete(self, key: str) -> None:
+        """Faylni o'chirish"""
+        await async_fs.remove(self.path(key))
+
+    async def touch(self, key: str) -> None:
+        """Fayl o'zgartirilgan vaqtini yangilash"""
+        try:
+            await async_fs.utime(self.path(key))
+        except FileNotFoundError:
+            pass
+
+
+class S3MediaBackend(MediaBackend):
+    """
+    S3-mos backend (AWS S3, MinIO, Cloudflare R2 ...)
+
+    So'rovlar AWS Signature V4 bilan imzolanadi va path-style manzil
+    ishlatiladi: {endpoint}/{bucket}/{key}. Payload hash sifatida
+    faylning yozilish paytida hisoblangan SHA-256 qiymati ishlatiladi.
+    """
+
+    def __init__(self, endpoint_url: str, bucket: str, access_key: str, secret_key: str,
+                 region: str = "us-east-1", client: Optional[httpx.AsyncClient] = None):
+        self.endpoint_url = endpoint_url.rstrip('/')
+        self.bucket = bucket
+        self.access_key = access_key
+        self.secret_key = secret_key
+        self.region = region
+        self.client = client or httpx.AsyncClient(timeout=60)
+
+    def url(self, key: str) -> str:
+        """Obyekt URL i"""
+        return f"{self.endpoint_url}/{self.bucket}/{quote(key)}"
+
+    async def put(self, key: str, source_path: str, sha256: str, content_type: str) -> None:
+        """Faylni bo'laklab yuklash"""
+        size = await async_fs.getsize(source_path)
+        headers = {'Content-Type': content_type, 'Content-Length': str(size)}
+        response = await self._request('PUT', key, headers, sha256, content=self._read_chunks(source_path))
+        response.raise_for_status()
+
+        await async_fs.remove(source_path)
+
+    async def get(self, key: str) -> bytes:
+        """Obyektni yuklab olish"""
+        response = await self._request('GET', key)
+        response.raise_for_status()
+        return response.content
+
+    async def exists(self, key: str) -> bool:
+        """Obyekt mavjudligini tekshirish"""
+        response = await self._request('HEAD', key)
+        if response.status_code == 404:
+            return False
+        response.raise_for_status()
+        return True
+
+    async def delete(self, key: str) -> None:
+        """Obyektni o'chirish"""
+        response = await self._request('DELETE', key)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    async def _request(self, method: str, key: str, headers: Optional[Dict[str, str]] = None,
+                       payload_hash: str = hashlib.sha256(b'').hexdigest(), content=None) -> httpx.Response:
+        """Imzolangan so'rov yuborish"""
+        url = self.url(key)
+        signed_headers = sign_v4(
+            method, url, dict(headers or {}), payload_hash,
+            self.access_key, self.secret_key, self.region
+        )
+        return await self.client.request(method, url, headers=signed_headers, content=content)
+
+    @staticmethod
+    async def _read_chunks(path: str) -> AsyncIterator[bytes]:
+        """Faylni event loop ni bloklamasdan bo'laklab o'qish"""
+        file = await async_fs.open_file(path)
+        try:
+            while True:
+                chunk = await async_fs.run(file.read, CHUNK_SIZE)
+                if not chunk:
+                    break
+                yield chunk
+        finally:
+            await async_fs.run(file.close)
+
+
+def sign_v4(method: str, url: str, headers: Dict[str, str], payload_hash: str,
+            access_key: str, secret_key: str, region: str, service: str = "s3",
+            now: Optional[datetime] = None) -> Dict[str, str]:
+    """
+    So'rov sarlavhalarini AWS Signature V4 bilan imzolash
+
+    Returns:
+        Dict[str, str]: Authorization, x-amz-date va x-amz-content-sha256 qo'shilgan sarlavhalar
+    """
+    now = now or datetime.now(timezone.utc)
+    amz_date = now.strftime('%Y%m%dT%H%M%SZ')
+    date_stamp = now.strftime('%Y%m%d')
+    parts = urlsplit(url)
+
+    headers = {name.lower(): str(value).strip() for name, value in headers.items()}
+    headers['host'] = parts.netloc
+    headers['x-amz-date'] = amz_date
+    headers['x-amz-content-sha256'] = payload_hash
+    # Content-Length ni imzolamaymiz - ba'zi proxy lar uni o'zgartiradi
+    signed_names = sorted(name for name in headers if name != 'content-length')
+
+    query = '&'.join(
+        sorted(
+            f"{quote(name, safe='-_.~')}={quote(value, safe='-_.~')}"
+            for name, _, value in (pair.partition('=') for pair in parts.query.split('&') if pair)
+        )
+    )
+    canonical_request = '\n'.join([
+        method,
+        quote(parts.path or '/', safe='/-_.~%'),
+        query,
+        ''.join(f"{name}:{headers[name]}\n" for name in signed_names),
+        ';'.join(signed_names),
+        payload_hash
+    ])
+
+    scope = f"{date_stamp}/{region}/{service}/aws4_request"
+    string_to_sign = '\n'.join([
+        'AWS4-HMAC-SHA256',
+        amz_date,
+        scope,
+        hashlib.sha256(canonical_request.encode()).hexdigest()
+    ])
+
+    signing_key = f"AWS4{secret_key}".encode()
+    for part in (date_stamp, region, service, 'aws4_request'):
+        signing_key = hmac.new(signing_key, part.encode(), hashlib.sha256).digest()
+    signature = hmac.new(signing_key, string_to_sign.encode(), hashlib.sha256).hexdigest()
+
+    headers['authorization'] = (
+        f"AWS4-HMAC-SHA256 Credential={access_key}/{scope}, "
+        f"SignedHeaders={';'.join(signed_names)}, Signature={signature}"
+    )
+    return headers
+
+
+class HashingWriter:
+    """
+    Yozilayotgan baytlarni bir vaqtda SHA-256 bilan hashlab vaqtinchalik faylga yozuvchi
+
+    Birinchi baytlardan fayl turi aniqlanadi: images_only bo'lsa rasm
+    bo'lmagan fayl qolgan qismi yozilmasdan rad etiladi.
+    """
+
+    def __init__(self, file: BinaryIO, max_size: Optional[int] = None, images_only: bool = False):
+        self.file = file
+        self.max_size = max_size
+        self.images_only = images_only
+        self.size = 0
+        self.header = b''
+        self.content_type: Optional[str] = None
+        self._hash = hashlib.sha256()
+
+    def write(self, data: bytes) -> int:
+        """Bo'lakni hashlash va yozish"""
+        self.size += len(data)
+        if self.max_size is not None and self.size > self.max_size:
+            raise MediaTooLargeError(f"Media fayl {self.max_size} baytdan katta")
+
+        if len(self.header) < IMAGE_HEADER_SIZE:
+            self.header += bytes(data[:IMAGE_HEADER_SIZE - len(self.header)])
+            if len(self.header) >= IMAGE_HEADER_SIZE:
+                self.check_type()
+
+        self._hash.update(data)
+        return self.file.write(data)
+
+    def check_type(self) -> None:
+        """Sarlavha bo'yicha turni aniqlash (juda qisqa fayllar uchun yozish oxirida ham chaqiriladi)"""
+        self.content_type = detect_image_type(self.header)
+        if self.images_only and self.content_type is None:
+            raise UnsupportedMediaError("Fayl tarkibi rasm emas")
+
+    def hexdigest(self) -> str:
+        """Yozilgan tarkib hash i"""
+        return self._hash.hexdigest()
+
+
+class _ChunkCollector:
+    """Yuklab olingan bo'laklarni nusxa olmasdan yig'ish (write() faqat havolani saqlaydi)"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data: bytes) -> int:
+        self.chunks.append(data)
+        return len(data)
+
+    def flush(self, writer: HashingWriter) -> None:
+        """Yig'ilgan bo'laklarni yozuvchiga berish (fayl hovuzida chaqiriladi)"""
+        for chunk in self.chunks:
+            writer.write(chunk)
+        self.chunks.clear()
+
+
+class ContentAddressedStore:
+    """
+    Kontent bo'yicha manzillanadigan media ombori
+
+    Har bir fayl SHA-256 hash i bo'yicha bir marta saqlanadi, media_blobs
+    jadvalidagi ref_count esa nechta e'lon shu faylni ishlatayotganini bildiradi.
+    """
+
+    def __init__(self, backend: MediaBackend,
+                 session_factory: Callable[[], AsyncSession] = AsyncSessionLocal,
+                 spool_dir: Optional[str] = None, max_size: Optional[int] = None):
+        self.backend = backend
+        self.session_factory = session_factory
+        if spool_dir is None:
+            # Lokal backend da bir diskda bo'lsa, joyiga ko'chirish atomik rename bo'ladi
+            if isinstance(backend, LocalMediaBackend):
+                spool_dir = os.path.join(backend.root, ".spool")
+            else:
+                spool_dir = os.path.join(tempfile.gettempdir(), "uykelishuv-media")
+        self.spool_dir = spool_dir
+        self.max_size = max_size
+
+    async def open_spool(self) -> BinaryIO:
+        """Vaqtinchalik yozish fayli (lokal backend bilan bir diskda bo'lishi kerak)"""
+        await async_fs.makedirs(self.spool_dir)
+        return await async_fs.open_file(os.path.join(self.spool_dir, f"{uuid.uuid4().hex}.part"), 'wb')
+
+    async def _discard_spool(self, spool: BinaryIO) -> None:
+        """Yakunlanmagan vaqtinchalik faylni yopish va o'chirish"""
+        await async_fs.run(spool.close)
+        await async_fs.remove(spool.name)
+
+    async def _finish(self, spool: BinaryIO, writer: HashingWriter, content_type: Optional[str]) -> str:
+        """Yozib bo'lingan vaqtinchalik faylni yopish va omborga qo'shish"""
+        try:
+            if len(writer.header) < IMAGE_HEADER_SIZE:
+                writer.check_type()
+        except Exception:
+            await self._discard_spool(spool)
+            raise
+
+        await async_fs.run(spool.close)
+        return await self.commit(
+            spool.name, writer.hexdigest(), writer.size,
+            writer.content_type or content_type or "application/octet-stream"
+        )
+
+    async def save_download(self, telegram_file, content_type: Optional[str] = "image/jpeg",
+                            images_only: bool = False) -> str:
+        """
+        Telegram faylini yuklab olish paytida hashlab saqlash
+
+        download_to_memory buferni bitta write() bilan beradi - u event loop
+        da diskka yozilmasin uchun avval havola sifatida olinadi, keyin fayl
+        hovuzida hashlanib yoziladi.
+
+        Args:
+            telegram_file: telegram.File
+            content_type: MIME turi (tarkibdan aniqlangan tur ustun)
+            images_only: Rasm bo'lmagan fayllarni rad etish
+
+        Returns:
+            str: Faylning SHA-256 hash i
+        """
+        if self.max_size is not None and (getattr(telegram_file, 'file_size', None) or 0) > self.max_size:
+            raise MediaTooLargeError(f"Media fayl {self.max_size} baytdan katta")
+
+        collector = _ChunkCollector()
+        await telegram_file.download_to_memory(collector)
+
+        spool = await self.open_spool()
+        writer = HashingWriter(spool, self.max_size, images_only)
+        try:
+            await async_fs.run(collector.flush, writer)
+        except Exception:
+            await self._discard_spool(spool)
+            raise
+
+        return await self._finish(spool, writer, content_type)
+
+    async def save_bytes(self, data: bytes, content_type: str = "image/jpeg") -> str:
+        """
+        Xotiradagi faylni saqlash (masalan, qayta ishlangan rasm)
+
+        Returns:
+            str: Faylning SHA-256 hash i
+        """
+        spool = await self.open_spool()
+        writer = HashingWriter(spool)
+        try:
+            await async_fs.run(writer.write, data)
+        except Exception:
+            await self._discard_spool(spool)
+            raise
+
+        return await self._finish(spool, writer, content_type)
+
+    async def save_stream(self, chunks: AsyncIterator[bytes], content_type: Optional[str] = "image/jpeg",
+                          images_only: bool = False) -> str:
+        """
+        Bo'laklab kelayotgan faylni hashlab saqlash
+
+        Args:
+            chunks: Fayl bo'laklari
+            content_type: MIME turi (tarkibdan aniqlangan tur ustun)
+            images_only: Rasm bo'lmagan fayllarni birinchi bo'lakdayoq rad etish
+
+        Returns:
+            str: Faylning SHA-256 hash i
+        """
+        spool = await self.open_spool()
+        writer = HashingWriter(spool, self.max_size, images_only)
+        try:
+            async for chunk in chunks:
+                await async_fs.run(writer.write, chunk)
+        except Exception:
+            await self._discard_spool(spool)
+            raise
+
+        return await self._finish(spool, writer, content_type)
+
+    async def commit(self, spool_path: str, sha256: str, size: int, content_type: str) -> str:
+        """
+        Hashlangan vaqtinchalik faylni omborga qo'shish yoki mavjud nusxaga havola qo'shish
+
+        Returns:
+            str: Faylning SHA-256 hash i
+        """
+        if await self._increment(sha256):
+            # Takroriy fayl - bir marta saqlangan
+            await async_fs.remove(spool_path)
+            await self.backend.touch(blob_key(sha256))
+            logger.info(f"Media deduplicated: {sha256}")
+            return sha256
+
+        await self.backend.put(blob_key(sha256), spool_path, sha256, content_type)
+
+        async with self.session_factory() as db:
+            db.add(MediaBlob(sha256=sha256, size=size, content_type=content_type, ref_count=1))
+            try:
+                await db.commit()
+            except IntegrityError:
+                # Parallel yuklashda boshqa so'rov birinchi yozib ulgurdi
+                await db.rollback()
+                await self._increment(sha256)
+
+        logger.info(f"Media stored: {sha256} ({size} bytes)")
+        return sha256
+
+    async def add_reference(self, sha256: str) -> bool:
+        """Mavjud faylga yana bitta havola qo'shish"""
+        return await self._increment(sha256)
+
+    async def release(self, sha256: str) -> bool:
+        """
+        Havolani olib tashlash, oxirgi havola bo'lsa faylni o'chirish
+
+        Fayl media_blobs qatori o'chirilgan tranzaksiya commit qilinishidan
+        oldin o'chiriladi: shu orada xuddi shu faylni commit() qilayotgan
+        so'rov qator qulfini kutadi, keyin qator yo'qligini ko'rib faylni
+        qaytadan yozadi. Fayl o'chirilmasa tranzaksiya bekor bo'ladi.
+
+        Returns:
+            bool: Fayl butunlay o'chirilgan bo'lsa True
+        """
+        async with self.session_factory() as db:
+            await db.execute(
+                update(MediaBlob)
+                .where(MediaBlob.sha256 == sha256, MediaBlob.ref_count > 0)
+                .values(ref_count=MediaBlob.ref_count - 1)
+            )
+            result = await db.execute(
+                delete(MediaBlob)
+                .where(MediaBlob.sha256 == sha256, MediaBlob.ref_count <= 0)
+                .returning(MediaBlob.sha256)
+            )
+            removed = result.scalar_one_or_none() is not None
+            if removed:
+                try:
+                    await self.backend.delete(blob_key(sha256))
+                except Exception:
+                    await db.rollback()
+                    raise
+            await db.commit()
+
+        if removed:
+            logger.info(f"Media removed: {sha256}")
+
+        return removed
+
+    async def release_all(self, shas: Iterable[str]) -> int:
+        """
+        Bir nechta havolani bo'shatish (e'lon yoki qoralama o'chirilganda)
+
+        Xatolik boshqa havolalarni to'xtatmaydi - bo'shatilmay qolgan fayl
+        media GC da listing_media ga qarab baribir tozalanadi.
+
+        Returns:
+            int: Butunlay o'chirilgan fayllar soni
+        """
+        removed = 0
+        for sha256 in shas:
+            try:
+                removed += await self.release(sha256)
+            except Exception as e:
+                logger.error(f"Failed to release media {sha256}: {e}")
+        return removed
+
+    async def read(self, sha256: str) -> bytes:
+        """Fayl tarkibini olish"""
+        return await self.backend.get(blob_key(sha256))
+
+    async def get_blob(self, sha256: str) -> Optional[MediaBlob]:
+        """Fayl yozuvini olish"""
+        async with self.session_factory() as db:
+            result = await db.execute(select(MediaBlob).where(MediaBlob.sha256 == sha256))
+            return result.scalar_one_or_none()
+
+    async def _increment(self, sha256: str) -> bool:
+        """Mavjud yozuvning ref_count ini oshirish"""
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(MediaBlob)
+                .where(MediaBlob.sha256 == sha256)
+                .values(ref_count=MediaBlob.ref_count + 1)
+            )
+            await db.commit()
+            return result.rowcount > 0
+
+
+def create_media_backend(mode: Optional[str] = None) -> MediaBackend:
+    """Sozlamalar bo'yicha media backend yaratish"""
+    mode = mode or settings.media_storage_mode
+
+    if mode == "s3":
+        return S3MediaBackend(
+            settings.s3_endpoint_url,
+            settings.s3_bucket,
+            settings.s3_access_key,
+            settings.s3_secret_key,
+            settings.s3_region
+        )
+
+    return LocalMediaBackend(settings.media_root)
+
+
+_media_store: Optional[ContentAddressedStore] = None
+
+
+def get_media_store() -> ContentAddressedStore:
+    """Umumiy media ombori (e'lon o'chirilganda havolalarni bo'shatish uchun)"""
+    global _media_store
+    if _media_store is None:
+        _media_store = ContentAddressedStore(create_media_backend())
+    return _media_store
@@ -128,6 +128,9 @@ Qidiruv mezonlarini o'zgartirib qaytadan urinib ko'ring."""
         if listing_data.get('description'):
             text += f"**Tavsif:** {listing_data.get('description')}\n"
         
+        if listing_data.get('media'):
+            text += f"**Rasmlar:** {len(listing_data['media'])} ta\n"
+        
         text += "\nE'loni yuborishni tasdiqlaysizmi?"
         
         return text
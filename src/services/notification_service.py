@@ -1,8 +1,9 @@
 """
 Notification Service - Xabar yuborish xizmati
 """
+import asyncio
 import logging
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List, Tuple
 from telegram import Update, Bot
 from telegram.ext import ContextTypes
 from src.database.models import User, Listing, ListingStatus
@@ -14,8 +15,13 @@ logger = logging.getLogger(__name__)
 class NotificationService:
     """Xabar yuborish xizmati"""
     
-    def __init__(self, bot: Optional[Bot] = None):
+    def __init__(self, bot: Optional[Bot] = None, batch_size: int = 25, batch_interval: float = 1.0):
         self.bot = bot
+        # Telegram ~30 xabar/soniya limitidan oshmaslik uchun navbat partiyalari
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker_task: Optional[asyncio.Task] = None
     
     async def send_listing_approved_notification(self, listing: Listing, user: User) -> bool:
         """
@@ -84,6 +90,93 @@ class NotificationService:
             logger.error(f"Error sending rejection notification: {e}")
             return False
     
+    async def queue_moderation_notifications(self, listings: List[Any], approved: bool, reason: str = None) -> int:
+        """
+        Moderatsiya xabarlarini navbatga qo'yish (partiyalab yuboriladi)
+        
+        Args:
+            listings: Moderatsiya qilingan e'lonlar (owner_telegram_id bilan)
+            approved: Tasdiqlangan bo'lsa True, rad etilgan bo'lsa False
+            reason: Rad etish sababi
+            
+        Returns:
+            int: Navbatga qo'yilgan xabarlar soni
+        """
+        queue = self._get_queue()
+        queued = 0
+        
+        for listing in listings:
+            chat_id = getattr(listing, 'owner_telegram_id', None)
+            if not chat_id:
+                continue
+            
+            if approved:
+                message = self._create_approval_message(listing)
+            else:
+                message = self._create_rejection_message(listing, reason)
+            
+            queue.put_nowait((chat_id, message))
+            queued += 1
+        
+        if queued:
+            self._ensure_worker()
+            logger.info(f"{queued} moderation notifications queued")
+        
+        return queued
+    
+    async def wait_until_sent(self) -> None:
+        """Navbatdagi barcha xabarlar yuborilishini kutish"""
+        if self._queue is not None:
+            await self._queue.join()
+    
+    def _get_queue(self) -> asyncio.Queue:
+        """Xabarlar navbatini olish"""
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        return self._queue
+    
+    def _ensure_worker(self) -> None:
+        """Navbat worker ini ishga tushirish"""
+        if self._worker_task is None or self._worker_task.done():
+            self._worker_task = asyncio.create_task(self._notification_worker())
+    
+    async def _notification_worker(self) -> None:
+        """Navbatdagi xabarlarni partiyalab yuborish"""
+        queue = self._get_queue()
+        
+        while True:
+            batch: List[Tuple[int, str]] = [await queue.get()]
+            while len(batch) < self.batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            try:
+                await asyncio.gather(*(
+                    self._send_queued_message(chat_id, message) for chat_id, message in batch
+                ))
+            finally:
+                for _ in batch:
+                    queue.task_done()
+            
+            await asyncio.sleep(self.batch_interval)
+    
+    async def _send_queued_message(self, chat_id: int, message: str) -> bool:
+        """Navbatdagi bitta xabarni yuborish"""
+        try:
+            if not self.bot:
+                logger.error("Bot instance not available for notifications")
+                return False
+            
+            await self.bot.send_message(
+                chat_id=chat_id,
+                text=message,
+                parse_mode='Markdown'
+            )
+            return True
+            
+        except Exception as e:
+            logger.error(f"Error sending queued notification to {chat_id}: {e}")
+            return False
+    
     def _create_approval_message(self, listing: Listing) -> str:
         """Tasdiqlash xabari matnini yaratish"""
         region_name = REGIONS.get(listing.region_code, listing.region_code)
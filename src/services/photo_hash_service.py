@@ -0,0 +1,187 @@
+"""
+Photo Hash Service - E'lonlar orasida o'xshash rasmlarni topish
+
+Har bir rasmning 64 bitli dHash i to'rtta 16 bitli bo'lakka (band) bo'linib
+indekslangan ustunlarda saqlanadi (multi-index hashing). Agar ikki hash
+orasidagi Hamming masofasi r bo'lsa, pigeonhole bo'yicha kamida bitta
+bo'lak r // 4 bitdan ko'p farq qilmaydi. Shuning uchun har bir bo'lak uchun
+shu radiusdagi barcha qiymatlar indeks bo'yicha qidiriladi va topilgan
+nomzodlar aniq masofa bilan tekshiriladi - butun jadval skanerlanmaydi.
+"""
+import logging
+from itertools import combinations
+from typing import Optional, List, Dict, Any
+from sqlalchemy import select, delete, or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.models import Listing, PhotoHash
+
+logger = logging.getLogger(__name__)
+
+HASH_BITS = 64
+BAND_COUNT = 4
+BAND_BITS = HASH_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# Shu masofagacha bo'lgan rasmlar bir xil deb hisoblanadi
+DEFAULT_MAX_DISTANCE = 7
+
+
+def split_bands(image_hash: int) -> List[int]:
+    """64 bitli hashni 16 bitli bo'laklarga ajratish (yuqori bo'lak birinchi)"""
+    return [
+        (image_hash >> (BAND_BITS * (BAND_COUNT - 1 - index))) & BAND_MASK
+        for index in range(BAND_COUNT)
+    ]
+
+
+def to_signed(image_hash: int) -> int:
+    """Ishorasiz 64 bitli hashni BIGINT ga sig'adigan ko'rinishga o'tkazish"""
+    return image_hash - (1 << HASH_BITS) if image_hash >= 1 << (HASH_BITS - 1) else image_hash
+
+
+def to_unsigned(value: int) -> int:
+    """BIGINT dan o'qilgan qiymatni ishorasiz hashga qaytarish"""
+    return value & ((1 << HASH_BITS) - 1)
+
+
+def hamming_distance(first: int, second: int) -> int:
+    """Ikki hash orasidagi farq qiluvchi bitlar soni"""
+    return bin(to_unsigned(first) ^ to_unsigned(second)).count('1')
+
+
+def band_neighbours(band: int, radius: int) -> List[int]:
+    """Bo'lakdan ko'pi bilan `radius` bit farq qiladigan barcha qiymatlar"""
+    values = [band]
+    for flips in range(1, radius + 1):
+        for positions in combinations(range(BAND_BITS), flips):
+            value = band
+            for position in positions:
+                value ^= 1 << position
+            values.append(value)
+    return values
+
+
+class PhotoHashService:
+    """Rasm hashlarini saqlash va o'xshashlarini qidirish"""
+
+    def __init__(self, db: Optional[AsyncSession] = None):
+        self.db = db
+
+    async def add_listing_hashes(self, listing_id: str, hashes: List[Optional[int]]) -> int:
+        """
+        E'lon rasmlari hashlarini saqlash (avvalgilari almashtiriladi)
+
+        Args:
+            listing_id: E'lon ID si
+            hashes: Rasmlar tartibidagi dHash lar (hisoblanmaganlari None)
+
+        Returns:
+            int: Saqlangan hashlar soni
+        """
+        await self.db.execute(delete(PhotoHash).where(PhotoHash.listing_id == listing_id))
+
+        count = 0
+        for position, image_hash in enumerate(hashes):
+            if image_hash is None:
+                continue
+            bands = split_bands(image_hash)
+            self.db.add(PhotoHash(
+                listing_id=listing_id,
+                position=position,
+                dhash=to_signed(image_hash),
+                band0=bands[0],
+                band1=bands[1],
+                band2=bands[2],
+                band3=bands[3]
+            ))
+            count += 1
+
+        await self.db.commit()
+        return count
+
+    async def find_similar(self, image_hash: int, max_distance: int = DEFAULT_MAX_DISTANCE,
+                           exclude_listing_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Hashga yaqin rasmlarni topish
+
+        Args:
+            image_hash: Qidirilayotgan dHash
+            max_distance: Ruxsat etilgan eng katta Hamming masofasi
+            exclude_listing_id: Natijadan chiqariladigan e'lon (odatda o'zi)
+
+        Returns:
+            List[Dict]: listing_id, position, distance (masofa bo'yicha tartiblangan)
+        """
+        radius = max_distance // BAND_COUNT
+        band_columns = [PhotoHash.band0, PhotoHash.band1, PhotoHash.band2, PhotoHash.band3]
+        conditions = [
+            column.in_(band_neighbours(band, radius))
+            for column, band in zip(band_columns, split_bands(image_hash))
+        ]
+
+        # Listing bilan JOIN: o'chirilgan e'londan qolgan hashlar nomzod bo'lmaydi
+        query = (
+            select(PhotoHash.listing_id, PhotoHash.position, PhotoHash.dhash)
+            .join(Listing, Listing.id == PhotoHash.listing_id)
+            .where(or_(*conditions))
+        )
+        if exclude_listing_id:
+            query = query.where(PhotoHash.listing_id != exclude_listing_id)
+
+        result = await self.db.execute(query)
+
+        matches = []
+        for row in result.all():
+            distance = hamming_distance(image_hash, row.dhash)
+            if distance <= max_distance:
+                matches.append({'listing_id': row.listing_id, 'position': row.position, 'distance': distance})
+
+        matches.sort(key=lambda match: match['distance'])
+        return matches
+
+    async def find_similar_listings(self, listing_id: str, max_distance: int = DEFAULT_MAX_DISTANCE,
+                                    limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        E'lon rasmlariga o'xshash rasmlari bor boshqa e'lonlar
+
+        Args:
+            listing_id: Tekshirilayotgan e'lon
+            max_distance: Ruxsat etilgan eng katta Hamming masofasi
+            limit: Eng ko'p qaytariladigan e'lonlar soni
+
+        Returns:
+            List[Dict]: listing_id, title, status, matches (mos rasmlar soni), distance
+        """
+        result = await self.db.execute(
+            select(PhotoHash.dhash).where(PhotoHash.listing_id == listing_id)
+        )
+        own_hashes = result.scalars().all()
+
+        similar: Dict[str, Dict[str, Any]] = {}
+        for own_hash in own_hashes:
+            for match in await self.find_similar(to_unsigned(own_hash), max_distance, listing_id):
+                entry = similar.setdefault(match['listing_id'], {'matches': 0, 'distance': match['distance']})
+                entry['matches'] += 1
+                entry['distance'] = min(entry['distance'], match['distance'])
+
+        if not similar:
+            return []
+
+        ranked = sorted(similar.items(), key=lambda item: (-item[1]['matches'], item[1]['distance']))[:limit]
+        result = await self.db.execute(
+            select(Listing.id, Listing.title, Listing.status)
+            .where(Listing.id.in_([similar_id for similar_id, _ in ranked]))
+        )
+        listings = {row.id: row for row in result.all()}
+
+        return [
+            {
+                'listing_id': similar_id,
+                'title': listings[similar_id].title,
+                'status': listings[similar_id].status,
+                'matches': entry['matches'],
+                'distance': entry['distance']
+            }
+            for similar_id, entry in ranked
+            if similar_id in listings
+        ]
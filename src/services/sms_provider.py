@@ -0,0 +1,271 @@
+"""
+SMS Provider - Eskiz.uz API mijozi
+
+Barcha xabarlar bitta umumiy httpx.AsyncClient orqali yuboriladi: TCP/TLS
+ulanishlari hovuzda qayta ishlatiladi va har bir xabar uchun yangi ulanish
+ochilmaydi. Vaqtinchalik xatolar (ulanish, timeout, 429, 5xx) jitter li
+eksponensial kutish bilan qayta uriniladi. Provayder ketma-ket ishlamasa
+circuit breaker ochiladi va keyingi so'rovlar tarmoqqa chiqmasdan darhol
+rad etiladi - foydalanuvchi timeout kutib qolmaydi.
+"""
+import asyncio
+import logging
+import random
+import time
+from typing import Optional, List, Dict, Any, Tuple, Callable
+import httpx
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Eskiz bitta send-batch so'rovida qabul qiladigan xabarlar soni
+BATCH_SIZE = 200
+
+# Qayta urinish mumkin bo'lgan javob kodlari
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class SMSProviderError(Exception):
+    """SMS provayderi xabarni qabul qilmadi"""
+
+
+class CircuitOpenError(SMSProviderError):
+    """Provayder ishlamayapti - so'rov yuborilmadi"""
+
+
+class CircuitBreaker:
+    """
+    Oddiy circuit breaker
+
+    closed - so'rovlar o'tadi; failure_threshold ta ketma-ket xatodan keyin
+    open - reset_timeout davomida barcha so'rovlar rad etiladi; keyin
+    half_open - bitta sinov so'rovi o'tkaziladi, muvaffaqiyatli bo'lsa yana closed.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self) -> bool:
+        """So'rov yuborish mumkinmi (half_open da faqat bitta sinov so'rovi)"""
+        state = self.state
+        if state == self.CLOSED:
+            return True
+        if state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def release_probe(self) -> None:
+        """Sinov so'rovi natijasiz tugadi (bekor qilindi yoki kutilmagan xato) - holat o'zgarmaydi"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self._probe_in_flight or self.failures >= self.failure_threshold:
+            if self.opened_at is None:
+                logger.warning("SMS provider circuit opened")
+            self.opened_at = self.clock()
+        self._probe_in_flight = False
+
+
+class EskizClient:
+    """Eskiz.uz SMS API mijozi"""
+
+    def __init__(self, base_url: Optional[str] = None, email: Optional[str] = None,
+                 password: Optional[str] = None, sender: Optional[str] = None,
+                 client: Optional[httpx.AsyncClient] = None, timeout: Optional[float] = None,
+                 max_retries: int = 3, backoff_base: float = 0.5, backoff_max: float = 5.0,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.base_url = (base_url or settings.sms_api_url).rstrip('/')
+        self.email = email if email is not None else settings.sms_email
+        self.password = password if password is not None else settings.sms_password
+        self.sender = sender or settings.sms_sender
+        timeout = timeout if timeout is not None else settings.sms_timeout
+        self.client = client or httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=httpx.Timeout(timeout, connect=min(timeout, 5.0)),
+            limits=httpx.Limits(max_connections=20, max_keepalive_connections=10)
+        )
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.breaker = breaker or CircuitBreaker()
+        self._token: Optional[str] = None
+        self._token_lock = asyncio.Lock()
+
+    async def close(self) -> None:
+        """Ulanishlar hovuzini yopish"""
+        await self.client.aclose()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full jitter: 0 .. min(max, base * 2^attempt)"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    async def _login(self, stale_token: Optional[str] = None) -> str:
+        """Token olish (bir vaqtdagi so'rovlar bitta login ni kutadi)"""
+        async with self._token_lock:
+            if self._token is not None and self._token != stale_token:
+                return self._token
+
+            response = await self.client.post(
+                f"{self.base_url}/api/auth/login",
+                data={'email': self.email, 'password': self.password}
+            )
+            if response.status_code != 200:
+                raise SMSProviderError(f"Eskiz login failed: {response.status_code}")
+            self._token = response.json()['data']['token']
+            return self._token
+
+    async def _post(self, path: str, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Qayta urinish, token yangilash va circuit breaker bilan so'rov
+
+        Raises:
+            CircuitOpenError: Provayder ishlamayapti
+            SMSProviderError: Qayta urinishlardan keyin ham xatolik
+        """
+        last_error: Optional[Exception] = None
+        for attempt in range(self.max_retries + 1):
+            if not self.breaker.allow():
+                raise CircuitOpenError("SMS provider is unavailable")
+
+            try:
+                token = self._token or await self._login()
+                response = await self.client.post(
+                    f"{self.base_url}{path}", json=payload,
+                    headers={'Authorization': f"Bearer {token}"}
+                )
+                if response.status_code == 401:
+                    # Token muddati tugagan - bir marta yangilab qayta yuboriladi
+                    token = await self._login(stale_token=token)
+                    response = await self.client.post(
+                        f"{self.base_url}{path}", json=payload,
+                        headers={'Authorization': f"Bearer {token}"}
+                    )
+            except (httpx.TransportError, SMSProviderError) as e:
+                self.breaker.record_failure()
+                last_error = e
+            except BaseException:
+                # Bekor qilingan yoki kutilmagan xato bilan tugagan sinov so'rovi
+                # breaker ni half_open da abadiy band qilib qo'ymasligi kerak
+                self.breaker.release_probe()
+                raise
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    # 4xx - provayder ishlayapti, so'rov noto'g'ri; qayta urinish foydasiz
+                    self.breaker.record_success()
+                    if response.status_code >= 400:
+                        raise SMSProviderError(f"Eskiz rejected request: {response.status_code} {response.text}")
+                    return response.json()
+
+                self.breaker.record_failure()
+                last_error = SMSProviderError(f"Eskiz returned {response.status_code}")
+
+            if attempt < self.max_retries:
+                logger.warning(f"SMS request failed ({last_error}), retry {attempt + 1}/{self.max_retries}")
+                await asyncio.sleep(self._backoff(attempt))
+
+        raise SMSProviderError(f"SMS request failed after {self.max_retries + 1} attempts: {last_error}")
+
+    @staticmethod
+    def _normalize_phone(phone: str) -> str:
+        """Eskiz raqamni + belgisisiz kutadi: 998901234567"""
+        return phone.lstrip('+')
+
+    async def send(self, phone: str, message: str) -> Dict[str, Any]:
+        """
+        Bitta SMS yuborish
+
+        Args:
+            phone: Telefon raqami (+998XXXXXXXXX)
+            message: Xabar matni
+
+        Returns:
+            Dict[str, Any]: Provayder javobi
+        """
+        return await self._post('/api/message/sms/send', {
+            'mobile_phone': self._normalize_phone(phone),
+            'message': message,
+            'from': self.sender
+        })
+
+    async def send_bulk(self, messages: List[Tuple[str, str]], batch_size: int = BATCH_SIZE) -> Dict[str, int]:
+        """
+        Ko'p SMS ni partiyalab yuborish (har bir partiya - bitta so'rov)
+
+        Args:
+            messages: (telefon, matn) juftliklari
+            batch_size: Bitta so'rovdagi xabarlar soni
+
+        Returns:
+            Dict[str, int]: sent, failed, batches
+        """
+        stats = {'sent': 0, 'failed': 0, 'batches': 0}
+        dispatch_id = int(time.time())
+
+        for start in range(0, len(messages), batch_size):
+            batch = messages[start:start + batch_size]
+            payload = {
+                'messages': [
+                    {'user_sms_id': f"{dispatch_id}-{start + index}", 'to': self._normalize_phone(phone), 'text': text}
+                    for index, (phone, text) in enumerate(batch)
+                ],
+                'from': self.sender,
+                'dispatch_id': dispatch_id
+            }
+            stats['batches'] += 1
+            try:
+                await self._post('/api/message/sms/send-batch', payload)
+                stats['sent'] += len(batch)
+            except CircuitOpenError:
+                # Qolgan partiyalar ham rad etiladi - ularni yubormaymiz
+                stats['failed'] += len(messages) - start
+                break
+            except SMSProviderError as e:
+                logger.error(f"SMS batch failed: {e}")
+                stats['failed'] += len(batch)
+
+        return stats
+
+
+# Barcha SMSService lar uchun bitta ulanishlar hovuzi
+_sms_client: Optional[EskizClient] = None
+
+
+def get_sms_client() -> EskizClient:
+    """Umumiy Eskiz mijozini olish"""
+    global _sms_client
+    if _sms_client is None:
+        _sms_client = EskizClient()
+    return _sms_client
+
+
+async def close_sms_client() -> None:
+    """Umumiy mijozni yopish (bot to'xtaganda)"""
+    global _sms_client
+    if _sms_client is not None:
+        await _sms_client.close()
+        _sms_client = None
@@ -1,13 +1,17 @@
 """
 SMS Service - SMS yuborish xizmati
 """
+import asyncio
 import logging
 import random
 import string
 from typing import Optional, Dict, Any
-from datetime import datetime, timedelta
-import httpx
 from src.config import settings
+from src.services.sms_provider import SMSProviderError, get_sms_client
+from src.services.verification_store import (
+    VerificationStore, create_verification_store,
+    CHECK_VERIFIED, CHECK_MISSING, CHECK_EXPIRED, CHECK_LOCKED
+)
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +19,9 @@ logger = logging.getLogger(__name__)
 class SMSService:
     """SMS yuborish xizmati"""
     
-    def __init__(self):
-        self.verification_codes: Dict[str, Dict[str, Any]] = {}
+    def __init__(self, store: Optional[VerificationStore] = None):
+        # Kodlar umumiy omborda - qayta ishga tushirish va bir nechta nusxa uchun
+        self.store = store if store is not None else create_verification_store()
         self.code_expiry_minutes = 5
         self.max_attempts = 3
         self.cooldown_minutes = 1
@@ -89,24 +94,21 @@ class SMSService:
                     'error': 'Noto\'g\'ri telefon raqami format. O\'zbekiston raqamini kiriting.'
                 }
             
-            # Cooldown tekshirish
-            if self._is_in_cooldown(formatted_phone):
+            # Tasdiqlash kodini yaratish
+            code = self.generate_verification_code()
+            
+            # Kodni saqlash - cooldown tekshiruvi bilan bitta atomik amal
+            issued = await self.store.issue(
+                formatted_phone, code,
+                ttl=self.code_expiry_minutes * 60,
+                cooldown=self.cooldown_minutes * 60
+            )
+            if not issued:
                 return {
                     'success': False,
                     'error': f'Iltimos, {self.cooldown_minutes} daqiqa kutib turing.'
                 }
             
-            # Tasdiqlash kodini yaratish
-            code = self.generate_verification_code()
-            
-            # Kodni saqlash
-            self.verification_codes[formatted_phone] = {
-                'code': code,
-                'created_at': datetime.utcnow(),
-                'attempts': 0,
-                'verified': False
-            }
-            
             # SMS yuborish (test rejimda console ga chiqarish)
             if settings.debug:
                 logger.info(f"SMS Verification Code for {formatted_phone}: {code}")
@@ -151,55 +153,41 @@ class SMSService:
         try:
             formatted_phone = self.format_phone_number(phone)
             
-            # Kod mavjudligini tekshirish
-            if formatted_phone not in self.verification_codes:
+            # Urinish hisoblagichi solishtirish bilan birga atomik oshiriladi
+            status, attempts = await self.store.check(formatted_phone, code.strip(), self.max_attempts)
+            
+            if status == CHECK_MISSING:
                 return {
                     'success': False,
                     'error': 'Tasdiqlash kodi topilmadi. Yangi kod so\'rang.'
                 }
             
-            verification_data = self.verification_codes[formatted_phone]
-            
-            # Kod muddatini tekshirish
-            if self._is_code_expired(verification_data['created_at']):
-                del self.verification_codes[formatted_phone]
+            if status == CHECK_EXPIRED:
+                await self.store.delete(formatted_phone)
                 return {
                     'success': False,
                     'error': 'Tasdiqlash kodining muddati tugagan. Yangi kod so\'rang.'
                 }
             
-            # Urinishlar sonini tekshirish
-            if verification_data['attempts'] >= self.max_attempts:
-                del self.verification_codes[formatted_phone]
+            if status == CHECK_VERIFIED:
                 return {
-                    'success': False,
-                    'error': 'Juda ko\'p noto\'g\'ri urinish. Yangi kod so\'rang.'
+                    'success': True,
+                    'message': 'Telefon raqami muvaffaqiyatli tasdiqlandi!'
                 }
             
-            # Kodni tekshirish
-            if verification_data['code'] == code.strip():
-                # Tasdiqlash muvaffaqiyatli
-                self.verification_codes[formatted_phone]['verified'] = True
+            # Noto'g'ri kod yoki urinishlar tugagan
+            remaining_attempts = self.max_attempts - attempts
+            if status != CHECK_LOCKED and remaining_attempts > 0:
                 return {
-                    'success': True,
-                    'message': 'Telefon raqami muvaffaqiyatli tasdiqlandi!'
+                    'success': False,
+                    'error': f'Noto\'g\'ri tasdiqlash kodi. {remaining_attempts} ta urinish qoldi.'
                 }
-            else:
-                # Noto'g'ri kod
-                self.verification_codes[formatted_phone]['attempts'] += 1
-                remaining_attempts = self.max_attempts - verification_data['attempts'] - 1
-                
-                if remaining_attempts > 0:
-                    return {
-                        'success': False,
-                        'error': f'Noto\'g\'ri tasdiqlash kodi. {remaining_attempts} ta urinish qoldi.'
-                    }
-                else:
-                    del self.verification_codes[formatted_phone]
-                    return {
-                        'success': False,
-                        'error': 'Juda ko\'p noto\'g\'ri urinish. Yangi kod so\'rang.'
-                    }
+            
+            # Kod o'chirilmaydi - yangi kod faqat cooldown tugagach yuboriladi
+            return {
+                'success': False,
+                'error': 'Juda ko\'p noto\'g\'ri urinish. Yangi kod so\'rang.'
+            }
             
         except Exception as e:
             logger.error(f"Failed to verify code for {phone}: {e}")
@@ -208,7 +196,7 @@ class SMSService:
                 'error': 'Kod tekshirishda xatolik yuz berdi.'
             }
     
-    def is_phone_verified(self, phone: str) -> bool:
+    async def is_phone_verified(self, phone: str) -> bool:
         """
         Telefon raqami tasdiqlanganligini tekshirish
         
@@ -218,47 +206,35 @@ class SMSService:
         Returns:
             bool: Tasdiqlangan bo'lsa True
         """
-        formatted_phone = self.format_phone_number(phone)
+        return await self.store.is_verified(self.format_phone_number(phone))
+    
+    async def cleanup_expired_codes(self) -> int:
+        """
+        Muddati tugagan kodlarni tozalash
         
-        if formatted_phone in self.verification_codes:
-            verification_data = self.verification_codes[formatted_phone]
-            return verification_data.get('verified', False)
+        Xotira omborida muddati tugagan kodlar har bir murojaatda o'chiriladi,
+        Redis ularni o'zi o'chiradi - bu faqat bazadagi eski qatorlar uchun.
         
-        return False
-    
-    def cleanup_expired_codes(self) -> None:
-        """Muddati tugagan kodlarni tozalash"""
+        Returns:
+            int: O'chirilgan kodlar soni
+        """
         try:
-            current_time = datetime.utcnow()
-            expired_phones = []
-            
-            for phone, data in self.verification_codes.items():
-                if self._is_code_expired(data['created_at']):
-                    expired_phones.append(phone)
-            
-            for phone in expired_phones:
-                del self.verification_codes[phone]
-            
-            if expired_phones:
-                logger.info(f"Cleaned up {len(expired_phones)} expired verification codes")
+            removed = await self.store.purge_expired()
+            if removed:
+                logger.info(f"Cleaned up {removed} expired verification codes")
+            return removed
                 
         except Exception as e:
             logger.error(f"Failed to cleanup expired codes: {e}")
+            return 0
     
-    # Private methods
-    
-    def _is_code_expired(self, created_at: datetime) -> bool:
-        """Kod muddatini tekshirish"""
-        expiry_time = created_at + timedelta(minutes=self.code_expiry_minutes)
-        return datetime.utcnow() > expiry_time
+    async def run_cleanup_forever(self, interval_seconds: float) -> None:
+        """Muddati tugagan kodlarni belgilangan oraliqda tozalash (bot bilan birga fonda)"""
+        while True:
+            await self.cleanup_expired_codes()
+            await asyncio.sleep(interval_seconds)
     
-    def _is_in_cooldown(self, phone: str) -> bool:
-        """Cooldown holatini tekshirish"""
-        if phone in self.verification_codes:
-            last_sent = self.verification_codes[phone]['created_at']
-            cooldown_end = last_sent + timedelta(minutes=self.cooldown_minutes)
-            return datetime.utcnow() < cooldown_end
-        return False
+    # Private methods
     
     async def _send_real_sms(self, phone: str, code: str) -> bool:
         """
@@ -272,28 +248,9 @@ class SMSService:
             bool: Yuborildi bo'lsa True
         """
         try:
-            # Bu yerda real SMS provider API'sini ishlatish kerak
-            # Masalan: Eskiz.uz, Playmobile.uz, SMS.uz
-            
-            # Eskiz.uz API example:
-            # async with httpx.AsyncClient() as client:
-            #     response = await client.post(
-            #         "https://notify.eskiz.uz/api/message/sms/send",
-            #         headers={
-            #             "Authorization": f"Bearer {settings.sms_token}"
-            #         },
-            #         json={
-            #             "mobile_phone": phone,
-            #             "message": f"UyKelishuv tasdiqlash kodi: {code}",
-            #             "from": "4546"
-            #         }
-            #     )
-            #     return response.status_code == 200
-            
-            # Hozircha test rejimda
-            logger.info(f"Would send SMS to {phone} with code {code}")
+            await get_sms_client().send(phone, f"UyKelishuv tasdiqlash kodi: {code}")
             return True
             
-        except Exception as e:
+        except SMSProviderError as e:
             logger.error(f"Failed to send real SMS to {phone}: {e}")
             return False
@@ -5,6 +5,7 @@ from typing import Optional, List
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, update, delete
 from src.database.models import User
+from src.utils.helpers import normalize_name
 
 
 class UserService:
@@ -54,6 +55,9 @@ class UserService:
     
     async def update_user(self, user_id: str, **kwargs) -> Optional[User]:
         """Foydalanuvchini yangilash"""
+        if 'name' in kwargs:
+            kwargs['name_normalized'] = normalize_name(kwargs['name'])
+        
         try:
             result = await self.db.execute(
                 update(User)
@@ -0,0 +1,360 @@
+"""
+Verification Store - SMS tasdiqlash kodlarini saqlash
+
+Kodlar jarayon xotirasida emas, almashtiriladigan omborda saqlanadi:
+- MemoryVerificationStore - bitta jarayon uchun (testlar, lokal ishga tushirish);
+  muddati tugagan kodlar min-heap bo'yicha har bir murojaatda o'chiriladi
+- DatabaseVerificationStore - verification_codes jadvali, bot qayta ishga
+  tushganda va bir nechta nusxada ishlaydi
+- RedisVerificationStore - Redis ning o'z TTL i bilan
+
+Cooldown tekshiruvi va urinishlar hisoblagichi har bir omborda bitta atomik
+amal: ikkita nusxa bir vaqtda kod yubora olmaydi va parallel urinishlar
+max_attempts chegarasini chetlab o'ta olmaydi.
+"""
+import heapq
+import hmac
+import logging
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional, Dict, Any, List, Tuple, Callable
+from sqlalchemy import select, update, delete
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.database import AsyncSessionLocal
+from src.database.models import VerificationCode
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Kod tekshiruvi natijalari
+CHECK_VERIFIED = "verified"
+CHECK_INVALID = "invalid"
+CHECK_MISSING = "missing"
+CHECK_EXPIRED = "expired"
+CHECK_LOCKED = "locked"
+
+STORE_MEMORY = "memory"
+STORE_DATABASE = "database"
+STORE_REDIS = "redis"
+
+# (natija, shu kod bo'yicha qilingan urinishlar soni)
+CheckResult = Tuple[str, int]
+
+
+class VerificationStore(ABC):
+    """Tasdiqlash kodlari ombori interfeysi"""
+
+    @abstractmethod
+    async def issue(self, phone: str, code: str, ttl: float, cooldown: float) -> bool:
+        """
+        Yangi kodni saqlash (cooldown tugamagan bo'lsa saqlanmaydi)
+
+        Args:
+            phone: Telefon raqami
+            code: Tasdiqlash kodi
+            ttl: Kodning amal qilish muddati (soniya)
+            cooldown: Keyingi kod yuborilishigacha bo'lgan vaqt (soniya)
+
+        Returns:
+            bool: Kod saqlangan bo'lsa True, cooldown davom etayotgan bo'lsa False
+        """
+
+    @abstractmethod
+    async def check(self, phone: str, code: str, max_attempts: int) -> CheckResult:
+        """
+        Kodni tekshirish - urinish hisoblagichi solishtirishdan oldin oshiriladi
+
+        Returns:
+            CheckResult: (CHECK_* natija, urinishlar soni)
+        """
+
+    @abstractmethod
+    async def is_verified(self, phone: str) -> bool:
+        """Raqam amal qilayotgan kod bilan tasdiqlanganmi"""
+
+    @abstractmethod
+    async def delete(self, phone: str) -> None:
+        """Raqam kodini o'chirish (cooldown ham bekor bo'ladi)"""
+
+    async def purge_expired(self) -> int:
+        """
+        Muddati tugagan kodlarni tozalash
+
+        Returns:
+            int: O'chirilgan kodlar soni
+        """
+        return 0
+
+
+class MemoryVerificationStore(VerificationStore):
+    """
+    Jarayon xotirasidagi ombor
+
+    Har bir kod muddati bilan min-heap ga qo'shiladi va har bir murojaatda
+    faqat muddati tugaganlar heap boshidan olinadi - barcha kodlar
+    skanerlanmaydi. Qayta yuborilgan kodning eski heap yozuvi o'chirishda
+    muddat solishtirilib e'tiborsiz qoldiriladi.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self.clock = clock
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._expiry: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _expire(self, now: float) -> int:
+        """Muddati tugagan kodlarni heap boshidan o'chirish"""
+        removed = 0
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, phone = heapq.heappop(self._expiry)
+            entry = self._entries.get(phone)
+            if entry is not None and entry['expires_at'] == expires_at:
+                del self._entries[phone]
+                removed += 1
+        return removed
+
+    async def issue(self, phone: str, code: str, ttl: float, cooldown: float) -> bool:
+        now = self.clock()
+        self._expire(now)
+
+        entry = self._entries.get(phone)
+        if entry is not None and entry['cooldown_until'] > now:
+            return False
+
+        expires_at = now + ttl
+        self._entries[phone] = {
+            'code': code,
+            'attempts': 0,
+            'verified': False,
+            'cooldown_until': now + cooldown,
+            'expires_at': expires_at
+        }
+        heapq.heappush(self._expiry, (expires_at, phone))
+        return True
+
+    async def check(self, phone: str, code: str, max_attempts: int) -> CheckResult:
+        now = self.clock()
+        entry = self._entries.get(phone)
+        if entry is not None and entry['expires_at'] <= now:
+            del self._entries[phone]
+            self._expire(now)
+            return CHECK_EXPIRED, entry['attempts']
+
+        self._expire(now)
+        if entry is None:
+            return CHECK_MISSING, 0
+        if entry['attempts'] >= max_attempts:
+            return CHECK_LOCKED, entry['attempts']
+
+        entry['attempts'] += 1
+        if hmac.compare_digest(entry['code'], code):
+            entry['verified'] = True
+            return CHECK_VERIFIED, entry['attempts']
+        return CHECK_INVALID, entry['attempts']
+
+    async def is_verified(self, phone: str) -> bool:
+        self._expire(self.clock())
+        entry = self._entries.get(phone)
+        return bool(entry and entry['verified'])
+
+    async def delete(self, phone: str) -> None:
+        self._entries.pop(phone, None)
+
+    async def purge_expired(self) -> int:
+        return self._expire(self.clock())
+
+
+class DatabaseVerificationStore(VerificationStore):
+    """
+    verification_codes jadvalidagi ombor
+
+    Cooldown va urinishlar shartli UPDATE bilan tekshiriladi: shart va
+    o'zgartirish bitta so'rovda bo'lgani uchun bir nechta nusxa bir vaqtda
+    murojaat qilsa ham natija to'g'ri bo'ladi. Muddati tugagan qatorlar
+    so'rov shartlarida e'tiborsiz qoldiriladi, purge_expired esa ularni
+    expires_at indeksi bo'yicha o'chiradi.
+    """
+
+    def __init__(self, session_factory: Callable[[], AsyncSession] = AsyncSessionLocal):
+        self.session_factory = session_factory
+
+    async def issue(self, phone: str, code: str, ttl: float, cooldown: float) -> bool:
+        now = datetime.utcnow()
+        values = {
+            'code': code,
+            'attempts': 0,
+            'verified': False,
+            'created_at': now,
+            'cooldown_until': now + timedelta(seconds=cooldown),
+            'expires_at': now + timedelta(seconds=ttl)
+        }
+
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(VerificationCode)
+                .where(VerificationCode.phone == phone, VerificationCode.cooldown_until <= now)
+                .values(**values)
+                .execution_options(synchronize_session=False)
+            )
+            if result.rowcount:
+                await db.commit()
+                return True
+
+            # Qator yo'q yoki cooldown davom etmoqda - PRIMARY KEY ikkinchisini aniqlaydi
+            db.add(VerificationCode(phone=phone, **values))
+            try:
+                await db.commit()
+            except IntegrityError:
+                await db.rollback()
+                return False
+            return True
+
+    async def check(self, phone: str, code: str, max_attempts: int) -> CheckResult:
+        now = datetime.utcnow()
+        async with self.session_factory() as db:
+            result = await db.execute(
+                update(VerificationCode)
+                .where(
+                    VerificationCode.phone == phone,
+                    VerificationCode.expires_at > now,
+                    VerificationCode.attempts < max_attempts
+                )
+                .values(attempts=VerificationCode.attempts + 1)
+                .returning(VerificationCode.code, VerificationCode.attempts)
+                .execution_options(synchronize_session=False)
+            )
+            row = result.first()
+
+            if row is None:
+                result = await db.execute(
+                    select(VerificationCode.expires_at, VerificationCode.attempts)
+                    .where(VerificationCode.phone == phone)
+                )
+                existing = result.first()
+                if existing is None:
+                    return CHECK_MISSING, 0
+                if existing.expires_at <= now:
+                    return CHECK_EXPIRED, existing.attempts
+                return CHECK_LOCKED, existing.attempts
+
+            if hmac.compare_digest(row.code, code):
+                await db.execute(
+                    update(VerificationCode)
+                    .where(VerificationCode.phone == phone, VerificationCode.code == row.code)
+                    .values(verified=True)
+                    .execution_options(synchronize_session=False)
+                )
+                status = CHECK_VERIFIED
+            else:
+                status = CHECK_INVALID
+
+            await db.commit()
+            return status, row.attempts
+
+    async def is_verified(self, phone: str) -> bool:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                select(VerificationCode.verified)
+                .where(VerificationCode.phone == phone, VerificationCode.expires_at > datetime.utcnow())
+            )
+            return bool(result.scalar_one_or_none())
+
+    async def delete(self, phone: str) -> None:
+        async with self.session_factory() as db:
+            await db.execute(delete(VerificationCode).where(VerificationCode.phone == phone))
+            await db.commit()
+
+    async def purge_expired(self) -> int:
+        async with self.session_factory() as db:
+            result = await db.execute(
+                delete(VerificationCode).where(VerificationCode.expires_at <= datetime.utcnow())
+            )
+            await db.commit()
+            return result.rowcount or 0
+
+
+# Urinishni oshirish va solishtirish Redis da bitta atomik skript
+_REDIS_CHECK_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then
+    return {0, 0}
+end
+local attempts = tonumber(redis.call('HGET', KEYS[1], 'attempts'))
+if attempts >= tonumber(ARGV[2]) then
+    return {1, attempts}
+end
+attempts = redis.call('HINCRBY', KEYS[1], 'attempts', 1)
+if redis.call('HGET', KEYS[1], 'code') == ARGV[1] then
+    redis.call('HSET', KEYS[1], 'verified', '1')
+    return {2, attempts}
+end
+return {3, attempts}
+"""
+
+_REDIS_CHECK_STATUSES = {0: CHECK_MISSING, 1: CHECK_LOCKED, 2: CHECK_VERIFIED, 3: CHECK_INVALID}
+
+
+class RedisVerificationStore(VerificationStore):
+    """
+    Redis dagi ombor (redis.asyncio.Redis bilan mos mijoz)
+
+    Kod - PEXPIRE li hash, cooldown - alohida SET NX PX kaliti; ikkalasi
+    ham Redis tomonidan o'zi o'chiriladi.
+    """
+
+    def __init__(self, client, prefix: str = "sms"):
+        self.client = client
+        self.prefix = prefix
+
+    def _code_key(self, phone: str) -> str:
+        return f"{self.prefix}:code:{phone}"
+
+    def _cooldown_key(self, phone: str) -> str:
+        return f"{self.prefix}:cooldown:{phone}"
+
+    async def issue(self, phone: str, code: str, ttl: float, cooldown: float) -> bool:
+        if cooldown > 0:
+            acquired = await self.client.set(self._cooldown_key(phone), "1", nx=True, px=int(cooldown * 1000))
+            if not acquired:
+                return False
+
+        key = self._code_key(phone)
+        async with self.client.pipeline(transaction=True) as pipe:
+            pipe.delete(key)
+            pipe.hset(key, mapping={'code': code, 'attempts': 0, 'verified': 0})
+            pipe.pexpire(key, int(ttl * 1000))
+            await pipe.execute()
+        return True
+
+    async def check(self, phone: str, code: str, max_attempts: int) -> CheckResult:
+        status, attempts = await self.client.eval(
+            _REDIS_CHECK_SCRIPT, 1, self._code_key(phone), code, max_attempts
+        )
+        return _REDIS_CHECK_STATUSES[int(status)], int(attempts)
+
+    async def is_verified(self, phone: str) -> bool:
+        verified = await self.client.hget(self._code_key(phone), 'verified')
+        return verified in (b'1', '1')
+
+    async def delete(self, phone: str) -> None:
+        await self.client.delete(self._code_key(phone), self._cooldown_key(phone))
+
+
+def create_verification_store(backend: Optional[str] = None) -> VerificationStore:
+    """Sozlamalar bo'yicha tasdiqlash kodlari omborini yaratish"""
+    backend = backend or settings.verification_store
+
+    if backend == STORE_REDIS:
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError as e:
+            raise RuntimeError("VERIFICATION_STORE=redis uchun 'redis' paketi o'rnatilishi kerak") from e
+        return RedisVerificationStore(redis_asyncio.from_url(settings.redis_url))
+
+    if backend == STORE_MEMORY:
+        return MemoryVerificationStore()
+
+    return DatabaseVerificationStore()
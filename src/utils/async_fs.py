@@ -0,0 +1,115 @@
+"""
+Async FS - Fayl tizimi operatsiyalarini event loop ni bloklamasdan bajarish
+
+Sekin disk yoki tarmoq diskida os.stat/os.remove kabi chaqiruvlar ham
+o'nlab millisekund davom etadi va shu vaqt ichida bot hech kimga javob
+bermaydi. Bu moduldagi funksiyalar chaqiruvlarni alohida thread hovuzida
+bajaradi - umumiy executor band bo'lib qolmasligi uchun hovuz ajratilgan.
+"""
+import asyncio
+import functools
+import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, BinaryIO, Callable, Optional, TypeVar
+
+T = TypeVar('T')
+
+# Bir vaqtda bajariladigan fayl operatsiyalari soni
+MAX_WORKERS = 8
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Fayl operatsiyalari hovuzini birinchi kerak bo'lganda yaratish"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="media-fs")
+    return _executor
+
+
+async def run(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """Bloklovchi funksiyani fayl hovuzida bajarish"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), functools.partial(func, *args, **kwargs))
+
+
+async def exists(path: str) -> bool:
+    """Fayl yoki papka mavjudligi"""
+    return await run(os.path.exists, path)
+
+
+async def getsize(path: str) -> int:
+    """Fayl hajmi (bayt)"""
+    return await run(os.path.getsize, path)
+
+
+async def stat(path: str) -> os.stat_result:
+    """Fayl ma'lumotlari"""
+    return await run(os.stat, path)
+
+
+async def makedirs(path: str) -> None:
+    """Papkani (kerak bo'lsa ota papkalari bilan) yaratish"""
+    await run(os.makedirs, path, exist_ok=True)
+
+
+async def remove(path: str) -> bool:
+    """
+    Faylni o'chirish
+
+    Returns:
+        bool: Fayl mavjud bo'lib o'chirilgan bo'lsa True
+    """
+    try:
+        await run(os.remove, path)
+        return True
+    except FileNotFoundError:
+        return False
+
+
+async def replace(source: str, target: str) -> None:
+    """Faylni atomik qayta nomlash (bir fayl tizimida)"""
+    await run(os.replace, source, target)
+
+
+async def move(source: str, target: str) -> None:
+    """Faylni ko'chirish (boshqa fayl tizimiga ham)"""
+    await run(shutil.move, source, target)
+
+
+async def utime(path: str) -> None:
+    """Fayl o'zgartirilgan vaqtini hozirgi vaqtga o'rnatish"""
+    await run(os.utime, path)
+
+
+async def open_file(path: str, mode: str = 'rb') -> BinaryIO:
+    """Faylni ochish (tarmoq diskida open() ham sekin bo'lishi mumkin)"""
+    return await run(open, path, mode)
+
+
+async def read_bytes(path: str) -> bytes:
+    """Butun faylni o'qish"""
+    def _read() -> bytes:
+        with open(path, 'rb') as file:
+            return file.read()
+
+    return await run(_read)
+
+
+async def read_header(path: str, size: int = 32) -> bytes:
+    """Fayl boshidagi baytlarni o'qish (turini aniqlash uchun)"""
+    def _read() -> bytes:
+        with open(path, 'rb') as file:
+            return file.read(size)
+
+    return await run(_read)
+
+
+def shutdown() -> None:
+    """Fayl hovuzini to'xtatish"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
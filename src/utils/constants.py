@@ -11,6 +11,11 @@ class BotConstants:
     ITEMS_PER_PAGE = 5
     MAX_SEARCH_RESULTS = 100
     
+    # Admin bulk moderation
+    BULK_MODERATION_PAGE_SIZE = 8
+    BULK_MODERATION_MAX_LISTINGS = 200
+    ADMIN_USERS_PER_PAGE = 10
+    
     # Text limits
     MIN_TITLE_LENGTH = 5
     MAX_TITLE_LENGTH = 255
@@ -49,6 +54,7 @@ class CallbackPatterns:
     LISTING_SUBMIT = "LISTING_SUBMIT"
     LISTING_CANCEL = "LISTING_CANCEL"
     LISTING_SKIP_DESCRIPTION = "LISTING_SKIP_DESCRIPTION"
+    LISTING_PHOTOS_DONE = "LISTING_PHOTOS_DONE"
     
     # Search
     SEARCH_LISTINGS = "SEARCH_LISTINGS"
@@ -82,6 +88,23 @@ class CallbackPatterns:
     ADMIN_SEARCH_USER = "ADMIN_SEARCH_USER"
     ADMIN_ALL_USERS = "ADMIN_ALL_USERS"
     ADMIN_BLOCKED_USERS = "ADMIN_BLOCKED_USERS"
+    ADMIN_LISTING_PHOTOS = "ADMIN_LISTING_PHOTOS"
+    ADMIN_USER_SEARCH_PAGE = "ADMIN_USER_SEARCH_PAGE"
+
+    # Admin bulk moderation
+    ADMIN_BULK_MODERATION = "ADMIN_BULK_MODERATION"
+    ADMIN_BULK_TOGGLE = "ADMIN_BULK_TOGGLE"
+    ADMIN_BULK_SELECT_PAGE = "ADMIN_BULK_SELECT_PAGE"
+    ADMIN_BULK_PAGE = "ADMIN_BULK_PAGE"
+    ADMIN_BULK_APPROVE = "ADMIN_BULK_APPROVE"
+    ADMIN_BULK_REJECT = "ADMIN_BULK_REJECT"
+    ADMIN_BULK_DELETE = "ADMIN_BULK_DELETE"
+    
+    # Admin broadcast
+    ADMIN_BROADCAST = "ADMIN_BROADCAST"
+    ADMIN_BROADCAST_CONFIRM = "ADMIN_BROADCAST_CONFIRM"
+    ADMIN_BROADCAST_CANCEL = "ADMIN_BROADCAST_CANCEL"
+    ADMIN_BROADCAST_STOP = "ADMIN_BROADCAST_STOP"
 
 # Error messages
 class ErrorMessages:
@@ -172,6 +195,7 @@ class KeyboardTexts:
     FURNISHED = "🪑 Mebellar"
     PETS_ALLOWED = "🐕 Hayvonlar"
     SKIP_DESCRIPTION = "⏭️ Tavsifni o'tkazib yuborish"
+    PHOTOS_DONE = "➡️ Davom etish"
     
     # Pagination
     PREV_PAGE = "⬅️"
@@ -0,0 +1,133 @@
+"""
+Health - /healthz (liveness) va /readyz (readiness) javoblari
+
+/healthz - jarayon va event loop javob beryapti (hech narsaga murojaat
+qilmaydi). /readyz - baza javob beryapti, polling/webhook ishlayapti va
+update navbati chegaradan oshmagan. Ikkalasi ham hovuz holati va event loop
+kechikishini JSON da qaytaradi.
+
+Baza tekshiruvi hech qachon so'rovni ushlab qolmaydi: SELECT 1 alohida
+vazifada bajariladi va /readyz uni ko'pi bilan db_timeout soniya kutadi.
+Baza osilib qolsa ham keyingi so'rovlar o'sha vazifani qayta ishlatadi -
+hovuzdan yangi ulanishlar olinmaydi. Natija cache_ttl davomida saqlanadi.
+"""
+import asyncio
+import json
+import logging
+import time
+from typing import Optional, Dict, Any, Tuple
+from sqlalchemy import text
+from src.utils.metrics import EVENT_LOOP_LAG_LAST
+
+logger = logging.getLogger(__name__)
+
+
+def pool_stats(engine) -> Dict[str, Optional[int]]:
+    """Ulanishlar hovuzi holati (hovuz turi qo'llamasa None)"""
+    pool = getattr(engine, 'sync_engine', engine).pool
+    stats = {}
+    for name in ('size', 'checkedout', 'overflow'):
+        method = getattr(pool, name, None)
+        stats[name] = method() if callable(method) else None
+    return stats
+
+
+class HealthChecker:
+    """Liveness va readiness tekshiruvlari"""
+
+    def __init__(self, engine, application=None, db_timeout: float = 2.0,
+                 cache_ttl: float = 5.0, max_queue_depth: int = 100):
+        self.engine = engine
+        self.application = application
+        self.db_timeout = db_timeout
+        self.cache_ttl = cache_ttl
+        self.max_queue_depth = max_queue_depth
+        self.started_at = time.monotonic()
+        self._probe: Optional[asyncio.Task] = None
+        self._db_result: Optional[Tuple[bool, str]] = None
+        self._db_checked_at = 0.0
+
+    async def _ping_db(self) -> float:
+        started = time.perf_counter()
+        async with self.engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        return time.perf_counter() - started
+
+    async def check_db(self) -> Tuple[bool, str]:
+        """
+        Baza tekshiruvi (ko'pi bilan db_timeout soniya)
+
+        Returns:
+            Tuple[bool, str]: (tayyor, izoh)
+        """
+        if self._db_result is not None and time.monotonic() - self._db_checked_at < self.cache_ttl:
+            return self._db_result
+
+        # Oldingi tekshiruv hali tugamagan bo'lsa o'shani kutamiz
+        if self._probe is None or self._probe.done():
+            self._probe = asyncio.create_task(self._ping_db())
+
+        done, _ = await asyncio.wait({self._probe}, timeout=self.db_timeout)
+        if not done:
+            return False, f"timeout after {self.db_timeout:g}s"
+
+        error = self._probe.exception()
+        if error is not None:
+            logger.warning(f"Readiness DB check failed: {error}")
+            result = (False, f"error: {type(error).__name__}")
+        else:
+            result = (True, f"ok in {self._probe.result() * 1000:.1f} ms")
+        self._db_result = result
+        self._db_checked_at = time.monotonic()
+        return result
+
+    def check_telegram(self) -> Tuple[bool, str]:
+        """Application ishga tushgan va polling/webhook ishlayapti"""
+        if self.application is None:
+            return False, "not configured"
+        if not self.application.running:
+            return False, "application stopped"
+        updater = self.application.updater
+        if updater is None or not updater.running:
+            return False, "updater stopped"
+        return True, "running"
+
+    def queue_depth(self) -> int:
+        if self.application is None:
+            return 0
+        return self.application.update_queue.qsize()
+
+    def _stats(self) -> Dict[str, Any]:
+        return {
+            'uptime_seconds': round(time.monotonic() - self.started_at, 1),
+            'event_loop_lag_ms': round(EVENT_LOOP_LAG_LAST.labels().value * 1000, 2),
+            'update_queue_depth': self.queue_depth(),
+            'db_pool': pool_stats(self.engine)
+        }
+
+    @staticmethod
+    def _response(status: int, payload: Dict[str, Any]) -> Tuple[int, str, bytes]:
+        return status, "application/json", json.dumps(payload).encode()
+
+    async def liveness(self) -> Tuple[int, str, bytes]:
+        """/healthz javobi"""
+        return self._response(200, {'status': 'ok', **self._stats()})
+
+    async def readiness(self) -> Tuple[int, str, bytes]:
+        """/readyz javobi (tayyor bo'lmasa 503)"""
+        db_ok, db_detail = await self.check_db()
+        telegram_ok, telegram_detail = self.check_telegram()
+        depth = self.queue_depth()
+        queue_ok = depth <= self.max_queue_depth
+
+        ready = db_ok and telegram_ok and queue_ok
+        payload = {
+            'status': 'ready' if ready else 'not_ready',
+            'checks': {
+                'database': {'ok': db_ok, 'detail': db_detail},
+                'telegram': {'ok': telegram_ok, 'detail': telegram_detail},
+                'update_queue': {'ok': queue_ok, 'detail': f"{depth}/{self.max_queue_depth}"}
+            },
+            **self._stats()
+        }
+        return self._response(200 if ready else 503, payload)
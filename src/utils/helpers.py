@@ -28,4 +28,15 @@ def validate_phone(phone: str) -> bool:
         return False
     
     formatted_phone = format_phone_number(phone)
-    return bool(re.match(PHONE_REGEX, formatted_phone))
\ No newline at end of file
+    return bool(re.match(PHONE_REGEX, formatted_phone))
+
+# O'zbek ismlarida uchraydigan turli apostroflar (O‘tkir, G'ayrat, Oʻlmas)
+_APOSTROPHES = str.maketrans({"‘": "'", "’": "'", "ʻ": "'", "ʼ": "'", "`": "'"})
+
+
+def normalize_name(name: Optional[str]) -> Optional[str]:
+    """Ismni qidiruv uchun normallashtirish (kichik harf, bitta probel, bir xil apostrof)"""
+    if name is None:
+        return None
+    
+    return ' '.join(name.translate(_APOSTROPHES).casefold().split())
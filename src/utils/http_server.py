@@ -0,0 +1,87 @@
+"""
+HTTP Server - Bot jarayonidagi kichik HTTP server (/metrics va boshqalar)
+
+Faqat stdlib asyncio ustida: bir nechta GET manzili uchun alohida web
+framework kerak emas. Har bir so'rovga javob berib ulanish yopiladi.
+"""
+import asyncio
+import logging
+from typing import Optional, Dict, Tuple, Callable, Awaitable
+
+logger = logging.getLogger(__name__)
+
+# (status, Content-Type, tana)
+Response = Tuple[int, str, bytes]
+RouteHandler = Callable[[], Awaitable[Response]]
+
+_REASONS = {200: "OK", 404: "Not Found", 405: "Method Not Allowed", 500: "Internal Server Error",
+            503: "Service Unavailable"}
+
+# So'rov sarlavhalarini o'qish uchun muddat (sekin mijozlar ulanishni band qilmasin)
+READ_TIMEOUT = 5.0
+
+
+class HTTPServer:
+    """Manzillar bo'yicha GET so'rovlariga javob beruvchi server"""
+
+    def __init__(self, host: str = "0.0.0.0", port: int = 8080):
+        self.host = host
+        self.port = port
+        self.routes: Dict[str, RouteHandler] = {}
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    def route(self, path: str, handler: RouteHandler) -> None:
+        """Manzil qo'shish"""
+        self.routes[path] = handler
+
+    async def start(self) -> None:
+        """Tinglashni boshlash (port=0 bo'lsa bo'sh port tanlanadi)"""
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info(f"HTTP server listening on {self.host}:{self.port}")
+
+    async def stop(self) -> None:
+        """Serverni to'xtatish"""
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+            while True:
+                header = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+                if header in (b'\r\n', b'\n', b''):
+                    break
+
+            parts = request_line.decode('latin-1').split()
+            if len(parts) < 2:
+                return
+            method, target = parts[0], parts[1]
+            path = target.split('?', 1)[0]
+
+            handler = self.routes.get(path)
+            if handler is None:
+                status, content_type, body = 404, "text/plain", b"not found\n"
+            elif method not in ("GET", "HEAD"):
+                status, content_type, body = 405, "text/plain", b"method not allowed\n"
+            else:
+                try:
+                    status, content_type, body = await handler()
+                except Exception as e:
+                    logger.error(f"HTTP handler {path} failed: {e}")
+                    status, content_type, body = 500, "text/plain", b"internal error\n"
+
+            head = (
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: {content_type}\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: close\r\n\r\n"
+            ).encode('latin-1')
+            writer.write(head if method == "HEAD" else head + body)
+            await writer.drain()
+        except (asyncio.TimeoutError, ConnectionError):
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,409 @@
+"""
+Metrics - Prometheus formatidagi ko'rsatkichlar
+
+Ko'rsatkichlar jarayon xotirasida yig'iladi va /metrics manzilida text
+exposition formatida beriladi. Barcha yozuvlar event loop oqimida bo'ladi
+(handlerlar, SQLAlchemy hodisalari, PTB so'rovlari), shuning uchun qulf
+ishlatilmaydi.
+
+Yig'iladigan ko'rsatkichlar:
+- handler va callback yo'nalishi bo'yicha javob vaqti
+- SQL so'rovlar soni va vaqti (before/after_cursor_execute hodisalari)
+- ulanishlar hovuzidan ulanish olish uchun kutish vaqti
+- Telegram Bot API so'rovlari vaqti va xatolari
+- event loop kechikishi
+"""
+import asyncio
+import functools
+import logging
+import math
+import time
+import weakref
+from abc import ABC, abstractmethod
+from typing import Optional, Dict, List, Tuple, Callable, Iterable, Sequence, Any
+from telegram.request import HTTPXRequest
+from src.utils.constants import CallbackPatterns
+from src.utils.tracing import TRACER, KIND_CLIENT
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+FAST_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    pairs = ','.join(
+        f'{name}="{str(value).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+        for name, value in zip(names, values)
+    )
+    return "{" + pairs + "}"
+
+
+class _Metric(ABC):
+    """Ko'rsatkich (label lar bo'yicha qiymatlar to'plami)"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[LabelValues, Any] = {}
+
+    @abstractmethod
+    def _new_child(self) -> Any:
+        """Bitta label kombinatsiyasi uchun yangi qiymat"""
+
+    def labels(self, *values: str) -> Any:
+        """Label qiymatlari bo'yicha qiymat (birinchi murojaatda yaratiladi)"""
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is None:
+            child = self._children[key] = self._new_child()
+        return child
+
+    def clear(self) -> None:
+        self._children.clear()
+
+    @abstractmethod
+    def samples(self) -> Iterable[Tuple[str, Sequence[str], Sequence[str], float]]:
+        """(nom, label nomlari, label qiymatlari, qiymat)"""
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for name, labelnames, labelvalues, value in self.samples():
+            lines.append(f"{name}{_format_labels(labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class _Value:
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.value += amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """Faqat oshadigan hisoblagich"""
+
+    kind = "counter"
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self.labels().inc(amount)
+
+    def value(self, *values: str) -> float:
+        return self.labels(*values).value
+
+    def samples(self):
+        for key, child in self._children.items():
+            yield self.name, self.labelnames, key, child.value
+
+
+class Gauge(_Metric):
+    """Joriy qiymat (yoki o'qish paytida hisoblanadigan funksiya)"""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 function: Optional[Callable[[], Optional[float]]] = None):
+        super().__init__(name, documentation, labelnames)
+        self.function = function
+
+    def _new_child(self) -> _Value:
+        return _Value()
+
+    def set(self, value: float) -> None:
+        self.labels().set(value)
+
+    def samples(self):
+        if self.function is not None:
+            try:
+                value = self.function()
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} failed: {e}")
+                value = None
+            if value is not None:
+                yield self.name, (), (), value
+            return
+        for key, child in self._children.items():
+            yield self.name, self.labelnames, key, child.value
+
+
+class _HistogramValue:
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+
+class Histogram(_Metric):
+    """Qiymatlar taqsimoti (Prometheus histogram i)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def _new_child(self) -> _HistogramValue:
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def samples(self):
+        labelnames = self.labelnames + ('le',)
+        for key, child in self._children.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets, child.counts):
+                cumulative += count
+                yield f"{self.name}_bucket", labelnames, key + (_format_value(bound),), cumulative
+            yield f"{self.name}_sum", self.labelnames, key, child.sum
+            yield f"{self.name}_count", self.labelnames, key, child.count
+
+
+class MetricsRegistry:
+    """Ko'rsatkichlar ro'yxati"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+              function: Optional[Callable[[], Optional[float]]] = None) -> Gauge:
+        return self.register(Gauge(name, documentation, labelnames, function))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Prometheus text exposition formati (0.0.4)"""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+HANDLER_LATENCY = REGISTRY.histogram(
+    "bot_handler_duration_seconds", "Update handler duration", ["handler"]
+)
+HANDLER_ERRORS = REGISTRY.counter(
+    "bot_handler_errors_total", "Unhandled exceptions raised by update handlers", ["handler"]
+)
+CALLBACK_LATENCY = REGISTRY.histogram(
+    "bot_callback_duration_seconds", "Callback query duration by route", ["route"]
+)
+DB_QUERIES = REGISTRY.counter(
+    "db_queries_total", "SQL statements executed", ["operation"]
+)
+DB_QUERY_LATENCY = REGISTRY.histogram(
+    "db_query_duration_seconds", "SQL statement duration", ["operation"], FAST_BUCKETS
+)
+DB_ERRORS = REGISTRY.counter(
+    "db_errors_total", "SQL statements that raised", ["operation"]
+)
+DB_POOL_WAIT = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection", buckets=FAST_BUCKETS
+)
+TELEGRAM_API_LATENCY = REGISTRY.histogram(
+    "telegram_api_duration_seconds", "Telegram Bot API request duration", ["method"]
+)
+TELEGRAM_API_ERRORS = REGISTRY.counter(
+    "telegram_api_errors_total", "Failed Telegram Bot API requests", ["method", "reason"]
+)
+EVENT_LOOP_LAG = REGISTRY.histogram(
+    "event_loop_lag_seconds", "Delay between scheduled and actual event loop wakeups", buckets=FAST_BUCKETS
+)
+EVENT_LOOP_LAG_LAST = REGISTRY.gauge(
+    "event_loop_lag_last_seconds", "Most recent event loop lag measurement"
+)
+
+# Callback data odatda "PATTERN_<qiymat>" - label sifatida faqat pattern olinadi
+_CALLBACK_ROUTES = sorted(
+    (value for name, value in vars(CallbackPatterns).items() if name.isupper() and isinstance(value, str)),
+    key=len, reverse=True
+)
+
+
+def callback_route(data: Optional[str]) -> str:
+    """Callback data dan cheklangan sonli yo'nalish nomi"""
+    if not data:
+        return "none"
+    for route in _CALLBACK_ROUTES:
+        if data == route or data.startswith(route + "_") or data.startswith(route + ":"):
+            return route
+    return "other"
+
+
+def timed_handler(name: str) -> Callable:
+    """PTB handler callback ini vaqt o'lchovi bilan o'rash"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(update, context, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return await func(update, context, *args, **kwargs)
+            except Exception:
+                HANDLER_ERRORS.labels(name).inc()
+                raise
+            finally:
+                elapsed = time.perf_counter() - started
+                HANDLER_LATENCY.labels(name).observe(elapsed)
+                query = getattr(update, 'callback_query', None)
+                if query is not None:
+                    CALLBACK_LATENCY.labels(callback_route(query.data)).observe(elapsed)
+        return wrapper
+    return decorator
+
+
+def _operation(statement: str) -> str:
+    """SQL so'rov turi (SELECT, INSERT, ...)"""
+    keyword = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    return keyword if keyword in {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"} else "OTHER"
+
+
+_instrumented_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+
+def instrument_engine(engine) -> None:
+    """
+    SQLAlchemy engine ga so'rov va hovuz ko'rsatkichlarini ulash
+
+    Args:
+        engine: AsyncEngine yoki Engine
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    if sync_engine in _instrumented_engines:
+        return
+    _instrumented_engines.add(sync_engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('query_started', []).append(time.perf_counter())
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = conn.info['query_started'].pop()
+        operation = _operation(statement)
+        DB_QUERIES.labels(operation).inc()
+        DB_QUERY_LATENCY.labels(operation).observe(time.perf_counter() - started)
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        stack = context.connection.info.get('query_started') if context.connection is not None else None
+        if stack:
+            stack.pop()
+        DB_ERRORS.labels(_operation(context.statement or "")).inc()
+
+    # Pool da "kutish boshlandi" hodisasi yo'q - ulanish olish o'lchanadi.
+    # raw_connection engine da qoladi (dispose() da pool almashsa ham)
+    raw_connection = sync_engine.raw_connection
+
+    def timed_raw_connection(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return raw_connection(*args, **kwargs)
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+    sync_engine.raw_connection = timed_raw_connection
+
+    def pool_stat(name: str) -> Callable[[], Optional[float]]:
+        def read() -> Optional[float]:
+            method = getattr(sync_engine.pool, name, None)
+            return method() if callable(method) else None
+        return read
+
+    for stat, documentation in (
+        ('checkedout', "Connections currently checked out of the pool"),
+        ('size', "Configured pool size"),
+        ('overflow', "Connections opened above the pool size"),
+    ):
+        if REGISTRY.get(f"db_pool_{stat}") is None:
+            REGISTRY.gauge(f"db_pool_{stat}", documentation, function=pool_stat(stat))
+
+
+class InstrumentedRequest(HTTPXRequest):
+    """Bot API so'rovlarini o'lchaydigan PTB request (usul nomi URL oxiridan olinadi)"""
+
+    async def do_request(self, url: str, method: str, *args, **kwargs) -> Tuple[int, bytes]:
+        api_method = url.rsplit('/', 1)[-1]
+        started = time.perf_counter()
+        # Update ichida bo'lsa Bot API so'rovi uning bola span i bo'ladi
+        with TRACER.start_span(f"telegram {api_method}", {'telegram.method': api_method}, KIND_CLIENT) as span:
+            try:
+                code, payload = await super().do_request(url, method, *args, **kwargs)
+            except Exception as e:
+                TELEGRAM_API_ERRORS.labels(api_method, type(e).__name__).inc()
+                raise
+            finally:
+                TELEGRAM_API_LATENCY.labels(api_method).observe(time.perf_counter() - started)
+
+            if span is not None:
+                span.set_attribute('http.status_code', code)
+        if code >= 400:
+            TELEGRAM_API_ERRORS.labels(api_method, str(code)).inc()
+        return code, payload
+
+
+async def monitor_event_loop(interval: float = 0.5) -> None:
+    """Event loop kechikishini doimiy o'lchash (fonda ishlaydi)"""
+    loop = asyncio.get_running_loop()
+    while True:
+        started = loop.time()
+        await asyncio.sleep(interval)
+        lag = max(0.0, loop.time() - started - interval)
+        EVENT_LOOP_LAG.observe(lag)
+        EVENT_LOOP_LAG_LAST.set(lag)
+
+
+async def metrics_endpoint() -> Tuple[int, str, bytes]:
+    """/metrics javobi"""
+    return 200, "text/plain; version=0.0.4; charset=utf-8", REGISTRY.render().encode()
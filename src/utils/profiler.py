@@ -0,0 +1,253 @@
+"""
+Profiler - Ishlab turgan botni qayta deploy qilmasdan profillash
+
+Alohida daemon thread har interval soniyada sys._current_frames() orqali
+barcha thread larning stek izini oladi (sampling). Kuzatilayotgan kod
+to'xtatilmaydi va unga hech narsa ulanmaydi (sys.setprofile yo'q) -
+xarajat faqat namuna olish vaqtiga teng, u Profile.overhead da ko'rsatiladi.
+
+Event loop thread ida ishlayotgan coroutine lar o'z frame lari bilan
+stekda ko'rinadi, shuning uchun qaysi handler yoki servis vaqt olayotgani
+to'g'ridan-to'g'ri ko'rinadi. Kutish holatidagi namunalar (select, Condition
+va navbat kutishi) "bo'sh" deb sanaladi va hisobotga kirmaydi.
+
+Natija:
+- report(): eng ko'p vaqt olgan funksiyalar (o'zi va chaqirganlari bilan)
+- collapsed(): flamegraph.pl / speedscope uchun "a;b;c 12" formatidagi stek lar
+"""
+import asyncio
+import os
+import re
+import sys
+import sysconfig
+import threading
+import time
+from collections import Counter
+from typing import Optional, Dict, List, Tuple
+
+# Bir stekdan olinadigan eng ko'p frame (chuqur rekursiyada xarajat chegarasi)
+MAX_DEPTH = 128
+
+# Bu funksiyalarda turgan thread hech narsa qilmayapti
+IDLE_FRAMES = {
+    ('selectors.py', 'select'),
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker'),
+}
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_STDLIB = sysconfig.get_paths()['stdlib']
+_THREAD_NUMBER = re.compile(r"[-_]\d+")
+
+_lock = threading.Lock()
+_active: Optional["StackSampler"] = None
+
+
+class ProfilerBusy(RuntimeError):
+    """Profil allaqachon olinmoqda"""
+
+
+def _short_path(path: str) -> str:
+    for marker in ('site-packages' + os.sep, 'dist-packages' + os.sep):
+        if marker in path:
+            return path.split(marker, 1)[1]
+    for root in (_PROJECT_ROOT, _STDLIB):
+        if path.startswith(root + os.sep):
+            return os.path.relpath(path, root)
+    return path
+
+
+class Profile:
+    """
+    Namunalar natijasi
+
+    Attributes:
+        stacks: (thread, frame, ...) -> namunalar soni (faqat band namunalar)
+        threads: thread -> (band, bo'sh) namunalar
+        duration: Profillash davomiyligi (soniya)
+        overhead: Namuna olishga ketgan vaqt ulushi
+    """
+
+    def __init__(self, stacks: Counter, threads: Dict[str, List[int]], duration: float, sampling_time: float, interval: float):
+        self.stacks = stacks
+        self.threads = threads
+        self.duration = duration
+        self.interval = interval
+        self.overhead = sampling_time / duration if duration else 0.0
+
+    @property
+    def busy_samples(self) -> int:
+        return sum(busy for busy, _ in self.threads.values())
+
+    def top(self, limit: int = 20) -> List[Tuple[str, int, int]]:
+        """
+        Eng issiq funksiyalar
+
+        Returns:
+            List[Tuple[str, int, int]]: (funksiya, o'zi, jami) namunalar - o'zi bo'yicha kamayish tartibida
+        """
+        own: Counter = Counter()
+        total: Counter = Counter()
+        for stack, count in self.stacks.items():
+            frames = stack[1:]
+            if not frames:
+                continue
+            own[frames[-1]] += count
+            # Rekursiv funksiya bir stekda bir marta sanaladi
+            for frame in set(frames):
+                total[frame] += count
+        ranked = sorted(total, key=lambda frame: (own[frame], total[frame]), reverse=True)
+        return [(frame, own[frame], total[frame]) for frame in ranked[:limit]]
+
+    def report(self, limit: int = 20) -> str:
+        """Matnli hisobot: thread lar bandligi va eng issiq funksiyalar"""
+        samples = self.busy_samples
+        lines = [
+            f"Profil: {self.duration:.1f} s, har {self.interval * 1000:.0f} ms, "
+            f"{samples} band namuna, xarajat {self.overhead * 100:.2f}%",
+            "",
+            "Thread lar (band %):"
+        ]
+        for thread, (busy, idle) in sorted(self.threads.items(), key=lambda item: -item[1][0]):
+            if busy + idle:
+                lines.append(f"  {busy / (busy + idle) * 100:5.1f}%  {thread}")
+        lines += ["", "  o'zi%  jami%  funksiya"]
+        for frame, own, total in self.top(limit):
+            lines.append(f"{own / samples * 100:6.1f} {total / samples * 100:6.1f}  {frame}")
+        return '\n'.join(lines)
+
+    def collapsed(self) -> str:
+        """flamegraph.pl uchun collapsed stek lar"""
+        return ''.join(
+            f"{';'.join(stack)} {count}\n"
+            for stack, count in sorted(self.stacks.items(), key=lambda item: -item[1])
+        )
+
+
+class StackSampler:
+    """
+    Thread lar stekini muntazam oluvchi sampler
+
+    Args:
+        interval: Namunalar orasidagi vaqt (soniya)
+        max_depth: Stekdan olinadigan eng ko'p frame
+    """
+
+    def __init__(self, interval: float = 0.01, max_depth: int = MAX_DEPTH):
+        self.interval = interval
+        self.max_depth = max_depth
+        self._labels: Dict[object, str] = {}
+        self._stacks: Counter = Counter()
+        self._threads: Dict[str, List[int]] = {}
+        self._sampling_time = 0.0
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _label(self, code) -> str:
+        label = self._labels.get(code)
+        if label is None:
+            name = getattr(code, 'co_qualname', code.co_name)
+            label = f"{name} ({_short_path(code.co_filename)}:{code.co_firstlineno})".replace(';', ':')
+            self._labels[code] = label
+        return label
+
+    def _sample(self, own_ident: int, names: Dict[int, str]) -> None:
+        for ident, frame in sys._current_frames().items():
+            if ident == own_ident:
+                continue
+            thread = names.get(ident)
+            if thread is None:
+                names.update(
+                    (item.ident, _THREAD_NUMBER.sub('', item.name)) for item in threading.enumerate()
+                )
+                thread = names.get(ident, 'unknown')
+            counts = self._threads.setdefault(thread, [0, 0])
+
+            code = frame.f_code
+            if (os.path.basename(code.co_filename), code.co_name) in IDLE_FRAMES:
+                counts[1] += 1
+                continue
+            counts[0] += 1
+
+            frames = []
+            while frame is not None and len(frames) < self.max_depth:
+                frames.append(self._label(frame.f_code))
+                frame = frame.f_back
+            frames.append(thread)
+            frames.reverse()
+            self._stacks[tuple(frames)] += 1
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        names: Dict[int, str] = {}
+        while not self._stop.wait(self.interval):
+            started = time.perf_counter()
+            self._sample(own_ident, names)
+            self._sampling_time += time.perf_counter() - started
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        self._started = time.perf_counter()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> Profile:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        return Profile(
+            self._stacks, self._threads, time.perf_counter() - self._started, self._sampling_time, self.interval
+        )
+
+
+def is_busy() -> bool:
+    """Profil hozir olinayotganini tekshirish"""
+    return _active is not None
+
+
+def acquire(interval: float = 0.01) -> StackSampler:
+    """
+    Jarayonda yagona sampler ni ishga tushirish
+
+    Raises:
+        ProfilerBusy: Boshqa profil hali olinmoqda
+    """
+    global _active
+    with _lock:
+        if _active is not None:
+            raise ProfilerBusy("Profil allaqachon olinmoqda")
+        _active = StackSampler(interval)
+        _active.start()
+        return _active
+
+
+def release(sampler: StackSampler) -> Profile:
+    """Sampler ni to'xtatish va natijani olish"""
+    global _active
+    try:
+        return sampler.stop()
+    finally:
+        with _lock:
+            if _active is sampler:
+                _active = None
+
+
+async def profile_for(seconds: float, interval: float = 0.01) -> Profile:
+    """
+    seconds davomida profillash (event loop bloklanmaydi)
+
+    Raises:
+        ProfilerBusy: Boshqa profil hali olinmoqda
+    """
+    sampler = acquire(interval)
+    try:
+        await asyncio.sleep(seconds)
+    finally:
+        profile = release(sampler)
+    return profile
@@ -0,0 +1,161 @@
+"""
+Query Budget - Handler chaqiruvi boshiga SQL so'rovlar soni va chegarasi
+
+Har bir handler chaqiruvida bajarilgan SQL so'rovlar QueryCounter bilan
+sanaladi (contextvar - parallel update lar aralashmaydi). Yo'nalishlar
+(buyruq yoki callback pattern) uchun QUERY_BUDGETS da chegara e'lon
+qilinadi:
+- production: budgeted_handler so'rovlar sonini bot_handler_db_queries
+  histogrammasiga yozadi, chegaradan oshsa bot_query_budget_exceeded_total
+  oshadi va ogohlantirish yoziladi
+- testlar: query_budget(route) context manager chegaradan oshganda
+  QueryBudgetExceeded (AssertionError) ko'taradi - N+1 regressiyasi test
+  bosqichida ushlanadi
+"""
+import functools
+import logging
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional, Dict, List, Tuple, Callable, Iterator
+from src.utils.metrics import REGISTRY, callback_route
+
+logger = logging.getLogger(__name__)
+
+# Yo'nalish -> bitta chaqiruvdagi ko'pi bilan SQL so'rovlar.
+# Yo'nalish: callback uchun pattern (callback_route), qolganlari handler nomi
+QUERY_BUDGETS: Dict[str, int] = {
+    'start': 3,
+    'admin': 2,
+    'message': 4,
+    'media': 3,
+    'ADMIN_STATISTICS': 2,
+    'ADMIN_PENDING_LISTINGS': 3,
+    'ADMIN_APPROVE': 2,
+    'ADMIN_REJECT': 2,
+    'ADMIN_DELETE': 2,
+    # foydalanuvchi, takror tekshiruvi, e'lon va rasmlar (bitta INSERT)
+    'LISTING_SUBMIT': 4,
+    'SEARCH_EXECUTE': 3,
+    'SEARCH_PAGE': 3,
+    'MY_LISTINGS': 3,
+}
+# E'lon qilinmagan yo'nalishlar uchun
+DEFAULT_QUERY_BUDGET = 10
+
+# Statement lar faqat xatolik xabari uchun saqlanadi
+MAX_STATEMENTS = 50
+MAX_STATEMENT_LENGTH = 200
+
+HANDLER_DB_QUERIES = REGISTRY.histogram(
+    "bot_handler_db_queries", "SQL statements per handler invocation", ["route"],
+    (0, 1, 2, 3, 5, 8, 13, 21, 34)
+)
+QUERY_BUDGET_EXCEEDED = REGISTRY.counter(
+    "bot_query_budget_exceeded_total", "Handler invocations that ran more SQL statements than budgeted", ["route"]
+)
+
+_counted_engines: "weakref.WeakSet" = weakref.WeakSet()
+
+_active_counters: ContextVar[Tuple["QueryCounter", ...]] = ContextVar('query_counters', default=())
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Yo'nalish uchun e'lon qilingan so'rovlar chegarasidan oshildi"""
+
+
+class QueryCounter:
+    """
+    Blok ichida bajarilgan SQL so'rovlarni sanash
+
+    Ichma-ich ishlatish mumkin - har bir so'rov barcha faol hisoblagichlarga
+    yoziladi. Faqat count_engine_queries() ulangan engine lar sanaladi.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.statements: List[str] = []
+        self._token = None
+
+    def record(self, statement: str) -> None:
+        self.count += 1
+        if len(self.statements) < MAX_STATEMENTS:
+            self.statements.append(' '.join(statement.split())[:MAX_STATEMENT_LENGTH])
+
+    def __enter__(self) -> "QueryCounter":
+        self._token = _active_counters.set(_active_counters.get() + (self,))
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _active_counters.reset(self._token)
+        return False
+
+
+def count_engine_queries(engine) -> None:
+    """
+    Engine so'rovlarini faol QueryCounter larga yozish
+
+    Args:
+        engine: AsyncEngine yoki Engine
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    if sync_engine in _counted_engines:
+        return
+    _counted_engines.add(sync_engine)
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        for counter in _active_counters.get():
+            counter.record(statement)
+
+
+def budget_for(route: str) -> int:
+    return QUERY_BUDGETS.get(route, DEFAULT_QUERY_BUDGET)
+
+
+def handler_route(name: str, update) -> str:
+    """Byudjet yo'nalishi: callback uchun pattern, qolganlari handler nomi"""
+    query = getattr(update, 'callback_query', None)
+    if query is not None:
+        return callback_route(query.data)
+    return name
+
+
+@contextmanager
+def query_budget(route: str, budget: Optional[int] = None) -> Iterator[QueryCounter]:
+    """
+    Test uchun: blok yo'nalish byudjetidan ko'p so'rov bajarsa QueryBudgetExceeded
+
+    Args:
+        route: QUERY_BUDGETS dagi yo'nalish
+        budget: Aniq chegara (berilmasa QUERY_BUDGETS dan)
+    """
+    limit = budget_for(route) if budget is None else budget
+    with QueryCounter() as counter:
+        yield counter
+    if counter.count > limit:
+        statements = '\n'.join(f"  {statement}" for statement in counter.statements)
+        raise QueryBudgetExceeded(f"{route}: {counter.count} queries, budget {limit}\n{statements}")
+
+
+def budgeted_handler(name: str) -> Callable:
+    """PTB handler callback i so'rovlarini sanash va byudjet bilan solishtirish"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(update, context, *args, **kwargs):
+            with QueryCounter() as counter:
+                try:
+                    return await func(update, context, *args, **kwargs)
+                finally:
+                    route = handler_route(name, update)
+                    HANDLER_DB_QUERIES.labels(route).observe(counter.count)
+                    if counter.count > budget_for(route):
+                        QUERY_BUDGET_EXCEEDED.labels(route).inc()
+                        logger.warning(
+                            f"Query budget exceeded on {route}: {counter.count} > {budget_for(route)} "
+                            f"({'; '.join(counter.statements[:5])})"
+                        )
+        return wrapper
+    return decorator
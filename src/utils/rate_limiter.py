@@ -0,0 +1,52 @@
+"""
+Rate Limiter - Chiquvchi so'rovlar tezligini cheklash
+"""
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """
+    Asinxron token bucket
+
+    Soniyasiga `rate` ta token to'ldiriladi, bir vaqtda ko'pi bilan `capacity`
+    ta token yig'iladi. Har bir `acquire()` bitta token sarflaydi va token
+    bo'lmasa keyingisi paydo bo'lguncha kutadi.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate musbat bo'lishi kerak")
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        """Bitta token olish (kerak bo'lsa kutish)"""
+        async with self._lock:
+            while True:
+                self._refill()
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Tokenlarni `seconds` soniyaga muzlatish (masalan Telegram RetryAfter)
+
+        Token soni manfiy bo'lib qoladi va to'ldirilguncha hech kim o'ta olmaydi.
+        Bir vaqtda kelgan bir nechta pause() qo'shilmaydi - eng uzuni qoladi.
+        """
+        self._refill()
+        self._tokens = min(self._tokens, -seconds * self.rate)
+
+    def _refill(self) -> None:
+        """O'tgan vaqt uchun tokenlarni to'ldirish"""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
@@ -0,0 +1,367 @@
+"""
+Tracing - Update -> SQL -> Bot API span lari
+
+Har bir kiruvchi update uchun ildiz span ochiladi; shu update davomida
+bajarilgan har bir SQL so'rov va Bot API so'rovi uning bola span i bo'ladi.
+Joriy span contextvars da saqlanadi, shuning uchun asyncio task lari va
+SQLAlchemy greenlet lari orqali o'zi uzatiladi. trace_id log yozuvlariga ham
+qo'shiladi (TraceContextFilter) - sekin update ning loglari bitta id bilan
+topiladi.
+
+Tugagan span lar OTLP/HTTP JSON formatida kollektorga partiyalab yuboriladi
+(Jaeger, Tempo, OpenTelemetry Collector yoki tools/fake_otlp_collector.py).
+
+Tracing o'chirilgan bo'lsa handler o'ramasi to'g'ridan-to'g'ri funksiyani
+chaqiradi, SQL hodisalari ulanmaydi, Bot API so'rovi esa bitta contextvar
+o'qish bilan cheklanadi.
+"""
+import asyncio
+import functools
+import logging
+import random
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional, Dict, List, Any, Callable
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# OTLP span turlari
+KIND_INTERNAL = 1
+KIND_SERVER = 2
+KIND_CLIENT = 3
+
+# OTLP status kodlari
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+# db.statement atributi shu uzunlikda qisqartiriladi
+MAX_STATEMENT_LENGTH = 1000
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+def current_span() -> Optional["Span"]:
+    """Joriy span (update tashqarisida None)"""
+    return _current_span.get()
+
+
+class Span:
+    """Bitta amal (update, SQL so'rov, Bot API so'rovi)"""
+
+    __slots__ = ('tracer', 'name', 'kind', 'trace_id', 'span_id', 'parent_id',
+                 'start_ns', 'end_ns', 'attributes', 'status', 'status_message')
+
+    def __init__(self, tracer: "Tracer", name: str, trace_id: str, parent_id: Optional[str] = None,
+                 kind: int = KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None):
+        self.tracer = tracer
+        self.name = name
+        self.kind = kind
+        self.trace_id = trace_id
+        self.span_id = f"{random.getrandbits(64):016x}"
+        self.parent_id = parent_id
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes: Dict[str, Any] = dict(attributes) if attributes else {}
+        self.status = STATUS_UNSET
+        self.status_message = ""
+
+    @property
+    def duration_ms(self) -> Optional[float]:
+        if self.end_ns is None:
+            return None
+        return (self.end_ns - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def record_exception(self, error: BaseException) -> None:
+        """Xatolikni span ga yozish"""
+        self.status = STATUS_ERROR
+        self.status_message = str(error)[:200]
+        self.attributes['exception.type'] = type(error).__name__
+
+    def end(self) -> None:
+        """Span ni yopish va eksport navbatiga qo'yish (ikkinchi chaqiruv e'tiborsiz)"""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        exporter = self.tracer.exporter
+        if exporter is not None:
+            exporter.export(self)
+
+
+class _SpanScope:
+    """Span ni joriy qilib turuvchi context manager"""
+
+    __slots__ = ('span', '_token')
+
+    def __init__(self, span: Span):
+        self.span = span
+        self._token = None
+
+    def __enter__(self) -> Span:
+        self._token = _current_span.set(self.span)
+        return self.span
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        _current_span.reset(self._token)
+        if exc is not None and not isinstance(exc, asyncio.CancelledError):
+            self.span.record_exception(exc)
+        self.span.end()
+        return False
+
+
+class _NoopScope:
+    """Tracing o'chirilgan yoki span tanlanmagan holat"""
+
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        return False
+
+
+_NOOP = _NoopScope()
+
+
+class Tracer:
+    """Span yaratuvchi (exporter berilmaguncha o'chirilgan)"""
+
+    def __init__(self, exporter=None, sample_rate: float = 1.0,
+                 rng: Optional[Callable[[], float]] = None):
+        self.exporter = exporter
+        self.sample_rate = sample_rate
+        self._random = rng or random.random
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def configure(self, exporter, sample_rate: Optional[float] = None) -> None:
+        """Exporter ni o'rnatish (None - tracing o'chiriladi)"""
+        self.exporter = exporter
+        if sample_rate is not None:
+            self.sample_rate = sample_rate
+
+    def start_trace(self, name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = KIND_SERVER):
+        """
+        Yangi trace ning ildiz span i (update boshlanishi)
+
+        Trace sample_rate bo'yicha tanlanadi; tanlanmagan update ichidagi
+        SQL va Bot API so'rovlari uchun ham span ochilmaydi.
+        """
+        if self.exporter is None or self._random() >= self.sample_rate:
+            return _NOOP
+        return _SpanScope(Span(self, name, f"{random.getrandbits(128):032x}", None, kind, attributes))
+
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None, kind: int = KIND_INTERNAL):
+        """Joriy span ning bola span i (joriy span bo'lmasa hech narsa qilinmaydi)"""
+        parent = _current_span.get()
+        if parent is None:
+            return _NOOP
+        return _SpanScope(Span(self, name, parent.trace_id, parent.span_id, kind, attributes))
+
+
+TRACER = Tracer()
+
+
+def _update_attributes(name: str, update) -> Dict[str, Any]:
+    attributes: Dict[str, Any] = {'bot.handler': name}
+    update_id = getattr(update, 'update_id', None)
+    if update_id is not None:
+        attributes['telegram.update_id'] = update_id
+    user = getattr(update, 'effective_user', None)
+    if user is not None:
+        attributes['telegram.user_id'] = user.id
+    query = getattr(update, 'callback_query', None)
+    if query is not None:
+        from src.utils.metrics import callback_route
+        attributes['telegram.callback_route'] = callback_route(query.data)
+    return attributes
+
+
+def traced_handler(name: str) -> Callable:
+    """PTB handler callback ini update span i bilan o'rash"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        async def wrapper(update, context, *args, **kwargs):
+            if TRACER.exporter is None:
+                return await func(update, context, *args, **kwargs)
+            with TRACER.start_trace(f"update {name}", _update_attributes(name, update)):
+                return await func(update, context, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_engine(engine, tracer: Tracer = TRACER) -> None:
+    """
+    SQLAlchemy engine ga SQL so'rov span larini ulash
+
+    Span lar faqat update ichida (joriy span bo'lganda) ochiladi.
+
+    Args:
+        engine: AsyncEngine yoki Engine
+        tracer: Span yaratuvchi
+    """
+    from sqlalchemy import event
+
+    sync_engine = getattr(engine, 'sync_engine', engine)
+    system = sync_engine.dialect.name
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        parent = _current_span.get()
+        span = None
+        if parent is not None:
+            operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+            span = Span(tracer, f"db {operation}", parent.trace_id, parent.span_id, KIND_CLIENT, {
+                'db.system': system,
+                'db.operation': operation,
+                'db.statement': statement[:MAX_STATEMENT_LENGTH]
+            })
+        conn.info.setdefault('trace_spans', []).append(span)
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        span = conn.info['trace_spans'].pop()
+        if span is not None:
+            if cursor.rowcount is not None and cursor.rowcount >= 0:
+                span.set_attribute('db.rowcount', cursor.rowcount)
+            span.end()
+
+    @event.listens_for(sync_engine, "handle_error")
+    def handle_error(context):
+        stack = context.connection.info.get('trace_spans') if context.connection is not None else None
+        span = stack.pop() if stack else None
+        if span is not None:
+            span.record_exception(context.original_exception)
+            span.end()
+
+
+class TraceContextFilter(logging.Filter):
+    """Log yozuviga trace_id va span_id qo'shish (format: %(trace_id)s)"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        span = _current_span.get()
+        record.trace_id = span.trace_id if span is not None else "-"
+        record.span_id = span.span_id if span is not None else "-"
+        return True
+
+
+class InMemoryExporter:
+    """Tugagan span larni ro'yxatda saqlash (testlar uchun)"""
+
+    def __init__(self):
+        self.spans: List[Span] = []
+
+    def export(self, span: Span) -> None:
+        self.spans.append(span)
+
+
+def _attribute_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {'boolValue': value}
+    if isinstance(value, int):
+        return {'intValue': str(value)}
+    if isinstance(value, float):
+        return {'doubleValue': value}
+    return {'stringValue': str(value)}
+
+
+def _attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return [{'key': key, 'value': _attribute_value(value)} for key, value in attributes.items()]
+
+
+def to_otlp(spans: List[Span], service_name: str) -> Dict[str, Any]:
+    """Span larni OTLP/HTTP JSON (ExportTraceServiceRequest) ko'rinishiga o'tkazish"""
+    otlp_spans = []
+    for span in spans:
+        item = {
+            'traceId': span.trace_id,
+            'spanId': span.span_id,
+            'name': span.name,
+            'kind': span.kind,
+            'startTimeUnixNano': str(span.start_ns),
+            'endTimeUnixNano': str(span.end_ns),
+            'attributes': _attributes(span.attributes),
+            'status': {'code': span.status}
+        }
+        if span.parent_id:
+            item['parentSpanId'] = span.parent_id
+        if span.status_message:
+            item['status']['message'] = span.status_message
+        otlp_spans.append(item)
+
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': _attributes({'service.name': service_name})},
+            'scopeSpans': [{'scope': {'name': 'uykelishuv.tracing'}, 'spans': otlp_spans}]
+        }]
+    }
+
+
+class OTLPExporter:
+    """
+    OTLP/HTTP JSON exporter
+
+    Span lar xotiradagi chegaralangan navbatga yig'iladi va fon vazifasi
+    ularni partiyalab yuboradi. Kollektor ishlamasa partiya tashlab
+    yuboriladi - tracing botni sekinlashtirmasligi kerak.
+    """
+
+    def __init__(self, endpoint: str, service_name: str = "uykelishuv-bot",
+                 batch_size: int = 512, max_queue: int = 4096, interval: float = 5.0,
+                 client: Optional[httpx.AsyncClient] = None):
+        self.endpoint = endpoint
+        self.service_name = service_name
+        self.batch_size = batch_size
+        self.interval = interval
+        self.queue: deque = deque(maxlen=max_queue)
+        self.dropped = 0
+        self.client = client or httpx.AsyncClient(timeout=httpx.Timeout(5.0))
+
+    def export(self, span: Span) -> None:
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append(span)
+
+    async def flush(self) -> int:
+        """
+        Navbatdagi barcha span larni yuborish
+
+        Returns:
+            int: Kollektor qabul qilgan span lar soni
+        """
+        sent = 0
+        while self.queue:
+            batch = [self.queue.popleft() for _ in range(min(self.batch_size, len(self.queue)))]
+            try:
+                response = await self.client.post(self.endpoint, json=to_otlp(batch, self.service_name))
+                if response.status_code >= 400:
+                    raise httpx.HTTPStatusError(
+                        f"collector returned {response.status_code}", request=response.request, response=response
+                    )
+                sent += len(batch)
+            except httpx.HTTPError as e:
+                self.dropped += len(batch)
+                logger.warning(f"Trace export failed, {len(batch)} spans dropped: {e}")
+                break
+        return sent
+
+    async def run_forever(self) -> None:
+        """Navbatni vaqti-vaqti bilan yuborish (fonda ishlaydi)"""
+        while True:
+            await asyncio.sleep(self.interval)
+            await self.flush()
+
+    async def close(self) -> None:
+        """Qolgan span larni yuborib, ulanishlarni yopish"""
+        try:
+            await self.flush()
+        finally:
+            await self.client.aclose()
@@ -0,0 +1,204 @@
+"""
+Update Recorder - Kiruvchi update larni anonimlashtirib yozib olish
+
+Yozuv gzip JSONL: birinchi qator sarlavha, keyingilari
+{"t": <boshlanishdan soniya>, "update": {...}}. Fayl benchmarks/bench_replay.py
+bilan botga qayta beriladi - haqiqiy trafik shaklida versiyalarni solishtirish
+uchun.
+
+Anonimlashtirish:
+- foydalanuvchi va chat ID lari HMAC(salt) psevdonimlari bilan almashtiriladi
+  (bir foydalanuvchi - har doim bir psevdonim, holatlar replay da saqlanadi)
+- ism, familiya, username olib tashlanadi, telefon soxta raqamga almashadi
+- matndagi harflar "x" ga almashadi, raqamlar saqlanadi (narx, xonalar),
+  7 va undan uzun raqamlar ketma-ketligi (telefon, karta) nollanadi;
+  buyruqlar (/start) va callback data o'zgarmaydi
+- fayl ID lari xeshlanadi, joylashuv ~1 km gacha yaxlitlanadi
+
+Vaqt update handlerga yetib kelganda olinadi (navbatdan chiqqanda) - bot
+ortda qolmaganda bu Telegram dan kelish vaqtiga teng.
+"""
+import asyncio
+import gzip
+import hashlib
+import hmac
+import json
+import logging
+import re
+import secrets
+import time
+from datetime import datetime
+from typing import Optional, Dict, List, Any, Iterator, Tuple
+from src.utils import async_fs
+
+logger = logging.getLogger(__name__)
+
+RECORDING_VERSION = 1
+
+# Barcha handlerlardan oldin ishlaydigan guruh
+RECORDER_GROUP = -100
+
+# Foydalanuvchi yoki chat obyektlari joylashadigan kalitlar
+_IDENTITY_KEYS = {'from', 'chat', 'user', 'contact', 'sender_chat', 'forward_from', 'forward_from_chat', 'via_bot'}
+_DROPPED_KEYS = {'last_name', 'username', 'bio', 'invite_link', 'vcard'}
+_TEXT_KEYS = {'text', 'caption', 'query'}
+_FILE_KEYS = {'file_id', 'file_unique_id'}
+_LONG_DIGITS = re.compile(r"\d{7,}")
+
+
+def pseudonym(value: int, salt: str) -> int:
+    """Telegram ID ning barqaror psevdonimi (ishora saqlanadi - guruhlar manfiy)"""
+    digest = hmac.new(salt.encode(), str(abs(value)).encode(), hashlib.sha256).digest()
+    result = 10_000_000_000 + int.from_bytes(digest[:6], 'big') % 1_000_000_000_000
+    return -result if value < 0 else result
+
+
+def fake_phone(value: int, salt: str) -> str:
+    """Psevdonimga bog'langan soxta telefon raqami"""
+    return f"+99890{pseudonym(value, salt) % 10_000_000:07d}"
+
+
+def anonymize_text(text: str) -> str:
+    """Harflarni "x" ga almashtirish; buyruq va qisqa raqamlar saqlanadi"""
+    command = ""
+    if text.startswith('/'):
+        command, _, text = text.partition(' ')
+        if not text:
+            return command
+        command += ' '
+    masked = _LONG_DIGITS.sub(lambda match: '0' * len(match.group()), text)
+    masked = ''.join(('X' if char.isupper() else 'x') if char.isalpha() else char for char in masked)
+    return command + masked
+
+
+def _file_id(value: str, salt: str) -> str:
+    return "REC" + hmac.new(salt.encode(), value.encode(), hashlib.sha256).hexdigest()[:24]
+
+
+def anonymize(data: Any, salt: str, key: Optional[str] = None) -> Any:
+    """Update (dict) ning anonim nusxasi"""
+    if isinstance(data, list):
+        return [anonymize(item, salt, key) for item in data]
+    if not isinstance(data, dict):
+        return data
+
+    result: Dict[str, Any] = {}
+    for name, value in data.items():
+        if name in _DROPPED_KEYS:
+            continue
+        if key in _IDENTITY_KEYS and name == 'id' and isinstance(value, int):
+            result[name] = pseudonym(value, salt)
+        elif key in _IDENTITY_KEYS and name in ('first_name', 'title'):
+            result[name] = "Foydalanuvchi" if name == 'first_name' else "Chat"
+        elif name == 'user_id' and isinstance(value, int):
+            result[name] = pseudonym(value, salt)
+        elif name == 'phone_number' and isinstance(value, str):
+            result[name] = fake_phone(data.get('user_id') or 0, salt)
+        elif name in _TEXT_KEYS and isinstance(value, str):
+            result[name] = anonymize_text(value)
+        elif name in _FILE_KEYS and isinstance(value, str):
+            result[name] = _file_id(value, salt)
+        elif name == 'chat_instance':
+            result[name] = _file_id(str(value), salt)
+        elif name in ('latitude', 'longitude') and isinstance(value, (int, float)):
+            result[name] = round(value, 2)
+        else:
+            result[name] = anonymize(value, salt, name)
+    return result
+
+
+def read_recording(path: str) -> Iterator[Tuple[float, Dict[str, Any]]]:
+    """
+    Yozuvni o'qish: (vaqt, update) juftliklari
+
+    Bot qayta ishga tushib o'sha faylga yozishni davom ettirgan bo'lsa,
+    har bir yangi sarlavhadan keyingi vaqtlar avvalgisining oxiriga suriladi.
+    """
+    offset = last = 0.0
+    with gzip.open(path, 'rt', encoding='utf-8') as file:
+        for line in file:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if 'update' in record:
+                last = offset + record['t']
+                yield last, record['update']
+            else:
+                offset = last
+
+
+class UpdateRecorder:
+    """
+    Update larni gzip JSONL ga yozuvchi
+
+    Qatorlar xotirada to'planadi va flush_every ta yoki flush_interval
+    soniyadan keyin fonda, alohida thread da fayl oxiriga yangi gzip
+    bo'lagi sifatida qo'shiladi - update larni kechiktirmaydi, jarayon
+    to'satdan to'xtasa ham yozilgan qismi o'qiladi.
+
+    Args:
+        path: Fayl yo'li (.jsonl.gz)
+        salt: Psevdonimlar kaliti (bo'sh bo'lsa tasodifiy - snapshot ni
+            bir xil anonimlashtirib bo'lmaydi)
+        flush_every: Diskka yozishdan oldin to'planadigan update lar
+        flush_interval: Bufer diskka yozilmay turadigan eng ko'p vaqt (soniya)
+    """
+
+    def __init__(self, path: str, salt: str = "", flush_every: int = 100, flush_interval: float = 10.0):
+        self.path = path
+        if not salt:
+            logger.warning("UPDATE_RECORDING_SALT berilmagan - tasodifiy kalit ishlatiladi")
+            salt = secrets.token_hex(16)
+        self.salt = salt
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval
+        self.recorded = 0
+        self._flushed_at = time.monotonic()
+        self._started: Optional[float] = None
+        self._buffer: List[str] = []
+        self._lock = asyncio.Lock()
+        self._flush_task: Optional[asyncio.Task] = None
+
+    async def record(self, update, context=None) -> None:
+        """PTB TypeHandler callback i"""
+        self.add(update.to_dict())
+        due = len(self._buffer) >= self.flush_every or time.monotonic() - self._flushed_at >= self.flush_interval
+        if due and (self._flush_task is None or self._flush_task.done()):
+            self._flush_task = asyncio.create_task(self.flush())
+
+    def add(self, update_data: Dict[str, Any]) -> None:
+        """Update ni buferga qo'shish"""
+        now = time.monotonic()
+        if self._started is None:
+            self._started = now
+            self._buffer.append(json.dumps({
+                'version': RECORDING_VERSION,
+                'started_at': datetime.utcnow().isoformat(),
+                'anonymized': True
+            }))
+        record = {'t': round(now - self._started, 4), 'update': anonymize(update_data, self.salt)}
+        self._buffer.append(json.dumps(record, ensure_ascii=False))
+        self.recorded += 1
+
+    def _write(self, lines: List[str]) -> None:
+        with gzip.open(self.path, 'at', encoding='utf-8') as file:
+            file.write('\n'.join(lines) + '\n')
+
+    async def flush(self) -> None:
+        """Buferni diskka yozish"""
+        async with self._lock:
+            if not self._buffer:
+                return
+            lines, self._buffer = self._buffer, []
+            self._flushed_at = time.monotonic()
+            try:
+                await async_fs.run(self._write, lines)
+            except OSError as e:
+                logger.error(f"Update yozuvini saqlashda xatolik: {e}")
+
+    async def close(self) -> None:
+        if self._flush_task is not None:
+            await self._flush_task
+        await self.flush()
+        logger.info(f"{self.recorded} ta update {self.path} ga yozildi")
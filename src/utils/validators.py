@@ -34,4 +34,46 @@ def validate_region(region_code: str) -> bool:
 
 def validate_price(price: float) -> bool:
     """Narxni validatsiya qilish"""
-    return price > 0 and price <= 1000000
\ No newline at end of file
+    return price > 0 and price <= 1000000
+
+# Rasm turini aniqlash uchun kerak bo'ladigan boshlang'ich baytlar soni
+IMAGE_HEADER_SIZE = 12
+
+IMAGE_EXTENSIONS = {
+    'image/jpeg': ('.jpg', '.jpeg'),
+    'image/png': ('.png',),
+    'image/gif': ('.gif',),
+    'image/webp': ('.webp',),
+}
+
+
+def detect_image_type(header: bytes) -> Optional[str]:
+    """
+    Fayl boshidagi "magic" baytlardan rasm turini aniqlash
+    
+    Kengaytma yoki Telegram yuborgan mime_type ga ishonib bo'lmaydi -
+    haqiqiy tur fayl tarkibidan olinadi.
+    
+    Args:
+        header: Faylning kamida IMAGE_HEADER_SIZE ta birinchi bayti
+    
+    Returns:
+        Optional[str]: MIME turi yoki None (rasm emas)
+    """
+    if header.startswith(b'\xff\xd8\xff'):
+        return 'image/jpeg'
+    if header.startswith(b'\x89PNG\r\n\x1a\n'):
+        return 'image/png'
+    if header[:6] in (b'GIF87a', b'GIF89a'):
+        return 'image/gif'
+    if header[:4] == b'RIFF' and header[8:12] == b'WEBP':
+        return 'image/webp'
+    return None
+
+
+def validate_image_file(header: bytes, file_name: str) -> bool:
+    """Fayl tarkibi rasm ekanligi va kengaytmasi tarkibiga mosligini tekshirish"""
+    image_type = detect_image_type(header)
+    if image_type is None:
+        return False
+    return file_name.lower().endswith(IMAGE_EXTENSIONS[image_type])
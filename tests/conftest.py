@@ -19,6 +19,7 @@ from src.services.validation_service import ValidationService
 from src.services.keyboard_builder import KeyboardBuilder
 from src.services.message_builder import MessageBuilder
 from src.bot.handlers.listing_handlers import ListingHandlers
+from src.utils.query_budget import count_engine_queries, query_budget
 
 
 @pytest.fixture(scope="session")
@@ -53,6 +54,13 @@ async def test_db() -> AsyncGenerator[AsyncSession, None]:
     await engine.dispose()
 
 
+@pytest.fixture
+def db_query_budget(test_db: AsyncSession):
+    """Test bazasi so'rovlarini yo'nalish byudjeti bilan tekshirish (query_budget)"""
+    count_engine_queries(test_db.bind)
+    return query_budget
+
+
 @pytest.fixture
 def mock_user() -> User:
     """Mock Telegram user"""
@@ -0,0 +1,77 @@
+"""
+End-to-End Tests - Bot va soxta Bot API server (haqiqiy HTTP yo'li)
+"""
+import time
+import pytest
+import pytest_asyncio
+from telegram import Bot
+from telegram.error import RetryAfter
+
+from src.config import settings
+from src.bot.client_telegram import UyKelishuvBot
+from tools.fake_bot_api import FakeBotAPI, FakeBotAPIServer, default_file
+
+TOKEN = "123456789:FAKE-token-for-local-testing"
+
+
+@pytest_asyncio.fixture
+async def server():
+    """Lokal soxta Bot API server"""
+    server = FakeBotAPIServer(FakeBotAPI(latency=0.05, chat_rate=2))
+    await server.start()
+    yield server
+    await server.stop()
+
+
+def make_bot(server: FakeBotAPIServer) -> Bot:
+    return Bot(TOKEN, base_url=server.base_url, base_file_url=server.base_file_url)
+
+
+@pytest.mark.asyncio
+class TestFakeBotAPIServer:
+    """Fake Bot API server tests"""
+
+    async def test_bot_polls_and_replies(self, server, monkeypatch):
+        """Test the bot long-polls getUpdates and answers /help over HTTP"""
+        monkeypatch.setattr(settings, 'telegram_api_url', server.url)
+        bot = UyKelishuvBot()
+        application = bot.application
+        await bot.start()
+        await application.initialize()
+        await application.start()
+        await application.updater.start_polling(poll_interval=0, timeout=1)
+        try:
+            user = {'id': 42, 'is_bot': False, 'first_name': "Test"}
+            server.api.push_update({'message': server.api.user_message(user, "/help")})
+            reply = await server.api.wait_bot_message(42, timeout=10)
+        finally:
+            await application.updater.stop()
+            await application.stop()
+            await application.shutdown()
+
+        assert "Yordam" in reply['text']
+        assert server.api.buttons(42) == ["MAIN_MENU"]
+        assert server.api.calls['getUpdates'] >= 1
+        # Tasdiqlangan update qayta berilmaydi
+        assert not server.api.pending_updates
+
+    async def test_latency_and_flood_limit(self, server):
+        """Test configured latency is observed and the chat limit raises RetryAfter"""
+        async with make_bot(server) as bot:
+            started = time.perf_counter()
+            await bot.send_message(7, "birinchi")
+            assert time.perf_counter() - started >= 0.05
+            await bot.send_message(7, "ikkinchi")
+            with pytest.raises(RetryAfter):
+                await bot.send_message(7, "uchinchi")
+
+    async def test_photo_upload_and_download(self, server):
+        """Test multipart uploads are stored and served from the file endpoint"""
+        content = default_file()
+        async with make_bot(server) as bot:
+            message = await bot.send_photo(7, photo=content, caption="Rasm")
+            file = await bot.get_file(message.photo[-1].file_id)
+            downloaded = await file.download_as_bytearray()
+
+        assert message.caption == "Rasm"
+        assert bytes(downloaded) == content
@@ -0,0 +1,317 @@
+"""
+Integration Tests - Admin Service
+"""
+from datetime import datetime, timedelta
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, event
+from src.services.admin_service import AdminService
+from src.database.models import Listing, ListingMedia, ListingType, ListingStatus, PhotoHash, User
+from src.config import ADMIN_IDS
+
+
+@pytest.fixture
+def admin_id() -> int:
+    """Admin Telegram ID"""
+    return ADMIN_IDS[0] if ADMIN_IDS else 924016177
+
+
+@pytest.fixture
+def admin_service(test_db) -> AdminService:
+    """Admin service fixture"""
+    return AdminService(test_db)
+
+
+@pytest_asyncio.fixture
+async def pending_listings(test_db, test_user):
+    """Bir nechta pending e'lonlar"""
+    listings = []
+    for i in range(3):
+        listing = Listing(
+            user_id=test_user.id,
+            region_code="14",
+            city_name="Chilonzor",
+            type=ListingType.ijara,
+            rooms=i + 1,
+            price=300.0 + i * 100,
+            currency="USD",
+            title=f"Pending Listing {i}",
+            status=ListingStatus.pending
+        )
+        test_db.add(listing)
+        listings.append(listing)
+    await test_db.commit()
+    return listings
+
+
+@pytest_asyncio.fixture
+async def many_users(test_db):
+    """25 ta foydalanuvchi (har 5-chisi bloklangan)"""
+    users = []
+    for i in range(25):
+        user = User(
+            telegram_user_id=5000 + i,
+            name=f"User {i}",
+            verified=i % 2 == 0,
+            blocked=i % 5 == 0
+        )
+        test_db.add(user)
+        users.append(user)
+    await test_db.commit()
+    return users
+
+
+@pytest.mark.asyncio
+class TestAdminServiceBulkModeration:
+    """Admin service bulk moderation tests"""
+    
+    async def test_bulk_approve_listings(self, test_db, admin_service, admin_id, pending_listings, test_user):
+        """Test bulk approve returns owner data for notifications"""
+        ids = [listing.id for listing in pending_listings[:2]]
+        
+        rows = await admin_service.bulk_approve_listings(ids, admin_id)
+        
+        assert {row.id for row in rows} == set(ids)
+        assert all(row.owner_telegram_id == test_user.telegram_user_id for row in rows)
+        
+        result = await test_db.execute(select(Listing.id, Listing.status))
+        statuses = dict(result.all())
+        assert statuses[ids[0]] == ListingStatus.approved
+        assert statuses[ids[1]] == ListingStatus.approved
+        assert statuses[pending_listings[2].id] == ListingStatus.pending
+    
+    async def test_bulk_approve_skips_non_pending(self, admin_service, admin_id, pending_listings, test_listing):
+        """Test bulk approve only touches pending listings"""
+        rows = await admin_service.bulk_approve_listings([test_listing.id, pending_listings[0].id], admin_id)
+        
+        assert [row.id for row in rows] == [pending_listings[0].id]
+    
+    async def test_bulk_reject_listings(self, test_db, admin_service, admin_id, pending_listings):
+        """Test bulk reject stores the reason"""
+        ids = [listing.id for listing in pending_listings]
+        
+        rows = await admin_service.bulk_reject_listings(ids, admin_id, "Takroriy e'lon")
+        
+        assert len(rows) == 3
+        result = await test_db.execute(
+            select(Listing.rejection_reason).where(Listing.status == ListingStatus.rejected)
+        )
+        assert set(result.scalars().all()) == {"Takroriy e'lon"}
+    
+    async def test_bulk_delete_listings(self, test_db, admin_service, admin_id, pending_listings):
+        """Test bulk delete"""
+        ids = [listing.id for listing in pending_listings[:2]]
+        
+        deleted_ids = await admin_service.bulk_delete_listings(ids, admin_id)
+        
+        assert set(deleted_ids) == set(ids)
+        result = await test_db.execute(select(Listing.id))
+        assert result.scalars().all() == [pending_listings[2].id]
+    
+    async def test_delete_removes_media_and_photo_hashes(self, test_db, admin_service, admin_id, pending_listings):
+        """Test single and bulk delete remove listing_media and photo_hashes rows too"""
+        for listing in pending_listings:
+            test_db.add(ListingMedia(listing_id=listing.id, position=0, file_id=f"file-{listing.id}"))
+            test_db.add(PhotoHash(listing_id=listing.id, dhash=1, band0=1, band1=0, band2=0, band3=0))
+        await test_db.commit()
+        
+        assert await admin_service.delete_listing(pending_listings[0].id, admin_id) is True
+        await admin_service.bulk_delete_listings([pending_listings[1].id], admin_id)
+        
+        media = await test_db.execute(select(ListingMedia.listing_id))
+        hashes = await test_db.execute(select(PhotoHash.listing_id))
+        assert media.scalars().all() == [pending_listings[2].id]
+        assert hashes.scalars().all() == [pending_listings[2].id]
+    
+    async def test_bulk_operations_require_admin(self, admin_service, pending_listings):
+        """Test non-admin users cannot moderate"""
+        ids = [listing.id for listing in pending_listings]
+        
+        assert await admin_service.bulk_approve_listings(ids, 1) == []
+        assert await admin_service.bulk_reject_listings(ids, 1) == []
+        assert await admin_service.bulk_delete_listings(ids, 1) == []
+    
+    async def test_bulk_operations_empty_ids(self, admin_service, admin_id):
+        """Test empty id list is a no-op"""
+        assert await admin_service.bulk_approve_listings([], admin_id) == []
+        assert await admin_service.bulk_delete_listings([], admin_id) == []
+
+
+@pytest.mark.asyncio
+class TestAdminServicePendingQueue:
+    """Moderation queue ordering tests"""
+    
+    async def test_duplicates_are_last(self, test_db, admin_service, pending_listings):
+        """Test likely duplicates are moved to the end of the queue"""
+        pending_listings[2].duplicate_of_id = pending_listings[0].id
+        await test_db.commit()
+        
+        listings = await admin_service.get_pending_listings()
+        
+        assert [listing.id for listing in listings][-1] == pending_listings[2].id
+        assert len(listings) == 3
+    
+    async def test_duplicates_are_last_in_summaries(self, test_db, admin_service, pending_listings):
+        """Test bulk moderation summaries use the same duplicate-last order"""
+        now = datetime.utcnow()
+        for age, listing in enumerate(pending_listings):
+            listing.created_at = now - timedelta(minutes=age)
+        # Eng yangi e'lon takror - baribir oxirida bo'lishi kerak
+        pending_listings[0].duplicate_of_id = pending_listings[2].id
+        await test_db.commit()
+        
+        summaries = await admin_service.get_pending_listing_summaries()
+        
+        assert summaries[-1].id == pending_listings[0].id
+        assert len(summaries) == 3
+
+
+@pytest.mark.asyncio
+class TestAdminServiceModeration:
+    """Admin service single listing moderation tests"""
+    
+    async def test_approve_listing_single_round_trip(self, test_db, admin_service, admin_id, pending_listings, test_user):
+        """Test approve returns owner data using one statement"""
+        statements = []
+        
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        sync_engine = test_db.bind.sync_engine
+        event.listen(sync_engine, "before_cursor_execute", count_statement)
+        try:
+            approved = await admin_service.approve_listing(pending_listings[0].id, admin_id)
+        finally:
+            event.remove(sync_engine, "before_cursor_execute", count_statement)
+        
+        assert approved is not None
+        assert approved.id == pending_listings[0].id
+        assert approved.owner_telegram_id == test_user.telegram_user_id
+        assert approved.owner_name == test_user.name
+        assert len(statements) == 1
+        assert statements[0].startswith("UPDATE")
+    
+    async def test_reject_listing_returns_owner(self, test_db, admin_service, admin_id, pending_listings, test_user):
+        """Test reject stores reason and returns owner data"""
+        rejected = await admin_service.reject_listing(pending_listings[1].id, admin_id, "Noto'g'ri narx")
+        
+        assert rejected.owner_telegram_id == test_user.telegram_user_id
+        
+        result = await test_db.execute(
+            select(Listing.status, Listing.rejection_reason).where(Listing.id == pending_listings[1].id)
+        )
+        assert result.one() == (ListingStatus.rejected, "Noto'g'ri narx")
+    
+    async def test_approve_listing_not_found(self, admin_service, admin_id):
+        """Test approving a missing listing returns None"""
+        assert await admin_service.approve_listing("non-existing-id", admin_id) is None
+    
+    async def test_approve_listing_requires_admin(self, admin_service, pending_listings):
+        """Test non-admin users cannot approve"""
+        assert await admin_service.approve_listing(pending_listings[0].id, 1) is None
+
+
+@pytest.mark.asyncio
+class TestAdminServiceStreaming:
+    """Admin service streaming and pagination tests"""
+    
+    async def test_get_user_counts(self, admin_service, many_users):
+        """Test user counts come from one aggregate query"""
+        counts = await admin_service.get_user_counts()
+        
+        assert counts == {'total': 25, 'verified': 13, 'blocked': 5}
+    
+    async def test_get_users_page(self, admin_service, many_users):
+        """Test users pagination"""
+        first_page, has_next = await admin_service.get_users_page(page=0, per_page=10)
+        last_page, last_has_next = await admin_service.get_users_page(page=2, per_page=10)
+        
+        assert len(first_page) == 10
+        assert has_next is True
+        assert len(last_page) == 5
+        assert last_has_next is False
+    
+    async def test_get_users_page_blocked_filter(self, admin_service, many_users):
+        """Test blocked users pagination"""
+        users, has_next = await admin_service.get_users_page(page=0, per_page=10, blocked=True)
+        
+        assert len(users) == 5
+        assert all(user.blocked for user in users)
+        assert has_next is False
+    
+    async def test_get_listings_page(self, admin_service, pending_listings):
+        """Test listings pagination"""
+        listings, has_next = await admin_service.get_listings_page(page=0, per_page=2, status=ListingStatus.pending)
+        
+        assert len(listings) == 2
+        assert has_next is True
+    
+    async def test_get_listings_count(self, admin_service, pending_listings, test_listing):
+        """Test listings are counted with a status filter"""
+        assert await admin_service.get_listings_count(ListingStatus.pending) == 3
+        assert await admin_service.get_listings_count() == 4
+
+
+@pytest_asyncio.fixture
+async def searchable_users(test_db):
+    """Qidiruv uchun foydalanuvchilar"""
+    users = [
+        User(telegram_user_id=7001, name="Alisher Navoiy", phone_number="+998901112233"),
+        User(telegram_user_id=7002, name="ALIYA Karimova"),
+        User(telegram_user_id=7003, name="O‘tkir Hoshimov"),
+        User(telegram_user_id=7004, name="Bobur Mirzo"),
+        User(telegram_user_id=7005, name="100%_foydalanuvchi"),
+    ]
+    test_db.add_all(users)
+    await test_db.commit()
+    return users
+
+
+@pytest.mark.asyncio
+class TestAdminServiceUserSearch:
+    """Admin service user search tests"""
+    
+    async def test_search_by_telegram_id(self, admin_service, searchable_users):
+        """Test exact telegram id match"""
+        users, has_next = await admin_service.search_users("7004")
+        
+        assert [user.name for user in users] == ["Bobur Mirzo"]
+        assert has_next is False
+    
+    async def test_search_by_phone(self, admin_service, searchable_users):
+        """Test phone number match in different formats"""
+        for query in ("+998901112233", "998 90 111 22 33", "901112233"):
+            users, _ = await admin_service.search_users(query)
+            assert [user.telegram_user_id for user in users] == [7001], query
+    
+    async def test_search_by_name_prefix_case_insensitive(self, admin_service, searchable_users):
+        """Test name prefix search ignores case"""
+        users, _ = await admin_service.search_users("ali")
+        
+        assert [user.telegram_user_id for user in users] == [7001, 7002]
+    
+    async def test_search_normalizes_apostrophes(self, admin_service, searchable_users):
+        """Test different apostrophe characters match each other"""
+        users, _ = await admin_service.search_users("O'tkir")
+        
+        assert [user.telegram_user_id for user in users] == [7003]
+    
+    async def test_search_treats_wildcards_literally(self, admin_service, searchable_users):
+        """Test LIKE wildcards in the query are not special"""
+        assert await admin_service.search_users("%") == ([], False)
+        users, _ = await admin_service.search_users("100%_")
+        assert [user.telegram_user_id for user in users] == [7005]
+    
+    async def test_search_pagination(self, admin_service, many_users):
+        """Test search results are paginated"""
+        first_page, has_next = await admin_service.search_users("user", page=0, per_page=10)
+        last_page, last_has_next = await admin_service.search_users("user", page=2, per_page=10)
+        
+        assert len(first_page) == 10
+        assert has_next is True
+        assert len(last_page) == 5
+        assert last_has_next is False
+    
+    async def test_search_empty_query(self, admin_service, searchable_users):
+        """Test empty query returns nothing"""
+        assert await admin_service.search_users("   ") == ([], False)
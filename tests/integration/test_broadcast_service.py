@@ -0,0 +1,135 @@
+"""
+Integration Tests - Broadcast Service
+"""
+import pytest
+import pytest_asyncio
+from unittest.mock import AsyncMock, MagicMock
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from telegram.error import Forbidden, RetryAfter
+from src.services.broadcast_service import BroadcastService
+from src.database.models import User, Broadcast, BroadcastStatus
+
+
+@pytest_asyncio.fixture
+async def recipients(test_db):
+    """10 ta foydalanuvchi (9000 bloklangan)"""
+    users = [
+        User(telegram_user_id=9000 + i, name=f"Recipient {i}", blocked=i == 0)
+        for i in range(10)
+    ]
+    test_db.add_all(users)
+    await test_db.commit()
+    return users
+
+
+@pytest.fixture
+def bot() -> MagicMock:
+    """Fake bot"""
+    bot = MagicMock()
+    bot.send_message = AsyncMock()
+    bot.edit_message_text = AsyncMock()
+    return bot
+
+
+@pytest.fixture
+def broadcast_service(test_db, bot) -> BroadcastService:
+    """Broadcast service fixture (test bazasi bilan)"""
+    session_factory = async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False)
+    return BroadcastService(
+        session_factory, bot=bot, rate=1000, concurrency=5, chunk_size=3, progress_interval=0
+    )
+
+
+def _sent_chat_ids(bot: MagicMock) -> list:
+    """Xabar yuborilgan chatlar"""
+    return [call.kwargs['chat_id'] for call in bot.send_message.await_args_list]
+
+
+@pytest.mark.asyncio
+class TestBroadcastService:
+    """Broadcast service tests"""
+    
+    async def test_broadcast_sends_to_reachable_users(self, broadcast_service, bot, recipients):
+        """Test every non-blocked user receives the message once"""
+        broadcast = await broadcast_service.create_broadcast(1, "Yangilik")
+        
+        finished = await broadcast_service.run(broadcast.id)
+        
+        assert sorted(_sent_chat_ids(bot)) == list(range(9001, 9010))
+        assert finished.status == BroadcastStatus.completed
+        assert finished.total_count == 9
+        assert finished.sent_count == 9
+        assert finished.last_telegram_user_id == 9009
+    
+    async def test_forbidden_marks_user_unreachable(self, test_db, broadcast_service, bot, recipients):
+        """Test users who blocked the bot are skipped next time"""
+        async def send_message(chat_id, text):
+            if chat_id == 9003:
+                raise Forbidden("Forbidden: bot was blocked by the user")
+        
+        bot.send_message.side_effect = send_message
+        broadcast = await broadcast_service.create_broadcast(1, "Birinchi")
+        
+        finished = await broadcast_service.run(broadcast.id)
+        
+        assert finished.sent_count == 8
+        assert finished.unreachable_count == 1
+        result = await test_db.execute(select(User.telegram_user_id).where(User.unreachable == True))
+        assert result.scalars().all() == [9003]
+        
+        bot.send_message.reset_mock()
+        bot.send_message.side_effect = None
+        second = await broadcast_service.create_broadcast(1, "Ikkinchi")
+        await broadcast_service.run(second.id)
+        
+        assert 9003 not in _sent_chat_ids(bot)
+        assert second.total_count == 8
+    
+    async def test_broadcast_resumes_from_saved_cursor(self, test_db, broadcast_service, bot, recipients):
+        """Test a restarted broadcast continues after the persisted cursor"""
+        broadcast = await broadcast_service.create_broadcast(1, "Davomi")
+        # Oldingi ishga tushirishda 9005 gacha yuborilgan
+        stored = await test_db.get(Broadcast, broadcast.id)
+        stored.last_telegram_user_id = 9005
+        stored.sent_count = 5
+        await test_db.commit()
+        
+        assert await broadcast_service.resume_unfinished() == 1
+        finished = await broadcast_service.start(broadcast.id)
+        
+        assert sorted(_sent_chat_ids(bot)) == [9006, 9007, 9008, 9009]
+        assert finished.sent_count == 9
+    
+    async def test_retry_after_is_respected(self, broadcast_service, bot, recipients):
+        """Test flood control errors are retried"""
+        bot.send_message.side_effect = [RetryAfter(0)] + [None] * 9
+        broadcast = await broadcast_service.create_broadcast(1, "Qayta")
+        
+        finished = await broadcast_service.run(broadcast.id)
+        
+        assert finished.sent_count == 9
+        assert finished.failed_count == 0
+    
+    async def test_cancelled_broadcast_stops(self, broadcast_service, bot, recipients):
+        """Test a cancelled broadcast is not sent"""
+        broadcast = await broadcast_service.create_broadcast(1, "Bekor")
+        
+        assert await broadcast_service.cancel(broadcast.id) is True
+        finished = await broadcast_service.run(broadcast.id)
+        
+        assert finished.status == BroadcastStatus.cancelled
+        bot.send_message.assert_not_awaited()
+    
+    async def test_progress_message_is_updated(self, broadcast_service, bot, recipients):
+        """Test admin progress message shows counts and rate"""
+        broadcast = await broadcast_service.create_broadcast(
+            1, "Progress", progress_chat_id=1, progress_message_id=42
+        )
+        
+        await broadcast_service.run(broadcast.id)
+        
+        text = bot.edit_message_text.await_args.kwargs['text']
+        assert "Yakunlandi" in text
+        assert "9/9" in text
+        assert "xabar/soniya" in text
@@ -0,0 +1,118 @@
+"""
+Integration Tests - /healthz and /readyz
+"""
+import asyncio
+import time
+from unittest.mock import MagicMock
+import httpx
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.utils.health import HealthChecker
+from src.utils.http_server import HTTPServer
+
+
+def _application(running=True, queued=0):
+    """Polling ishlayotgan PTB Application o'rnini bosuvchi"""
+    application = MagicMock()
+    application.running = running
+    application.updater.running = running
+    application.update_queue = asyncio.Queue()
+    for index in range(queued):
+        application.update_queue.put_nowait(index)
+    return application
+
+
+class HangingHealthChecker(HealthChecker):
+    """Bazasi javob bermayotgan holat"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.pings = 0
+
+    async def _ping_db(self) -> float:
+        self.pings += 1
+        await asyncio.sleep(30)
+        return 30.0
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    """Fayldagi SQLite bazasi"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'health.db'}")
+    yield engine
+    await engine.dispose()
+
+
+async def _get(health: HealthChecker, path: str) -> httpx.Response:
+    server = HTTPServer("127.0.0.1", 0)
+    server.route('/healthz', health.liveness)
+    server.route('/readyz', health.readiness)
+    await server.start()
+    try:
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}") as client:
+            return await client.get(path)
+    finally:
+        await server.stop()
+
+
+@pytest.mark.asyncio
+class TestHealthEndpoints:
+    """Health server tests"""
+
+    async def test_ready_when_everything_is_up(self, engine):
+        """Test /readyz and /healthz report ok with pool and loop stats"""
+        health = HealthChecker(engine, _application(queued=3))
+
+        live = await _get(health, '/healthz')
+        ready = await _get(health, '/readyz')
+
+        assert live.status_code == 200 and live.json()['status'] == 'ok'
+        body = ready.json()
+        assert ready.status_code == 200 and body['status'] == 'ready'
+        assert body['checks']['database']['ok'] is True
+        assert body['update_queue_depth'] == 3
+        assert set(body['db_pool']) == {'size', 'checkedout', 'overflow'}
+        assert 'event_loop_lag_ms' in body
+
+    async def test_not_ready_when_polling_stopped_or_queue_backed_up(self, engine):
+        """Test Telegram and queue checks fail readiness"""
+        stopped = await _get(HealthChecker(engine, _application(running=False)), '/readyz')
+        backed_up = await _get(HealthChecker(engine, _application(queued=5), max_queue_depth=2), '/readyz')
+
+        assert stopped.status_code == 503
+        assert stopped.json()['checks']['telegram']['ok'] is False
+        assert backed_up.status_code == 503
+        assert backed_up.json()['checks']['update_queue']['detail'] == "5/2"
+
+    async def test_slow_database_never_blocks(self, engine):
+        """Test a hanging DB check returns 503 quickly and is not piled up"""
+        health = HangingHealthChecker(engine, _application(), db_timeout=0.1)
+
+        started = time.perf_counter()
+        first = await _get(health, '/readyz')
+        second = await _get(health, '/readyz')
+        live = await _get(health, '/healthz')
+        elapsed = time.perf_counter() - started
+
+        assert first.status_code == 503 and second.status_code == 503
+        assert first.json()['checks']['database']['detail'].startswith("timeout")
+        assert live.status_code == 200
+        assert elapsed < 2
+        assert health.pings == 1
+        health._probe.cancel()
+
+    async def test_db_result_is_cached(self, engine):
+        """Test frequent probes do not hit the database every time"""
+        health = HealthChecker(engine, _application(), cache_ttl=60)
+        calls = []
+        ping = health._ping_db
+
+        async def counting_ping():
+            calls.append(1)
+            return await ping()
+
+        health._ping_db = counting_ping
+        for _ in range(3):
+            assert (await health.check_db())[0] is True
+        assert len(calls) == 1
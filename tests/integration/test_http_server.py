@@ -0,0 +1,46 @@
+"""
+Integration Tests - In-process HTTP server
+"""
+import httpx
+import pytest
+from src.utils.http_server import HTTPServer
+from src.utils.metrics import metrics_endpoint
+
+
+@pytest.mark.asyncio
+class TestHTTPServer:
+    """HTTP server tests"""
+    
+    async def test_metrics_endpoint(self):
+        """Test /metrics is served in Prometheus text format"""
+        server = HTTPServer("127.0.0.1", 0)
+        server.route('/metrics', metrics_endpoint)
+        await server.start()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}") as client:
+                response = await client.get('/metrics')
+                missing = await client.get('/nope')
+                post = await client.post('/metrics')
+        finally:
+            await server.stop()
+        
+        assert response.status_code == 200
+        assert response.headers['content-type'].startswith('text/plain; version=0.0.4')
+        assert '# TYPE bot_handler_duration_seconds histogram' in response.text
+        assert missing.status_code == 404
+        assert post.status_code == 405
+    
+    async def test_handler_errors_return_500(self):
+        """Test a failing route does not take the server down"""
+        async def broken():
+            raise RuntimeError("boom")
+        
+        server = HTTPServer("127.0.0.1", 0)
+        server.route('/broken', broken)
+        await server.start()
+        try:
+            async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{server.port}") as client:
+                assert (await client.get('/broken')).status_code == 500
+                assert (await client.get('/broken')).status_code == 500
+        finally:
+            await server.stop()
@@ -2,8 +2,12 @@
 Integration Tests - Listing Service
 """
 import pytest
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from src.services.listing_service import ListingService
-from src.database.models import Listing, ListingType, ListingStatus
+from src.services.duplicate_service import DuplicateDetector
+from src.database.database import enable_sqlite_foreign_keys
+from src.database.models import Base, Listing, ListingMedia, ListingType, ListingStatus, User
 
 
 @pytest.mark.asyncio
@@ -385,6 +389,42 @@ class TestListingServiceIntegration:
         listing = await listing_service.get_listing_by_id(listing_id)
         assert listing is None
     
+    async def test_delete_listing_removes_media(self, test_db, listing_service, test_listing):
+        """Test deleting a listing removes its listing_media rows"""
+        test_db.add(ListingMedia(listing_id=test_listing.id, position=0, file_id="file-1"))
+        await test_db.commit()
+        
+        assert await listing_service.delete_listing(test_listing.id) is True
+        
+        result = await test_db.execute(select(ListingMedia.id))
+        assert result.scalars().all() == []
+    
+    async def test_sqlite_foreign_keys_cascade(self, tmp_path):
+        """Test the SQLite connect hook makes ON DELETE CASCADE fire"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'fk.db'}")
+        enable_sqlite_foreign_keys(engine)
+        try:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.create_all)
+            session_factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+            async with session_factory() as db:
+                owner = User(telegram_user_id=1, name="Owner")
+                db.add(owner)
+                await db.flush()
+                listing = Listing(user_id=owner.id, region_code="14", city_name="Toshkent",
+                                  type=ListingType.ijara, rooms=2, price=300.0, title="FK")
+                db.add(listing)
+                await db.flush()
+                db.add(ListingMedia(listing_id=listing.id, position=0, file_id="file-1"))
+                await db.commit()
+                
+                await db.execute(Listing.__table__.delete().where(Listing.id == listing.id))
+                await db.commit()
+                result = await db.execute(select(ListingMedia.id))
+                assert result.scalars().all() == []
+        finally:
+            await engine.dispose()
+    
     async def test_delete_listing_not_found(self, test_db, listing_service):
         """Test deleting non-existing listing"""
         success = await listing_service.delete_listing("non-existing-id")
@@ -425,3 +465,110 @@ class TestListingServiceIntegration:
         assert updated_listing is not None
         assert updated_listing.views_count == 100
         assert updated_listing.contacts_count == 5
+
+
+@pytest.mark.asyncio
+class TestListingMedia:
+    """listing_media table tests"""
+    
+    async def test_create_listing_stores_media_rows(self, test_db, listing_service, test_user, valid_listing_data):
+        """Test photo references become ordered listing_media rows"""
+        media = [{'file_id': f"photo-{i}", 'size': 1000 + i, 'width': 800, 'height': 600} for i in range(3)]
+        listing = await listing_service.create_listing(test_user.id, dict(valid_listing_data, media=media))
+        
+        result = await listing_service.get_media_for_listings([listing.id])
+        
+        rows = result[listing.id]
+        assert [row.file_id for row in rows] == ["photo-0", "photo-1", "photo-2"]
+        assert [row.size for row in rows] == [1000, 1001, 1002]
+    
+    async def test_batch_loader_uses_one_query(self, test_db, listing_service, test_user, valid_listing_data):
+        """Test media for a whole page is loaded with a single IN query"""
+        listing_ids = []
+        for count in (2, 0, 1):
+            media = [{'file_id': f"photo-{count}-{i}"} for i in range(count)]
+            listing = await listing_service.create_listing(test_user.id, dict(valid_listing_data, media=media))
+            listing_ids.append(listing.id)
+        
+        statements = []
+        
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(test_db.bind.sync_engine, "before_cursor_execute", count_statement)
+        try:
+            result = await listing_service.get_media_for_listings(listing_ids)
+        finally:
+            event.remove(test_db.bind.sync_engine, "before_cursor_execute", count_statement)
+        
+        assert len(statements) == 1
+        assert [len(result[listing_id]) for listing_id in listing_ids] == [2, 0, 1]
+        assert [row.position for row in result[listing_ids[0]]] == [0, 1]
+
+
+@pytest.mark.asyncio
+class TestListingDuplicateDetection:
+    """Near-duplicate listing detection tests"""
+    
+    DESCRIPTION = (
+        "Chilonzor tumanida 3 xonali kvartira ijaraga beriladi. Evroremont, "
+        "mebel va maishiy texnika bor. Metroga 5 daqiqa piyoda."
+    )
+    
+    def _listing_data(self, title: str, description: str) -> dict:
+        return {
+            'region_code': '14',
+            'city_name': 'Toshkent',
+            'type': 'ijara',
+            'rooms': 3,
+            'price': 500.0,
+            'title': title,
+            'description': description
+        }
+    
+    async def test_resubmission_is_flagged(self, test_db, test_user):
+        """Test a reworded resubmission points at the original listing"""
+        service = ListingService(test_db, DuplicateDetector())
+        original = await service.create_listing(
+            test_user.id, self._listing_data("3 xonali kvartira", self.DESCRIPTION)
+        )
+        repost = await service.create_listing(
+            test_user.id, self._listing_data("3 xonali kvartira!!", self.DESCRIPTION + " Tez kunda bo'shaydi.")
+        )
+        
+        assert original.duplicate_of_id is None
+        assert original.text_signature is not None
+        assert repost.duplicate_of_id == original.id
+        assert repost.duplicate_score >= 0.6
+    
+    async def test_deleted_original_is_forgotten(self, test_db, test_user):
+        """Test deleted listings are removed from the index"""
+        detector = DuplicateDetector()
+        service = ListingService(test_db, detector)
+        original = await service.create_listing(
+            test_user.id, self._listing_data("3 xonali kvartira", self.DESCRIPTION)
+        )
+        
+        await service.delete_listing(original.id)
+        repost = await service.create_listing(
+            test_user.id, self._listing_data("3 xonali kvartira", self.DESCRIPTION)
+        )
+        
+        assert repost.duplicate_of_id is None
+        assert len(detector.index) == 1
+    
+    async def test_index_is_restored_from_database(self, test_db, test_user):
+        """Test the in-memory index is rebuilt from stored signatures"""
+        original = await ListingService(test_db, DuplicateDetector()).create_listing(
+            test_user.id, self._listing_data("3 xonali kvartira", self.DESCRIPTION)
+        )
+        
+        detector = DuplicateDetector()
+        session_factory = async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False)
+        assert await detector.load(session_factory) == 1
+        
+        repost = await ListingService(test_db, detector).create_listing(
+            test_user.id, self._listing_data("3 xonali kvartira", self.DESCRIPTION)
+        )
+        
+        assert repost.duplicate_of_id == original.id
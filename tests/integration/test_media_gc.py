@@ -0,0 +1,140 @@
+"""
+Integration Tests - Media Garbage Collector
+"""
+import os
+import time
+import pytest
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.services.media_gc import MediaGarbageCollector, TOMBSTONE_SUFFIX, MEDIA_GC_FILES_DELETED, MEDIA_GC_BYTES_RECLAIMED
+from src.services.media_store import ContentAddressedStore, LocalMediaBackend
+from src.database.models import Listing, ListingMedia, MediaBlob
+
+OLD = time.time() - 3 * 24 * 3600
+
+
+def _age(path: str) -> None:
+    """Faylni muhlatdan eskiroq qilish"""
+    os.utime(path, (OLD, OLD))
+
+
+@pytest.fixture
+def session_factory(test_db):
+    """Test bazasi session factory si"""
+    return async_sessionmaker(test_db.bind, class_=AsyncSession, expire_on_commit=False)
+
+
+@pytest.fixture
+def media_root(tmp_path) -> str:
+    """Vaqtinchalik media papkasi"""
+    return str(tmp_path / "media")
+
+
+@pytest.fixture
+def store(media_root, session_factory) -> ContentAddressedStore:
+    """Lokal ombor"""
+    return ContentAddressedStore(LocalMediaBackend(media_root), session_factory)
+
+
+def _collector(media_root, session_factory, **kwargs) -> MediaGarbageCollector:
+    """Kichik partiyali GC (partiyalar orasidagi holatni ham tekshirish uchun)"""
+    return MediaGarbageCollector(media_root, session_factory, grace_seconds=24 * 3600, batch_size=2, **kwargs)
+
+
+@pytest.mark.asyncio
+class TestMediaGarbageCollector:
+    """Media GC tests"""
+    
+    async def test_removes_only_old_unreferenced_blobs(self, test_db, test_listing, store, media_root,
+                                                       session_factory):
+        """Test referenced and fresh files survive, old orphans are removed"""
+        referenced = await store.save_bytes(b"referenced")
+        thumb = await store.save_bytes(b"thumb")
+        orphan = await store.save_bytes(b"orphan-bytes")
+        fresh = await store.save_bytes(b"fresh upload")
+        test_db.add(ListingMedia(listing_id=test_listing.id, position=0, sha256=referenced, thumb_sha256=thumb))
+        await test_db.commit()
+        for sha256 in (referenced, thumb, orphan):
+            _age(store.backend.path(f"{sha256[:2]}/{sha256[2:4]}/{sha256}"))
+        
+        stats = await _collector(media_root, session_factory).collect()
+        
+        assert stats['scanned'] == 4
+        assert stats['orphaned'] == stats['deleted'] == 1
+        assert stats['bytes_reclaimed'] == len(b"orphan-bytes")
+        assert not await store.backend.exists(f"{orphan[:2]}/{orphan[2:4]}/{orphan}")
+        for sha256 in (referenced, thumb, fresh):
+            assert await store.backend.exists(f"{sha256[:2]}/{sha256[2:4]}/{sha256}")
+        
+        result = await test_db.execute(select(MediaBlob.sha256))
+        assert orphan not in result.scalars().all()
+    
+    async def test_deleted_listing_blob_is_collected(self, test_db, test_listing, store, media_root,
+                                                     session_factory):
+        """Test files of a deleted listing are reclaimed even if its listing_media rows were left behind"""
+        sha256 = await store.save_bytes(b"listing photo")
+        test_db.add(ListingMedia(listing_id=test_listing.id, position=0, sha256=sha256))
+        await test_db.commit()
+        _age(store.backend.path(f"{sha256[:2]}/{sha256[2:4]}/{sha256}"))
+        # Cascade siz eski yo'l: listing_media qatori qoladi
+        await test_db.execute(Listing.__table__.delete().where(Listing.id == test_listing.id))
+        await test_db.commit()
+        deleted_before = MEDIA_GC_FILES_DELETED.value()
+        bytes_before = MEDIA_GC_BYTES_RECLAIMED.value()
+        
+        stats = await _collector(media_root, session_factory).collect()
+        
+        assert stats['deleted'] == 1
+        assert not await store.backend.exists(f"{sha256[:2]}/{sha256[2:4]}/{sha256}")
+        assert MEDIA_GC_FILES_DELETED.value() == deleted_before + 1
+        assert MEDIA_GC_BYTES_RECLAIMED.value() == bytes_before + len(b"listing photo")
+    
+    async def test_dry_run_deletes_nothing(self, store, media_root, session_factory):
+        """Test dry run only reports"""
+        orphan = await store.save_bytes(b"orphan")
+        _age(store.backend.path(f"{orphan[:2]}/{orphan[2:4]}/{orphan}"))
+        
+        stats = await _collector(media_root, session_factory, dry_run=True).collect()
+        
+        assert stats['orphaned'] == 1
+        assert stats['deleted'] == 0
+        assert stats['bytes_reclaimed'] == len(b"orphan")
+        assert await store.backend.exists(f"{orphan[:2]}/{orphan[2:4]}/{orphan}")
+    
+    async def test_reupload_refreshes_grace_period(self, store, media_root, session_factory):
+        """Test a deduplicated upload of an old orphan is kept for the new draft"""
+        sha256 = await store.save_bytes(b"draft photo")
+        path = store.backend.path(f"{sha256[:2]}/{sha256[2:4]}/{sha256}")
+        _age(path)
+        
+        await store.save_bytes(b"draft photo")
+        stats = await _collector(media_root, session_factory).collect()
+        
+        assert stats['orphaned'] == 0
+        assert os.path.exists(path)
+    
+    async def test_legacy_paths_and_leftovers(self, test_db, test_listing, media_root, session_factory):
+        """Test legacy files are checked by path and stale spool/tombstone files are removed"""
+        os.makedirs(os.path.join(media_root, ".spool"))
+        files = {
+            name: os.path.join(media_root, name)
+            for name in ("kept.jpg", "orphan.jpg", os.path.join(".spool", "crashed.part"), "x" * 64 + TOMBSTONE_SUFFIX)
+        }
+        for path in files.values():
+            with open(path, 'wb') as file:
+                file.write(b"data")
+            _age(path)
+        test_db.add(ListingMedia(listing_id=test_listing.id, position=0, path=files["kept.jpg"]))
+        await test_db.commit()
+        
+        stats = await _collector(media_root, session_factory).collect()
+        
+        assert stats['deleted'] == 3
+        assert sorted(os.listdir(media_root)) == [".spool", "kept.jpg"]
+        assert os.listdir(os.path.join(media_root, ".spool")) == []
+    
+    async def test_missing_root(self, tmp_path, session_factory):
+        """Test a missing media directory is not an error"""
+        stats = await _collector(str(tmp_path / "missing"), session_factory).collect()
+        
+        assert stats['scanned'] == 0
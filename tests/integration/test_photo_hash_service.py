@@ -0,0 +1,132 @@
+"""
+Integration Tests - Photo Hash Service
+"""
+import random
+import pytest
+from src.services.photo_hash_service import (
+    PhotoHashService, split_bands, band_neighbours, hamming_distance, to_signed, to_unsigned
+)
+from src.database.models import Listing, ListingType, ListingStatus
+
+
+def _flip_bits(value: int, positions) -> int:
+    for position in positions:
+        value ^= 1 << position
+    return value
+
+
+async def _create_listing(test_db, test_user, title: str) -> Listing:
+    listing = Listing(
+        user_id=test_user.id, region_code="01", city_name="Toshkent",
+        type=ListingType.ijara, rooms=2, price=300, title=title,
+        status=ListingStatus.pending
+    )
+    test_db.add(listing)
+    await test_db.commit()
+    return listing
+
+
+class TestHashHelpers:
+    """Hash helper unit tests"""
+    
+    def test_split_bands(self):
+        """Test hash is split into four 16-bit bands"""
+        assert split_bands(0x0123456789ABCDEF) == [0x0123, 0x4567, 0x89AB, 0xCDEF]
+    
+    def test_signed_round_trip(self):
+        """Test hashes with the top bit set fit into BIGINT"""
+        value = 0xFFFF000000000001
+        
+        assert to_signed(value) < 0
+        assert to_unsigned(to_signed(value)) == value
+        assert hamming_distance(value, to_signed(value)) == 0
+    
+    def test_band_neighbours(self):
+        """Test neighbours within radius 1"""
+        neighbours = band_neighbours(0, 1)
+        
+        assert len(neighbours) == 17
+        assert set(neighbours) == {0} | {1 << bit for bit in range(16)}
+
+
+@pytest.mark.asyncio
+class TestPhotoHashService:
+    """Photo hash service tests"""
+    
+    async def test_finds_listing_with_near_duplicate_photo(self, test_db, test_user, test_listing):
+        """Test a reposted photo is linked to the original listing"""
+        service = PhotoHashService(test_db)
+        original_hash = 0xF0F0A5A5_3C3C9999
+        await service.add_listing_hashes(test_listing.id, [original_hash, 0x1234])
+        
+        repost = await _create_listing(test_db, test_user, "Boshqa sarlavha")
+        # 7 bit farq - to'rttala bo'lakda ham o'zgarish bor
+        await service.add_listing_hashes(repost.id, [_flip_bits(original_hash, [1, 2, 17, 33, 34, 49, 60])])
+        
+        similar = await service.find_similar_listings(repost.id)
+        
+        assert len(similar) == 1
+        assert similar[0]['listing_id'] == test_listing.id
+        assert similar[0]['title'] == test_listing.title
+        assert similar[0]['distance'] == 7
+        assert similar[0]['matches'] == 1
+    
+    async def test_stale_hashes_do_not_hide_matches(self, test_db, test_user, test_listing):
+        """Test hashes left behind by deleted listings do not take the result slots"""
+        service = PhotoHashService(test_db)
+        original_hash = 0xF0F0A5A5_3C3C9999
+        await service.add_listing_hashes(test_listing.id, [_flip_bits(original_hash, [1, 2, 17])])
+        
+        stale_ids = []
+        for i in range(6):
+            stale = await _create_listing(test_db, test_user, f"O'chirilgan {i}")
+            await service.add_listing_hashes(stale.id, [original_hash])
+            stale_ids.append(stale.id)
+        # Cascade siz eski baza: hash qatorlari e'londan keyin ham qoladi
+        await test_db.execute(Listing.__table__.delete().where(Listing.id.in_(stale_ids)))
+        await test_db.commit()
+        
+        repost = await _create_listing(test_db, test_user, "Qayta joylangan")
+        await service.add_listing_hashes(repost.id, [original_hash])
+        
+        similar = await service.find_similar_listings(repost.id, limit=5)
+        
+        assert [entry['listing_id'] for entry in similar] == [test_listing.id]
+    
+    async def test_ignores_own_and_distant_photos(self, test_db, test_user, test_listing):
+        """Test a listing does not match itself or unrelated photos"""
+        service = PhotoHashService(test_db)
+        await service.add_listing_hashes(test_listing.id, [0])
+        
+        other = await _create_listing(test_db, test_user, "Boshqa")
+        await service.add_listing_hashes(other.id, [(1 << 64) - 1])
+        
+        assert await service.find_similar_listings(test_listing.id) == []
+    
+    async def test_rehashing_replaces_rows(self, test_db, test_listing):
+        """Test hashes of a listing are replaced, not duplicated"""
+        service = PhotoHashService(test_db)
+        await service.add_listing_hashes(test_listing.id, [1, 2, None])
+        
+        assert await service.add_listing_hashes(test_listing.id, [3]) == 1
+        assert len(await service.find_similar(3, max_distance=0)) == 1
+        assert await service.find_similar(1, max_distance=0) == []
+    
+    async def test_matches_brute_force(self, test_db, test_user, test_listing):
+        """Test the band index finds exactly what a full scan finds"""
+        rng = random.Random(34)
+        service = PhotoHashService(test_db)
+        query = rng.getrandbits(64)
+        
+        hashes = [rng.getrandbits(64) for _ in range(200)]
+        hashes += [_flip_bits(query, rng.sample(range(64), rng.randint(0, 9))) for _ in range(50)]
+        other = await _create_listing(test_db, test_user, "Ko'p rasmli")
+        await service.add_listing_hashes(other.id, hashes)
+        
+        found = await service.find_similar(query, max_distance=7)
+        
+        expected = sorted(
+            (position for position, value in enumerate(hashes) if hamming_distance(query, value) <= 7)
+        )
+        assert sorted(match['position'] for match in found) == expected
+        assert expected
@@ -0,0 +1,138 @@
+"""
+Integration Tests - Handler yo'nalishlari uchun SQL so'rovlar byudjeti
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import select
+from unittest.mock import AsyncMock, MagicMock
+from src.services.admin_service import AdminService
+from src.services.user_service import UserService
+from src.services.listing_service import ListingService
+from src.services.duplicate_service import DuplicateDetector
+from src.database.models import Listing, ListingMedia, ListingType, ListingStatus, User
+from src.utils.query_budget import QueryBudgetExceeded, budgeted_handler, HANDLER_DB_QUERIES, QUERY_BUDGET_EXCEEDED
+from src.config import ADMIN_IDS
+
+ADMIN_ID = ADMIN_IDS[0] if ADMIN_IDS else 924016177
+
+
+@pytest.fixture
+def admin_service(test_db, monkeypatch) -> AdminService:
+    """Admin service fixture"""
+    service = AdminService(test_db)
+    monkeypatch.setattr(service, 'is_admin', lambda user_id: user_id == ADMIN_ID)
+    return service
+
+
+@pytest_asyncio.fixture
+async def pending_listings(test_db, test_user):
+    """Turli egali pending e'lonlar"""
+    listings = []
+    for i in range(5):
+        owner = User(telegram_user_id=7000 + i, name=f"Owner {i}", verified=True)
+        test_db.add(owner)
+        await test_db.flush()
+        listing = Listing(
+            user_id=owner.id,
+            region_code="14",
+            city_name="Chilonzor",
+            type=ListingType.ijara if i % 2 else ListingType.sotuv,
+            rooms=i + 1,
+            price=300.0 + i * 100,
+            currency="USD",
+            title=f"Pending Listing {i}",
+            status=ListingStatus.pending
+        )
+        test_db.add(listing)
+        listings.append(listing)
+    await test_db.commit()
+    return listings
+
+
+@pytest.mark.asyncio
+class TestQueryBudgets:
+    """Query budget tests"""
+    
+    async def test_statistics_single_query(self, admin_service, pending_listings, test_listing, db_query_budget):
+        """Test statistics are computed in one statement with correct counts"""
+        with db_query_budget('ADMIN_STATISTICS', budget=1):
+            stats = await admin_service.get_statistics()
+        
+        assert stats['users'] == {'total': 6, 'verified': 6, 'blocked': 0}
+        assert stats['listings']['total'] == 6
+        assert stats['listings']['pending'] == 5
+        assert stats['listings']['approved'] == 1
+        assert stats['listings']['rental'] == 3
+        assert stats['listings']['sale'] == 3
+    
+    async def test_pending_listings_owner_joined(self, admin_service, pending_listings, db_query_budget):
+        """Test owners of pending listings are loaded without extra queries"""
+        with db_query_budget('ADMIN_PENDING_LISTINGS', budget=1):
+            listings = await admin_service.get_pending_listings()
+            owners = {listing.owner.name for listing in listings}
+        
+        assert len(owners) == 5
+    
+    async def test_approve_within_budget(self, admin_service, pending_listings, db_query_budget):
+        """Test approving a listing stays within the ADMIN_APPROVE budget"""
+        with db_query_budget('ADMIN_APPROVE') as counter:
+            approved = await admin_service.approve_listing(pending_listings[0].id, ADMIN_ID)
+        
+        assert approved is not None
+        assert counter.count == 1
+    
+    async def test_listing_submit_within_budget(self, test_db, test_user, listing_service, valid_listing_data, db_query_budget):
+        """Test the submit path (user lookup + insert) stays within LISTING_SUBMIT"""
+        with db_query_budget('LISTING_SUBMIT'):
+            user = await UserService(test_db).get_user_by_telegram_id(test_user.telegram_user_id)
+            listing = await listing_service.create_listing(user.id, valid_listing_data)
+        
+        assert listing is not None
+        assert listing.id is not None
+    
+    async def test_listing_submit_with_photos_and_duplicate(self, test_db, test_user, valid_listing_data, db_query_budget):
+        """Test photos and duplicate candidates do not add statements to LISTING_SUBMIT"""
+        detector = DuplicateDetector()
+        service = ListingService(test_db, detector)
+        description = "Chilonzor tumanida 3 xonali kvartira, yevroremont, metro yaqinida, mebel va texnika bilan"
+        originals = [
+            await service.create_listing(test_user.id, {**valid_listing_data, 'description': description})
+            for _ in range(3)
+        ]
+        # Indeksda qolib ketgan o'chirilgan e'lon ham nomzod bo'ladi
+        await test_db.execute(Listing.__table__.delete().where(Listing.id == originals[0].id))
+        await test_db.commit()
+        media = [{'file_id': f"photo-{i}", 'width': 800, 'height': 600} for i in range(5)]
+        
+        with db_query_budget('LISTING_SUBMIT') as counter:
+            user = await UserService(test_db).get_user_by_telegram_id(test_user.telegram_user_id)
+            listing = await service.create_listing(user.id, {**valid_listing_data, 'description': description, 'media': media})
+        
+        assert counter.count == 4
+        assert listing.duplicate_of_id in {originals[1].id, originals[2].id}
+        assert len(detector.index) == 3
+        result = await test_db.execute(
+            select(ListingMedia.file_id).where(ListingMedia.listing_id == listing.id).order_by(ListingMedia.position)
+        )
+        assert result.scalars().all() == [f"photo-{i}" for i in range(5)]
+    
+    async def test_exceeding_budget_raises(self, admin_service, pending_listings, db_query_budget):
+        """Test running more statements than budgeted fails with the statements listed"""
+        with pytest.raises(QueryBudgetExceeded, match="ADMIN_STATISTICS: 2 queries, budget 1"):
+            with db_query_budget('ADMIN_STATISTICS', budget=1):
+                await admin_service.get_statistics()
+                await admin_service.get_pending_listings()
+    
+    async def test_budgeted_handler_records_metric(self, admin_service, pending_listings, db_query_budget):
+        """Test the handler wrapper observes the per-route query count"""
+        @budgeted_handler('test_route')
+        async def handler(update, context):
+            await admin_service.get_statistics()
+            await admin_service.get_pending_listings()
+        
+        update = MagicMock(callback_query=None)
+        exceeded_before = QUERY_BUDGET_EXCEEDED.labels('test_route').value
+        await handler(update, AsyncMock())
+        
+        assert HANDLER_DB_QUERIES.labels('test_route').count >= 1
+        assert QUERY_BUDGET_EXCEEDED.labels('test_route').value == exceeded_before
@@ -0,0 +1,83 @@
+"""
+Integration Tests - Slow query log
+"""
+import pytest
+import pytest_asyncio
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.database.models import Base, Listing
+from src.database.slow_query_log import SlowQueryLog
+
+
+@pytest_asyncio.fixture
+async def engine(tmp_path):
+    """Fayldagi SQLite bazasi"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'slow.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield engine
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestSlowQueryLog:
+    """Slow query log tests"""
+    
+    async def test_records_statement_parameters_and_plan(self, engine):
+        """Test statements over the threshold are captured with EXPLAIN output"""
+        log = SlowQueryLog(threshold_ms=0)
+        log.attach(engine)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(
+                    select(Listing.id).where(Listing.city_name == "Toshkent", Listing.price < 500)
+                )
+        finally:
+            log.detach(engine)
+        
+        entry = log.snapshot()[0]
+        assert entry['statement'].lstrip().startswith("SELECT")
+        assert "'Toshkent'" in entry['parameters'] and "500" in entry['parameters']
+        assert any("listings" in line for line in entry['plan'])
+        assert "plan:" in log.dump()
+    
+    async def test_fast_statements_are_ignored(self, engine):
+        """Test the threshold filters out fast queries"""
+        log = SlowQueryLog(threshold_ms=10_000)
+        log.attach(engine)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+        finally:
+            log.detach(engine)
+        
+        assert len(log) == 0 and log.seen == 0
+    
+    async def test_ring_buffer_and_sampling(self, engine):
+        """Test only the newest sampled entries are kept"""
+        decisions = iter([0.0, 0.9] * 10)
+        log = SlowQueryLog(threshold_ms=0, capacity=3, sample_rate=0.5, explain=False,
+                           rng=lambda: next(decisions))
+        log.attach(engine)
+        try:
+            async with engine.connect() as conn:
+                for value in range(10):
+                    await conn.execute(text(f"SELECT {value}"))
+        finally:
+            log.detach(engine)
+        
+        assert log.seen == 10
+        assert [entry['statement'] for entry in log.snapshot()] == ["SELECT 8", "SELECT 6", "SELECT 4"]
+        assert all(entry['plan'] is None for entry in log.snapshot())
+    
+    async def test_long_parameters_are_truncated(self, engine):
+        """Test large parameter values do not bloat the buffer"""
+        log = SlowQueryLog(threshold_ms=0, explain=False)
+        log.attach(engine)
+        try:
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT :value"), {'value': "x" * 5000})
+        finally:
+            log.detach(engine)
+        
+        assert len(log.snapshot()[0]['parameters']) < 300
@@ -0,0 +1,224 @@
+"""
+Integration Tests - Eskiz SMS provider client
+"""
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+import pytest
+from unittest.mock import AsyncMock
+from src.services.sms_provider import (
+    EskizClient, CircuitBreaker, SMSProviderError, CircuitOpenError
+)
+
+
+class EskizStub:
+    """
+    Eskiz API ga o'xshash lokal HTTP server
+    
+    latency - har bir javob oldidan kutish, failures - navbatdagi nechta
+    so'rov 503 qaytarishi, down - barcha so'rovlar 503.
+    """
+    
+    def __init__(self):
+        self.latency = 0.0
+        self.failures = 0
+        self.down = False
+        self.token = "token-1"
+        self.requests = []
+        self.connections = set()
+        stub = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            
+            def log_message(self, *args):
+                pass
+            
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stub.connections.add(self.client_address)
+                stub.requests.append((self.path, self.headers.get('Authorization'), body))
+                time.sleep(stub.latency)
+                
+                if stub.down or stub.failures > 0:
+                    stub.failures = max(0, stub.failures - 1)
+                    return self._reply(503, {'message': 'Service Unavailable'})
+                if self.path == '/api/auth/login':
+                    form = parse_qs(body.decode())
+                    if form.get('password') != ['secret']:
+                        return self._reply(401, {'message': 'Invalid credentials'})
+                    return self._reply(200, {'data': {'token': stub.token}})
+                if self.headers.get('Authorization') != f"Bearer {stub.token}":
+                    return self._reply(401, {'message': 'Expired token'})
+                
+                payload = json.loads(body)
+                if self.path == '/api/message/sms/send':
+                    if not payload['mobile_phone'].startswith('998'):
+                        return self._reply(422, {'message': 'Invalid phone'})
+                    return self._reply(200, {'id': len(stub.requests), 'status': 'waiting'})
+                if self.path == '/api/message/sms/send-batch':
+                    return self._reply(200, {'status': 'success', 'count': len(payload['messages'])})
+                return self._reply(404, {'message': 'Not found'})
+            
+            def _reply(self, status, payload):
+                data = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+        
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, args=(0.05,), daemon=True)
+    
+    def paths(self):
+        return [path for path, _, _ in self.requests]
+
+
+@pytest.fixture
+def eskiz():
+    """Ishga tushirilgan stub server"""
+    stub = EskizStub()
+    stub.thread.start()
+    yield stub
+    stub.server.shutdown()
+    stub.server.server_close()
+
+
+def _client(eskiz, **kwargs) -> EskizClient:
+    options = {'timeout': 2.0, 'max_retries': 3, 'backoff_base': 0.01}
+    options.update(kwargs)
+    return EskizClient(eskiz.url, "bot@example.com", "secret", "4546", **options)
+
+
+@pytest.mark.asyncio
+class TestEskizClient:
+    """Eskiz client tests"""
+    
+    async def test_send_reuses_token_and_connection(self, eskiz):
+        """Test one login and one pooled connection serve many messages"""
+        client = _client(eskiz)
+        try:
+            for _ in range(5):
+                await client.send("+998901234567", "Kod: 123456")
+        finally:
+            await client.close()
+        
+        assert eskiz.paths() == ['/api/auth/login'] + ['/api/message/sms/send'] * 5
+        assert len(eskiz.connections) == 1
+        assert json.loads(eskiz.requests[1][2]) == {
+            'mobile_phone': '998901234567', 'message': 'Kod: 123456', 'from': '4546'
+        }
+    
+    async def test_transient_errors_are_retried(self, eskiz):
+        """Test 503 responses are retried until the provider recovers"""
+        client = _client(eskiz)
+        eskiz.failures = 2
+        try:
+            assert (await client.send("+998901234567", "Kod"))['status'] == 'waiting'
+        finally:
+            await client.close()
+        
+        assert client.breaker.state == CircuitBreaker.CLOSED
+        assert len(eskiz.requests) == 4
+    
+    async def test_expired_token_is_refreshed(self, eskiz):
+        """Test a 401 triggers one re-login"""
+        client = _client(eskiz)
+        try:
+            await client.send("+998901234567", "Kod")
+            eskiz.token = "token-2"
+            await client.send("+998901234567", "Kod")
+        finally:
+            await client.close()
+        
+        assert eskiz.paths().count('/api/auth/login') == 2
+    
+    async def test_client_errors_are_not_retried(self, eskiz):
+        """Test a rejected message fails immediately"""
+        client = _client(eskiz)
+        try:
+            with pytest.raises(SMSProviderError):
+                await client.send("+7000", "Kod")
+        finally:
+            await client.close()
+        
+        assert eskiz.paths().count('/api/message/sms/send') == 1
+    
+    async def test_timeout_is_retried(self, eskiz):
+        """Test slow responses hit the request timeout"""
+        client = _client(eskiz, timeout=0.05, max_retries=1)
+        eskiz.latency = 0.2
+        try:
+            with pytest.raises(SMSProviderError):
+                await client.send("+998901234567", "Kod")
+        finally:
+            await client.close()
+        
+        assert client.breaker.failures == 2
+    
+    async def test_circuit_breaker_fails_fast(self, eskiz):
+        """Test an open breaker rejects requests without touching the network"""
+        now = [0.0]
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10, clock=lambda: now[0])
+        client = _client(eskiz, max_retries=5, breaker=breaker)
+        eskiz.down = True
+        try:
+            with pytest.raises(CircuitOpenError):
+                await client.send("+998901234567", "Kod")
+            requests_when_opened = len(eskiz.requests)
+            with pytest.raises(CircuitOpenError):
+                await client.send("+998901234567", "Kod")
+            assert len(eskiz.requests) == requests_when_opened == 3
+            
+            # Muddat o'tgach bitta sinov so'rovi o'tadi va breaker yopiladi
+            eskiz.down = False
+            now[0] = 11
+            await client.send("+998901234567", "Kod")
+            assert breaker.state == CircuitBreaker.CLOSED
+        finally:
+            await client.close()
+    
+    async def test_interrupted_probe_is_released(self, eskiz):
+        """Test a cancelled or crashed half-open probe does not keep the breaker blocked"""
+        now = [1000.0]
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10, clock=lambda: now[0])
+        breaker.opened_at = 900.0
+        client = _client(eskiz, max_retries=0, breaker=breaker)
+        try:
+            eskiz.latency = 1.0
+            probe = asyncio.create_task(client.send("+998901234567", "Kod"))
+            await asyncio.sleep(0.2)
+            probe.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await probe
+            assert breaker.state == CircuitBreaker.HALF_OPEN
+            assert breaker.allow() is True
+            breaker.release_probe()
+            
+            # Login javobi kutilgan shaklda emas
+            client._login = AsyncMock(side_effect=KeyError('data'))
+            with pytest.raises(KeyError):
+                await client.send("+998901234567", "Kod")
+            assert breaker.allow() is True
+        finally:
+            eskiz.latency = 0.0
+            await client.close()
+    
+    async def test_bulk_send_is_batched(self, eskiz):
+        """Test bulk messages are grouped into send-batch requests"""
+        client = _client(eskiz)
+        messages = [(f"+99890{index:07d}", f"Xabar {index}") for index in range(450)]
+        try:
+            stats = await client.send_bulk(messages, batch_size=200)
+        finally:
+            await client.close()
+        
+        assert stats == {'sent': 450, 'failed': 0, 'batches': 3}
+        batches = [json.loads(body) for path, _, body in eskiz.requests if path.endswith('send-batch')]
+        assert [len(batch['messages']) for batch in batches] == [200, 200, 50]
+        assert batches[0]['messages'][0]['to'] == '998900000000'
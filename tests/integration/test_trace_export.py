@@ -0,0 +1,62 @@
+"""
+Integration Tests - OTLP trace export
+"""
+import pytest
+from src.utils.tracing import Tracer, OTLPExporter
+from tools.fake_otlp_collector import FakeOTLPCollector, format_trace
+
+
+@pytest.fixture
+def collector():
+    """Lokal OTLP kollektor"""
+    collector = FakeOTLPCollector().start()
+    yield collector
+    collector.stop()
+
+
+@pytest.mark.asyncio
+class TestOTLPExport:
+    """OTLP exporter tests"""
+
+    async def test_spans_reach_collector_in_batches(self, collector):
+        """Test finished spans are shipped and reassembled per trace"""
+        exporter = OTLPExporter(collector.endpoint, service_name="test-bot", batch_size=2)
+        tracer = Tracer(exporter)
+        with tracer.start_trace("update callback") as root:
+            with tracer.start_span("db SELECT"):
+                pass
+            with tracer.start_span("telegram editMessageText"):
+                pass
+
+        assert await exporter.flush() == 3
+        await exporter.close()
+
+        assert collector.requests == 2
+        trace = collector.traces()[root.trace_id]
+        assert {span['service'] for span in trace} == {"test-bot"}
+        assert format_trace(trace).splitlines()[0].startswith("update callback")
+        assert format_trace(trace).splitlines()[1].startswith("  db SELECT")
+
+    async def test_unreachable_collector_drops_spans(self, collector):
+        """Test export failures never raise into the bot"""
+        endpoint = collector.endpoint
+        collector.stop()
+        exporter = OTLPExporter(endpoint)
+        tracer = Tracer(exporter)
+        with tracer.start_trace("update start"):
+            pass
+
+        assert await exporter.flush() == 0
+        assert exporter.dropped == 1 and not exporter.queue
+        await exporter.close()
+
+    async def test_queue_is_bounded(self):
+        """Test a stalled exporter cannot grow memory without limit"""
+        exporter = OTLPExporter("http://127.0.0.1:9/v1/traces", max_queue=2)
+        tracer = Tracer(exporter)
+        for _ in range(5):
+            with tracer.start_trace("update start"):
+                pass
+
+        assert len(exporter.queue) == 2 and exporter.dropped == 3
+        await exporter.client.aclose()
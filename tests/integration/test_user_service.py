@@ -68,6 +68,7 @@ class TestUserServiceIntegration:
         
         assert updated_user is not None
         assert updated_user.name == new_name
+        assert updated_user.name_normalized == "updated name"
         assert updated_user.phone_number == new_phone
         assert updated_user.verified is True
     
@@ -0,0 +1,82 @@
+"""
+Integration Tests - Database Verification Store
+"""
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from src.database.models import Base
+from src.services.sms_service import SMSService
+from src.services.verification_store import (
+    DatabaseVerificationStore, CHECK_VERIFIED, CHECK_INVALID, CHECK_MISSING,
+    CHECK_EXPIRED, CHECK_LOCKED
+)
+
+PHONE = "+998901234567"
+
+
+@pytest_asyncio.fixture
+async def store(tmp_path):
+    """Fayldagi SQLite bazasi - har bir session alohida ulanish (alohida worker kabi)"""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'codes.db'}")
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    
+    yield DatabaseVerificationStore(async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False))
+    
+    await engine.dispose()
+
+
+@pytest.mark.asyncio
+class TestDatabaseVerificationStore:
+    """Database verification store tests"""
+    
+    async def test_issue_and_verify(self, store):
+        """Test a code survives in the database and verifies once"""
+        assert await store.issue(PHONE, "123456", ttl=300, cooldown=60) is True
+        assert await store.check(PHONE, "000000", 3) == (CHECK_INVALID, 1)
+        assert await store.check(PHONE, "123456", 3) == (CHECK_VERIFIED, 2)
+        assert await store.is_verified(PHONE) is True
+    
+    async def test_concurrent_issue_respects_cooldown(self, store):
+        """Test only one of several simultaneous requests sends a code"""
+        results = await asyncio.gather(*(
+            store.issue(PHONE, f"{index:06d}", ttl=300, cooldown=60) for index in range(5)
+        ))
+        
+        assert results.count(True) == 1
+    
+    async def test_concurrent_attempts_cannot_exceed_limit(self, store):
+        """Test parallel guesses are counted atomically"""
+        await store.issue(PHONE, "123456", ttl=300, cooldown=60)
+        
+        results = await asyncio.gather(*(store.check(PHONE, f"{guess:06d}", 3) for guess in range(10)))
+        
+        statuses = [status for status, _ in results]
+        assert statuses.count(CHECK_INVALID) == 3
+        assert statuses.count(CHECK_LOCKED) == 7
+        assert sorted(attempts for status, attempts in results if status == CHECK_INVALID) == [1, 2, 3]
+    
+    async def test_expired_code(self, store):
+        """Test expired codes are reported and purged"""
+        await store.issue(PHONE, "123456", ttl=0, cooldown=0)
+        
+        assert await store.check(PHONE, "123456", 3) == (CHECK_EXPIRED, 0)
+        assert await store.is_verified(PHONE) is False
+        assert await store.purge_expired() == 1
+        assert await store.check(PHONE, "123456", 3) == (CHECK_MISSING, 0)
+        # Cooldown tugagan - yangi kod yuboriladi
+        assert await store.issue(PHONE, "654321", ttl=300, cooldown=60) is True
+    
+    async def test_background_cleanup_purges_expired_codes(self, store):
+        """Test the scheduled cleanup loop removes expired rows"""
+        await store.issue(PHONE, "123456", ttl=0, cooldown=0)
+        
+        task = asyncio.create_task(SMSService(store=store).run_cleanup_forever(0.01))
+        try:
+            await asyncio.sleep(0.1)
+        finally:
+            task.cancel()
+        
+        assert await store.check(PHONE, "123456", 3) == (CHECK_MISSING, 0)
+        assert await store.purge_expired() == 0
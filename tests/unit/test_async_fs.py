@@ -0,0 +1,54 @@
+"""
+Unit Tests - Async File System Helpers
+"""
+import threading
+import pytest
+from src.utils import async_fs
+from src.utils.validators import detect_image_type, validate_image_file
+
+
+@pytest.mark.asyncio
+class TestAsyncFs:
+    """Async file system helper tests"""
+    
+    async def test_runs_outside_event_loop_thread(self):
+        """Test blocking calls run on the media file pool"""
+        name = await async_fs.run(lambda: threading.current_thread().name)
+        
+        assert name.startswith("media-fs")
+    
+    async def test_file_roundtrip(self, tmp_path):
+        """Test basic operations on a temporary tree"""
+        directory = tmp_path / "a" / "b"
+        await async_fs.makedirs(str(directory))
+        path = directory / "file.bin"
+        path.write_bytes(b"0123456789")
+        
+        assert await async_fs.exists(str(path))
+        assert await async_fs.getsize(str(path)) == 10
+        assert await async_fs.read_header(str(path), 4) == b"0123"
+        assert await async_fs.read_bytes(str(path)) == b"0123456789"
+        assert await async_fs.remove(str(path)) is True
+        assert await async_fs.remove(str(path)) is False
+
+
+class TestDetectImageType:
+    """Magic byte detection tests"""
+    
+    def test_known_signatures(self):
+        """Test supported image formats are recognised"""
+        assert detect_image_type(b"\xff\xd8\xff\xe0" + b"\x00" * 8) == 'image/jpeg'
+        assert detect_image_type(b"\x89PNG\r\n\x1a\n\x00\x00\x00\x0d") == 'image/png'
+        assert detect_image_type(b"GIF89a\x01\x00\x01\x00\x00\x00") == 'image/gif'
+        assert detect_image_type(b"RIFF\x24\x00\x00\x00WEBP") == 'image/webp'
+    
+    def test_non_images(self):
+        """Test other content is not treated as an image"""
+        assert detect_image_type(b"%PDF-1.7\n") is None
+        assert detect_image_type(b"RIFF\x24\x00\x00\x00WAVE") is None
+        assert detect_image_type(b"") is None
+    
+    def test_extension_must_match(self):
+        """Test the file name extension is checked against the content"""
+        assert validate_image_file(b"\xff\xd8\xff\xe0", "photo.JPEG") is True
+        assert validate_image_file(b"\xff\xd8\xff\xe0", "photo.png") is False
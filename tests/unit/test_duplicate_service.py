@@ -0,0 +1,106 @@
+"""
+Unit Tests - Duplicate Service (MinHash + LSH)
+"""
+import pytest
+from src.services.duplicate_service import (
+    DuplicateDetector, LSHIndex, MinHasher, shingles, estimate_similarity
+)
+
+DESCRIPTION = (
+    "Chilonzor tumanida 3 xonali kvartira ijaraga beriladi. Evroremont, "
+    "mebel va maishiy texnika bor. Metroga 5 daqiqa piyoda, yaqinida maktab "
+    "va bozor joylashgan. Faqat oilaga beriladi."
+)
+
+
+class TestShingles:
+    """Shingle unit tests"""
+    
+    def test_ignores_case_and_punctuation(self):
+        """Test normalisation before shingling"""
+        assert shingles("Yangi, UY bor!") == shingles("yangi uy bor")
+    
+    def test_short_text(self):
+        """Test texts shorter than the shingle size"""
+        assert shingles("uy") == {"uy"}
+        assert shingles("  ") == set()
+
+
+class TestMinHash:
+    """MinHash and LSH unit tests"""
+    
+    def test_similarity_estimate(self):
+        """Test estimate tracks the real Jaccard similarity"""
+        hasher = MinHasher(num_perm=128)
+        first = {f"s{i}" for i in range(100)}
+        second = {f"s{i}" for i in range(20, 120)}
+        expected = len(first & second) / len(first | second)
+        
+        estimate = estimate_similarity(hasher.signature(first), hasher.signature(second))
+        
+        assert abs(estimate - expected) < 0.15
+    
+    def test_signature_is_deterministic(self):
+        """Test signatures are stable across instances (stored in the database)"""
+        items = shingles(DESCRIPTION)
+        
+        assert MinHasher().signature(items) == MinHasher().signature(items)
+    
+    def test_index_add_query_remove(self):
+        """Test LSH candidates and removal"""
+        hasher = MinHasher()
+        index = LSHIndex()
+        signature = hasher.signature(shingles(DESCRIPTION))
+        index.add("a", signature)
+        index.add("b", hasher.signature(shingles("Yunusobodda hovli uy sotiladi, 6 sotix yer, gaz va suv bor")))
+        
+        assert [key for key, _ in index.query(signature, 0.5)] == ["a"]
+        
+        index.remove("a")
+        
+        assert index.query(signature, 0.5) == []
+        assert len(index) == 1
+    
+    def test_invalid_band_count(self):
+        """Test num_perm must split evenly into bands"""
+        with pytest.raises(ValueError):
+            LSHIndex(num_perm=64, bands=10)
+
+
+class TestDuplicateDetector:
+    """Duplicate detector unit tests"""
+    
+    def test_detects_reworded_listing(self):
+        """Test small wording changes are still flagged"""
+        detector = DuplicateDetector()
+        detector.add("original", detector.signature("3 xonali kvartira", DESCRIPTION))
+        
+        reworded = DESCRIPTION.replace("Faqat oilaga beriladi.", "Oilaga beriladi, narxi kelishiladi.")
+        matches = detector.find_duplicates(detector.signature("3 xonali kvartira!", reworded))
+        
+        assert matches and matches[0][0] == "original"
+    
+    def test_unrelated_listing_not_flagged(self):
+        """Test different listings are not flagged"""
+        detector = DuplicateDetector()
+        detector.add("original", detector.signature("3 xonali kvartira", DESCRIPTION))
+        
+        other = detector.signature(
+            "Ofis ijaraga", "Markazda 120 m2 ofis, alohida kirish joyi, avtoturargoh va qo'riqlash mavjud"
+        )
+        
+        assert detector.find_duplicates(other) == []
+    
+    def test_short_text_has_no_signature(self):
+        """Test bare titles are not compared"""
+        detector = DuplicateDetector()
+        
+        assert detector.signature("2 xonali kvartira", None) is None
+    
+    def test_signature_round_trip(self):
+        """Test signature survives database serialisation"""
+        detector = DuplicateDetector()
+        signature = detector.signature("3 xonali kvartira", DESCRIPTION)
+        
+        assert DuplicateDetector.load_signature(DuplicateDetector.dump(signature)) == signature
+        assert DuplicateDetector.load_signature(None) is None
@@ -0,0 +1,55 @@
+"""
+Unit Tests - Soxta Bot API (load test uchun)
+"""
+import pytest
+from telegram import Bot, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.error import BadRequest, RetryAfter, NetworkError
+from tools.fake_bot_api import FakeBotAPI, FakeBotRequest
+from tools.bot_harness import TOKEN
+
+
+def make_bot(api: FakeBotAPI) -> Bot:
+    return Bot(TOKEN, request=FakeBotRequest(api), get_updates_request=FakeBotRequest(api))
+
+
+@pytest.mark.asyncio
+class TestFakeBotAPI:
+    """FakeBotAPI tests"""
+
+    async def test_messages_and_keyboards_are_stored(self):
+        """Test sent keyboards are visible and identical edits are rejected like Telegram does"""
+        api = FakeBotAPI()
+        markup = InlineKeyboardMarkup([[InlineKeyboardButton("Qidirish", callback_data="SEARCH_LISTINGS")]])
+        async with make_bot(api) as bot:
+            message = await bot.send_message(42, "Salom", reply_markup=markup)
+            assert api.buttons(42) == ["SEARCH_LISTINGS"]
+
+            await bot.edit_message_text("Tanlang", 42, message.message_id)
+            assert api.buttons(42) == []
+            with pytest.raises(BadRequest, match="not modified"):
+                await bot.edit_message_text("Tanlang", 42, message.message_id)
+
+        assert api.calls['sendMessage'] == 1
+        assert api.errors[('editMessageText', 400)] == 1
+
+    async def test_chat_flood_limit(self):
+        """Test per-chat rate limit answers 429 with retry_after"""
+        api = FakeBotAPI(chat_rate=1)
+        async with make_bot(api) as bot:
+            await bot.send_message(42, "birinchi")
+            await bot.send_message(43, "boshqa chat")
+            with pytest.raises(RetryAfter) as error:
+                await bot.send_message(42, "ikkinchi")
+
+        assert error.value.retry_after >= 1
+
+    async def test_injected_failure(self):
+        """Test fail_next affects only the next call"""
+        api = FakeBotAPI()
+        api.fail_next('sendMessage', 502, "Bad Gateway")
+        async with make_bot(api) as bot:
+            with pytest.raises(NetworkError):
+                await bot.send_message(42, "xato")
+            await bot.send_message(42, "yaxshi")
+
+        assert [message['text'] for message in api.messages(42)] == ["yaxshi"]
@@ -0,0 +1,135 @@
+"""
+Unit Tests - Image Pipeline
+"""
+import io
+import pytest
+from PIL import Image
+from src.services.image_pipeline import ImagePipeline, process_image, dhash
+
+# EXIF teglari
+ORIENTATION = 0x0112
+GPS_INFO = 0x8825
+
+
+def _jpeg_with_exif(width: int = 800, height: int = 600, orientation: int = 1) -> bytes:
+    """GPS va orientatsiya EXIF i bor JPEG"""
+    image = Image.new('RGB', (width, height), (10, 120, 200))
+    exif = Image.Exif()
+    exif[ORIENTATION] = orientation
+    exif[GPS_INFO] = {1: 'N', 2: (41.0, 18.0, 0.0), 3: 'E', 4: (69.0, 16.0, 0.0)}
+    output = io.BytesIO()
+    image.save(output, format='JPEG', exif=exif)
+    return output.getvalue()
+
+
+class TestProcessImage:
+    """process_image unit tests"""
+    
+    def test_strips_exif(self):
+        """Test GPS and other EXIF data is removed"""
+        result = process_image(_jpeg_with_exif())
+        
+        for key in ('main', 'thumb'):
+            with Image.open(io.BytesIO(result[key])) as image:
+                assert 'exif' not in image.info
+                assert GPS_INFO not in image.getexif()
+    
+    def test_resizes_main_and_thumbnail(self):
+        """Test main image and thumbnail are bounded"""
+        result = process_image(_jpeg_with_exif(4000, 3000), max_side=1600, thumb_side=320)
+        
+        assert (result['width'], result['height']) == (1600, 1200)
+        with Image.open(io.BytesIO(result['thumb'])) as thumb:
+            assert thumb.size == (320, 240)
+    
+    def test_applies_orientation_before_stripping(self):
+        """Test rotated photos stay upright after EXIF is removed"""
+        # 6 - 90 gradusga burilgan
+        result = process_image(_jpeg_with_exif(800, 600, orientation=6))
+        
+        assert (result['width'], result['height']) == (600, 800)
+    
+    def test_transparent_png_is_flattened(self):
+        """Test PNG with alpha becomes a JPEG"""
+        output = io.BytesIO()
+        Image.new('RGBA', (100, 100), (0, 0, 0, 0)).save(output, format='PNG')
+        
+        result = process_image(output.getvalue())
+        
+        with Image.open(io.BytesIO(result['main'])) as image:
+            assert image.format == 'JPEG'
+            assert image.getpixel((50, 50)) == (255, 255, 255)
+    
+    def test_invalid_data_raises(self):
+        """Test non-image bytes raise"""
+        with pytest.raises(Exception):
+            process_image(b"not an image")
+
+
+def _gradient_jpeg(width: int, height: int, quality: int = 90, flip: bool = False) -> bytes:
+    """Gorizontal gradientli JPEG"""
+    image = Image.linear_gradient('L').rotate(90).resize((width, height)).convert('RGB')
+    if flip:
+        image = image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+    output = io.BytesIO()
+    image.save(output, format='JPEG', quality=quality)
+    return output.getvalue()
+
+
+def _distance(first: int, second: int) -> int:
+    return bin(first ^ second).count('1')
+
+
+class TestDhash:
+    """dHash unit tests"""
+    
+    def test_hash_is_64_bits(self):
+        """Test hash fits into 64 bits"""
+        assert 0 <= dhash(_gradient_jpeg(640, 480)) < 1 << 64
+    
+    def test_resized_recompressed_copy_is_close(self):
+        """Test a smaller, recompressed copy has a near-identical hash"""
+        original = dhash(_gradient_jpeg(1600, 1200, quality=95))
+        repost = dhash(_gradient_jpeg(320, 240, quality=40))
+        
+        assert _distance(original, repost) <= 4
+    
+    def test_different_image_is_far(self):
+        """Test a mirrored image has a distant hash"""
+        original = dhash(_gradient_jpeg(640, 480))
+        mirrored = dhash(_gradient_jpeg(640, 480, flip=True))
+        
+        assert _distance(original, mirrored) > 32
+    
+    def test_process_image_returns_hash(self):
+        """Test process_image hashes the main rendition"""
+        data = _gradient_jpeg(1600, 1200)
+        result = process_image(data)
+        
+        assert _distance(result['dhash'], dhash(data)) <= 4
+
+
+@pytest.mark.asyncio
+class TestImagePipeline:
+    """Process pool pipeline tests"""
+    
+    async def test_process_in_pool(self):
+        """Test images are processed in a worker process"""
+        pipeline = ImagePipeline(max_workers=1, max_side=200)
+        try:
+            result = await pipeline.process(_jpeg_with_exif())
+        finally:
+            pipeline.shutdown()
+        
+        assert (result['width'], result['height']) == (200, 150)
+    
+    async def test_dhash_in_pool(self):
+        """Test hashes are computed in a worker process"""
+        data = _gradient_jpeg(640, 480)
+        pipeline = ImagePipeline(max_workers=1)
+        try:
+            result = await pipeline.dhash(data)
+        finally:
+            pipeline.shutdown()
+        
+        assert result == dhash(data)
@@ -0,0 +1,140 @@
+"""
+Unit Tests - Media Service
+"""
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from telegram import PhotoSize, InputMediaPhoto
+from src.services.media_service import MediaService, MEDIA_MODE_FILE_ID
+
+
+def _photo_update(index: int = 0) -> MagicMock:
+    """Rasmli xabar update i"""
+    update = MagicMock()
+    update.message.photo = [
+        PhotoSize(f"thumb-{index}", f"thumb-unique-{index}", 90, 67),
+        PhotoSize(f"large-{index}", f"large-unique-{index}", 1280, 960),
+    ]
+    update.message.document = None
+    return update
+
+
+def _bot() -> MagicMock:
+    """Fake bot"""
+    bot = MagicMock()
+    bot.send_photo = AsyncMock()
+    bot.send_document = AsyncMock()
+    bot.send_media_group = AsyncMock()
+    bot.get_file = AsyncMock()
+    return bot
+
+
+class TestMediaReferences:
+    """Telegram file_id reference tests"""
+    
+    def test_photo_reference_uses_largest_size(self):
+        """Test largest photo is stored with the smallest as thumbnail"""
+        reference = MediaService(MEDIA_MODE_FILE_ID).get_media_reference(_photo_update())
+        
+        assert reference['file_id'] == "large-0"
+        assert reference['file_unique_id'] == "large-unique-0"
+        assert reference['thumb_file_id'] == "thumb-0"
+    
+    def test_non_image_document_is_ignored(self):
+        """Test non-image documents have no reference"""
+        update = MagicMock()
+        update.message.photo = []
+        update.message.document.mime_type = "application/pdf"
+        
+        assert MediaService(MEDIA_MODE_FILE_ID).get_media_reference(update) is None
+    
+    def test_listing_media_roundtrip(self):
+        """Test media refs round-trip through listing_media rows"""
+        media = [
+            {'file_id': 'a', 'size': 1024, 'width': 800, 'height': 600},
+            {'file_id': 'b', 'document': True},
+            {'sha256': 'c' * 64, 'thumb_sha256': 'd' * 64}
+        ]
+        
+        rows = MediaService.to_listing_media("listing-1", media)
+        
+        assert [row.position for row in rows] == [0, 1, 2]
+        assert all(row.listing_id == "listing-1" for row in rows)
+        assert rows[1].is_document is True
+        assert MediaService.to_references(rows) == media
+
+
+@pytest.mark.asyncio
+class TestMediaFileIdMode:
+    """file_id storage mode tests"""
+    
+    async def test_store_media_does_not_download(self):
+        """Test file_id mode never downloads the file"""
+        context = MagicMock()
+        context.bot = _bot()
+        
+        reference = await MediaService(MEDIA_MODE_FILE_ID).store_media(_photo_update(), context)
+        
+        assert reference['file_id'] == "large-0"
+        context.bot.get_file.assert_not_awaited()
+    
+    async def test_send_listing_media_as_groups(self):
+        """Test photos are re-sent by file_id in groups of 10"""
+        bot = _bot()
+        media = [{'file_id': f"photo-{i}"} for i in range(12)]
+        
+        sent = await MediaService(MEDIA_MODE_FILE_ID).send_listing_media(bot, 1, media, caption="E'lon")
+        
+        assert sent == 12
+        first_group = bot.send_media_group.await_args_list[0].kwargs['media']
+        assert len(first_group) == 10
+        assert all(isinstance(item, InputMediaPhoto) for item in first_group)
+        assert first_group[0].media == "photo-0"
+        assert first_group[0].caption == "E'lon"
+        # Qolgan 2 ta rasm ikkinchi guruhda
+        assert len(bot.send_media_group.await_args_list[1].kwargs['media']) == 2
+    
+    async def test_send_single_photo(self):
+        """Test one photo is sent with send_photo"""
+        bot = _bot()
+        
+        sent = await MediaService(MEDIA_MODE_FILE_ID).send_listing_media(
+            bot, 1, [{'file_id': 'only'}]
+        )
+        
+        assert sent == 1
+        assert bot.send_photo.await_args.kwargs['photo'] == "only"
+        bot.send_media_group.assert_not_awaited()
+
+
+@pytest.mark.asyncio
+class TestMediaFileValidation:
+    """Media file validation tests"""
+    
+    async def test_valid_image(self, tmp_path):
+        """Test a PNG with a matching extension passes"""
+        path = tmp_path / "photo.png"
+        path.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 32)
+        
+        assert await MediaService(MEDIA_MODE_FILE_ID).validate_media(str(path)) is True
+    
+    async def test_extension_must_match_content(self, tmp_path):
+        """Test renamed non-images and mismatched extensions are rejected"""
+        service = MediaService(MEDIA_MODE_FILE_ID)
+        script = tmp_path / "photo.jpg"
+        script.write_bytes(b"#!/bin/sh\necho not a photo\n")
+        png = tmp_path / "photo2.jpg"
+        png.write_bytes(b"\x89PNG\r\n\x1a\n" + b"\x00" * 32)
+        
+        assert await service.validate_media(str(script)) is False
+        assert await service.validate_media(str(png)) is False
+        assert await service.validate_media(str(tmp_path / "missing.jpg")) is False
+    
+    async def test_cleanup_media(self, tmp_path):
+        """Test cleanup removes the file once"""
+        path = tmp_path / "old.jpg"
+        path.write_bytes(b"\xff\xd8\xff")
+        service = MediaService(MEDIA_MODE_FILE_ID)
+        
+        assert await service.cleanup_media(str(path)) is True
+        assert not path.exists()
+        assert await service.cleanup_media(str(path)) is False
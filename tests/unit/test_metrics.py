@@ -0,0 +1,104 @@
+"""
+Unit Tests - Metrics registry and instrumentation
+"""
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from src.utils.metrics import (
+    MetricsRegistry, callback_route, timed_handler, instrument_engine,
+    HANDLER_LATENCY, HANDLER_ERRORS, CALLBACK_LATENCY, DB_QUERIES, DB_POOL_WAIT, REGISTRY
+)
+
+
+class TestMetricsRegistry:
+    """Metrics registry tests"""
+    
+    def test_render_prometheus_text(self):
+        """Test counters, gauges and histograms in exposition format"""
+        registry = MetricsRegistry()
+        requests = registry.counter("requests_total", "Requests", ["path"])
+        registry.gauge("queue_depth", "Queue depth", function=lambda: 3)
+        latency = registry.histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        
+        requests.labels('/a"b').inc()
+        requests.labels('/a"b').inc(2)
+        latency.observe(0.05)
+        latency.observe(0.5)
+        latency.observe(5)
+        
+        output = registry.render()
+        
+        assert '# TYPE requests_total counter' in output
+        assert 'requests_total{path="/a\\"b"} 3' in output
+        assert 'queue_depth 3' in output
+        assert 'latency_seconds_bucket{le="0.1"} 1' in output
+        assert 'latency_seconds_bucket{le="1"} 2' in output
+        assert 'latency_seconds_bucket{le="+Inf"} 3' in output
+        assert 'latency_seconds_count 3' in output
+        assert 'latency_seconds_sum 5.55' in output
+    
+    def test_duplicate_names_rejected(self):
+        """Test a metric name can be registered once"""
+        registry = MetricsRegistry()
+        registry.counter("x_total", "X")
+        
+        with pytest.raises(ValueError):
+            registry.counter("x_total", "X")
+    
+    def test_callback_route_is_bounded(self):
+        """Test callback data maps to its pattern, not its payload"""
+        assert callback_route("ADMIN_APPROVE_1234-abcd") == "ADMIN_APPROVE"
+        assert callback_route("ADMIN_BULK_APPROVE") == "ADMIN_BULK_APPROVE"
+        assert callback_route("SEARCH_PAGE_7") == "SEARCH_PAGE"
+        assert callback_route("something-random") == "other"
+        assert callback_route(None) == "none"
+
+
+@pytest.mark.asyncio
+class TestInstrumentation:
+    """Handler and database instrumentation tests"""
+    
+    async def test_timed_handler_records_latency_and_route(self):
+        """Test handler and callback route histograms are filled"""
+        @timed_handler("unit-test")
+        async def handler(update, context):
+            return "ok"
+        
+        update = MagicMock()
+        update.callback_query.data = "LISTING_REGION_Toshkent"
+        before = CALLBACK_LATENCY.labels("LISTING_REGION").count
+        
+        assert await handler(update, None) == "ok"
+        
+        assert HANDLER_LATENCY.labels("unit-test").count == 1
+        assert CALLBACK_LATENCY.labels("LISTING_REGION").count == before + 1
+    
+    async def test_timed_handler_counts_errors(self):
+        """Test exceptions are counted and re-raised"""
+        @timed_handler("unit-test-error")
+        async def handler(update, context):
+            raise RuntimeError("boom")
+        
+        with pytest.raises(RuntimeError):
+            await handler(MagicMock(callback_query=None), None)
+        
+        assert HANDLER_ERRORS.value("unit-test-error") == 1
+    
+    async def test_engine_queries_are_counted(self, tmp_path):
+        """Test cursor events and pool checkouts feed the metrics"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'metrics.db'}")
+        instrument_engine(engine)
+        instrument_engine(engine)
+        selects = DB_QUERIES.value("SELECT")
+        checkouts = DB_POOL_WAIT.labels().count
+        
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            await conn.execute(text("SELECT 2"))
+        await engine.dispose()
+        
+        # Ikki marta ulansa ham hodisalar bir marta yoziladi
+        assert DB_QUERIES.value("SELECT") == selects + 2
+        assert DB_POOL_WAIT.labels().count == checkouts + 1
+        assert "db_pool_checkedout" in REGISTRY.render()
@@ -0,0 +1,76 @@
+"""
+Unit Tests - Notification Service
+"""
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+from src.services.notification_service import NotificationService
+from src.database.models import ListingType
+
+
+def _moderated_listing(index: int, owner_telegram_id: int = None) -> SimpleNamespace:
+    """Moderatsiya so'rovi qaytaradigan qatorga o'xshash obyekt"""
+    return SimpleNamespace(
+        id=f"listing-{index}",
+        title=f"Listing {index}",
+        region_code="14",
+        city_name="Chilonzor",
+        type=ListingType.ijara,
+        rooms=2,
+        price=500,
+        currency="USD",
+        owner_telegram_id=owner_telegram_id if owner_telegram_id is not None else 1000 + index
+    )
+
+
+@pytest.mark.asyncio
+class TestNotificationQueue:
+    """Notification queue unit tests"""
+    
+    async def test_queue_sends_all_notifications(self):
+        """Test every queued notification is delivered"""
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+        service = NotificationService(bot, batch_size=2, batch_interval=0)
+        
+        queued = await service.queue_moderation_notifications(
+            [_moderated_listing(i) for i in range(5)], approved=True
+        )
+        await service.wait_until_sent()
+        
+        assert queued == 5
+        assert bot.send_message.await_count == 5
+        chat_ids = {call.kwargs['chat_id'] for call in bot.send_message.await_args_list}
+        assert chat_ids == {1000, 1001, 1002, 1003, 1004}
+    
+    async def test_queue_rejection_includes_reason(self):
+        """Test rejection notifications include the reason"""
+        bot = MagicMock()
+        bot.send_message = AsyncMock()
+        service = NotificationService(bot, batch_interval=0)
+        
+        await service.queue_moderation_notifications([_moderated_listing(1)], approved=False, reason="Spam")
+        await service.wait_until_sent()
+        
+        text = bot.send_message.await_args.kwargs['text']
+        assert "rad etildi" in text
+        assert "Spam" in text
+    
+    async def test_queue_skips_rows_without_owner(self):
+        """Test rows without owner telegram id are skipped"""
+        service = NotificationService(MagicMock(), batch_interval=0)
+        
+        queued = await service.queue_moderation_notifications([_moderated_listing(1, owner_telegram_id=0)], approved=True)
+        
+        assert queued == 0
+    
+    async def test_failed_send_does_not_stop_queue(self):
+        """Test one failing chat does not block the rest"""
+        bot = MagicMock()
+        bot.send_message = AsyncMock(side_effect=[Exception("Forbidden"), None, None])
+        service = NotificationService(bot, batch_size=1, batch_interval=0)
+        
+        await service.queue_moderation_notifications([_moderated_listing(i) for i in range(3)], approved=True)
+        await service.wait_until_sent()
+        
+        assert bot.send_message.await_count == 3
@@ -0,0 +1,87 @@
+"""
+Unit Tests - Stek namunalari bilan profillash
+"""
+import asyncio
+import threading
+import time
+import pytest
+from src.utils import profiler
+from src.utils.profiler import StackSampler, ProfilerBusy, profile_for
+
+
+def spin(seconds: float) -> None:
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        sum(range(1000))
+
+
+async def busy_loop(stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        spin(0.05)
+        await asyncio.sleep(0)
+
+
+class TestStackSampler:
+    """StackSampler tests"""
+
+    def test_samples_busy_thread(self):
+        """Test a busy worker thread shows up as the hottest function"""
+        sampler = StackSampler(interval=0.002)
+        sampler.start()
+        worker = threading.Thread(target=spin, args=(0.3,), name="worker-1")
+        worker.start()
+        worker.join()
+        profile = sampler.stop()
+
+        frame, own, total = profile.top(1)[0]
+        assert frame.startswith("spin (tests/unit/test_profiler.py:")
+        assert own == total > 0
+        assert 'worker' in profile.threads
+        assert 'stack-sampler' not in profile.threads
+
+    def test_collapsed_format(self):
+        """Test collapsed stacks are 'thread;outer;...;leaf count' lines"""
+        sampler = StackSampler(interval=0.002)
+        sampler.start()
+        spin(0.2)
+        profile = sampler.stop()
+
+        lines = profile.collapsed().splitlines()
+        stack, count = lines[0].rsplit(' ', 1)
+        assert stack.startswith("MainThread;")
+        assert stack.endswith("spin (tests/unit/test_profiler.py:12)")
+        assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) == profile.busy_samples
+
+
+@pytest.mark.asyncio
+class TestProfileFor:
+    """profile_for tests"""
+
+    async def test_event_loop_coroutines_visible(self):
+        """Test coroutine frames on the event loop are attributed and idle time is excluded"""
+        stop = asyncio.Event()
+        task = asyncio.create_task(busy_loop(stop))
+        profile = await profile_for(0.3, interval=0.002)
+        stop.set()
+        await task
+
+        assert profile.top(1)[0][0].startswith("spin ")
+        assert any(
+            ";busy_loop (" in line and line.index(";busy_loop (") < line.index(";spin (")
+            for line in profile.collapsed().splitlines()
+        )
+        assert "Thread lar (band %)" in profile.report(5)
+        assert profile.overhead < 0.5
+
+    async def test_single_profile_at_a_time(self):
+        """Test a second profile is refused while one is running"""
+        running = asyncio.create_task(profile_for(0.2, interval=0.01))
+        await asyncio.sleep(0.05)
+        assert profiler.is_busy() is True
+        with pytest.raises(ProfilerBusy):
+            await profile_for(0.1)
+        await running
+
+        assert profiler.is_busy() is False
+
+        assert profiler._active is None
@@ -0,0 +1,63 @@
+"""
+Unit Tests - Rate Limiter
+"""
+import time
+import pytest
+from src.utils.rate_limiter import TokenBucket
+
+
+@pytest.mark.asyncio
+class TestTokenBucket:
+    """Token bucket unit tests"""
+    
+    async def test_burst_up_to_capacity(self):
+        """Test capacity tokens are available immediately"""
+        bucket = TokenBucket(rate=10, capacity=5)
+        
+        started = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        
+        assert time.monotonic() - started < 0.05
+    
+    async def test_rate_is_limited(self):
+        """Test acquiring beyond capacity waits for refill"""
+        bucket = TokenBucket(rate=100, capacity=1)
+        
+        started = time.monotonic()
+        for _ in range(6):
+            await bucket.acquire()
+        
+        assert time.monotonic() - started >= 0.045
+    
+    async def test_pause_blocks_acquire(self):
+        """Test pause delays the next token"""
+        bucket = TokenBucket(rate=100, capacity=1)
+        bucket.pause(0.05)
+        
+        started = time.monotonic()
+        await bucket.acquire()
+        
+        assert time.monotonic() - started >= 0.05
+    
+    async def test_concurrent_pauses_do_not_add_up(self):
+        """Test several senders hitting flood control pause the bucket only once"""
+        bucket = TokenBucket(rate=25)
+        for _ in range(10):
+            bucket.pause(5)
+        
+        assert bucket._tokens == pytest.approx(-125, abs=1)
+        
+        bucket = TokenBucket(rate=100, capacity=1)
+        for _ in range(10):
+            bucket.pause(0.05)
+        
+        started = time.monotonic()
+        await bucket.acquire()
+        
+        assert time.monotonic() - started < 0.2
+    
+    async def test_invalid_rate(self):
+        """Test non-positive rate is rejected"""
+        with pytest.raises(ValueError):
+            TokenBucket(rate=0)
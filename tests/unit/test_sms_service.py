@@ -0,0 +1,105 @@
+"""
+Unit Tests - SMS Service and in-memory verification store
+"""
+import pytest
+from src.services.sms_service import SMSService
+from src.services.verification_store import (
+    MemoryVerificationStore, CHECK_VERIFIED, CHECK_INVALID, CHECK_MISSING,
+    CHECK_EXPIRED, CHECK_LOCKED
+)
+
+
+class FakeClock:
+    """Qo'lda suriladigan soat"""
+    
+    def __init__(self):
+        self.now = 1000.0
+    
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.mark.asyncio
+class TestMemoryVerificationStore:
+    """Memory verification store tests"""
+    
+    async def test_cooldown(self):
+        """Test a second code is refused until the cooldown ends"""
+        clock = FakeClock()
+        store = MemoryVerificationStore(clock)
+        
+        assert await store.issue("+998901234567", "111111", ttl=300, cooldown=60) is True
+        assert await store.issue("+998901234567", "222222", ttl=300, cooldown=60) is False
+        clock.now += 61
+        assert await store.issue("+998901234567", "333333", ttl=300, cooldown=60) is True
+        assert await store.check("+998901234567", "333333", 3) == (CHECK_VERIFIED, 1)
+    
+    async def test_attempts_are_limited(self):
+        """Test wrong codes count towards the limit"""
+        store = MemoryVerificationStore(FakeClock())
+        await store.issue("+998901234567", "123456", ttl=300, cooldown=60)
+        
+        assert await store.check("+998901234567", "000000", 2) == (CHECK_INVALID, 1)
+        assert await store.check("+998901234567", "000000", 2) == (CHECK_INVALID, 2)
+        assert await store.check("+998901234567", "123456", 2) == (CHECK_LOCKED, 2)
+        assert await store.is_verified("+998901234567") is False
+    
+    async def test_expired_codes_are_evicted_from_heap(self):
+        """Test expiry removes only the codes whose deadline passed"""
+        clock = FakeClock()
+        store = MemoryVerificationStore(clock)
+        await store.issue("+998900000001", "111111", ttl=10, cooldown=0)
+        await store.issue("+998900000002", "222222", ttl=100, cooldown=0)
+        # Qayta yuborilgan kod - eski heap yozuvi uni o'chirmasligi kerak
+        await store.issue("+998900000001", "333333", ttl=100, cooldown=0)
+        
+        clock.now += 50
+        assert await store.purge_expired() == 0
+        assert len(store) == 2
+        
+        clock.now += 60
+        assert await store.purge_expired() == 2
+        assert len(store) == 0
+        assert await store.check("+998900000002", "222222", 3) == (CHECK_MISSING, 0)
+    
+    async def test_expired_code_is_reported(self):
+        """Test a code checked after its deadline is reported as expired"""
+        clock = FakeClock()
+        store = MemoryVerificationStore(clock)
+        await store.issue("+998901234567", "123456", ttl=10, cooldown=0)
+        
+        clock.now += 11
+        assert await store.check("+998901234567", "123456", 3) == (CHECK_EXPIRED, 0)
+        assert len(store) == 0
+
+
+@pytest.mark.asyncio
+class TestSMSServiceVerification:
+    """SMS service verification flow tests"""
+    
+    async def test_send_and_verify(self, monkeypatch):
+        """Test the code sent in debug mode verifies the phone"""
+        store = MemoryVerificationStore()
+        service = SMSService(store)
+        monkeypatch.setattr(service, 'generate_verification_code', lambda: "654321")
+        
+        sent = await service.send_verification_code("901234567")
+        assert sent['success'] is True
+        assert (await service.send_verification_code("901234567"))['success'] is False
+        
+        wrong = await service.verify_code("+998901234567", "000000")
+        assert wrong == {'success': False, 'error': "Noto'g'ri tasdiqlash kodi. 2 ta urinish qoldi."}
+        assert (await service.verify_code("+998901234567", " 654321 "))['success'] is True
+        assert await service.is_phone_verified("901234567") is True
+    
+    async def test_lockout_after_max_attempts(self):
+        """Test the third wrong code locks the phone"""
+        service = SMSService(MemoryVerificationStore())
+        await service.send_verification_code("+998901234567")
+        
+        for _ in range(2):
+            await service.verify_code("+998901234567", "000000")
+        result = await service.verify_code("+998901234567", "000000")
+        
+        assert result['error'] == "Juda ko'p noto'g'ri urinish. Yangi kod so'rang."
+        assert await service.is_phone_verified("+998901234567") is False
@@ -0,0 +1,146 @@
+"""
+Unit Tests - Tracing
+"""
+import asyncio
+import logging
+import pytest
+from unittest.mock import AsyncMock, MagicMock, patch
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import create_async_engine
+from telegram.request import HTTPXRequest
+from src.utils.metrics import InstrumentedRequest
+from src.utils.tracing import (
+    Tracer, TRACER, InMemoryExporter, TraceContextFilter, traced_handler, trace_engine,
+    current_span, to_otlp, STATUS_ERROR
+)
+
+
+@pytest.fixture
+def exporter():
+    """Global TRACER ni test davomida yoqish"""
+    exporter = InMemoryExporter()
+    TRACER.configure(exporter, 1.0)
+    yield exporter
+    TRACER.configure(None)
+
+
+def _update(update_id=1, user_id=42):
+    update = MagicMock()
+    update.update_id = update_id
+    update.effective_user.id = user_id
+    update.callback_query = None
+    return update
+
+
+@pytest.mark.asyncio
+class TestTracer:
+    """Span tests"""
+
+    async def test_disabled_tracer_opens_nothing(self):
+        """Test no spans exist without an exporter"""
+        tracer = Tracer()
+        with tracer.start_trace("update start") as root:
+            with tracer.start_span("db SELECT") as child:
+                assert root is None and child is None
+                assert current_span() is None
+
+    async def test_children_share_trace_and_survive_tasks(self):
+        """Test child spans link to the parent across asyncio tasks"""
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporter)
+
+        async def work(name):
+            with tracer.start_span(name):
+                await asyncio.sleep(0)
+
+        with tracer.start_trace("update message") as root:
+            await asyncio.gather(work("a"), work("b"))
+
+        assert current_span() is None
+        children = [span for span in exporter.spans if span.parent_id == root.span_id]
+        assert sorted(span.name for span in children) == ["a", "b"]
+        assert all(span.trace_id == root.trace_id for span in exporter.spans)
+        assert exporter.spans[-1] is root and root.duration_ms >= 0
+
+    async def test_sampling_skips_whole_trace(self):
+        """Test an unsampled update creates no child spans either"""
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporter, sample_rate=0.5, rng=lambda: 0.7)
+        with tracer.start_trace("update start"):
+            with tracer.start_span("db SELECT") as child:
+                assert child is None
+        assert exporter.spans == []
+
+    async def test_exception_marks_span(self):
+        """Test errors are recorded on the span"""
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporter)
+        with pytest.raises(ValueError):
+            with tracer.start_trace("update start"):
+                raise ValueError("boom")
+        assert exporter.spans[0].status == STATUS_ERROR
+        assert exporter.spans[0].attributes['exception.type'] == "ValueError"
+
+    async def test_traced_handler_and_log_filter(self, exporter):
+        """Test handler spans carry update attributes and logs get the trace id"""
+        record = logging.LogRecord("test", logging.INFO, __file__, 1, "msg", None, None)
+        log_filter = TraceContextFilter()
+
+        @traced_handler("start")
+        async def handler(update, context):
+            log_filter.filter(record)
+            return "ok"
+
+        assert await handler(_update(update_id=7, user_id=42), None) == "ok"
+        span = exporter.spans[0]
+        assert span.name == "update start"
+        assert span.attributes['telegram.update_id'] == 7
+        assert span.attributes['telegram.user_id'] == 42
+        assert record.trace_id == span.trace_id
+
+        log_filter.filter(record)
+        assert record.trace_id == "-"
+
+    async def test_sql_and_bot_api_spans(self, exporter, tmp_path):
+        """Test SQL statements and Bot API requests become child spans"""
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'trace.db'}")
+        trace_engine(engine)
+        request = InstrumentedRequest()
+
+        @traced_handler("message")
+        async def handler(update, context):
+            async with engine.connect() as conn:
+                await conn.execute(text("SELECT 1"))
+            await request.do_request("https://api.telegram.org/bot123:abc/sendMessage", "POST")
+
+        try:
+            with patch.object(HTTPXRequest, 'do_request', AsyncMock(return_value=(200, b'{}'))):
+                await handler(_update(), None)
+                # Update tashqarisidagi so'rovlar span yaratmaydi
+                async with engine.connect() as conn:
+                    await conn.execute(text("SELECT 2"))
+        finally:
+            await engine.dispose()
+
+        root = exporter.spans[-1]
+        names = [span.name for span in exporter.spans if span.parent_id == root.span_id]
+        assert "db SELECT" in names and "telegram sendMessage" in names
+        assert len(exporter.spans) == 3
+        db_span = next(span for span in exporter.spans if span.name == "db SELECT")
+        assert db_span.attributes['db.statement'] == "SELECT 1"
+
+    async def test_otlp_payload(self):
+        """Test spans serialize to the OTLP JSON shape"""
+        exporter = InMemoryExporter()
+        tracer = Tracer(exporter)
+        with tracer.start_trace("update start", {'telegram.user_id': 42}):
+            with tracer.start_span("db SELECT"):
+                pass
+
+        payload = to_otlp(exporter.spans, "bot")
+        resource = payload['resourceSpans'][0]
+        assert resource['resource']['attributes'][0]['value'] == {'stringValue': "bot"}
+        child, root = resource['scopeSpans'][0]['spans']
+        assert child['parentSpanId'] == root['spanId'] and 'parentSpanId' not in root
+        assert len(root['traceId']) == 32 and len(root['spanId']) == 16
+        assert root['attributes'] == [{'key': 'telegram.user_id', 'value': {'intValue': '42'}}]
@@ -0,0 +1,87 @@
+"""
+Unit Tests - Update yozuvi (replay uchun)
+"""
+import gzip
+import json
+import pytest
+from src.utils.update_recorder import UpdateRecorder, anonymize, anonymize_text, pseudonym, read_recording
+
+
+def message_update(user_id: int, text: str) -> dict:
+    user = {'id': user_id, 'is_bot': False, 'first_name': "Damir", 'last_name': "N", 'username': "damir"}
+    return {
+        'update_id': 1,
+        'message': {
+            'message_id': 5,
+            'date': 1700000000,
+            'chat': {'id': user_id, 'type': 'private', 'first_name': "Damir"},
+            'from': user,
+            'text': text
+        }
+    }
+
+
+class TestAnonymize:
+    """Anonimlashtirish tests"""
+
+    def test_identities_are_stable_pseudonyms(self):
+        """Test user ids map consistently and names are removed"""
+        data = anonymize(message_update(924016177, "salom"), "salt")
+        message = data['message']
+
+        assert message['from']['id'] == message['chat']['id'] == pseudonym(924016177, "salt")
+        assert message['from']['id'] != 924016177
+        assert pseudonym(924016177, "other") != message['from']['id']
+        assert message['from']['first_name'] == "Foydalanuvchi"
+        assert 'username' not in message['from'] and 'last_name' not in message['from']
+
+    def test_text_keeps_shape(self):
+        """Test commands and short numbers survive, letters and phone numbers do not"""
+        assert anonymize_text("/start") == "/start"
+        assert anonymize_text("/start ref123") == "/start xxx123"
+        assert anonymize_text("100-1000") == "100-1000"
+        assert anonymize_text("Tel: +998901234567") == "Xxx: +000000000000"
+
+    def test_contact_phone_replaced(self):
+        """Test shared contacts get a fake phone number"""
+        data = anonymize({'contact': {'phone_number': "+998901234567", 'first_name': "Damir", 'user_id': 42}}, "salt")
+
+        assert data['contact']['phone_number'] != "+998901234567"
+        assert data['contact']['first_name'] == "Foydalanuvchi"
+        assert data['contact']['user_id'] == pseudonym(42, "salt")
+
+
+@pytest.mark.asyncio
+class TestUpdateRecorder:
+    """UpdateRecorder tests"""
+
+    async def test_recording_round_trip(self, tmp_path):
+        """Test updates are written as gzip JSONL and read back in order"""
+        path = str(tmp_path / "updates.jsonl.gz")
+        recorder = UpdateRecorder(path, salt="salt")
+        recorder.add(message_update(1, "/start"))
+        recorder.add(message_update(2, "450"))
+        await recorder.close()
+
+        with gzip.open(path, 'rt') as file:
+            header = json.loads(file.readline())
+        records = list(read_recording(path))
+
+        assert header['version'] == 1
+        assert [update['message']['text'] for _, update in records] == ["/start", "450"]
+        assert records[0][0] <= records[1][0]
+
+    async def test_restarted_recording_continues_timeline(self, tmp_path):
+        """Test a second session appended to the file is shifted after the first"""
+        path = str(tmp_path / "updates.jsonl.gz")
+        for text in ("birinchi", "ikkinchi"):
+            recorder = UpdateRecorder(path, salt="salt")
+            recorder.add(message_update(1, text))
+            recorder._started -= 3.0
+            recorder.add(message_update(1, text))
+            await recorder.close()
+
+        times = [offset for offset, _ in read_recording(path)]
+
+        assert times == sorted(times)
+        assert times[-1] == pytest.approx(6.0, abs=0.1)
@@ -0,0 +1,155 @@
+"""
+Bot Harness - UyKelishuvBot ni soxta Bot API bilan shu jarayonda ishlatish
+
+Update lar haqiqiy botdagi kabi Application.update_queue orqali o'tadi
+(navbat, concurrent_updates, handler guruhlari), Bot API so'rovlari esa
+FakeBotRequest orqali FakeBotAPI ga boradi. feed() update navbatga
+qo'yilgandan to barcha handlerlar tugaguncha bo'lgan vaqtni qaytaradi -
+foydalanuvchi sezadigan kechikish (tarmoqsiz).
+
+network=True bilan so'rovlar FakeBotAPIServer ga HTTP orqali boradi
+(production dagi InstrumentedRequest, ulanishlar hovuzi, JSON/multipart).
+
+Baza src.database.database dagi engine (DATABASE_URL) - harness ni import
+qilishdan oldin muhit o'zgaruvchilarini sozlang.
+"""
+import asyncio
+import time
+from typing import Optional, Dict, Any, Union
+from telegram import Update
+from telegram.ext import Application, ContextTypes, TypeHandler
+from src.bot.client_telegram import UyKelishuvBot
+from src.utils.metrics import InstrumentedRequest
+from tools.fake_bot_api import FakeBotAPI, FakeBotRequest, FakeBotAPIServer
+
+TOKEN = "123456789:FAKE-token-for-local-testing"
+
+# Barcha handlerlardan keyin ishlaydigan guruh - update tugaganini bildiradi
+COMPLETION_GROUP = 1_000_000
+
+
+class BotHarness:
+    """
+    Soxta Bot API ga ulangan bot
+
+    Args:
+        api: Soxta Bot API (berilmasa yangisi yaratiladi)
+        concurrent_updates: PTB concurrent_updates (False - ketma-ket, production dagi kabi)
+        timeout: Bitta update uchun maksimal kutish (soniya)
+        network: Bot API ga lokal HTTP server orqali ulanish
+    """
+
+    def __init__(self, api: Optional[FakeBotAPI] = None, concurrent_updates: Union[bool, int] = False,
+                 timeout: float = 60.0, network: bool = False):
+        self.api = api or FakeBotAPI()
+        self.timeout = timeout
+        self.server: Optional[FakeBotAPIServer] = None
+        builder = Application.builder().token(TOKEN).updater(None).concurrent_updates(concurrent_updates)
+        if network:
+            self.server = FakeBotAPIServer(self.api)
+            builder = (
+                builder.base_url(self.server.base_url).base_file_url(self.server.base_file_url)
+                .request(InstrumentedRequest(connection_pool_size=256))
+            )
+        else:
+            builder = builder.request(FakeBotRequest(self.api))
+        self.application = builder.build()
+        self.bot = UyKelishuvBot(self.application)
+        self.errors = 0
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._update_id = 0
+        self._callback_id = 0
+
+    async def start(self) -> None:
+        if self.server is not None:
+            await self.server.start()
+        await self.bot.start()
+        self.application.add_handler(TypeHandler(Update, self._completed), group=COMPLETION_GROUP)
+        self.application.add_error_handler(self._error)
+        await self.application.initialize()
+        await self.application.start()
+
+    async def stop(self) -> None:
+        await self.application.stop()
+        await self.application.shutdown()
+        if self.server is not None:
+            await self.server.stop()
+
+    async def __aenter__(self) -> "BotHarness":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _completed(self, update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+        future = self._pending.get(update.update_id)
+        if future is not None and not future.done():
+            future.set_result(None)
+
+    async def _error(self, update: object, context: ContextTypes.DEFAULT_TYPE) -> None:
+        # Handler tashqarisiga chiqqan xatolik (handlerlar odatda o'zi ushlaydi)
+        self.errors += 1
+
+    # --- Update lar ---
+
+    @staticmethod
+    def user(telegram_id: int, first_name: str = "Test", language_code: str = "uz") -> Dict[str, Any]:
+        """Telegram foydalanuvchisi (update lardagi "from")"""
+        return {'id': telegram_id, 'is_bot': False, 'first_name': first_name, 'language_code': language_code}
+
+    def next_update_id(self) -> int:
+        self._update_id += 1
+        return self._update_id
+
+    def message_update(self, user: Dict[str, Any], text: str) -> Dict[str, Any]:
+        """Matn yoki buyruq xabari"""
+        return {'update_id': self.next_update_id(), 'message': self.api.user_message(user, text)}
+
+    def photo_update(self, user: Dict[str, Any]) -> Dict[str, Any]:
+        """Rasm xabari (fayl soxta API da saqlanadi - getFile ishlaydi)"""
+        file_id = self.api.add_file()
+        photo = [{'file_id': file_id, 'file_unique_id': f"u{file_id}", 'width': 1280, 'height': 960,
+                  'file_size': len(self.api.files[file_id])}]
+        return {'update_id': self.next_update_id(), 'message': self.api.user_message(user, photo=photo)}
+
+    def callback_update(self, user: Dict[str, Any], data: str) -> Dict[str, Any]:
+        """Oxirgi inline klaviaturali xabardagi tugmani bosish"""
+        message = self.api.last_bot_message(user['id'], with_keyboard=True)
+        if message is None:
+            raise LookupError(f"No inline keyboard in chat {user['id']}")
+        self._callback_id += 1
+        return {
+            'update_id': self.next_update_id(),
+            'callback_query': {
+                'id': str(self._callback_id),
+                'from': user,
+                'chat_instance': str(user['id']),
+                'message': message,
+                'data': data
+            }
+        }
+
+    async def feed(self, update_data: Dict[str, Any]) -> float:
+        """
+        Update ni navbatga qo'yib, qayta ishlanishini kutish
+
+        Returns:
+            float: Navbatga qo'yilgandan tugaguncha o'tgan vaqt (soniya)
+        """
+        update = Update.de_json(update_data, self.application.bot)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[update.update_id] = future
+        started = time.perf_counter()
+        try:
+            await self.application.update_queue.put(update)
+            await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(update.update_id, None)
+        return time.perf_counter() - started
+
+    async def send_text(self, user: Dict[str, Any], text: str) -> float:
+        return await self.feed(self.message_update(user, text))
+
+    async def click(self, user: Dict[str, Any], data: str) -> float:
+        return await self.feed(self.callback_update(user, data))
@@ -0,0 +1,631 @@
+"""
+Fake Bot API - Telegram Bot API ning lokal o'rnini bosuvchi
+
+Bot yuborgan xabarlar chatlar bo'yicha xotirada saqlanadi (tahrirlar bilan),
+shuning uchun virtual foydalanuvchi oxirgi xabardagi tugmani "bosishi"
+mumkin. Sozlanadigan kechikish va flood-limit (429 + retry_after) haqiqiy
+Telegram xatti-harakatini taqlid qiladi.
+
+FakeBotRequest - PTB request i: so'rovlar tarmoqqa chiqmasdan shu jarayondagi
+FakeBotAPI ga yo'naltiriladi (load test, replay).
+
+FakeBotAPIServer - xuddi shu API ni HTTP orqali beradi (/bot<token>/<method>,
+/file/bot<token>/<path>, getUpdates long polling). Bot TELEGRAM_API_URL ga
+uning manzili berilsa haqiqiy tarmoq yo'li (httpx, ulanishlar hovuzi,
+timeout lar) ishlaydi:
+    python -m tools.fake_bot_api --port 8081 --latency 0.05 --chat-rate 5
+    TELEGRAM_API_URL=http://127.0.0.1:8081 python main.py
+Foydalanuvchi xabarlari POST /_fake/updates orqali beriladi
+({"chat_id": 42, "text": "/start"} yoki to'liq update), bot javoblari
+GET /_fake/chats/42 da ko'rinadi.
+"""
+import argparse
+import asyncio
+import io
+import itertools
+import json
+import logging
+import os
+import random
+import socket
+import sys
+import time
+from collections import Counter, OrderedDict, defaultdict, deque
+from email import policy
+from email.parser import BytesParser
+from typing import Optional, Dict, List, Any, Tuple
+from urllib.parse import parse_qs
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from telegram.request import BaseRequest, RequestData
+from src.utils.tracing import TRACER, KIND_CLIENT
+
+BOT_USER = {
+    'id': 7000000001,
+    'is_bot': True,
+    'first_name': "UyKelishuv",
+    'username': "uykelishuv_test_bot",
+    'can_join_groups': False,
+    'can_read_all_group_messages': False,
+    'supports_inline_queries': False
+}
+
+# Har bir chat uchun saqlanadigan oxirgi xabarlar soni
+MESSAGES_PER_CHAT = 50
+
+# So'rov sarlavhalari va tanasini o'qish muddati
+READ_TIMEOUT = 10.0
+
+logger = logging.getLogger(__name__)
+
+_default_file: Optional[bytes] = None
+
+
+def default_file() -> bytes:
+    """getFile uchun standart fayl - kichik JPEG (rasm pipeline i ochib ko'ra oladi)"""
+    global _default_file
+    if _default_file is None:
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new('RGB', (64, 48), (180, 140, 90)).save(buffer, 'JPEG')
+        _default_file = buffer.getvalue()
+    return _default_file
+
+
+class BotAPIError(Exception):
+    """Bot API xato javobi (HTTP kodi va tavsifi bilan)"""
+
+    def __init__(self, code: int, description: str, retry_after: Optional[int] = None):
+        super().__init__(description)
+        self.code = code
+        self.description = description
+        self.retry_after = retry_after
+
+    def payload(self) -> Dict[str, Any]:
+        body: Dict[str, Any] = {'ok': False, 'error_code': self.code, 'description': self.description}
+        if self.retry_after is not None:
+            body['parameters'] = {'retry_after': self.retry_after}
+        return body
+
+
+class _RateLimiter:
+    """Sirpanuvchi oyna: period soniyada ko'pi bilan limit ta so'rov"""
+
+    def __init__(self, limit: int, period: float = 1.0):
+        self.limit = limit
+        self.period = period
+        self.calls: deque = deque()
+
+    def retry_after(self, now: float) -> Optional[int]:
+        while self.calls and now - self.calls[0] >= self.period:
+            self.calls.popleft()
+        if len(self.calls) >= self.limit:
+            return max(1, int(self.period - (now - self.calls[0]) + 0.999))
+        self.calls.append(now)
+        return None
+
+
+class FakeBotAPI:
+    """
+    Bot API holati va usullari
+
+    Args:
+        latency: Har bir so'rov oldidan kutish (soniya)
+        jitter: Kechikishga qo'shiladigan tasodifiy qism (0..jitter)
+        global_rate: Barcha chatlar bo'yicha soniyada ruxsat etilgan xabarlar (None - cheklanmagan)
+        chat_rate: Bitta chatga soniyada ruxsat etilgan xabarlar (None - cheklanmagan)
+    """
+
+    # Flood-limit faqat xabar yuboruvchi/o'zgartiruvchi usullarga qo'llanadi
+    LIMITED_METHODS = {
+        'sendMessage', 'sendPhoto', 'sendDocument', 'sendMediaGroup', 'editMessageText',
+        'editMessageCaption', 'editMessageReplyMarkup', 'copyMessage', 'forwardMessage'
+    }
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, global_rate: Optional[int] = None,
+                 chat_rate: Optional[int] = None, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.global_limiter = _RateLimiter(global_rate) if global_rate else None
+        self.chat_rate = chat_rate
+        self.chat_limiters: Dict[int, _RateLimiter] = {}
+        self.chats: Dict[int, "OrderedDict[int, Dict[str, Any]]"] = defaultdict(OrderedDict)
+        self.files: Dict[str, bytes] = {}
+        self.calls: Counter = Counter()
+        self.errors: Counter = Counter()
+        self._message_ids: Dict[int, int] = defaultdict(int)
+        self._injected: Dict[str, deque] = defaultdict(deque)
+        self._file_counter = 0
+        self._random = random.Random(seed)
+        # getUpdates navbati: offset bilan tasdiqlanmaguncha qaytariladi
+        self.pending_updates: deque = deque()
+        self._last_update_id = 0
+        self._updates_event: Optional[asyncio.Event] = None
+
+    # --- Holat ---
+
+    def next_message_id(self, chat_id: int) -> int:
+        """Chat dagi keyingi message_id (foydalanuvchi va bot xabarlari uchun umumiy)"""
+        self._message_ids[chat_id] += 1
+        return self._message_ids[chat_id]
+
+    def _store(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        chat = self.chats[message['chat']['id']]
+        chat[message['message_id']] = message
+        while len(chat) > MESSAGES_PER_CHAT:
+            chat.popitem(last=False)
+        return message
+
+    def user_message(self, user: Dict[str, Any], text: Optional[str] = None, **fields: Any) -> Dict[str, Any]:
+        """Foydalanuvchi yuborgan xabar (update ichiga qo'yish uchun)"""
+        message = {
+            'message_id': self.next_message_id(user['id']),
+            'date': int(time.time()),
+            'chat': {'id': user['id'], 'type': 'private', 'first_name': user.get('first_name', '')},
+            'from': user,
+            **fields
+        }
+        if text is not None:
+            message['text'] = text
+            if text.startswith('/'):
+                message['entities'] = [{'type': 'bot_command', 'offset': 0, 'length': len(text.split()[0])}]
+        return self._store(message)
+
+    def messages(self, chat_id: int) -> List[Dict[str, Any]]:
+        """Chat xabarlari (eskisidan yangisiga)"""
+        return list(self.chats.get(chat_id, {}).values())
+
+    def last_bot_message(self, chat_id: int, with_keyboard: bool = False) -> Optional[Dict[str, Any]]:
+        """Bot yuborgan oxirgi xabar (with_keyboard - faqat inline tugmalisi)"""
+        for message in reversed(self.messages(chat_id)):
+            if message['from']['id'] != BOT_USER['id']:
+                continue
+            if with_keyboard and not message.get('reply_markup'):
+                continue
+            return message
+        return None
+
+    def buttons(self, chat_id: int) -> List[str]:
+        """Oxirgi klaviaturadagi callback_data lar"""
+        message = self.last_bot_message(chat_id, with_keyboard=True)
+        if message is None:
+            return []
+        return [
+            button['callback_data']
+            for row in message['reply_markup'].get('inline_keyboard', [])
+            for button in row if button.get('callback_data')
+        ]
+
+    def add_file(self, content: Optional[bytes] = None) -> str:
+        """getFile orqali yuklab olinadigan fayl qo'shish"""
+        self._file_counter += 1
+        file_id = f"FAKEFILE{self._file_counter:08d}"
+        self.files[file_id] = content if content is not None else default_file()
+        return file_id
+
+    def push_update(self, update: Dict[str, Any]) -> Dict[str, Any]:
+        """getUpdates orqali botga beriladigan update (update_id berilmasa qo'yiladi)"""
+        if 'update_id' not in update:
+            update = {'update_id': self._last_update_id + 1, **update}
+        self._last_update_id = max(self._last_update_id, update['update_id'])
+        self.pending_updates.append(update)
+        self._event().set()
+        return update
+
+    def _event(self) -> asyncio.Event:
+        if self._updates_event is None:
+            self._updates_event = asyncio.Event()
+        return self._updates_event
+
+    async def wait_bot_message(self, chat_id: int, after: int = 0, timeout: float = 5.0) -> Dict[str, Any]:
+        """Bot chatga message_id > after bo'lgan xabar yuborguncha kutish"""
+        deadline = time.monotonic() + timeout
+        while True:
+            for message in self.messages(chat_id):
+                if message['from']['id'] == BOT_USER['id'] and message['message_id'] > after:
+                    return message
+            if time.monotonic() >= deadline:
+                raise asyncio.TimeoutError(f"No bot message in chat {chat_id}")
+            await asyncio.sleep(0.01)
+
+    def fail_next(self, method: str, code: int = 500, description: str = "Internal Server Error",
+                  retry_after: Optional[int] = None) -> None:
+        """Usulning navbatdagi chaqiruvi xato qaytaradi"""
+        self._injected[method].append(BotAPIError(code, description, retry_after))
+
+    # --- So'rovlar ---
+
+    async def call(self, method: str, params: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+        """
+        Bot API usulini bajarish
+
+        Returns:
+            Tuple[int, Dict[str, Any]]: HTTP kodi va JSON javob
+        """
+        self.calls[method] += 1
+        delay = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if delay:
+            await asyncio.sleep(delay)
+
+        try:
+            if self._injected.get(method):
+                raise self._injected[method].popleft()
+            self._check_flood(method, params)
+            handler = getattr(self, f"_{method}", None)
+            if method == 'getUpdates':
+                result = await self._get_updates(params)
+            elif handler is None:
+                result = self._generic(method, params)
+            else:
+                result = handler(params)
+        except BotAPIError as e:
+            self.errors[(method, e.code)] += 1
+            return e.code, e.payload()
+        return 200, {'ok': True, 'result': result}
+
+    def _check_flood(self, method: str, params: Dict[str, Any]) -> None:
+        if method not in self.LIMITED_METHODS:
+            return
+        now = time.monotonic()
+        if self.global_limiter is not None:
+            retry_after = self.global_limiter.retry_after(now)
+            if retry_after is not None:
+                raise BotAPIError(429, f"Too Many Requests: retry after {retry_after}", retry_after)
+        if self.chat_rate:
+            chat_id = int(params.get('chat_id', 0))
+            limiter = self.chat_limiters.setdefault(chat_id, _RateLimiter(self.chat_rate))
+            retry_after = limiter.retry_after(now)
+            if retry_after is not None:
+                raise BotAPIError(429, f"Too Many Requests: retry after {retry_after}", retry_after)
+
+    @staticmethod
+    def _json_field(value: Any) -> Any:
+        # Multipart so'rovlarda murakkab maydonlar JSON satr bo'lib keladi
+        if isinstance(value, str) and value[:1] in ('{', '['):
+            return json.loads(value)
+        return value
+
+    def _bot_message(self, chat_id: Any, **fields: Any) -> Dict[str, Any]:
+        chat_id = int(chat_id)
+        message = {
+            'message_id': self.next_message_id(chat_id),
+            'date': int(time.time()),
+            'chat': {'id': chat_id, 'type': 'private' if chat_id > 0 else 'supergroup'},
+            'from': BOT_USER,
+            **{key: value for key, value in fields.items() if value is not None}
+        }
+        return self._store(message)
+
+    def _find(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        chat_id = int(params.get('chat_id', 0))
+        message = self.chats.get(chat_id, {}).get(int(params.get('message_id', 0)))
+        if message is None:
+            raise BotAPIError(400, "Bad Request: message to edit not found")
+        return message
+
+    def _photo(self, file_id: Any) -> List[Dict[str, Any]]:
+        if isinstance(file_id, bytes):
+            # HTTP orqali yuklangan fayl (multipart)
+            file_id = self.add_file(file_id)
+        elif not isinstance(file_id, str) or file_id.startswith('attach://'):
+            file_id = self.add_file()
+        return [{'file_id': file_id, 'file_unique_id': f"u{file_id[-12:]}", 'width': 1280, 'height': 960}]
+
+    def _getMe(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return BOT_USER
+
+    def _sendMessage(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        if not params.get('text'):
+            raise BotAPIError(400, "Bad Request: message text is empty")
+        return self._bot_message(
+            params['chat_id'], text=params['text'], reply_markup=self._json_field(params.get('reply_markup'))
+        )
+
+    def _sendPhoto(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return self._bot_message(
+            params['chat_id'], photo=self._photo(params.get('photo')), caption=params.get('caption'),
+            reply_markup=self._json_field(params.get('reply_markup'))
+        )
+
+    def _sendDocument(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        document = params.get('document')
+        file_id = self.add_file(document if isinstance(document, bytes) else None)
+        return self._bot_message(
+            params['chat_id'], caption=params.get('caption'),
+            document={'file_id': file_id, 'file_unique_id': f"u{file_id}", 'file_name': "document"}
+        )
+
+    def _sendMediaGroup(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        media = self._json_field(params.get('media')) or []
+        return [
+            self._bot_message(params['chat_id'], photo=self._photo(item.get('media')), caption=item.get('caption'))
+            for item in media
+        ]
+
+    def _edit(self, params: Dict[str, Any], **changes: Any) -> Any:
+        if params.get('inline_message_id'):
+            return True
+        message = self._find(params)
+        markup = self._json_field(params.get('reply_markup'))
+        if all(message.get(key) == value for key, value in changes.items()) and message.get('reply_markup') == markup:
+            raise BotAPIError(400, "Bad Request: message is not modified")
+        message.update(changes)
+        if markup:
+            message['reply_markup'] = markup
+        else:
+            message.pop('reply_markup', None)
+        message['edit_date'] = int(time.time())
+        return message
+
+    def _editMessageText(self, params: Dict[str, Any]) -> Any:
+        return self._edit(params, text=params.get('text'))
+
+    def _editMessageCaption(self, params: Dict[str, Any]) -> Any:
+        return self._edit(params, caption=params.get('caption'))
+
+    def _editMessageReplyMarkup(self, params: Dict[str, Any]) -> Any:
+        return self._edit(params)
+
+    def _deleteMessage(self, params: Dict[str, Any]) -> bool:
+        chat = self.chats.get(int(params.get('chat_id', 0)), {})
+        if chat.pop(int(params.get('message_id', 0)), None) is None:
+            raise BotAPIError(400, "Bad Request: message to delete not found")
+        return True
+
+    def _copyMessage(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        return {'message_id': self.next_message_id(int(params['chat_id']))}
+
+    def _getFile(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        file_id = params.get('file_id')
+        if file_id not in self.files:
+            raise BotAPIError(400, "Bad Request: invalid file_id")
+        return {
+            'file_id': file_id, 'file_unique_id': f"u{file_id}",
+            'file_size': len(self.files[file_id]), 'file_path': f"photos/{file_id}.jpg"
+        }
+
+    def _confirm_updates(self, offset: int) -> None:
+        while self.pending_updates and self.pending_updates[0]['update_id'] < offset:
+            self.pending_updates.popleft()
+
+    async def _get_updates(self, params: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Long polling: navbat bo'sh bo'lsa timeout soniyagacha yangi update kutiladi"""
+        offset = int(params.get('offset') or 0)
+        limit = int(params.get('limit') or 100)
+        timeout = float(params.get('timeout') or 0)
+        self._confirm_updates(offset)
+        if not self.pending_updates and timeout > 0:
+            event = self._event()
+            event.clear()
+            try:
+                await asyncio.wait_for(event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            self._confirm_updates(offset)
+        return list(itertools.islice(self.pending_updates, limit))
+
+    def _generic(self, method: str, params: Dict[str, Any]) -> Any:
+        if method in ('answerCallbackQuery', 'setMyCommands', 'deleteMyCommands', 'setWebhook',
+                      'deleteWebhook', 'sendChatAction', 'close', 'logOut', 'setChatMenuButton'):
+            return True
+        if method == 'getWebhookInfo':
+            return {'url': "", 'has_custom_certificate': False, 'pending_update_count': 0}
+        raise BotAPIError(404, "Not Found: method not found")
+
+    def file_content(self, file_path: str) -> Optional[bytes]:
+        """photos/<file_id>.jpg manzilidagi fayl"""
+        file_id = file_path.rsplit('/', 1)[-1].rsplit('.', 1)[0]
+        return self.files.get(file_id)
+
+
+class FakeBotRequest(BaseRequest):
+    """PTB so'rovlarini shu jarayondagi FakeBotAPI ga yo'naltiruvchi request"""
+
+    def __init__(self, api: FakeBotAPI):
+        self.api = api
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+    async def do_request(self, url: str, method: str, request_data: Optional[RequestData] = None,
+                         *args, **kwargs) -> Tuple[int, bytes]:
+        # .../file/bot<token>/<file_path> - fayl yuklab olish
+        if '/file/bot' in url:
+            content = self.api.file_content(url.split('/file/bot', 1)[1].split('/', 1)[1])
+            if content is None:
+                return 404, json.dumps({'ok': False, 'error_code': 404, 'description': "Not Found"}).encode()
+            return 200, content
+
+        api_method = url.rsplit('/', 1)[-1]
+        params = request_data.parameters if request_data is not None else {}
+        # InstrumentedRequest dagi kabi span - replay Bot API chaqiruvlarini update bo'yicha sanaydi
+        with TRACER.start_span(f"telegram {api_method}", {'telegram.method': api_method}, KIND_CLIENT):
+            code, payload = await self.api.call(api_method, params)
+        return code, json.dumps(payload).encode()
+
+
+_REASONS = {200: "OK", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden", 404: "Not Found",
+            429: "Too Many Requests", 500: "Internal Server Error", 502: "Bad Gateway"}
+
+
+def parse_body(content_type: str, body: bytes) -> Dict[str, Any]:
+    """
+    PTB so'rov tanasi: form-urlencoded, multipart (fayl yuklash) yoki JSON
+
+    Form maydonlari satr bo'lib keladi (murakkablari JSON satr) - FakeBotAPI
+    usullari ikkala ko'rinishni ham qabul qiladi. Multipart dagi fayllar bytes.
+    """
+    if not body:
+        return {}
+    if content_type.startswith('application/json'):
+        return json.loads(body)
+    if content_type.startswith('multipart/form-data'):
+        message = BytesParser(policy=policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode('latin-1') + body
+        )
+        params: Dict[str, Any] = {}
+        for part in message.iter_parts():
+            name = part.get_param('name', header='content-disposition')
+            payload = part.get_payload(decode=True) or b''
+            params[name] = payload if part.get_filename() else payload.decode('utf-8')
+        return params
+    return {key: values[-1] for key, values in parse_qs(body.decode('utf-8'), keep_blank_values=True).items()}
+
+
+class FakeBotAPIServer:
+    """
+    FakeBotAPI ni HTTP orqali beruvchi server (keep-alive bilan)
+
+    Port konstruktorda band qilinadi - Application.builder().base_url(...)
+    server ishga tushishidan oldin ham tayyor bo'ladi.
+
+    Args:
+        api: Soxta Bot API holati
+        host: Tinglanadigan manzil
+        port: Port (0 - bo'sh port)
+    """
+
+    def __init__(self, api: Optional[FakeBotAPI] = None, host: str = "127.0.0.1", port: int = 0):
+        self.api = api or FakeBotAPI()
+        self.host = host
+        self._socket = socket.create_server((host, port))
+        self.port = self._socket.getsockname()[1]
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: set = set()
+
+    @property
+    def url(self) -> str:
+        """TELEGRAM_API_URL uchun manzil"""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def base_url(self) -> str:
+        return f"{self.url}/bot"
+
+    @property
+    def base_file_url(self) -> str:
+        return f"{self.url}/file/bot"
+
+    async def start(self) -> "FakeBotAPIServer":
+        self._server = await asyncio.start_server(self._handle, sock=self._socket)
+        logger.info(f"Fake Bot API listening on {self.url}")
+        return self
+
+    async def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.close()
+        # Keep-alive ulanishlar o'zi yopilmaydi
+        for writer in list(self._writers):
+            writer.close()
+        await self._server.wait_closed()
+        self._server = None
+
+    async def __aenter__(self) -> "FakeBotAPIServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                # Keep-alive: navbatdagi so'rovni cheksiz kutish (server to'xtaganda yopiladi)
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers: Dict[str, str] = {}
+                while True:
+                    line = await asyncio.wait_for(reader.readline(), READ_TIMEOUT)
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+                length = int(headers.get('content-length') or 0)
+                body = await asyncio.wait_for(reader.readexactly(length), READ_TIMEOUT) if length else b''
+
+                method, target = request_line.decode('latin-1').split()[:2]
+                status, content_type, payload = await self._dispatch(method, target, headers, body)
+                writer.write((
+                    f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                    f"Content-Type: {content_type}\r\n"
+                    f"Content-Length: {len(payload)}\r\n\r\n"
+                ).encode('latin-1') + payload)
+                await writer.drain()
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _dispatch(self, method: str, target: str, headers: Dict[str, str],
+                        body: bytes) -> Tuple[int, str, bytes]:
+        path, _, query = target.partition('?')
+
+        # /file/bot<token>/<file_path>
+        if path.startswith('/file/bot'):
+            content = self.api.file_content(path.split('/', 3)[-1])
+            if content is None:
+                return 404, "application/json", b'{"ok": false, "error_code": 404, "description": "Not Found"}'
+            return 200, "application/octet-stream", content
+
+        # /bot<token>/<method>
+        if path.startswith('/bot') and path.count('/') == 2:
+            params = {key: values[-1] for key, values in parse_qs(query).items()}
+            try:
+                params.update(parse_body(headers.get('content-type', ''), body))
+            except ValueError:
+                return 400, "application/json", json.dumps(
+                    {'ok': False, 'error_code': 400, 'description': "Bad Request: can't parse request"}).encode()
+            code, payload = await self.api.call(path.rsplit('/', 1)[-1], params)
+            return code, "application/json", json.dumps(payload).encode()
+
+        # Boshqaruv: foydalanuvchi xabari yoki update qo'shish, chat xabarlari
+        if path == '/_fake/updates' and method == 'POST':
+            data = json.loads(body or b'{}')
+            if 'update_id' not in data and 'text' in data:
+                user = {'id': int(data['chat_id']), 'is_bot': False, 'first_name': data.get('first_name', "Test")}
+                data = {'message': self.api.user_message(user, data['text'])}
+            return 200, "application/json", json.dumps(self.api.push_update(data)).encode()
+        if path.startswith('/_fake/chats/'):
+            chat_id = int(path.rsplit('/', 1)[-1])
+            return 200, "application/json", json.dumps(self.api.messages(chat_id), ensure_ascii=False).encode()
+
+        return 404, "application/json", b'{"ok": false, "error_code": 404, "description": "Not Found"}'
+
+
+async def serve(args: argparse.Namespace) -> None:
+    api = FakeBotAPI(latency=args.latency, jitter=args.jitter, global_rate=args.global_rate, chat_rate=args.chat_rate)
+    server = FakeBotAPIServer(api, args.host, args.port)
+    await server.start()
+    print(f"Fake Bot API: TELEGRAM_API_URL={server.url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local fake Telegram Bot API server")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=8081)
+    parser.add_argument('--latency', type=float, default=0.0, help="Har bir so'rov kechikishi (s)")
+    parser.add_argument('--jitter', type=float, default=0.0, help="Tasodifiy qo'shimcha kechikish (s)")
+    parser.add_argument('--global-rate', type=int, default=30, help="Soniyasiga xabarlar (barcha chatlar)")
+    parser.add_argument('--chat-rate', type=int, default=0, help="Soniyasiga xabarlar (bitta chat, 0 - cheklanmagan)")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+"""
+Fake OTLP Collector - Lokal sinov uchun OTLP/HTTP JSON qabul qiluvchi
+
+Ishlatish:
+    python -m tools.fake_otlp_collector --port 4318
+
+Bot TRACING_ENABLED=true va OTLP_ENDPOINT=http://localhost:4318/v1/traces
+bilan ishga tushiriladi. Kollektor kelgan span larni xotirada saqlaydi va
+har bir trace ni daraxt ko'rinishida (davomiyligi bilan) chop etadi -
+sekin update ning qaysi qismi (handler, SQL, Bot API) sekinligi ko'rinadi.
+Haqiqiy Jaeger/Tempo kerak emas.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional, Dict, List, Any, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def _value(value: Dict[str, Any]) -> Any:
+    if 'intValue' in value:
+        return int(value['intValue'])
+    for key in ('stringValue', 'boolValue', 'doubleValue'):
+        if key in value:
+            return value[key]
+    return None
+
+
+def flatten(payload: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """ExportTraceServiceRequest dan oddiy span lug'atlari ro'yxati"""
+    spans = []
+    for resource_spans in payload.get('resourceSpans', []):
+        resource = {item['key']: _value(item['value'])
+                    for item in resource_spans.get('resource', {}).get('attributes', [])}
+        for scope_spans in resource_spans.get('scopeSpans', []):
+            for span in scope_spans.get('spans', []):
+                spans.append({
+                    'trace_id': span['traceId'],
+                    'span_id': span['spanId'],
+                    'parent_id': span.get('parentSpanId'),
+                    'name': span['name'],
+                    'service': resource.get('service.name'),
+                    'duration_ms': (int(span['endTimeUnixNano']) - int(span['startTimeUnixNano'])) / 1e6,
+                    'start_ns': int(span['startTimeUnixNano']),
+                    'status': span.get('status', {}).get('code', 0),
+                    'attributes': {item['key']: _value(item['value']) for item in span.get('attributes', [])}
+                })
+    return spans
+
+
+def format_trace(spans: List[Dict[str, Any]]) -> str:
+    """Bitta trace ni daraxt ko'rinishida chiqarish"""
+    children: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+    ids = {span['span_id'] for span in spans}
+    for span in sorted(spans, key=lambda item: item['start_ns']):
+        parent = span['parent_id'] if span['parent_id'] in ids else None
+        children[parent].append(span)
+
+    lines = []
+
+    def walk(parent: Optional[str], depth: int) -> None:
+        for span in children.get(parent, []):
+            mark = " !" if span['status'] == 2 else ""
+            lines.append(f"{'  ' * depth}{span['name']}  {span['duration_ms']:.1f} ms{mark}")
+            walk(span['span_id'], depth + 1)
+
+    walk(None, 0)
+    return '\n'.join(lines)
+
+
+class FakeOTLPCollector:
+    """POST /v1/traces ni qabul qiluvchi lokal HTTP server"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 on_spans: Optional[Callable[[List[Dict[str, Any]]], None]] = None):
+        self.spans: List[Dict[str, Any]] = []
+        self.requests = 0
+        self.on_spans = on_spans
+        self._lock = threading.Lock()
+        collector = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                if self.path != '/v1/traces':
+                    return self._reply(404, b'{}')
+                try:
+                    spans = flatten(json.loads(body))
+                except (ValueError, KeyError):
+                    return self._reply(400, b'{"error": "invalid payload"}')
+                with collector._lock:
+                    collector.requests += 1
+                    collector.spans.extend(spans)
+                if collector.on_spans is not None:
+                    collector.on_spans(spans)
+                self._reply(200, b'{}')
+
+            def _reply(self, status: int, body: bytes):
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def endpoint(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1/traces"
+
+    def start(self) -> "FakeOTLPCollector":
+        self._thread = threading.Thread(target=self.server.serve_forever, kwargs={'poll_interval': 0.05}, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def traces(self) -> Dict[str, List[Dict[str, Any]]]:
+        """trace_id bo'yicha guruhlangan span lar"""
+        grouped: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        with self._lock:
+            for span in self.spans:
+                grouped[span['trace_id']].append(span)
+        return dict(grouped)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Local OTLP/HTTP JSON collector stand-in")
+    parser.add_argument('--host', default="127.0.0.1")
+    parser.add_argument('--port', type=int, default=4318)
+    args = parser.parse_args()
+
+    def print_roots(spans: List[Dict[str, Any]]) -> None:
+        # Trace ildiz span i oxirida tugaydi - shunda butun daraxt chop etiladi
+        for span in spans:
+            if span['parent_id'] is None:
+                trace = collector.traces()[span['trace_id']]
+                print(f"trace {span['trace_id']}")
+                print(format_trace(trace))
+                print()
+
+    collector = FakeOTLPCollector(args.host, args.port, on_spans=print_roots)
+    print(f"Listening on {collector.endpoint}")
+    try:
+        collector.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        collector.server.server_close()
+
+
+if __name__ == '__main__':
+    main()